@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Cache do Chromedriver
+================================
+Mede o tempo de inicialização do driver (uc.Chrome até a primeira página
+em branco) no fluxo padrão do undetected_chromedriver — que detecta a
+versão do Chrome, baixa e patcheia o chromedriver a cada chamada — e com o
+driver em cache por versão (componentes/driver_cache.py).
+
+O cache é apagado antes da primeira execução "com cache", então ela inclui
+o provisionamento; as demais mostram o custo de reaproveitar o binário.
+
+Uso:
+    python benchmarks/bench_driver_cache.py --execucoes 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import undetected_chromedriver as uc
+
+from componentes.driver_cache import CacheDriver, localizar_chrome
+
+
+def iniciar(argumentos: dict) -> float:
+    options = uc.ChromeOptions()
+    for argumento in ('--headless=new', '--no-sandbox', '--disable-gpu', '--disable-dev-shm-usage'):
+        options.add_argument(argumento)
+    inicio = time.perf_counter()
+    driver = uc.Chrome(options=options, use_subprocess=True, **argumentos)
+    try:
+        driver.get("about:blank")
+        return time.perf_counter() - inicio
+    finally:
+        driver.quit()
+
+
+def resumo(rotulo: str, tempos: list):
+    print(f"   {rotulo:<22} mediana {statistics.median(tempos):6.2f}s  "
+          f"mín. {min(tempos):6.2f}s  máx. {max(tempos):6.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do cache do chromedriver")
+    parser.add_argument("--execucoes", type=int, default=5)
+    args = parser.parse_args()
+
+    caminho_chrome = localizar_chrome()
+    if not caminho_chrome:
+        print("❌ Chrome não encontrado")
+        sys.exit(1)
+
+    sem_cache = [iniciar({}) for _ in range(args.execucoes)]
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        cache = CacheDriver(diretorio)
+        com_cache = []
+        provisionamentos = []
+        for _ in range(args.execucoes):
+            inicio = time.perf_counter()
+            driver, versao_principal = cache.provisionar(caminho_chrome)
+            provisionamentos.append(time.perf_counter() - inicio)
+            argumentos = {"driver_executable_path": driver, "browser_executable_path": caminho_chrome,
+                          "version_main": versao_principal}
+            com_cache.append(provisionamentos[-1] + iniciar(argumentos))
+
+    print(f"\n📊 Inicialização do driver (Chrome {versao_principal}, {args.execucoes} execuções)")
+    resumo("sem cache:", sem_cache)
+    resumo("com cache (1ª, fria):", com_cache[:1])
+    if len(com_cache) > 1:
+        resumo("com cache (quente):", com_cache[1:])
+        resumo("  só provisionamento:", provisionamentos[1:])
+
+
+if __name__ == "__main__":
+    main()
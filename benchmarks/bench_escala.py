@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Escala da Formatação e da Validação
+==============================================
+Gera dados sintéticos (benchmarks/dados_sinteticos.py) em 10², 10⁴ e 10⁶
+linhas e mede tempo e pico de memória (tracemalloc) de cada etapa que lê os
+arquivos de extracoes/:
+
+- WhatsAppSender.format_data (ranking PEF com meta);
+- WhatsAppSender.format_marcas;
+- DataValidator.clean_and_validate_extraction_data (linhas do ranking já lidas);
+- validate_meta_file (meta_dia.csv com histórico, sem o cache do MetaIndex).
+
+Para cada etapa calcula a inclinação log-log entre tamanhos consecutivos
+(1,0 = linear, 2,0 = quadrático) e sai com código 1 se alguma passar do
+limite — uma mudança que concatene strings em laço ou procure em lista a
+cada linha aparece aqui antes de chegar a um ranking grande.
+
+O tempo é o menor de --repeticoes execuções; a memória vem de uma execução
+à parte, porque o tracemalloc deixa o código mais lento. Com 10⁶ linhas a
+rodada completa (geração incluída) leva alguns minutos.
+
+Uso:
+    python benchmarks/bench_escala.py
+    python benchmarks/bench_escala.py --tamanhos 100 10000 100000 --limite 1.3 --saida /tmp/escala.json
+"""
+
+import argparse
+import csv
+import gc
+import json
+import math
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+
+# Sem teclado nem clipboard: o sender só formata
+os.environ.setdefault("WHATSAPP_DRY_RUN", os.path.join(tempfile.gettempdir(), "bench_escala_envios.jsonl"))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados_sinteticos import gerar
+from componentes.meta_index import invalidar_cache_metas
+from componentes.validators import data_validator, validate_meta_file
+from componentes.whatsapp_sender import WhatsAppSender
+
+
+def ler_linhas(caminho: str) -> list:
+    with open(caminho, "r", encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return list(reader)
+
+
+def _validar_metas(caminho: str) -> dict:
+    invalidar_cache_metas()
+    return validate_meta_file(caminho)
+
+
+def preparar_etapas(sender: WhatsAppSender, arquivos: dict, ciclo: int) -> OrderedDict:
+    """Etapa -> (função sem argumentos, conferência do resultado)"""
+    ranking = arquivos[f"pef_C{ciclo}"]
+    linhas = ler_linhas(ranking)
+    return OrderedDict([
+        ("format_data", (lambda: sender.format_data(ranking, f"*PEF - Ciclo {ciclo}*", "", 1_000_000.0, "PEF"),
+                         lambda r: r is not None)),
+        ("format_marcas", (lambda: sender.format_marcas(arquivos[f"marcas_C{ciclo}"], ciclo),
+                           lambda r: r is not None)),
+        ("clean_and_validate_extraction_data",
+         (lambda: data_validator.clean_and_validate_extraction_data(linhas, "pef"),
+          lambda r: len(r.cleaned_data["data"]) + len(r.errors) == len(linhas))),
+        ("validate_meta_file", (lambda: _validar_metas(arquivos["meta"]),
+                                lambda r: all(r[t]["is_valid"] for t in ("PEF", "EUD", "LOJA")))),
+    ])
+
+
+def medir(funcao, conferir, repeticoes: int):
+    """(menor tempo em s, pico de memória em bytes)"""
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+        if not conferir(resultado):
+            raise AssertionError("resultado inesperado")
+        del resultado
+    gc.collect()
+    tracemalloc.start()
+    funcao()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tempos), pico
+
+
+def inclinacoes(tamanhos: list, valores: list) -> list:
+    """Inclinação log-log entre cada par de tamanhos consecutivos"""
+    resultado = []
+    for (n1, v1), (n2, v2) in zip(zip(tamanhos, valores), zip(tamanhos[1:], valores[1:])):
+        resultado.append(math.log(max(v2, 1e-9) / max(v1, 1e-9)) / math.log(n2 / n1))
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Escala de format_data, format_marcas e validações")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--ciclos", type=int, default=3, help="Ciclos nos dados gerados")
+    parser.add_argument("--marcas", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limite", type=float, default=1.2,
+                        help="Maior inclinação log-log aceita (tempo e memória)")
+    parser.add_argument("--saida", help="Grava as medições (JSON) neste caminho")
+    args = parser.parse_args()
+
+    tamanhos = sorted(set(args.tamanhos))
+    sender = WhatsAppSender([])
+    medicoes = OrderedDict()  # etapa -> [(tempo, pico) por tamanho]
+    with tempfile.TemporaryDirectory() as base:
+        for tamanho in tamanhos:
+            inicio = time.perf_counter()
+            arquivos = gerar(os.path.join(base, str(tamanho)), tamanho, args.ciclos, args.marcas)
+            print(f"▶️ {tamanho} linha(s) por arquivo ({len(arquivos)} arquivos gerados em "
+                  f"{time.perf_counter() - inicio:.1f}s)")
+            # Ciclo do meio: o validate_meta_file consolida pelo maior, o format usa um qualquer
+            ciclo = 15 + args.ciclos // 2
+            for nome, (funcao, conferir) in preparar_etapas(sender, arquivos, ciclo).items():
+                tempo, pico = medir(funcao, conferir, args.repeticoes)
+                medicoes.setdefault(nome, []).append((tempo, pico))
+                print(f"   {nome:<38} {tempo * 1000:10.2f} ms  {pico / 1024:10.0f} KB")
+
+    print(f"\n📊 Inclinação log-log ({' → '.join(str(t) for t in tamanhos)} linhas; limite {args.limite})")
+    violacoes = []
+    relatorio = {"tamanhos": tamanhos, "limite": args.limite, "etapas": {}}
+    for nome, valores in medicoes.items():
+        tempos = [t for t, _ in valores]
+        picos = [p for _, p in valores]
+        inc_tempo = inclinacoes(tamanhos, tempos)
+        inc_memoria = inclinacoes(tamanhos, picos)
+        print(f"   {nome:<38} tempo {' '.join(f'{i:5.2f}' for i in inc_tempo)}   "
+              f"memória {' '.join(f'{i:5.2f}' for i in inc_memoria)}")
+        for grandeza, lista in (("tempo", inc_tempo), ("memória", inc_memoria)):
+            for (n1, n2), inclinacao in zip(zip(tamanhos, tamanhos[1:]), lista):
+                if inclinacao > args.limite:
+                    violacoes.append(f"{nome}: {grandeza} cresce com expoente {inclinacao:.2f} de {n1} para {n2} linhas")
+        relatorio["etapas"][nome] = {"tempo_s": tempos, "pico_bytes": picos,
+                                     "inclinacao_tempo": inc_tempo, "inclinacao_memoria": inc_memoria}
+
+    if args.saida:
+        with open(args.saida, "w", encoding="utf-8") as f:
+            json.dump(relatorio, f, ensure_ascii=False, indent=2)
+        print(f"💾 {args.saida}")
+    if violacoes:
+        print("❌ Crescimento super-linear:")
+        for linha in violacoes:
+            print(f"   {linha}")
+        sys.exit(1)
+    print("✅ Todas as etapas escalam linearmente")
+
+
+if __name__ == "__main__":
+    main()
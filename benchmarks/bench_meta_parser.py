@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Importação de Conversas Exportadas
+=============================================
+Gera uma conversa exportada sintética (formato Android do "Exportar conversa")
+com o tamanho pedido — ruído, mensagens com várias linhas e uma meta por dia —
+e mede a vazão (MB/s) e o pico de memória do importador
+(componentes/meta_parser.py) contra uma passada linha a linha, conferindo se
+as duas encontram todas as metas.
+
+Uso:
+    python benchmarks/bench_meta_parser.py --mb 200
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from componentes.meta_parser import extrair_metas_vd, importar_exportacao, iterar_mensagens
+
+RUIDO = [
+    "Bom dia pessoal!",
+    "Alguém sabe o horário da reunião?",
+    "Segue o link do treinamento: https://exemplo.com/treinamento",
+    "Pedido 12345 faturado ✅",
+    "Parabéns equipe 👏👏👏\nSeguimos firmes\nRumo ao topo",
+]
+
+
+def gerar_exportacao(caminho: str, tamanho_mb: float) -> int:
+    """Escreve a conversa e retorna quantos dias (cada um com uma meta VD de 2 ciclos) foram gerados"""
+    limite = int(tamanho_mb * 1024 * 1024)
+    dia = date(2020, 1, 1)
+    dias = 0
+    escritos = 0
+    with open(caminho, "w", encoding="utf-8", newline="\n") as f:
+        while escritos < limite:
+            data_str = dia.strftime("%d/%m/%Y")
+            linhas = [f"{data_str} 08:{i % 60:02d} - Membro {i % 37}: {RUIDO[i % len(RUIDO)]}\n" for i in range(200)]
+            linhas.insert(100, f"{data_str} 09:00 - Coordenação: Meta de hoje 🎯\nCICLO 14\nPEF R$ {dias + 1}.000,00\n"
+                               f"EUD R$ {dias + 2}.500,50\nCICLO 15\nPEF R$ 1.234,56\nEUDORA R$ 7.890\n")
+            bloco = "".join(linhas)
+            f.write(bloco)
+            escritos += len(bloco.encode("utf-8"))
+            dias += 1
+            dia += timedelta(days=1)
+    return dias
+
+
+def importar_linha_a_linha(caminho: str):
+    """Referência: decodifica e testa todas as mensagens (iterar_mensagens)"""
+    metas = {}
+    for data_mensagem, bruto in iterar_mensagens(caminho):
+        texto = bruto.decode("utf-8", errors="replace")
+        if "meta de hoje" not in texto.lower():
+            continue
+        for meta in extrair_metas_vd(texto):
+            metas[(meta["tipo"], data_mensagem.strftime("%d/%m/%Y"), meta.get("ciclo") or "")] = meta["valor"]
+    return metas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do importador de conversas exportadas")
+    parser.add_argument("--mb", type=float, default=100, help="Tamanho da conversa sintética")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "Conversa do WhatsApp com Grupo VD.txt")
+        dias = gerar_exportacao(caminho, args.mb)
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+
+        inicio = time.perf_counter()
+        referencia = importar_linha_a_linha(caminho)
+        duracao_linhas = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        metas = importar_exportacao(caminho, "VD")
+        duracao = time.perf_counter() - inicio
+
+        # Segunda passada só para o pico de memória (tracemalloc deixa a leitura mais lenta)
+        tracemalloc.start()
+        importar_exportacao(caminho, "VD")
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    esperadas = dias * 4  # PEF e EUD em 2 ciclos por dia
+    if len(metas) != esperadas or metas != referencia:
+        print(f"❌ Esperava {esperadas} metas, encontrou {len(metas)} (linha a linha: {len(referencia)})")
+        sys.exit(1)
+
+    print(f"\n✅ {len(metas)} metas em {dias} dias conferidas")
+    print(f"📊 {tamanho_mb:.1f} MB")
+    print(f"   linha a linha:        {duracao_linhas:6.2f}s  {tamanho_mb / duracao_linhas:8.1f} MB/s")
+    print(f"   importar_exportacao:  {duracao:6.2f}s  {tamanho_mb / duracao:8.1f} MB/s")
+    print(f"   Pico de memória do importador: {pico / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Perfil do Driver
+===========================
+Compara o perfil "padrao" com o perfil "rapido" (headless + bloqueio de
+recursos via CDP) em um site local que imita a retaguarda: HTML com tabela
+montada por JS, imagens, fontes, vídeo e um script de analytics lentos.
+
+Mede, por perfil:
+- carregamento da página (driver.get até o evento load)
+- extração total (load + espera da tabela + leitura das linhas)
+
+Uso:
+    python benchmarks/bench_perfil_driver.py --execucoes 5 --linhas 500 --atraso 0.3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from componentes.perfil_driver import (
+    PERFIL_PADRAO,
+    PERFIL_RAPIDO,
+    aplicar_opcoes_perfil,
+    aplicar_perfil_driver,
+)
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Tamanho (bytes) dos recursos sintéticos servidos pelo fixture
+TAMANHOS_RECURSOS = {
+    ".jpg": 400_000, ".png": 300_000, ".webp": 200_000, ".svg": 20_000,
+    ".woff2": 80_000, ".ttf": 150_000, ".mp4": 1_500_000, ".js": 60_000,
+}
+
+
+def criar_handler(atraso: float):
+    class FixtureHandler(SimpleHTTPRequestHandler):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, directory=FIXTURES_DIR, **kwargs)
+
+        def do_GET(self):
+            caminho = self.path.split("?", 1)[0]
+            if caminho == "/" or caminho.startswith("/retaguarda"):
+                self.path = "/retaguarda.html"
+                return super().do_GET()
+            if caminho == "/assets/fonte.css":
+                self.path = "/fonte.css"
+                return super().do_GET()
+            extensao = os.path.splitext(caminho)[1]
+            if extensao in TAMANHOS_RECURSOS:
+                # Recursos pesados/lentos, como CDNs e analytics de produção
+                time.sleep(atraso)
+                corpo = b"\0" * TAMANHOS_RECURSOS[extensao]
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(corpo)
+                return
+            self.send_error(404)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+def iniciar_servidor(atraso: float):
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), criar_handler(atraso))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+def criar_driver(perfil: str, headless_base: bool):
+    options = webdriver.ChromeOptions()
+    # Mesmas opções básicas dos extratores
+    options.add_argument('--start-maximized')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-extensions')
+    if headless_base and perfil == PERFIL_PADRAO:
+        options.add_argument('--headless=new')
+    aplicar_opcoes_perfil(options, perfil)
+    driver = webdriver.Chrome(options=options)
+    aplicar_perfil_driver(driver, perfil)
+    return driver
+
+
+def medir_execucao(driver, url: str, linhas: int):
+    inicio = time.perf_counter()
+    driver.get(url)  # page load strategy "normal": retorna após o evento load
+    carregamento = time.perf_counter() - inicio
+
+    WebDriverWait(driver, 30).until(
+        lambda d: len(d.find_elements(By.CSS_SELECTOR, ".flora-table-row")) >= linhas
+    )
+    dados = driver.execute_script(
+        "return Array.from(document.querySelectorAll('.flora-table-row'))"
+        ".map(r => Array.from(r.children).map(c => c.innerText));"
+    )
+    total = time.perf_counter() - inicio
+    assert len(dados) == linhas, f"esperava {linhas} linhas, obteve {len(dados)}"
+    return carregamento, total
+
+
+def executar_benchmark(execucoes: int, linhas: int, atraso: float, headless_base: bool):
+    servidor = iniciar_servidor(atraso)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/retaguarda?linhas={linhas}"
+    resultados = {}
+    try:
+        for perfil in (PERFIL_PADRAO, PERFIL_RAPIDO):
+            driver = criar_driver(perfil, headless_base)
+            try:
+                medir_execucao(driver, url, linhas)  # aquecimento
+                amostras = [medir_execucao(driver, url, linhas) for _ in range(execucoes)]
+            finally:
+                driver.quit()
+            resultados[perfil] = {
+                "carregamento": statistics.median(a[0] for a in amostras),
+                "total": statistics.median(a[1] for a in amostras),
+            }
+    finally:
+        servidor.shutdown()
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do perfil do driver (padrao x rapido)")
+    parser.add_argument("--execucoes", type=int, default=5)
+    parser.add_argument("--linhas", type=int, default=200)
+    parser.add_argument("--atraso", type=float, default=0.3, help="Atraso (s) de cada recurso pesado")
+    parser.add_argument("--headless-base", action="store_true",
+                        help="Roda o perfil padrão em headless (máquinas sem display)")
+    args = parser.parse_args()
+
+    resultados = executar_benchmark(args.execucoes, args.linhas, args.atraso, args.headless_base)
+
+    print(f"\n📊 Mediana de {args.execucoes} execuções ({args.linhas} linhas, atraso {args.atraso}s)")
+    print(f"{'perfil':<10} {'carregamento (s)':>18} {'extração total (s)':>20}")
+    for perfil, r in resultados.items():
+        print(f"{perfil:<10} {r['carregamento']:>18.3f} {r['total']:>20.3f}")
+    base, rapido = resultados[PERFIL_PADRAO], resultados[PERFIL_RAPIDO]
+    if rapido["total"] > 0:
+        print(f"\n⚡ Speedup extração total: {base['total'] / rapido['total']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Pipeline Completo (Reprodução Offline)
+=================================================
+Roda main.main e main_com_marcas.main de ponta a ponta contra uma gravação
+(componentes/replay.py) servida localmente, com o envio do WhatsApp em
+simulação, e mede o tempo de parede de cada etapa ("📊 ETAPA N" do log, ou
+o relatório do executor de etapas em log/dag/ quando o pipeline o grava).
+
+Cada pipeline roda em um processo próprio, em um diretório de trabalho
+temporário (extracoes/, log/ e outbox isolados do projeto), com o Chrome
+headless. Serve para medir qualquer mudança de performance em uma máquina
+Linux sem acesso à retaguarda nem ao WhatsApp.
+
+Uso:
+    python benchmarks/bench_pipeline.py gravacoes/2025-06-15 --latencia 0.05 --execucoes 3
+    python benchmarks/bench_pipeline.py gravacoes/2025-06-15 --pipeline main_com_marcas --manter
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from componentes.driver_cache import localizar_chrome
+from componentes.replay import ServidorReplay
+
+PIPELINES = ("main", "main_com_marcas")
+_ETAPA = re.compile(r"📊 ETAPA ([\d.]+): (.+)$")
+
+
+def porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def preparar_diretorio(base: str) -> str:
+    """Diretório de trabalho com os caminhos relativos que o pipeline espera"""
+    diretorio = tempfile.mkdtemp(prefix="pipeline_", dir=base)
+    # O envio e a captura são chamados como "python -m componentes.<modulo>" a partir do cwd
+    os.symlink(os.path.join(RAIZ, "componentes"), os.path.join(diretorio, "componentes"))
+    return diretorio
+
+
+def ambiente(servidor: ServidorReplay, diretorio: str, chrome: str) -> dict:
+    env = dict(os.environ)
+    env.update(servidor.ambiente())
+    env.update({
+        "PYTHONPATH": RAIZ + os.pathsep + env.get("PYTHONPATH", ""),
+        "PYTHONUNBUFFERED": "1",
+        "HEADLESS": "1",
+        "CIRCUIT_BREAKER": "0",
+        "LOGIN_PASSWORD": env.get("LOGIN_PASSWORD") or "replay",
+        "WHATSAPP_DRY_RUN": os.path.join(diretorio, "enviadas.jsonl"),
+        "WHATSAPP_CHROME": chrome,
+        "WHATSAPP_CHROMEDRIVER": "",
+        "WHATSAPP_USER_DATA": os.path.join(diretorio, "perfil_whatsapp"),
+        "WHATSAPP_DEBUG_PORT": str(porta_livre()),
+        "WHATSAPP_SESSAO_ARGS": "--headless=new --no-sandbox --disable-gpu --disable-dev-shm-usage",
+    })
+    env.pop("REPLAY_MODO", None)
+    return env
+
+
+def executar(pipeline: str, diretorio: str, env: dict, timeout: float) -> dict:
+    """Roda o pipeline e marca o início de cada etapa pela chegada da linha na saída"""
+    codigo = f"import sys, {pipeline}; sys.exit(0 if {pipeline}.main() else 1)"
+    marcas = OrderedDict()
+    inicio = time.perf_counter()
+    with open(os.path.join(diretorio, "saida.log"), "w", encoding="utf-8") as saida:
+        processo = subprocess.Popen([sys.executable, "-u", "-c", codigo], cwd=diretorio, env=env,
+                                    stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                    text=True, encoding="utf-8", errors="replace")
+        try:
+            for linha in processo.stdout:
+                saida.write(linha)
+                match = _ETAPA.search(linha.rstrip())
+                # A mesma etapa pode sair no log e no print: vale a primeira
+                if match and match.group(1) not in marcas:
+                    marcas[match.group(1)] = (match.group(2).strip(), time.perf_counter() - inicio)
+            processo.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            processo.kill()
+    total = time.perf_counter() - inicio
+
+    etapas = OrderedDict()
+    itens = list(marcas.items())
+    if itens:
+        etapas["- início (imports e configuração)"] = itens[0][1][1]
+    relatorio = _relatorio_dag(diretorio, pipeline)
+    if relatorio:
+        # Etapas concorrentes (componentes/dag.py): a duração medida pelo executor
+        for nome, dados in relatorio["etapas"].items():
+            etapas[f"{nome}{' *' if dados['critica'] else ''}"] = dados["duracao_s"]
+    else:
+        for i, (numero, (nome, comeco)) in enumerate(itens):
+            fim = itens[i + 1][1][1] if i + 1 < len(itens) else total
+            etapas[f"{numero} {nome}"] = fim - comeco
+    return {"codigo": processo.returncode, "total": total, "etapas": etapas,
+            "caminho_critico": relatorio["caminho_critico_s"] if relatorio else None,
+            "enviadas": _contar_linhas(env["WHATSAPP_DRY_RUN"]),
+            "comandos": _comandos_webdriver(diretorio, pipeline)}
+
+
+def _contar_linhas(caminho: str) -> int:
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+    except FileNotFoundError:
+        return 0
+
+
+def _relatorio_dag(diretorio: str, pipeline: str):
+    try:
+        with open(os.path.join(diretorio, "log", "dag", f"{pipeline}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _comandos_webdriver(diretorio: str, pipeline: str):
+    try:
+        with open(os.path.join(diretorio, "log", "rastreamento", f"{pipeline}.json"), "r", encoding="utf-8") as f:
+            return json.load(f)["comandos"]
+    except (FileNotFoundError, KeyError, json.JSONDecodeError):
+        return None
+
+
+def encerrar_sessao(diretorio: str, env: dict):
+    subprocess.run([sys.executable, "-m", "componentes.whatsapp_sessao", "encerrar"], cwd=diretorio, env=env,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline completo com reprodução offline")
+    parser.add_argument("gravacao", help="Diretório gravado com REPLAY_MODO=gravar")
+    parser.add_argument("--pipeline", choices=PIPELINES + ("ambos",), default="ambos")
+    parser.add_argument("--latencia", type=float, default=None, help="Atraso por resposta (padrão: REPLAY_LATENCIA)")
+    parser.add_argument("--execucoes", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=1800, help="Limite por execução (segundos)")
+    parser.add_argument("--manter", action="store_true", help="Mantém os diretórios de trabalho (logs, CSVs)")
+    args = parser.parse_args()
+
+    chrome = localizar_chrome()
+    if not chrome:
+        print("❌ Chrome não encontrado")
+        sys.exit(1)
+    pipelines = PIPELINES if args.pipeline == "ambos" else (args.pipeline,)
+
+    servidor = ServidorReplay(args.gravacao, args.latencia)
+    servidor.iniciar()
+    base = tempfile.mkdtemp(prefix="bench_pipeline_")
+    resultados = {}
+    try:
+        for pipeline in pipelines:
+            resultados[pipeline] = []
+            for execucao in range(1, args.execucoes + 1):
+                diretorio = preparar_diretorio(base)
+                env = ambiente(servidor, diretorio, chrome)
+                print(f"▶️ {pipeline} ({execucao}/{args.execucoes}) em {diretorio}")
+                try:
+                    resultados[pipeline].append(executar(pipeline, diretorio, env, args.timeout))
+                finally:
+                    encerrar_sessao(diretorio, env)
+    finally:
+        servidor.encerrar()
+        if not args.manter:
+            shutil.rmtree(base, ignore_errors=True)
+
+    print(f"\n📊 Reprodução de {args.gravacao} (latência {servidor.latencia * 1000:.0f} ms, "
+          f"{servidor.atendidas} resposta(s) servidas, {servidor.nao_gravadas} sem gravação)")
+    for pipeline, execucoes in resultados.items():
+        print(f"\n{pipeline} - mediana de {len(execucoes)} execução(ões)")
+        nomes = list(OrderedDict.fromkeys(nome for r in execucoes for nome in r["etapas"]))
+        for nome in nomes:
+            tempos = [r["etapas"][nome] for r in execucoes if nome in r["etapas"]]
+            print(f"   {nome:<60} {statistics.median(tempos):8.2f}s")
+        print(f"   {'total':<60} {statistics.median(r['total'] for r in execucoes):8.2f}s")
+        criticos = [r["caminho_critico"] for r in execucoes if r["caminho_critico"] is not None]
+        if criticos:
+            print(f"   {'caminho crítico (* acima)':<60} {statistics.median(criticos):8.2f}s")
+        ultima = execucoes[-1]
+        print(f"   código de saída {ultima['codigo']}, {ultima['enviadas']} envio(s) simulado(s), "
+              f"{ultima['comandos'] if ultima['comandos'] is not None else '?'} comando(s) WebDriver")
+    if args.manter:
+        print(f"\n📁 Diretórios de trabalho em {base}")
+
+
+if __name__ == "__main__":
+    main()
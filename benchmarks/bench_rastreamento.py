@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Idas e Voltas ao WebDriver
+=====================================
+Roda um relatório declarativo pelo motor de extração
+(componentes/job_engine.py) contra a retaguarda local
+(fixtures/retaguarda.html), com o driver instrumentado pelo rastreamento
+(componentes/rastreamento.py), e mostra comandos e tempo por etapa.
+
+Com --base, compara a quantidade de comandos por etapa com um rastreamento
+gravado antes e sai com código 1 se alguma etapa passou dela — uma mudança
+que volte a ler a grid célula por célula, por exemplo, aparece aqui.
+
+Uso:
+    python benchmarks/bench_rastreamento.py --linhas 500 --saida /tmp/rastreamento.json
+    python benchmarks/bench_rastreamento.py --base benchmarks/fixtures/rastreamento_base.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+# Sem histórico de latências nem circuit breaker gravados no diretório do projeto
+os.environ.setdefault("TIMEOUTS_ADAPTATIVOS", "0")
+os.environ.setdefault("CIRCUIT_BREAKER", "0")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+
+from bench_perfil_driver import iniciar_servidor
+from componentes import job_engine
+from componentes.config import REPORT_JOBS
+from componentes.rastreamento import Rastreador, comparar, etapa, instrumentar
+
+JOB_FIXTURE = {
+    "login": "fixture",
+    "navegacao": [
+        {"acao": "abrir", "url": "{url}"},
+        {"acao": "aguardar_presente", "seletor": "#tabela .flora-table-row"},
+    ],
+    "tabela": {"seletor": "#tabela", "linha": ".flora-table-row", "celula": ".flora-table-cell", "timeout": 15},
+    "colunas": [
+        {"nome": "Código", "indice": 0},
+        {"nome": "Gerência", "indice": 1},
+        {"nome": "Valor", "indice": 2},
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Comandos do WebDriver por etapa em um relatório de fixture")
+    parser.add_argument("--linhas", type=int, default=200)
+    parser.add_argument("--saida", help="Grava o rastreamento (JSON) neste caminho")
+    parser.add_argument("--base", help="Rastreamento de referência para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.0)
+    args = parser.parse_args()
+
+    servidor = iniciar_servidor(0)
+    url = f"http://127.0.0.1:{servidor.server_address[1]}/retaguarda?linhas={args.linhas}"
+    REPORT_JOBS["fixture"] = JOB_FIXTURE
+
+    options = webdriver.ChromeOptions()
+    for argumento in ('--headless=new', '--no-sandbox', '--disable-gpu', '--disable-dev-shm-usage',
+                      '--blink-settings=imagesEnabled=false'):
+        options.add_argument(argumento)
+    rastreador = Rastreador()
+    with etapa("navegador"):
+        driver = instrumentar(webdriver.Chrome(options=options), rastreador)
+    try:
+        linhas = job_engine.executar_job(driver, "fixture", url=url)
+    finally:
+        driver.quit()
+        servidor.shutdown()
+
+    assert len(linhas) == args.linhas, f"esperava {args.linhas} linhas, obteve {len(linhas)}"
+    resumo = rastreador.resumo()
+    print(f"\n📊 {len(linhas)} linhas: {resumo['comandos']} comando(s), {resumo['tempo_s']:.3f}s em round trips")
+    for nome, dados in resumo["etapas"].items():
+        comandos = ", ".join(f"{c}={d['qtd']}" for c, d in dados["por_comando"].items())
+        print(f"   {nome:<28} {dados['comandos']:>5} {dados['tempo_s']:>8.3f}s  {comandos}")
+
+    if args.saida:
+        print(f"💾 {rastreador.gravar(args.saida)}")
+    if args.base:
+        with open(args.base, "r", encoding="utf-8") as f:
+            regressoes = comparar(json.load(f), resumo, args.tolerancia)
+        if regressoes:
+            print("❌ Mais idas e voltas ao WebDriver que a base:")
+            for linha in regressoes:
+                print(f"   {linha}")
+            sys.exit(1)
+        print("✅ Nenhuma etapa passou da base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Relatórios em Imagem
+===============================
+Gera rankings sintéticos (benchmarks/dados_sinteticos.py) de PEF e EUD para
+alguns ciclos e mede quanto componentes/render_relatorio.py leva para
+renderizar cada PNG, com a primeira imagem (fontes e medidas ainda fora do
+cache) separada das demais.
+
+Sai com código 1 se alguma imagem passar de
+REPORT_IMAGE_CONFIG["segundos_por_imagem"] (ou de --limite) — a mesma meta
+que o WhatsAppSender.gerar_imagens avisa no log. Requer Pillow.
+
+Uso:
+    python benchmarks/bench_render_relatorio.py --linhas 2000 --ciclos 6
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dados_sinteticos import gerar
+from componentes.config import REPORT_IMAGE_CONFIG
+from componentes.render_relatorio import ler_resultados, pillow_disponivel, renderizar_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de renderização dos relatórios em imagem")
+    parser.add_argument("--linhas", type=int, default=2000, help="Linhas por ranking")
+    parser.add_argument("--ciclos", type=int, default=6)
+    parser.add_argument("--limite", type=float, default=REPORT_IMAGE_CONFIG["segundos_por_imagem"],
+                        help="Maior tempo aceito por imagem (s)")
+    args = parser.parse_args()
+
+    if not pillow_disponivel():
+        print("❌ Pillow não está instalado")
+        sys.exit(1)
+    REPORT_IMAGE_CONFIG["enabled"] = True
+
+    tempos = []
+    with tempfile.TemporaryDirectory() as base:
+        arquivos = gerar(base, args.linhas, args.ciclos, marcas=5)
+        rankings = [caminho for chave, caminho in sorted(arquivos.items()) if chave.startswith(("pef_", "eud_"))]
+        for csv_file in rankings:
+            inicio = time.perf_counter()
+            resultados = ler_resultados(csv_file)
+            destino = renderizar_csv(csv_file, os.path.basename(csv_file), meta=1_000_000.0,
+                                     destino=os.path.splitext(csv_file)[0] + ".png", resultados=resultados)
+            tempos.append(time.perf_counter() - inicio)
+            if destino is None:
+                print(f"❌ {os.path.basename(csv_file)} não foi renderizado")
+                sys.exit(1)
+
+    print(f"\n📊 {len(tempos)} imagem(ns), {args.linhas} linhas cada")
+    print(f"  primeira (cache frio): {tempos[0] * 1000:8.1f} ms")
+    if len(tempos) > 1:
+        demais = tempos[1:]
+        print(f"  demais (média):        {sum(demais) / len(demais) * 1000:8.1f} ms")
+    print(f"  total:                 {sum(tempos) * 1000:8.1f} ms")
+    if max(tempos) > args.limite:
+        print(f"❌ Imagem mais lenta levou {max(tempos):.2f}s (limite {args.limite}s)")
+        sys.exit(1)
+    print(f"✅ Todas as imagens abaixo de {args.limite}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Coleta dos Resultados da Pesquisa do WhatsApp
+========================================================
+Compara a leitura antiga (find_element/get_attribute por resultado e por span)
+com a coleta em um único execute_script (componentes/whatsapp_dom.py), usando
+uma página salva da pesquisa de mensagens (fixtures/whatsapp_busca.html).
+
+Uso:
+    python benchmarks/bench_whatsapp_dom.py --execucoes 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+from componentes.whatsapp_dom import SELETOR_RESULTADOS_BUSCA, coletar_resultados_busca
+
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "whatsapp_busca.html"
+
+
+def coletar_legado(driver):
+    """Leitura como era feita em captura_metadia (uma chamada ao WebDriver por atributo)"""
+    container = driver.find_element(By.CSS_SELECTOR, SELETOR_RESULTADOS_BUSCA)
+    saida = []
+    for resultado in container.find_elements(By.XPATH, "./div"):
+        elemento_periodo = resultado.find_element(By.CSS_SELECTOR, "div._ak8l > div._ak8o")
+        elemento_mensagem = resultado.find_element(By.CSS_SELECTOR, "div._ak8l > div._ak8j")
+        texto_periodo = elemento_periodo.text.strip()
+        spans_mensagem = elemento_mensagem.find_elements(By.CSS_SELECTOR, "span")
+        partes = []
+        for s in spans_mensagem:
+            if s.get_attribute("class") and ("_ao3e" in s.get_attribute("class") or s.get_attribute("dir")):
+                partes.append(s.text.strip())
+        if partes:
+            texto_mensagem = " ".join(partes)
+        else:
+            texto_mensagem = " ".join([s.text.strip() for s in spans_mensagem if s.text.strip()])
+        saida.append((texto_periodo, texto_mensagem))
+    return saida
+
+
+def medir(funcao, driver, execucoes):
+    tempos = []
+    resultado = None
+    for _ in range(execucoes):
+        inicio = time.perf_counter()
+        resultado = funcao(driver)
+        tempos.append(time.perf_counter() - inicio)
+    return statistics.median(tempos), resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da coleta dos resultados da pesquisa do WhatsApp")
+    parser.add_argument("--execucoes", type=int, default=10)
+    args = parser.parse_args()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(FIXTURE.as_uri())
+        coletar_legado(driver)  # aquecimento
+        tempo_legado, legado = medir(coletar_legado, driver, args.execucoes)
+        tempo_novo, novo = medir(coletar_resultados_busca, driver, args.execucoes)
+    finally:
+        driver.quit()
+
+    if legado != novo:
+        print("❌ Resultados divergentes entre as duas coletas:")
+        for antigo, atual in zip(legado, novo):
+            if antigo != atual:
+                print(f"  legado={antigo!r}\n  novo  ={atual!r}")
+        sys.exit(1)
+
+    print(f"\n📊 {len(novo)} resultados, mediana de {args.execucoes} execuções")
+    print(f"  find_element/get_attribute: {tempo_legado * 1000:8.1f} ms")
+    print(f"  execute_script único:       {tempo_novo * 1000:8.1f} ms")
+    if tempo_novo > 0:
+        print(f"\n⚡ Speedup: {tempo_legado / tempo_novo:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Leitura das Mensagens pelo IndexedDB
+===============================================
+Mede a consulta das mensagens de hoje de um chat direto do IndexedDB
+(componentes/whatsapp_store.py) em uma página local que cria o banco
+"model-storage" com mensagens falsas (fixtures/whatsapp_store.html) e
+confere o filtro por chat e por data.
+
+Uso:
+    python benchmarks/bench_whatsapp_store.py --mensagens 20000 --execucoes 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.support.ui import WebDriverWait
+
+from componentes.whatsapp_store import ler_mensagens_hoje
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+CHAT_VD = "120363000000000001@g.us"
+CHAT_LOJA = "120363000000000002@g.us"
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def conferir(mensagens, hoje, esperada, ausente):
+    assert all(t >= hoje for t, _ in mensagens), "mensagem anterior a hoje retornada"
+    assert [t for t, _ in mensagens] == sorted((t for t, _ in mensagens), reverse=True), "ordem incorreta"
+    textos = [texto for _, texto in mensagens]
+    assert any(esperada in texto for texto in textos), f"mensagem esperada ausente: {esperada}"
+    assert ausente is None or not any(ausente in texto for texto in textos), f"mensagem de ontem retornada: {ausente}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da leitura de mensagens pelo IndexedDB")
+    parser.add_argument("--mensagens", type=int, default=20000, help="Mensagens de ruído no banco")
+    parser.add_argument("--execucoes", type=int, default=10)
+    args = parser.parse_args()
+
+    servidor = ThreadingHTTPServer(("127.0.0.1", 0), partial(_Handler, directory=FIXTURES_DIR))
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-gpu')
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(f"http://127.0.0.1:{servidor.server_address[1]}/whatsapp_store.html?mensagens={args.mensagens}")
+        WebDriverWait(driver, 120).until(lambda d: d.execute_script("return window.__storePronto === true"))
+        hoje = driver.execute_script("return window.__storeHoje")
+
+        vd = ler_mensagens_hoje(driver, CHAT_VD, desde=hoje)
+        loja = ler_mensagens_hoje(driver, CHAT_LOJA, desde=hoje)
+        conferir(vd, hoje, "CICLO 14: PEF R$ 125.430,50", "Ciclo 13")
+        conferir(loja, hoje, "Meta do dia 15/06 45.300", "01/01")
+
+        tempos = []
+        for _ in range(args.execucoes):
+            inicio = time.perf_counter()
+            ler_mensagens_hoje(driver, CHAT_VD, desde=hoje)
+            tempos.append(time.perf_counter() - inicio)
+    finally:
+        driver.quit()
+        servidor.shutdown()
+
+    print(f"\n✅ Filtro conferido: VD {len(vd)} mensagem(ns) de hoje, LOJA {len(loja)}")
+    print(f"📊 {args.mensagens} mensagens no banco, mediana de {args.execucoes} consultas: "
+          f"{statistics.median(tempos) * 1000:.1f} ms (máx. {max(tempos) * 1000:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Gerador de Dados Sintéticos
+===========================
+Escreve, em um diretório, arquivos com o mesmo formato dos que a extração e a
+captura gravam em extracoes/, no tamanho pedido:
+
+- resultado_loja.csv (Loja,GMV — valor em texto, como a coluna "moeda");
+- resultado_pef_C<ciclo>.csv e resultado_eud_C<ciclo>.csv (VD,Valor Praticado);
+- resultado_marcas_C<ciclo>.csv (Marca,Valor — BOT, OUI e QDB mais outras marcas);
+- meta_dia.csv (tipo;data;ciclo;valor — histórico de vários dias, com as
+  metas de hoje para todos os ciclos).
+
+Cada arquivo tem o número de linhas pedido. Uma fração das linhas vem suja
+como na retaguarda (valor vazio, texto no lugar do número, nome com espaços
+sobrando, 3 colunas no meta_dia.csv), e os dados são determinísticos pela
+semente — o mesmo comando gera sempre os mesmos arquivos.
+
+Uso:
+    python benchmarks/dados_sinteticos.py /tmp/dados --linhas 1000000 --ciclos 6 --marcas 50
+"""
+
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+MARCAS_FIXAS = ("BOT", "OUI", "QDB")
+_CIDADES = ("CENTRO", "NORTE", "SUL", "LESTE", "OESTE", "SHOPPING", "AEROPORTO", "RODOVIARIA")
+_SOBRENOMES = ("SILVA", "SANTOS", "OLIVEIRA", "SOUZA", "LIMA", "PEREIRA", "COSTA", "RODRIGUES", "ALMEIDA")
+
+
+def _valor(aleatorio: random.Random) -> float:
+    # Cauda longa: poucos VDs concentram a maior parte da receita
+    return round(aleatorio.lognormvariate(8, 1.5), 2)
+
+
+def _sujar(aleatorio: random.Random, sujeira: float) -> bool:
+    return aleatorio.random() < sujeira
+
+
+def _gravar(caminho: str, cabecalho: List[str], linhas, delimitador: str = ","):
+    with open(caminho, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=delimitador)
+        if cabecalho:
+            writer.writerow(cabecalho)
+        writer.writerows(linhas)
+
+
+def linhas_ranking(quantidade: int, aleatorio: random.Random, sujeira: float = 0.01):
+    """Linhas VD,Valor Praticado (valor float, como grava o job_engine)"""
+    for i in range(quantidade):
+        nome = f"{10000 + i} - GERENCIA {aleatorio.choice(_SOBRENOMES)} {aleatorio.choice(_CIDADES)}"
+        valor = _valor(aleatorio)
+        if _sujar(aleatorio, sujeira):
+            nome, valor = f"  {nome}  ", aleatorio.choice(("", "-", "N/D"))
+        yield [nome, valor]
+
+
+def linhas_loja(quantidade: int, aleatorio: random.Random, sujeira: float = 0.01):
+    """Linhas Loja,GMV (valor já limpo em texto, como a coluna "moeda")"""
+    for i in range(quantidade):
+        nome = f"LOJA {i + 1} {aleatorio.choice(_CIDADES)}"
+        valor = f"{_valor(aleatorio):.2f}"
+        if _sujar(aleatorio, sujeira):
+            valor = aleatorio.choice(("", "R$ -"))
+        yield [nome, valor]
+
+
+def linhas_marcas(quantidade: int, marcas: int, aleatorio: random.Random):
+    """Linhas Marca,Valor: BOT/OUI/QDB primeiro e as demais marcas até completar a quantidade"""
+    for i in range(quantidade):
+        if i < len(MARCAS_FIXAS):
+            marca = MARCAS_FIXAS[i]
+        else:
+            # Mais linhas que marcas: a mesma marca repete (a última leitura vence no format_marcas)
+            marca = f"M{(i - len(MARCAS_FIXAS)) % max(marcas - len(MARCAS_FIXAS), 1):03d}"
+        yield [marca, round(aleatorio.uniform(1000, 500000), 2)]
+
+
+def linhas_meta(quantidade: int, ciclos: List[int], aleatorio: random.Random, hoje: Optional[date] = None,
+                sujeira: float = 0.01):
+    """Histórico tipo;data;ciclo;valor terminando nas metas de hoje (PEF/EUD por ciclo e LOJA)"""
+    hoje = hoje or date.today()
+    de_hoje = [["PEF", hoje, c] for c in ciclos] + [["EUD", hoje, c] for c in ciclos] + [["LOJA", hoje, ""]]
+    por_dia = len(de_hoje)
+    historico = max(quantidade - por_dia, 0)
+    for i in range(historico):
+        dia = hoje - timedelta(days=1 + (historico - i) // por_dia)
+        tipo, _, ciclo = de_hoje[i % por_dia]
+        linha = [tipo, dia.strftime("%d/%m/%Y"), ciclo, _valor(aleatorio)]
+        if _sujar(aleatorio, sujeira):
+            # Linha antiga de 3 colunas (tipo;data;valor)
+            linha = [tipo, linha[1], linha[3]]
+        yield linha
+    for tipo, dia, ciclo in de_hoje[:quantidade]:
+        yield [tipo, dia.strftime("%d/%m/%Y"), ciclo, _valor(aleatorio)]
+
+
+def gerar(diretorio: str, linhas: int, ciclos: int = 3, marcas: int = 20, semente: int = 42,
+          sujeira: float = 0.01) -> Dict[str, str]:
+    """Gera todos os arquivos em `diretorio`.
+
+    Returns:
+        dict: nome lógico ("loja", "pef_C15", "marcas_C15", "meta"...) -> caminho
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    aleatorio = random.Random(semente)
+    lista_ciclos = list(range(15, 15 + ciclos))
+    arquivos = {}
+
+    arquivos["loja"] = os.path.join(diretorio, "resultado_loja.csv")
+    _gravar(arquivos["loja"], ["Loja", "GMV"], linhas_loja(linhas, aleatorio, sujeira))
+    for ciclo in lista_ciclos:
+        for indicador in ("pef", "eud"):
+            chave = f"{indicador}_C{ciclo}"
+            arquivos[chave] = os.path.join(diretorio, f"resultado_{chave}.csv")
+            _gravar(arquivos[chave], ["VD", "Valor Praticado"], linhas_ranking(linhas, aleatorio, sujeira))
+        chave = f"marcas_C{ciclo}"
+        arquivos[chave] = os.path.join(diretorio, f"resultado_{chave}.csv")
+        _gravar(arquivos[chave], ["Marca", "Valor"], linhas_marcas(linhas, marcas, aleatorio))
+    arquivos["meta"] = os.path.join(diretorio, "meta_dia.csv")
+    _gravar(arquivos["meta"], [], linhas_meta(linhas, lista_ciclos, aleatorio, sujeira=sujeira), delimitador=";")
+    return arquivos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera CSVs de ranking, marcas e metas sintéticos")
+    parser.add_argument("diretorio")
+    parser.add_argument("--linhas", type=int, default=10000, help="Linhas por arquivo")
+    parser.add_argument("--ciclos", type=int, default=3)
+    parser.add_argument("--marcas", type=int, default=20)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--sujeira", type=float, default=0.01, help="Fração de linhas inválidas")
+    args = parser.parse_args()
+
+    arquivos = gerar(args.diretorio, args.linhas, args.ciclos, args.marcas, args.semente, args.sujeira)
+    total_mb = sum(os.path.getsize(c) for c in arquivos.values()) / (1024 * 1024)
+    print(f"✅ {len(arquivos)} arquivo(s), {args.linhas} linha(s) cada, {total_mb:.1f} MB em {args.diretorio}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,7 +9,7 @@ call conda activate "VARIÁVEL DE AMBIENTE"
 
 echo.
 echo Executando captura_metadia.py...
-python componentes/captura_metadia.py
+python -m componentes.captura_metadia
 if %ERRORLEVEL% NEQ 0 (
     echo Erro ao executar captura_metadia.py
     pause
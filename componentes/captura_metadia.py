@@ -11,17 +11,28 @@ from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+
+from componentes.metrics import meta_capture_attempts_total, escrever_arquivo_metricas
+from componentes.rastreamento import etapa, gravar_rastreamento, instrumentar
+from componentes.replay import gravar_whatsapp, mensagens_de_resultados
+from componentes.logging_setup import configurar_logging_raiz
+from componentes.whatsapp_dom import coletar_resultados_busca, SELETOR_RESULTADOS_BUSCA
+from componentes.meta_parser import TERMOS_BUSCA, extrair_meta_loja, extrair_metas_vd
+from componentes.whatsapp_store import StoreIndisponivel, chat_configurado, ler_mensagens_hoje
+from componentes.whatsapp_sessao import PerfilEmUso, SessaoIndisponivel, obter_sessao, perfil_em_uso
+from componentes.config import META_CONFIG, WHATSAPP_STORE_CONFIG, WHATSAPP_SESSAO_CONFIG
 
 # --- CONFIGURAÇÕES CENTRALIZADAS ---
 CHROME_PATH = r"CAMINHO DO SEU CHROMEDRIVERWEB"
-USER_DATA_DIR = r"CAMINHO DO SEU GOOGLE CHROME PARA CAPUTRA DE PERFIL"
-PROFILE_DIR = "Profile 1"
-CHROMEDRIVER_PATH = r"CAMINHO DO SEU CHROMEDRIVERWEB"
+USER_DATA_DIR = WHATSAPP_SESSAO_CONFIG["user_data_dir"]
+PROFILE_DIR = WHATSAPP_SESSAO_CONFIG["profile_dir"]
+CHROMEDRIVER_PATH = WHATSAPP_SESSAO_CONFIG["chromedriver_path"]
 
+# Links de convite de META_CONFIG (sobrepostos por tenant em TENANT_SOBREPOSICOES)
 GRUPOS = [
-    ("VD", "LINK DO 1º GRUPO"), 
-    ("LOJA", "LINK DO 2º CASO NECESSÁRIO")
+    ("VD", f"{WHATSAPP_SESSAO_CONFIG['url']}accept?code={META_CONFIG['vd_group_link']}"),
+    ("LOJA", f"{WHATSAPP_SESSAO_CONFIG['url']}accept?code={META_CONFIG['loja_group_link']}")
 ]
 
 LOG_FILE = 'log/captura_metaDia.log'
@@ -188,18 +199,34 @@ if _dados_flag:
 else:
     print("ℹ️ Nenhum flag encontrado. Iniciando captura de metas.")
 
-# --- CONFIGURAÇÃO DE LOGGING ---
-os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
-logging.basicConfig(
-    filename=LOG_FILE,
-    filemode='w',  # Agora sobrescreve o log a cada execução
-    level=logging.INFO, # Mude para logging.DEBUG se precisar de mais detalhes
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    encoding='utf-8'
-)
-
 def configurar_driver():
+    """Retorna o WebDriver do WhatsApp Web.
+
+    Com a sessão única ativa (WHATSAPP_SESSAO_CONFIG), conecta ao Chrome de
+    longa duração já sincronizado; senão, abre um Chrome com o perfil dedicado.
+    Se o perfil já estiver aberto em outro Chrome (ex.: a sessão rodando mas sem
+    aceitar a conexão), levanta PerfilEmUso em vez de abrir um segundo Chrome nele.
+    Os comandos do driver entram no rastreamento (componentes/rastreamento.py).
+    """
+    sessao = obter_sessao()
+    if sessao:
+        try:
+            driver = sessao.conectar()
+            # Mesmo sem ficar pronta a sessão é usada: o perfil já está aberto nela
+            instrumentar(driver)
+            with etapa("whatsapp:sessao"):
+                sessao.aguardar_pronto()
+            return driver
+        except PerfilEmUso:
+            raise
+        except SessaoIndisponivel as e:
+            logging.warning(f"⚠️ Sessão única do WhatsApp indisponível ({e}). Abrindo Chrome dedicado.")
+    return instrumentar(_iniciar_chrome_dedicado())
+
+def _iniciar_chrome_dedicado():
     """Configura e retorna uma instância do WebDriver do Chrome."""
+    if perfil_em_uso(USER_DATA_DIR):
+        raise PerfilEmUso(f"Perfil {USER_DATA_DIR} já está aberto em outro Chrome - feche-o antes da captura")
     options = webdriver.ChromeOptions()
     options.binary_location = CHROME_PATH
     options.add_argument(f"--profile-directory={PROFILE_DIR}")
@@ -221,160 +248,6 @@ def configurar_driver():
     
     return driver
 
-# --- Funções de extração ---
-def extrair_metas_vd(texto):
-    """Extrai metas PEF e EUD, suportando múltiplos ciclos (ex.: CICLO 11, CICLO 12).
-
-    Retorna: lista de dicts no formato:
-      [{ 'tipo': 'PEF'|'EUD', 'ciclo': '11'|'12'|'' , 'valor': float }]
-    """
-    # Normaliza quebras de linha e espaços
-    texto_norm = re.sub(r"\u00A0", " ", texto)  # non-breaking space
-    # Identifica blocos por ciclo: "CICLO NN"
-    ciclo_pattern = re.compile(r"(?i)CICLO\s*(\d{1,2})")
-    # Aceita 1 ou 2 casas decimais (ou nenhuma) e tanto EUD quanto EUDORA
-    # Agora aceita R$ ou apenas R (para casos onde o $ é omitido)
-    valor_pattern_pef = re.compile(r"(?i)PEF\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)")
-    valor_pattern_eud = re.compile(r"(?i)\bEUD(?:ORA)?\b\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)")
-
-    def parse_valor(br):
-        try:
-            if ',' in br:
-                inteiro, dec = br.split(',')
-                if dec == '':
-                    dec = '00'
-                elif len(dec) == 1:
-                    dec = dec + '0'
-            else:
-                inteiro, dec = br, '00'
-            return float(inteiro.replace('.', '') + '.' + dec)
-        except Exception:
-            logging.warning(f"Falha ao converter valor '{br}'")
-            return None
-
-    metas = []
-
-    # Encontra todos os cabeçalhos de ciclo e delimita blocos
-    matches = list(ciclo_pattern.finditer(texto_norm))
-    if matches:
-        for idx, m in enumerate(matches):
-            ciclo = m.group(1)
-            start = m.end()
-            end = matches[idx + 1].start() if idx + 1 < len(matches) else len(texto_norm)
-            bloco = texto_norm[start:end]
-
-            # Extrai valores dentro do bloco do ciclo
-            pef_m = valor_pattern_pef.search(bloco)
-            eud_m = valor_pattern_eud.search(bloco)
-
-            if pef_m:
-                v = parse_valor(pef_m.group(1))
-                if v is not None:
-                    metas.append({'tipo': 'PEF', 'ciclo': ciclo, 'valor': v})
-                    logging.debug(f"Meta PEF extraída (C{ciclo}): {v}")
-            if eud_m:
-                v = parse_valor(eud_m.group(1))
-                if v is not None:
-                    metas.append({'tipo': 'EUD', 'ciclo': ciclo, 'valor': v})
-                    logging.debug(f"Meta EUD extraída (C{ciclo}): {v}")
-
-    else:
-        # Fallback: sem cabeçalho de ciclo, aplica regex simples (ciclo vazio)
-        # Regex flexível que aceita R$ ou apenas R
-        pef_m = re.search(r"(?i)PEF\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)", texto_norm)
-        if pef_m:
-            v = parse_valor(pef_m.group(1))
-            if v is not None:
-                metas.append({'tipo': 'PEF', 'ciclo': '', 'valor': v})
-                logging.debug(f"Meta PEF extraída (sem ciclo): {v}")
-        
-        eud_m = re.search(r"(?i)\bEUD(?:ORA)?\b\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)", texto_norm)
-        if eud_m:
-            v = parse_valor(eud_m.group(1))
-            if v is not None:
-                metas.append({'tipo': 'EUD', 'ciclo': '', 'valor': v})
-                logging.debug(f"Meta EUD extraída (sem ciclo): {v}")
-
-    logging.debug(f"Metas VD extraídas: {metas}")
-    return metas
-
-def extrair_meta_loja(texto):
-    """Extrai a meta LOJA considerando formatos antigos e novos.
-
-    Suporta:
-    - Formato antigo: "Meta de hoje DD/MM R$50.000,00"
-    - Formato novo: "Meta do dia DD/MM 43.000" (sem R$, decimais opcionais)
-    - Formato com "Nossa meta do dia DD/MM/YYYY" e "Total: XX.XXX"
-    """
-    # Regex flexível para capturar:
-    # 1. "Meta de hoje", "Meta do dia" ou "Nossa meta do dia"
-    # 2. Data no formato DD/MM ou DD/MM/YYYY
-    # 3. Valor com ou sem R$, com ponto para milhares e vírgula opcional para decimais
-    meta_regex = r'(?i)(?:Nossa\s+)?Meta\s+(?:de\s+hoje|do\s+dia)\s+(\d{2}/\d{2}(?:/\d{4})?)\s*(?:R?\$?\s*)?([\d\.]+(?:,\d{1,2})?)'
-    match = re.search(meta_regex, texto, re.IGNORECASE)
-    
-    if match:
-        try:
-            valor_str = match.group(3)  # O valor está no grupo 3 agora
-            # Normaliza números para o formato float independente do formato de entrada:
-            # R$50.000,00 -> 50000.00
-            # R$50.000 -> 50000.00
-            # 43.000 -> 43000.00
-            # 43000 -> 43000.00
-            
-            # Remove caracteres não numéricos (exceto . e ,)
-            valor_str = re.sub(r'[^\d\.,]', '', valor_str)
-            
-            # Trata caso com vírgula decimal
-            if ',' in valor_str:
-                inteiro, dec = valor_str.split(',', 1)
-                # Padroniza casas decimais
-                if dec == '':
-                    dec = '00'
-                elif len(dec) == 1:
-                    dec = dec + '0'
-            else:
-                # Sem decimais, assume .00
-                inteiro, dec = valor_str, '00'
-            
-            # Remove pontos de milhar e monta o float final
-            valor = float(inteiro.replace('.', '') + '.' + dec)
-            
-            logging.debug(f"Meta LOJA extraída (formato direto): {valor}")
-            return valor
-        except (ValueError, AttributeError) as e:
-            logging.error(f"Erro ao converter valor da meta LOJA '{match.group(3)}': {e}")
-            return None
-    
-    # Fallback: procurar por "Total:" se o regex principal não encontrou
-    total_regex = r'(?i)Total:\s*([\d\.]+(?:,\d{1,2})?)'
-    total_match = re.search(total_regex, texto)
-    if total_match:
-        try:
-            valor_str = total_match.group(1)
-            # Mesmo processamento de valor
-            valor_str = re.sub(r'[^\d\.,]', '', valor_str)
-            
-            if ',' in valor_str:
-                inteiro, dec = valor_str.split(',', 1)
-                if dec == '':
-                    dec = '00'
-                elif len(dec) == 1:
-                    dec = dec + '0'
-            else:
-                inteiro, dec = valor_str, '00'
-            
-            valor = float(inteiro.replace('.', '') + '.' + dec)
-            
-            logging.debug(f"Meta LOJA extraída (formato Total): {valor}")
-            return valor
-        except (ValueError, AttributeError) as e:
-            logging.error(f"Erro ao converter valor Total da meta LOJA '{total_match.group(1)}': {e}")
-            return None
-    
-    logging.debug(f"Nenhuma meta LOJA encontrada no padrão esperado.")
-    return None
-
 # --- Funções de Interação com a UI ---
 def fechar_mensagem_fixada(driver, wait):
     """Tenta fechar a mensagem fixada, se existir, usando o seletor fornecido."""
@@ -529,7 +402,7 @@ def buscar_meta_no_grupo(driver, wait, url, nome_grupo):
                 pass
 
             try:
-                termos_busca = ["meta de hoje"] if nome_grupo == "VD" else ["meta de hoje", "meta do dia"]
+                termos_busca = TERMOS_BUSCA[nome_grupo]
 
                 for termo in termos_busca:
                     logging.info(f"Tentando buscar por '{termo}'...")
@@ -551,40 +424,33 @@ def buscar_meta_no_grupo(driver, wait, url, nome_grupo):
 
                     # Verifica se há resultados
                     try:
-                        container_resultados_tmp = WebDriverWait(driver, 5).until(
-                            EC.presence_of_element_located((By.CSS_SELECTOR, "#pane-side > div:nth-child(1) > div > div"))
+                        WebDriverWait(driver, 5).until(
+                            EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_RESULTADOS_BUSCA))
                         )
-                        resultados = container_resultados_tmp.find_elements(By.XPATH, "./div")
+                        # Coleta períodos e textos de todos os resultados em uma única chamada
+                        resultados = coletar_resultados_busca(driver, filtrar_spans=False)
+                        gravar_whatsapp(driver, nome_grupo, None, mensagens_de_resultados(resultados))
                         
                         if not resultados:
                             logging.info(f"Nenhum resultado encontrado para '{termo}'. Tentando próximo termo...")
                             continue
                             
                         # Itera pelos resultados procurando uma mensagem de hoje
-                        for resultado in resultados:
-                            try:
-                                elemento_periodo = resultado.find_element(By.CSS_SELECTOR, "div._ak8l > div._ak8o")
-                                texto_periodo = elemento_periodo.text.strip()
+                        for texto_periodo, texto_mensagem in resultados:
+                            # Verifica se é uma mensagem de hoje (tem horário)
+                            if re.match(r'^\d{1,2}:\d{2}(:\d{2})?$', texto_periodo):
+                                # Tenta extrair a meta
+                                if nome_grupo == "LOJA":
+                                    meta = extrair_meta_loja(texto_mensagem)
+                                    if meta is not None:
+                                        logging.info(f"Meta encontrada usando termo '{termo}'")
+                                        return datetime.now().strftime("%d/%m/%Y"), None, meta
                                 
-                                # Verifica se é uma mensagem de hoje (tem horário)
-                                if re.match(r'^\d{1,2}:\d{2}(:\d{2})?$', texto_periodo):
-                                    elemento_mensagem = resultado.find_element(By.CSS_SELECTOR, "div._ak8l > div._ak8j")
-                                    texto_mensagem = elemento_mensagem.text.strip()
-                                    
-                                    # Tenta extrair a meta
-                                    if nome_grupo == "LOJA":
-                                        meta = extrair_meta_loja(texto_mensagem)
-                                        if meta is not None:
-                                            logging.info(f"Meta encontrada usando termo '{termo}'")
-                                            return datetime.now().strftime("%d/%m/%Y"), None, meta
-                                    
-                                    elif nome_grupo == "VD":
-                                        metas = extrair_metas_vd(texto_mensagem)
-                                        if isinstance(metas, list) and len(metas) > 0:
-                                            logging.info(f"Metas encontradas usando termo '{termo}'")
-                                            return datetime.now().strftime("%d/%m/%Y"), metas, None
-                            except (NoSuchElementException, StaleElementReferenceException):
-                                continue
+                                elif nome_grupo == "VD":
+                                    metas = extrair_metas_vd(texto_mensagem)
+                                    if isinstance(metas, list) and len(metas) > 0:
+                                        logging.info(f"Metas encontradas usando termo '{termo}'")
+                                        return datetime.now().strftime("%d/%m/%Y"), metas, None
                             
                         logging.info(f"Nenhuma meta válida encontrada nos resultados de '{termo}'. Tentando próximo termo...")
                             
@@ -600,20 +466,18 @@ def buscar_meta_no_grupo(driver, wait, url, nome_grupo):
             # --- Etapa 4: Identificar resultados da pesquisa ---
             logging.info("Procurando resultados da pesquisa...")
             
-            # Selector para o container dos resultados da pesquisa
-            seletor_container_resultados = "#pane-side > div:nth-child(1) > div > div"
-            
-            logging.info(f"Usando seletor para container de resultados: {seletor_container_resultados}")
+            logging.info(f"Usando seletor para container de resultados: {SELETOR_RESULTADOS_BUSCA}")
 
             # Espera até que o container de resultados esteja presente
             try:
-                container_resultados = wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, seletor_container_resultados)))
+                wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, SELETOR_RESULTADOS_BUSCA)))
             except TimeoutException:
                  logging.warning(f"Container de resultados não encontrado a tempo no grupo {nome_grupo}")
                  return None, None, None # Retorna None para indicar falha nesta tentativa
             
-            # Encontra todos os elementos filhos diretos do container (cada um é uma mensagem)
-            resultados = container_resultados.find_elements(By.XPATH, "./div") 
+            # Coleta período e texto de cada resultado (cada um é uma mensagem) em uma única chamada
+            resultados = coletar_resultados_busca(driver)
+            gravar_whatsapp(driver, nome_grupo, None, mensagens_de_resultados(resultados))
             
             logging.info(f"Resultados encontrados: {len(resultados)}")
 
@@ -625,71 +489,32 @@ def buscar_meta_no_grupo(driver, wait, url, nome_grupo):
             logging.info(f"Procurando metas para a data de hoje: {data_atual_str} (critério: horário)")
 
             # --- Etapa 5: Iterar pelos resultados e encontrar a mensagem mais recente de hoje ---
-            for i, resultado in enumerate(resultados):
-                try:
-                    logging.debug(f"Analisando resultado #{i+1}...")
-                    
-                    # Selector mais direto para o texto da mensagem dentro do resultado.
-                    elemento_periodo = None
-                    elemento_mensagem = None
-                    try:
-                        elemento_periodo = resultado.find_element(By.CSS_SELECTOR, "div._ak8l > div._ak8o")
-                        elemento_mensagem = resultado.find_element(By.CSS_SELECTOR, "div._ak8l > div._ak8j")
-                    except NoSuchElementException:
-                         logging.warning(f"Elementos de período ou mensagem não encontrados no resultado #{i+1}.")
-                         continue
-
-                    texto_periodo = elemento_periodo.text.strip()
-                    
-                    # Tentar extrair o texto da mensagem (focando nos spans que contêm o texto principal)
-                    spans_mensagem = elemento_mensagem.find_elements(By.CSS_SELECTOR, "span")
-                    if spans_mensagem:
-                        texto_mensagem_parts = []
-                        for s in spans_mensagem:
-                            # Filtrar spans que parecem conter o conteúdo principal da mensagem
-                            if s.get_attribute("class") and ("_ao3e" in s.get_attribute("class") or s.get_attribute("dir")):
-                                texto_mensagem_parts.append(s.text.strip())
-                        
-                        if texto_mensagem_parts:
-                             texto_mensagem = " ".join(texto_mensagem_parts)
-                        else:
-                            # Fallback se os filtros acima não funcionarem
-                            texto_mensagem = " ".join([s.text.strip() for s in spans_mensagem if s.text.strip()])
-                    else:
-                        texto_mensagem = elemento_mensagem.text.strip()
-
-                    if not texto_mensagem:
-                        logging.warning(f"Texto da mensagem vazio no resultado #{i+1}.")
-                        continue
+            for i, (texto_periodo, texto_mensagem) in enumerate(resultados):
+                if not texto_mensagem:
+                    logging.warning(f"Texto da mensagem vazio no resultado #{i+1}.")
+                    continue
 
-                    logging.debug(f"Resultado #{i+1} - Período: '{texto_periodo}', Mensagem (início): '{texto_mensagem[:100]}...'")
+                logging.debug(f"Resultado #{i+1} - Período: '{texto_periodo}', Mensagem (início): '{texto_mensagem[:100]}...'")
 
-                    # --- Etapa 6: Verificar se o período é um horário (indica mensagem de hoje) ---
-                    if re.match(r'^\d{1,2}:\d{2}(:\d{2})?$', texto_periodo):
-                        logging.info(f"Mensagem #{i+1} identificada como de hoje (período = horário: {texto_periodo}). Processando...")
-                        
-                        # --- Etapa 7: Extrair dados da mensagem identificada ---
-                        if nome_grupo == "VD":
-                            metas = extrair_metas_vd(texto_mensagem)
-                            # Agora 'metas' é uma lista de dicts com possíveis múltiplos ciclos
-                            if isinstance(metas, list) and len(metas) > 0:
-                                logging.info(f"Metas VD extraídas com sucesso da mensagem #{i+1}: {metas}")
-                                return data_atual_str, metas, None # Retorna lista, meta_loja é None para VD
-
-                        elif nome_grupo == "LOJA":
-                            meta_loja = extrair_meta_loja(texto_mensagem)
-                            if meta_loja is not None:
-                                logging.info(f"Meta LOJA extraída com sucesso da mensagem #{i+1}: {meta_loja}")
-                                return data_atual_str, None, meta_loja # Retorna com a data de hoje, metas é None para LOJA
-                    else:
-                        logging.debug(f"Mensagem #{i+1} não é de hoje (período: {texto_periodo}). Ignorando.")
-
-                except StaleElementReferenceException:
-                    logging.warning(f"Elemento de resultado #{i+1} ficou obsoleto. Pulando...")
-                    continue
-                except Exception as e:
-                    logging.warning(f"Erro ao analisar resultado #{i+1}: {e}", exc_info=True)
-                    continue
+                # --- Etapa 6: Verificar se o período é um horário (indica mensagem de hoje) ---
+                if re.match(r'^\d{1,2}:\d{2}(:\d{2})?$', texto_periodo):
+                    logging.info(f"Mensagem #{i+1} identificada como de hoje (período = horário: {texto_periodo}). Processando...")
+                    
+                    # --- Etapa 7: Extrair dados da mensagem identificada ---
+                    if nome_grupo == "VD":
+                        metas = extrair_metas_vd(texto_mensagem)
+                        # Agora 'metas' é uma lista de dicts com possíveis múltiplos ciclos
+                        if isinstance(metas, list) and len(metas) > 0:
+                            logging.info(f"Metas VD extraídas com sucesso da mensagem #{i+1}: {metas}")
+                            return data_atual_str, metas, None # Retorna lista, meta_loja é None para VD
+
+                    elif nome_grupo == "LOJA":
+                        meta_loja = extrair_meta_loja(texto_mensagem)
+                        if meta_loja is not None:
+                            logging.info(f"Meta LOJA extraída com sucesso da mensagem #{i+1}: {meta_loja}")
+                            return data_atual_str, None, meta_loja # Retorna com a data de hoje, metas é None para LOJA
+                else:
+                    logging.debug(f"Mensagem #{i+1} não é de hoje (período: {texto_periodo}). Ignorando.")
 
             # Se o loop terminar sem encontrar e extrair dados válidos
             logging.warning(f"Nenhuma mensagem válida (com horário) encontrada nesta tentativa para o grupo {nome_grupo}.")
@@ -730,6 +555,57 @@ def buscar_meta_no_grupo(driver, wait, url, nome_grupo):
     logging.info("--- Fim da busca no grupo (com erro) ---")
     return None, None, None
 
+def buscar_meta_no_store(driver, nome_grupo):
+    """Busca a meta do dia lendo as mensagens de hoje direto do IndexedDB do WhatsApp Web.
+
+    Returns:
+        (data, metas, meta_loja) como buscar_meta_no_grupo, ou None quando o
+        backend não resolve o grupo (sem id de chat configurado, banco ilegível,
+        nenhuma mensagem de hoje no store ou nenhuma delas com meta válida) e a
+        pesquisa pela interface deve ser usada.
+    """
+    chat_id = chat_configurado(nome_grupo)
+    if not chat_id:
+        return None
+    inicio = time.perf_counter()
+    try:
+        if not driver.current_url.startswith(WHATSAPP_STORE_CONFIG["url"]):
+            driver.get(WHATSAPP_STORE_CONFIG["url"])
+            # A lista de conversas só aparece depois que a sessão sincronizou o banco local
+            WebDriverWait(driver, WHATSAPP_STORE_CONFIG["timeout_carregamento"]).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "#pane-side"))
+            )
+        mensagens = ler_mensagens_hoje(driver, chat_id)
+        gravar_whatsapp(driver, nome_grupo, chat_id, mensagens)
+    except (StoreIndisponivel, TimeoutException) as e:
+        logging.warning(f"⚠️ IndexedDB indisponível para {nome_grupo} ({e}). Usando a pesquisa pela interface.")
+        return None
+    if not mensagens:
+        logging.info(f"Nenhuma mensagem de hoje no IndexedDB para {nome_grupo}. Usando a pesquisa pela interface.")
+        return None
+
+    data_atual_str = datetime.now().strftime("%d/%m/%Y")
+    termos = [t.lower() for t in TERMOS_BUSCA[nome_grupo]]
+    for timestamp, texto in mensagens:
+        if not any(termo in texto.lower() for termo in termos):
+            continue
+        horario = datetime.fromtimestamp(timestamp).strftime("%H:%M")
+        if nome_grupo == "VD":
+            metas = extrair_metas_vd(texto)
+            if metas:
+                logging.info(f"⚡ Metas VD lidas do IndexedDB (mensagem das {horario}) em "
+                             f"{time.perf_counter() - inicio:.2f}s: {metas}")
+                return data_atual_str, metas, None
+        elif nome_grupo == "LOJA":
+            meta_loja = extrair_meta_loja(texto)
+            if meta_loja is not None:
+                logging.info(f"⚡ Meta LOJA lida do IndexedDB (mensagem das {horario}) em "
+                             f"{time.perf_counter() - inicio:.2f}s: {meta_loja}")
+                return data_atual_str, None, meta_loja
+    logging.warning(f"⚠️ {len(mensagens)} mensagem(ns) de hoje no IndexedDB para {nome_grupo}, nenhuma com meta "
+                    f"válida. Usando a pesquisa pela interface.")
+    return None
+
 # --- Funções de Persistência ---
 def salvar_metas_csv(dados):
     """Salva as metas no arquivo CSV no formato: tipo;data;ciclo;valor
@@ -771,7 +647,12 @@ def main():
         tipos_capturados = set()
         for nome_grupo, url in GRUPOS:
             try:
-                data_meta, metas, meta_loja = buscar_meta_no_grupo(driver, wait, url, nome_grupo)
+                # IndexedDB primeiro (menos de 1s); pesquisa pela interface como fallback
+                with etapa(f"captura:{nome_grupo}"):
+                    resultado = buscar_meta_no_store(driver, nome_grupo)
+                    if resultado is None:
+                        resultado = buscar_meta_no_grupo(driver, wait, url, nome_grupo)
+                data_meta, metas, meta_loja = resultado
 
                 tem_dados_para_salvar = False
                 if nome_grupo == "VD" and metas:
@@ -802,6 +683,9 @@ def main():
                     logging.info(f"Adicionada meta LOJA: {meta_loja}")
                     print(f"  ➕ Adicionada meta LOJA: {meta_loja}")
 
+                meta_capture_attempts_total.inc(
+                    grupo=nome_grupo, resultado="sucesso" if tem_dados_para_salvar else "sem_meta"
+                )
                 if not tem_dados_para_salvar:
                     logging.warning(f"⚠️ Nenhuma meta significativa encontrada para o grupo {nome_grupo}")
                     print(f"⚠️ Nenhuma meta significativa encontrada para o grupo {nome_grupo}")
@@ -810,6 +694,7 @@ def main():
             except Exception as e:
                 logging.error(f"Erro ao processar grupo {nome_grupo}: {e}", exc_info=True)
                 print(f"❌ Erro ao processar grupo {nome_grupo}: {e}")
+                meta_capture_attempts_total.inc(grupo=nome_grupo, resultado="erro")
                 continue
 
         if metas_para_salvar:
@@ -883,7 +768,11 @@ def main():
         logging.critical(f"Erro crítico na execução do script: {e}", exc_info=True)
         print(f"❌ Erro crítico: {e}")
     finally:
-        if driver:
+        sessao = obter_sessao()
+        if driver and sessao and sessao.driver is driver:
+            sessao.desconectar()
+            logging.info("=== Sessão WhatsApp mantida aberta para o envio. ===")
+        elif driver:
             try:
                 driver.quit()
                 logging.info("=== Chrome finalizado. ===")
@@ -891,7 +780,11 @@ def main():
             except Exception as e:
                 logging.error(f"Erro ao finalizar o Chrome: {e}")
                 print(f"⚠️ Erro ao finalizar o Chrome: {e}")
+        escrever_arquivo_metricas("captura_metadia")
+        gravar_rastreamento("captura_metadia")
 
 if __name__ == "__main__":
+    # --- CONFIGURAÇÃO DE LOGGING --- (só executado direto, para não trocar o logging de quem importa)
+    configurar_logging_raiz(LOG_FILE, console=False)  # nível via LOG_LEVEL (ex.: DEBUG)
     print("Iniciando captura de metas (com retry)...")
     main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Checkpoints de Extração
+=======================
+Diário (JSONL, append-only) das unidades de extração concluídas no dia.
+
+Cada unidade — ex.: "EUD:C15", "PEF:C16", "MARCAS:C16:QDB" — é registrada ao
+terminar, com o arquivo gerado e o sha256 dele (ou com o valor extraído,
+quando não há arquivo). Numa nova execução, as unidades concluídas cujo
+arquivo continua íntegro são puladas e a extração recomeça na primeira
+pendente. O diário é por dia: nada de ontem é reaproveitado, e unidades
+concluídas há mais de CHECKPOINT_CONFIG["validade_minutos"] voltam a ser
+pendentes (um retry logo depois retoma; uma execução horas mais tarde
+extrai números atuais). Depois de uma
+execução completa ele é finalizado (finalizar), então só execuções que
+falharam ou foram interrompidas são retomadas.
+
+Uso:
+    journal = JournalCheckpoints("main_com_marcas")
+    journal.executar("PEF:C16", lambda: extrair(...), arquivo="extracoes/resultado_pef_C16.csv")
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from componentes.config import CHECKPOINT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+class UnidadeNaoConcluida(Exception):
+    """A unidade terminou sem gerar/atualizar o arquivo esperado"""
+
+
+def sha256_arquivo(caminho: str) -> Optional[str]:
+    try:
+        h = hashlib.sha256()
+        with open(caminho, "rb") as f:
+            for bloco in iter(lambda: f.read(1 << 16), b""):
+                h.update(bloco)
+        return h.hexdigest()
+    except OSError:
+        return None
+
+
+class JournalCheckpoints:
+    """Unidades concluídas de um pipeline no dia"""
+
+    def __init__(self, pipeline: str, diretorio: Optional[str] = None, data: Optional[date] = None,
+                 ativo: Optional[bool] = None):
+        """
+        Args:
+            pipeline: Nome do pipeline (prefixo do arquivo do diário)
+            diretorio: Padrão: CHECKPOINT_CONFIG["dir"]
+            data: Dia do diário (padrão: hoje)
+            ativo: False não lê nem grava nada (executar() só aplica as tentativas);
+                padrão: CHECKPOINT_CONFIG["enabled"]
+        """
+        data = data or date.today()
+        diretorio = diretorio or CHECKPOINT_CONFIG["dir"]
+        self.caminho = os.path.join(diretorio, f"{pipeline}_{data.strftime('%Y%m%d')}.jsonl")
+        self.ativo = CHECKPOINT_CONFIG["enabled"] if ativo is None else ativo
+        self.validade_minutos = CHECKPOINT_CONFIG["validade_minutos"]
+        self._lock = threading.Lock()
+        self._registros: Dict[str, Dict[str, Any]] = self._carregar()
+
+    def _carregar(self) -> Dict[str, Dict[str, Any]]:
+        registros = {}
+        if not self.ativo:
+            return registros
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        continue  # linha truncada por uma interrupção no meio da escrita
+                    unidade = registro.get("unidade")
+                    if not unidade:
+                        continue
+                    if registro.get("removida"):
+                        registros.pop(unidade, None)
+                    else:
+                        registros[unidade] = registro
+        except FileNotFoundError:
+            pass
+        return registros
+
+    def _anexar(self, registro: Dict[str, Any]):
+        if not self.ativo:
+            return
+        os.makedirs(os.path.dirname(self.caminho), exist_ok=True)
+        with open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def registro(self, unidade: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            registro = self._registros.get(unidade)
+            return dict(registro) if registro else None
+
+    def concluida(self, unidade: str) -> bool:
+        """True se a unidade foi registrada dentro da validade e o arquivo dela está inalterado"""
+        registro = self.registro(unidade)
+        if not registro:
+            return False
+        if self.validade_minutos > 0:
+            try:
+                idade = datetime.now() - datetime.fromisoformat(registro["concluida_em"])
+            except (KeyError, ValueError):
+                return False
+            if idade.total_seconds() > self.validade_minutos * 60:
+                logger.info(f"Checkpoint {unidade} descartado: concluído há {idade.total_seconds() / 60:.0f} min "
+                            f"(validade {self.validade_minutos} min)")
+                return False
+        arquivo = registro.get("arquivo")
+        if arquivo and sha256_arquivo(arquivo) != registro.get("sha256"):
+            logger.info(f"Checkpoint {unidade} descartado: {arquivo} ausente ou alterado")
+            return False
+        return True
+
+    def registrar(self, unidade: str, arquivo: Optional[str] = None, **dados):
+        """Marca a unidade como concluída (com o sha256 do arquivo, se houver)"""
+        registro = {"unidade": unidade, "concluida_em": datetime.now().isoformat(timespec="seconds")}
+        if arquivo:
+            registro["arquivo"] = arquivo
+            registro["sha256"] = sha256_arquivo(arquivo)
+        registro.update(dados)
+        with self._lock:
+            self._anexar(registro)
+            if self.ativo:
+                self._registros[unidade] = registro
+
+    def invalidar(self, unidade: str):
+        """Força a unidade a ser refeita na próxima execução"""
+        with self._lock:
+            if unidade in self._registros:
+                self._anexar({"unidade": unidade, "removida": True})
+                del self._registros[unidade]
+
+    def finalizar(self):
+        """Descarta o diário do dia após uma execução completa: a próxima extrai tudo de novo"""
+        with self._lock:
+            self._registros.clear()
+            if not self.ativo:
+                return
+            try:
+                os.remove(self.caminho)
+            except FileNotFoundError:
+                return
+        logger.info(f"🏁 Diário {os.path.basename(self.caminho)} finalizado")
+
+    def arquivos_concluidos(self) -> Set[str]:
+        """Caminhos normalizados dos arquivos de unidades concluídas e íntegras"""
+        with self._lock:
+            arquivos = {u: r["arquivo"] for u, r in self._registros.items() if r.get("arquivo")}
+        return {os.path.normpath(arquivo) for u, arquivo in arquivos.items() if self.concluida(u)}
+
+    def executar(self, unidade: str, funcao: Callable[[], Any], arquivo: Optional[str] = None,
+                 tentativas: int = 1, antes_de_repetir: Optional[Callable[[Exception], None]] = None):
+        """Executa a unidade (se ainda não concluída) e registra o checkpoint.
+
+        Args:
+            unidade: Identificador, ex. "EUD:C15"
+            funcao: Executa a extração; o retorno é guardado como "valor" quando não há arquivo
+            arquivo: Arquivo que a unidade deve gravar; só conta como concluída se ele
+                for (re)escrito durante esta chamada
+            tentativas: Número máximo de execuções da unidade
+            antes_de_repetir: Chamado com o erro antes de cada nova tentativa
+                (ex.: verificar/reabrir a sessão do navegador)
+
+        Returns:
+            O "valor" registrado (do checkpoint, se a unidade foi pulada)
+        """
+        if self.concluida(unidade):
+            logger.info(f"⏭️ {unidade} já concluída hoje - reaproveitando checkpoint")
+            return self.registro(unidade).get("valor")
+
+        ultimo_erro = None
+        for tentativa in range(1, max(1, tentativas) + 1):
+            if ultimo_erro is not None and antes_de_repetir:
+                antes_de_repetir(ultimo_erro)
+            inicio = time.time()
+            try:
+                valor = funcao()
+                if arquivo and not (os.path.exists(arquivo) and os.path.getmtime(arquivo) >= inicio - 1):
+                    raise UnidadeNaoConcluida(f"{arquivo} não foi gravado")
+            except Exception as e:
+                ultimo_erro = e
+                logger.warning(f"⚠️ {unidade}: tentativa {tentativa}/{tentativas} falhou: {e}")
+                continue
+            if arquivo:
+                self.registrar(unidade, arquivo)
+            else:
+                self.registrar(unidade, valor=valor)
+            return valor
+        raise ultimo_erro
+
+    def executar_lote(self, arquivos: Dict[str, str], funcao: Callable[[List[str]], Any], tentativas: int = 1,
+                      antes_de_repetir: Optional[Callable[[Exception], None]] = None):
+        """Executa numa só chamada todas as unidades pendentes e registra o checkpoint de cada uma depois.
+
+        Para extrações que cobrem várias unidades de uma vez (ex.: EUD de todos os ciclos);
+        cada nova tentativa recebe só as unidades que ainda não gravaram o arquivo.
+
+        Args:
+            arquivos: Unidade -> arquivo que ela deve gravar durante a chamada
+            funcao: Recebe a lista de unidades pendentes
+            tentativas, antes_de_repetir: Como em executar()
+
+        Raises:
+            O último erro, se alguma unidade continuar pendente após as tentativas
+        """
+        pendentes = []
+        for unidade in arquivos:
+            if self.concluida(unidade):
+                logger.info(f"⏭️ {unidade} já concluída hoje - reaproveitando checkpoint")
+            else:
+                pendentes.append(unidade)
+
+        ultimo_erro = None
+        for tentativa in range(1, max(1, tentativas) + 1):
+            if not pendentes:
+                return
+            if ultimo_erro is not None and antes_de_repetir:
+                antes_de_repetir(ultimo_erro)
+            inicio = time.time()
+            try:
+                funcao(list(pendentes))
+                ultimo_erro = None
+            except Exception as e:
+                ultimo_erro = e
+            for unidade in list(pendentes):
+                arquivo = arquivos[unidade]
+                if os.path.exists(arquivo) and os.path.getmtime(arquivo) >= inicio - 1:
+                    self.registrar(unidade, arquivo)
+                    pendentes.remove(unidade)
+            if pendentes:
+                ultimo_erro = ultimo_erro or UnidadeNaoConcluida(f"{', '.join(pendentes)} sem arquivo gravado")
+                logger.warning(f"⚠️ {', '.join(pendentes)}: tentativa {tentativa}/{tentativas} falhou: {ultimo_erro}")
+        if pendentes:
+            raise ultimo_erro
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Circuit Breaker dos Portais
+===========================
+Evita abrir o Chrome quando o portal (retaguarda/VD) está fora do ar.
+
+Antes de iniciar o navegador, uma requisição HTTP simples à URL de login
+verifica se o portal responde. Só falhas de saúde do portal são contadas
+(a sonda, ou um erro de rede do navegador ao abrir a página, logar ou
+navegar); um seletor que não aparece não diz nada sobre o portal. A partir
+de "limiar_falhas" seguidas o circuito abre e as execuções seguintes falham
+em milissegundos, sem sonda nem Chrome.
+Passado o "cooldown", o circuito fica meio-aberto: uma única sonda decide se
+a extração volta a rodar. Se ela responder, o circuito fecha na hora; se
+não, reabre. Uma sonda que não termina (processo morto) deixa de bloquear
+as demais após timeout_sonda + FOLGA_SONDA segundos.
+
+O estado é compartilhado entre processos (execuções agendadas) em um JSON
+pequeno (CIRCUIT_BREAKER_CONFIG["path"]); cada leitura seguida de gravação
+acontece sob uma trava de arquivo (<path>.lock), então duas falhas
+simultâneas contam como duas.
+
+Uso:
+    python -m componentes.circuit_breaker            # estado dos portais
+    python -m componentes.circuit_breaker --fechar   # força o fechamento
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from componentes.config import CIRCUIT_BREAKER_CONFIG
+from componentes.travas import trava_arquivo
+
+FECHADO = "fechado"
+ABERTO = "aberto"
+MEIO_ABERTO = "meio_aberto"
+# Segundos além do timeout_sonda em que o meio-aberto ainda é "sonda em andamento"
+FOLGA_SONDA = 30
+
+logger = logging.getLogger(__name__)
+
+
+class PortalIndisponivel(Exception):
+    """O portal não responde (sonda falhou ou circuito aberto)"""
+
+
+def sondar(url: str, timeout: float) -> Optional[str]:
+    """Requisição leve à URL; retorna None se o portal respondeu, ou o motivo da falha.
+
+    Qualquer resposta abaixo de 500 (inclusive 401/403 de páginas de login)
+    conta como portal no ar. URLs não-HTTP (placeholders) não são sondadas.
+    """
+    if not url or not url.lower().startswith(("http://", "https://")):
+        return None
+    requisicao = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0 (health-check)"})
+    try:
+        with urllib.request.urlopen(requisicao, timeout=timeout) as resposta:
+            status = resposta.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+    return f"HTTP {status}" if status >= 500 else None
+
+
+class CircuitBreaker:
+    """Estados fechado -> aberto -> meio_aberto por portal, persistidos em JSON"""
+
+    def __init__(self, caminho: str, limiar_falhas: int = 2, cooldown_segundos: float = 900,
+                 timeout_sonda: float = 5):
+        self.caminho = caminho
+        self.limiar_falhas = limiar_falhas
+        self.cooldown_segundos = cooldown_segundos
+        self.timeout_sonda = timeout_sonda
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transacao(self):
+        """Exclusão mútua entre threads e entre processos para ler e regravar o estado"""
+        with self._lock, trava_arquivo(f"{self.caminho}.lock"):
+            yield
+
+    def _carregar(self) -> Dict[str, Dict]:
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Estado do circuit breaker ilegível ({self.caminho}): {e}")
+            return {}
+
+    def _salvar(self, estados: Dict[str, Dict]):
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(estados, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
+
+    def estado(self, portal: str) -> Dict:
+        with self._lock:
+            return dict(self._carregar().get(portal, {"estado": FECHADO, "falhas": 0}))
+
+    def estados(self) -> Dict[str, Dict]:
+        with self._lock:
+            return self._carregar()
+
+    def verificar(self, portal: str, url: str):
+        """Libera o acesso ao portal ou levanta PortalIndisponivel.
+
+        - aberto dentro do cooldown: falha imediata, sem sonda
+        - aberto após o cooldown: meio-aberto, uma sonda decide (e fecha o circuito se o portal responder)
+        - fechado: sonda rápida antes de gastar um Chrome
+        """
+        agora = time.time()
+        meio_aberto = False
+        with self._transacao():
+            estados = self._carregar()
+            atual = estados.get(portal, {"estado": FECHADO, "falhas": 0})
+            if atual["estado"] == ABERTO:
+                restante = atual.get("aberto_ate", 0) - agora
+                if restante > 0:
+                    raise PortalIndisponivel(f"Circuito do portal {portal} aberto por mais {restante:.0f}s "
+                                             f"(último erro: {atual.get('ultimo_erro')})")
+                meio_aberto = True
+            elif atual["estado"] == MEIO_ABERTO:
+                if agora - atual.get("sonda_em", 0) < self.timeout_sonda + FOLGA_SONDA:
+                    # Outra execução já está testando o portal; não dispara uma segunda sonda
+                    raise PortalIndisponivel(f"Circuito do portal {portal} meio-aberto (sonda em andamento)")
+                meio_aberto = True  # a sonda anterior não terminou (processo morto): esta assume
+            if meio_aberto:
+                # Só uma execução passa para meio-aberto: as demais veem a sonda em andamento
+                atual.update(estado=MEIO_ABERTO, sonda_em=agora,
+                             atualizado_em=datetime.now().isoformat(timespec="seconds"))
+                estados[portal] = atual
+                self._salvar(estados)
+                logger.info(f"🔄 Circuito {portal} meio-aberto: sondando {url}")
+
+        motivo = sondar(url, self.timeout_sonda)
+        if motivo:
+            self.registrar_falha(portal, f"sonda: {motivo}")
+            raise PortalIndisponivel(f"Portal {portal} não respondeu: {motivo}")
+        if meio_aberto:
+            self.registrar_sucesso(portal)
+
+    def registrar_sucesso(self, portal: str):
+        atual = self.estado(portal)
+        if atual["estado"] == FECHADO and not atual.get("falhas"):
+            return
+        if atual["estado"] != FECHADO:
+            logger.info(f"✅ Circuito {portal} fechado: portal respondeu")
+        self.fechar(portal)
+
+    def registrar_falha(self, portal: str, erro):
+        # Leitura e gravação na mesma transação: falhas simultâneas de outros processos não se perdem
+        with self._transacao():
+            estados = self._carregar()
+            atual = estados.setdefault(portal, {"estado": FECHADO, "falhas": 0})
+            falhas = atual.get("falhas", 0) + 1
+            abrir = atual["estado"] == MEIO_ABERTO or falhas >= self.limiar_falhas
+            atual.update(falhas=falhas, ultimo_erro=str(erro)[:200],
+                         atualizado_em=datetime.now().isoformat(timespec="seconds"))
+            if abrir:
+                atual.update(estado=ABERTO, aberto_ate=time.time() + self.cooldown_segundos)
+            self._salvar(estados)
+        if abrir:
+            logger.error(f"⚡ Circuito {portal} aberto por {self.cooldown_segundos:.0f}s após "
+                         f"{falhas} falha(s): {erro}")
+        else:
+            logger.warning(f"⚠️ Falha no portal {portal} ({falhas}/{self.limiar_falhas}): {erro}")
+
+    def fechar(self, portal: Optional[str] = None):
+        """Força o fechamento (de um portal ou de todos)"""
+        with self._transacao():
+            estados = self._carregar()
+            for nome in ([portal] if portal else list(estados)):
+                estados[nome] = {"estado": FECHADO, "falhas": 0,
+                                 "atualizado_em": datetime.now().isoformat(timespec="seconds")}
+            self._salvar(estados)
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def obter_breaker() -> Optional[CircuitBreaker]:
+    """Breaker compartilhado do processo (None se CIRCUIT_BREAKER_CONFIG["enabled"] for False)"""
+    global _breaker
+    if not CIRCUIT_BREAKER_CONFIG["enabled"]:
+        return None
+    with _breaker_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(CIRCUIT_BREAKER_CONFIG["path"], CIRCUIT_BREAKER_CONFIG["limiar_falhas"],
+                                      CIRCUIT_BREAKER_CONFIG["cooldown_segundos"],
+                                      CIRCUIT_BREAKER_CONFIG["timeout_sonda"])
+        return _breaker
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Estado do circuit breaker dos portais")
+    parser.add_argument("--fechar", nargs="?", const="", metavar="PORTAL",
+                        help="Fecha o circuito do portal (ou de todos)")
+    args = parser.parse_args()
+
+    breaker = CircuitBreaker(CIRCUIT_BREAKER_CONFIG["path"])
+    if args.fechar is not None:
+        breaker.fechar(args.fechar or None)
+        print(f"✅ Circuito fechado: {args.fechar or 'todos os portais'}")
+        return
+    estados = breaker.estados()
+    if not estados:
+        print("Nenhuma falha registrada - todos os circuitos fechados")
+        return
+    for portal, estado in sorted(estados.items()):
+        extra = ""
+        if estado["estado"] == ABERTO:
+            extra = f" até {datetime.fromtimestamp(estado.get('aberto_ate', 0)).strftime('%H:%M:%S')}"
+        print(f"{portal:6} {estado['estado']:12}{extra}  falhas={estado.get('falhas', 0)}  "
+              f"{estado.get('ultimo_erro') or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Configurações do Sistema
 Arquivo centralizado com todas as configurações do sistema.
 """
 
+import json
 import os
 import warnings
 from typing import Dict, List
@@ -28,7 +29,25 @@ WHATSAPP_CONFIG = {
         "LINK FINAL DO 1º GRUPO",  
         "LINK FINAL DO 2º GRUPO CASO NECESSÁRIO"   
     ],
-    "delay_seconds": 15
+    "delay_seconds": 15,
+    # Threads usadas para formatar as mensagens enquanto o WhatsApp Web carrega
+    "prepare_workers": 4,
+    # Ritmo de envio por grupo (segundos). "padrao" vale para todos; chaves por grupo sobrepõem.
+    # pre_envio: espera após abrir o grupo (uma vez por grupo)
+    # intervalo_mensagens: mínimo entre mensagens do mesmo grupo quando a anterior não foi
+    #   confirmada no DOM (com confirmação a próxima sai logo em seguida)
+    # intervalo_grupos: mínimo entre o fim de um grupo e a abertura do próximo
+    "rate_limits": {
+        "padrao": {"pre_envio": 7, "intervalo_mensagens": 3, "intervalo_grupos": 10},
+        "VD": {},
+        "LOJA": {}
+    },
+    # Tempo máximo aguardando o hook de confirmação de cada mensagem
+    "confirmacao_timeout": 10,
+    # Simulação: caminho .jsonl que recebe as mensagens em vez do teclado/clipboard (vazio envia de verdade)
+    "dry_run": os.getenv("WHATSAPP_DRY_RUN", ""),
+    # Envio por grupo assim que os dados dele forem validados (0 = um envio único no fim do pipeline)
+    "streaming": os.getenv("WHATSAPP_STREAMING", "1").strip().lower() not in ("0", "false", "no")
 }
 
 # Configurações de Meta
@@ -47,6 +66,7 @@ FILE_CONFIG = {
     "log_dir": "log",
     "files": {
         "meta_dia": "meta_dia.csv",
+        "meta_historico": "meta_historico.csv",
         "resultado_loja": "resultado_loja.csv",
         "resultado_vd": "resultado.csv"
     },
@@ -56,37 +76,198 @@ FILE_CONFIG = {
     }
 }
 
-# Configurações de Navegação (Seletores CSS)
-NAVIGATION_CONFIG = {
-    "login": {
-        "username_field": "#username > div:nth-child(2) input",
-        "password_field": "#password > div:nth-child(2) input",
-        "submit_button": ".LoginGB_formulario_1LJpp > button:nth-child(3)"
-    },
+# Perfis de login (executados pelo componentes/job_engine.py)
+# Valores entre chaves são preenchidos com os parâmetros da execução:
+# {url}, {usuario}, {senha}; "env" lê o valor de uma variável de ambiente.
+LOGIN_PROFILES = {
     "loja": {
-        "menu_items": ["#sidemenu-item-6", "#sidemenu-item-602", "#sidemenu-item-20423"],
-        "query_button": "#app > div.App_layout_3o3R1 > div > main > div > section > section > div > div > footer > button.flora-button.flora-button--icon-left.flora-button--standard.flora-button--shape-small.flora-button--size-standard.flora-body-small.FiltrosIniciais_botaoConsultar_OBWUZ",
-        "table": ".flora-table",
-        "table_row": ".flora-table-row",
-        "loja_cell": "div.flora-table-cell:nth-child(1)",
-        "gmv_cell": "div.flora-table-cell:nth-child(3)"
+        "url": LOGIN_CONFIG["url"],
+        "portal": "loja",
+        "passos": [
+            {"acao": "abrir", "url": "{url}"},
+            {"acao": "aguardar_url", "igual": "{url}", "timeout": 30},
+            {"acao": "preencher", "seletor": "#username > div:nth-child(2) input", "valor": "{usuario}", "timeout": 20},
+            {"acao": "preencher", "seletor": "#password > div:nth-child(2) input", "valor": "{senha}", "timeout": 20},
+            {"acao": "clicar", "xpath": "//*[@id='app']/div[1]/section[2]/div/form/button", "timeout": 20},
+            {"acao": "aguardar_url", "igual": "LINK DO RETAGUARDA", "timeout": 30},
+            {"acao": "pausa", "segundos": 2}
+        ]
     },
     "vd": {
-        "menu_items": ["#sidemenu-item-6", "#sidemenu-item-602", "#sidemenu-item-20423"],
-        "query_button": "button.flora-button:nth-child(4)",
-        "table": ".flora-table",
-        "table_row": ".flora-table-row",
-        "empresa_cell": "div.flora-table-cell:nth-child(1)",
-        "gmv_cell": "div.flora-table-cell:nth-child(3)"
+        "url": os.getenv("VD_LOGIN_URL", "URL"),
+        "portal": "vd",
+        "passos": [
+            {"acao": "abrir", "url": "{url}"},
+            {"acao": "aguardar_visivel", "seletor": "#ctl00 > main", "timeout": 15},
+            {"acao": "clicar", "seletor": "#ctl00 > main > div.login__content > div > div.mdc-card__content > div.login__bottom > div"},
+            {"acao": "clicar", "seletor": "#GoogleExchange"},
+            {"acao": "preencher", "seletor": "#identifierId", "env": "GOOGLE_EMAIL", "limpar": False, "timeout": 15},
+            {"acao": "clicar", "seletor": "#identifierNext > div > button > span"},
+            {"acao": "pausa", "segundos": 1},
+            {"acao": "preencher", "seletor": "#password > div.aCsJod.oJeWuf > div > div.Xb9hP > input",
+             "env": "GOOGLE_PASSWORD", "limpar": False, "timeout": 15},
+            {"acao": "pausa", "segundos": 1},
+            {"acao": "clicar", "seletor": "#passwordNext > div > button"},
+            {"acao": "aguardar_presente", "seletor": "#menu-cod-8 > a:nth-child(1)", "timeout": 30},
+            # Painel superior de aviso que às vezes aparece após o login
+            {"acao": "clicar", "seletor": "#painelSuperior .btn-close, .top_panel .btn-close", "timeout": 3, "opcional": True}
+        ]
+    }
+}
+
+# Sequências de navegação reutilizáveis ({"acao": "sequencia", "nome": ...})
+NAVIGATION_STEPS = {
+    "menu_ranking_vendas": [
+        {"acao": "clicar", "seletor": "#menu-cod-8 > a:nth-child(1)"},
+        {"acao": "pausa", "segundos": 1},
+        {"acao": "clicar", "seletor": "#submenu-cod-8 > div:nth-child(1) > div:nth-child(1) > ul:nth-child(1) > li:nth-child(10)"},
+        {"acao": "pausa", "segundos": 1},
+        {"acao": "clicar", "seletor": ".submenu-select > ul:nth-child(2) > li:nth-child(5)"},
+        {"acao": "aguardar_loader"}
+    ],
+    "ciclo_faturamento": [
+        {"acao": "clicar", "seletor": "div.linha_form:nth-child(4) > span:nth-child(3) > span:nth-child(2) > span:nth-child(1)"},
+        {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlCicloFaturamentoInicial_d1 > option[value='{ano}{ciclo:02d}']"},
+        {"acao": "clicar", "seletor": "div.linha_form:nth-child(4) > span:nth-child(3) > span:nth-child(2) > span:nth-child(3)"},
+        {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlCicloFaturamentoFinal_d1 > option[value='{ano}{ciclo:02d}']"}
+    ],
+    "somente_faturados": [
+        {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlSituacaoFiscal_d1"},
+        {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlSituacaoFiscal_d1 > option:nth-child(3)"}
+    ],
+    "buscar": [
+        {"acao": "clicar", "seletor": "#ContentPlaceHolder1_btnBuscar_btn", "timeout": 15},
+        {"acao": "aguardar_loader", "timeout": 60}
+    ]
+}
+
+# Relatórios declarativos: login, navegação, tabela, colunas e saída.
+# Tipos de coluna: "texto", "numero_br" (1.234,56 -> float) e "moeda" (R$ 1.234,56 -> "1234.56").
+_GRID_RANKING = {
+    "seletor": "#ContentPlaceHolder1_grdRankingVendas",
+    "linha": "tr",
+    "celula": "td.grid_celula",
+    "min_celulas": 5,
+    "timeout": 15
+}
+_SEM_RESULTADO = {"seletor": "#mensagemPanel", "ok": "#popupOkButton"}
+
+REPORT_JOBS = {
+    "loja": {
+        "login": "loja",
+        "navegacao": [
+            {"acao": "clicar", "seletor": "#sidemenu-item-6", "timeout": 20},
+            {"acao": "pausa", "segundos": 1},
+            {"acao": "clicar", "seletor": "#sidemenu-item-602", "timeout": 20},
+            {"acao": "pausa", "segundos": 1},
+            {"acao": "clicar", "seletor": "#sidemenu-item-20423", "timeout": 20},
+            {"acao": "pausa", "segundos": 1},
+            {"acao": "clicar", "xpath": "//*[@id='app']/div[1]/div/main/div/section/section/div/div/footer/button[2]",
+             "timeout": 20}
+        ],
+        "tabela": {
+            "seletor": ".flora-table",
+            "linha": ".flora-table-row",
+            "celula": "div.flora-table-cell",
+            "timeout": 30,
+            "pausa_render": 2,
+            "ignorar_ultimas": 1  # última linha é o total
+        },
+        "colunas": [
+            {"indice": 0, "nome": "Loja", "tipo": "texto"},
+            {"indice": 2, "nome": "GMV", "tipo": "moeda"}
+        ],
+        "descartar_vazias": True,
+        "saida": os.path.join("extracoes", "resultado_loja.csv"),
+        "indicador": "LOJA"
+    },
+    "eud": {
+        "login": "vd",
+        "parametros": ["ciclo"],
+        "navegacao": [
+            {"acao": "sequencia", "nome": "menu_ranking_vendas"},
+            {"acao": "preencher", "seletor": "#ContentPlaceHolder1_txtEstruturaProdutoCodigo_T2", "valor": "22960", "tab": True},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_cedDataFaturamentoInicio_s1a"},
+            {"acao": "clicar", "seletor": ".ajax__calendar_container > span:nth-child(3)"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_cedDataFaturamentoFim_s1a"},
+            {"acao": "clicar", "seletor": "div.linha_form:nth-child(2) > span:nth-child(4) > span:nth-child(6) > div:nth-child(1) > span:nth-child(3)"},
+            {"acao": "sequencia", "nome": "ciclo_faturamento"},
+            {"acao": "sequencia", "nome": "somente_faturados"},
+            {"acao": "clicar", "seletor": "#divAgrupamento > span:nth-child(1) > span:nth-child(6)"},
+            {"acao": "sequencia", "nome": "buscar"}
+        ],
+        "sem_resultado": _SEM_RESULTADO,
+        "tabela": dict(_GRID_RANKING, timeout=10),
+        "colunas": [
+            {"indice": 0, "nome": "VD", "tipo": "texto"},
+            {"indice": 4, "nome": "Valor Praticado", "tipo": "numero_br"}
+        ],
+        "saida": os.path.join("extracoes", "resultado_eud_C{ciclo}.csv"),
+        "indicador": "EUD"
+    },
+    "pef": {
+        "login": "vd",
+        "parametros": ["ciclo"],
+        "navegacao": [
+            {"acao": "sequencia", "nome": "menu_ranking_vendas"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_cedDataFaturamentoInicio_I"},
+            {"acao": "clicar", "seletor": ".ajax__calendar_footer"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_cedDataFaturamentoFim_I"},
+            {"acao": "clicar", "seletor": "div.linha_form:nth-child(2) > span:nth-child(4) > span:nth-child(6) > div:nth-child(1) > span:nth-child(3) > div:nth-child(1)"},
+            {"acao": "sequencia", "nome": "ciclo_faturamento"},
+            {"acao": "sequencia", "nome": "somente_faturados"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_rdbAgrupamentoGerencia"},
+            {"acao": "pausa", "segundos": 2},
+            {"acao": "sequencia", "nome": "buscar"}
+        ],
+        "sem_resultado": _SEM_RESULTADO,
+        "tabela": dict(_GRID_RANKING, ausente="vazio"),  # grid ausente grava CSV só com cabeçalho
+        "colunas": [
+            {"indice": 0, "nome": "VD", "tipo": "texto"},
+            {"indice": 4, "nome": "Valor Praticado", "tipo": "numero_br"}
+        ],
+        "saida": os.path.join("extracoes", "resultado_pef_C{ciclo}.csv"),
+        "indicador": "PEF"
+    },
+    # Total geral de uma marca (código da estrutura de produto) no ciclo; sem arquivo de saída
+    "marca": {
+        "login": "vd",
+        "parametros": ["ciclo", "codigo"],
+        "navegacao": [
+            {"acao": "sequencia", "nome": "menu_ranking_vendas"},
+            {"acao": "preencher", "seletor": "#ContentPlaceHolder1_txtEstruturaProdutoCodigo_T2", "valor": "{codigo}", "tab": True},
+            {"acao": "pausa", "segundos": 1},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_cedDataFaturamentoInicio_s1a"},
+            {"acao": "clicar", "seletor": ".ajax__calendar_container > span:nth-child(3)"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_cedDataFaturamentoFim_s1a"},
+            {"acao": "clicar", "seletor": "div.linha_form:nth-child(2) > span:nth-child(4) > span:nth-child(6) > div:nth-child(1) > span:nth-child(3)"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlCicloFaturamentoInicial_d1"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlCicloFaturamentoInicial_d1 > option[value='{ano}{ciclo:02d}']"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlCicloFaturamentoFinal_d1"},
+            {"acao": "clicar", "seletor": "#ContentPlaceHolder1_ddlCicloFaturamentoFinal_d1 > option[value='{ano}{ciclo:02d}']"},
+            {"acao": "sequencia", "nome": "somente_faturados"},
+            {"acao": "sequencia", "nome": "buscar"}
+        ],
+        "sem_resultado": _SEM_RESULTADO,
+        # Colunas: [0]=Qtd. Itens, [1]=Qtd. Revendedor, [2]=Faturamento, [3]=Valor Praticado, [4]=Valor Venda
+        "tabela": dict(_GRID_RANKING, min_celulas=4, timeout=10),
+        "colunas": [{"indice": 3, "nome": "Valor", "tipo": "numero_br", "padrao": 0.0}]
     }
 }
 
 # Configurações de Logging
 LOGGING_CONFIG = {
-    "level": "INFO",
+    "level": os.getenv("LOG_LEVEL", "INFO"),
     "format": "%(asctime)s [%(levelname)s] %(message)s",
-    "file_mode": "w",
-    "encoding": "utf-8"
+    "file_mode": "a",  # append: o histórico é mantido e controlado pela rotação
+    "encoding": "utf-8",
+    # Rotação: "size" (por tamanho) ou "time" (por horário)
+    "rotation": os.getenv("LOG_ROTATION", "size"),
+    "max_bytes": 5 * 1024 * 1024,
+    "when": "midnight",
+    "backup_count": int(os.getenv("LOG_BACKUP_COUNT", "7") or 7),
+    # Registros estruturados (uma linha JSON por registro)
+    "json": os.getenv("LOG_JSON", "").lower() in ("1", "true", "sim")
 }
 
 # Configurações de Timing
@@ -99,6 +280,220 @@ TIMING_CONFIG = {
 }
 
 
+# Configurações de Métricas (formato Prometheus)
+METRICS_CONFIG = {
+    "namespace": "whatsapp_reporting",
+    # Diretório do textfile collector do node_exporter (um .prom por processo; vazio desabilita)
+    "textfile_dir": os.getenv("METRICS_TEXTFILE_DIR", os.path.join("log", "metrics")),
+    # Porta do endpoint HTTP /metrics (vazio desabilita)
+    "http_port": int(os.getenv("METRICS_PORT", "0") or 0),
+    "http_address": os.getenv("METRICS_ADDRESS", "127.0.0.1")
+}
+
+# Relatórios em imagem (PNG) para rankings grandes - requer Pillow
+REPORT_IMAGE_CONFIG = {
+    "enabled": os.getenv("RELATORIO_IMAGEM", "").lower() in ("1", "true", "sim"),
+    # Acima desse número de linhas o ranking vai como imagem e o texto vira só o resumo
+    "limite_linhas_texto": 40,
+    "top_n": 30,
+    # Meta de tempo de renderização: acima disso gerar_imagens avisa (benchmarks/bench_render_relatorio.py mede)
+    "segundos_por_imagem": 1.0,
+    "output_dir": os.path.join("extracoes", "imagens"),
+    "tamanho_fonte": 18,
+    "tamanho_titulo": 22,
+    "margem": 16,
+    "fontes": ["arial.ttf", "C:/Windows/Fonts/arial.ttf", "DejaVuSans.ttf",
+               "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf"],
+    "fontes_negrito": ["arialbd.ttf", "C:/Windows/Fonts/arialbd.ttf", "DejaVuSans-Bold.ttf",
+                       "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"]
+}
+
+# Perfil do Chrome usado nas extrações
+# "padrao": janela visível e maximizada (comportamento original)
+# "rapido": headless, janela reduzida e bloqueio de imagens/fontes/mídia/analytics via CDP
+DRIVER_PROFILE_CONFIG = {
+    "perfil": os.getenv("DRIVER_PROFILE", "padrao").strip().lower(),
+    "window_size": (1366, 768),
+    # Desabilitar o cache só é seguro quando a sessão não depende de recursos cacheados
+    "disable_cache": os.getenv("DRIVER_DISABLE_CACHE", "").lower() in ("1", "true", "sim"),
+    "blocked_urls": [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+        "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+        "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav",
+        "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+        "*hotjar.com*", "*facebook.net*", "*clarity.ms*"
+    ]
+}
+
+# Cache do chromedriver patcheado por versão do Chrome (ver componentes/driver_cache.py)
+# Fica fora do diretório do projeto para ser compartilhado entre execuções e cópias.
+DRIVER_CACHE_CONFIG = {
+    "enabled": os.getenv("DRIVER_CACHE", "1").strip().lower() not in ("0", "false", "no"),
+    "dir": os.getenv("DRIVER_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "chromedriver_patcheado")),
+    # Executável do Chrome; vazio usa a busca do undetected_chromedriver
+    "chrome_path": os.getenv("CHROME_BINARY", ""),
+    # Espera (segundos) pelo provisionamento de outro processo (download + patch)
+    "timeout_trava": 300
+}
+
+# Rastreamento dos comandos do WebDriver por etapa (ver componentes/rastreamento.py)
+RASTREAMENTO_CONFIG = {
+    "enabled": os.getenv("RASTREAMENTO", "1").strip().lower() not in ("0", "false", "no"),
+    "dir": os.getenv("RASTREAMENTO_DIR", os.path.join("log", "rastreamento")),
+    # Além do resumo, grava um .jsonl com cada comando (volumoso; para depuração)
+    "detalhado": os.getenv("RASTREAMENTO_DETALHADO", "").lower() in ("1", "true", "sim"),
+    # Alvos (seletores/atributos) mais frequentes mantidos por etapa
+    "max_alvos": 10
+}
+
+# Higiene de processos do Chrome/chromedriver (ver componentes/processos.py)
+PROCESS_CONFIG = {
+    "registry_dir": os.path.join("log", "pids"),
+    "timeout_encerramento": 5,
+    # Usados apenas com KILL_ALL_CHROME=1
+    "nomes_chrome": ["chromedriver", "chromedriver.exe", "chrome", "chrome.exe", "google-chrome"]
+}
+
+# Outbox de mensagens (evita reenvio em re-execuções após falha parcial)
+OUTBOX_CONFIG = {
+    "enabled": os.getenv("OUTBOX", "1").strip().lower() not in ("0", "false", "no"),
+    "path": os.getenv("OUTBOX_PATH", os.path.join("log", "outbox.json")),
+    # Entradas mais antigas que isso são descartadas ao carregar
+    "retencao_dias": 7
+}
+
+# Checkpoints de extração (retomada a partir da primeira unidade pendente)
+CHECKPOINT_CONFIG = {
+    "enabled": os.getenv("CHECKPOINTS", "1").strip().lower() not in ("0", "false", "no"),
+    "dir": os.path.join("log", "checkpoints"),
+    # Execuções por unidade; a partir da segunda, a sessão do navegador é verificada/reaberta
+    "tentativas_unidade": 2,
+    # Idade máxima de uma unidade concluída para ser reaproveitada (0 = o dia todo): retomar uma
+    # nova tentativa, sem enviar horas depois números antigos como se fossem atuais
+    "validade_minutos": int(os.getenv("CHECKPOINT_VALIDADE_MINUTOS", "90") or 0)
+}
+
+# Executor de etapas do pipeline (ver componentes/dag.py)
+DAG_CONFIG = {
+    # Etapas rodando ao mesmo tempo (cada extração abre um Chrome); 1 = uma por vez, na ordem declarada
+    "max_paralelo": int(os.getenv("DAG_MAX_PARALELO", "2") or 2),
+    # Relatório de tempos e caminho crítico (<dir>/<pipeline>.json)
+    "dir": os.getenv("DAG_DIR", os.path.join("log", "dag"))
+}
+
+# Timeouts aprendidos a partir das latências de cada passo (ver componentes/timeouts_adaptativos.py)
+ADAPTIVE_TIMEOUT_CONFIG = {
+    "enabled": os.getenv("TIMEOUTS_ADAPTATIVOS", "1").strip().lower() not in ("0", "false", "no"),
+    "path": os.getenv("TIMEOUTS_HISTORICO", os.path.join("log", "latencias_passos.jsonl")),
+    "percentil": float(os.getenv("TIMEOUTS_PERCENTIL", "95") or 95),
+    "margem": float(os.getenv("TIMEOUTS_MARGEM", "2.0") or 2.0),
+    # Nunca abaixo disso (segundos) nem acima de fator_maximo x o timeout declarado
+    "minimo": 3.0,
+    "fator_maximo": 2.0,
+    # Até ter min_amostras medições o passo usa o timeout declarado
+    "min_amostras": 10,
+    "janela": 100,
+    "retencao_dias": 30
+}
+
+# Circuit breaker dos portais (ver componentes/circuit_breaker.py)
+CIRCUIT_BREAKER_CONFIG = {
+    "enabled": os.getenv("CIRCUIT_BREAKER", "1").strip().lower() not in ("0", "false", "no"),
+    "path": os.getenv("CIRCUIT_BREAKER_PATH", os.path.join("log", "circuit_breaker.json")),
+    # Falhas seguidas (sonda, login ou relatório) que abrem o circuito
+    "limiar_falhas": 2,
+    # Tempo com o circuito aberto antes da sonda de meio-aberto (segundos)
+    "cooldown_segundos": int(os.getenv("CIRCUIT_BREAKER_COOLDOWN", "900") or 900),
+    "timeout_sonda": 5
+}
+
+# Captura de metas lendo o IndexedDB do WhatsApp Web (ver componentes/whatsapp_store.py)
+# Grupos sem id de chat configurado usam a pesquisa pela interface.
+WHATSAPP_STORE_CONFIG = {
+    "enabled": os.getenv("WHATSAPP_STORE", "1").strip().lower() not in ("0", "false", "no"),
+    "url": "https://web.whatsapp.com/",
+    # Ids serializados dos chats (ex.: 120363000000000000@g.us)
+    "chats": {
+        "VD": os.getenv("WHATSAPP_CHAT_VD", ""),
+        "LOJA": os.getenv("WHATSAPP_CHAT_LOJA", "")
+    },
+    # Esquema do banco local do WhatsApp Web
+    "banco": os.getenv("WHATSAPP_STORE_DB", "model-storage"),
+    "store": "message",
+    "campo_id": "id",
+    "campo_tempo": "t",
+    "campo_texto": "body",
+    # Espera da sessão carregada e da consulta (segundos)
+    "timeout_carregamento": 60,
+    "timeout_script": 10
+}
+
+# Sessão única do WhatsApp Web (ver componentes/whatsapp_sessao.py)
+# Chrome de longa duração compartilhado pela captura de metas e pelo envio.
+WHATSAPP_SESSAO_CONFIG = {
+    "enabled": os.getenv("WHATSAPP_SESSAO", "1").strip().lower() not in ("0", "false", "no"),
+    "url": "https://web.whatsapp.com/",
+    "chrome_path": os.getenv("WHATSAPP_CHROME", "C:/Program Files/Google/Chrome/Application/chrome.exe"),
+    "chromedriver_path": os.getenv("WHATSAPP_CHROMEDRIVER", "CAMINHO DO SEU CHROMEDRIVERWEB"),
+    # Perfil pareado com o WhatsApp (o mesmo usado antes pela captura de metas)
+    "user_data_dir": os.getenv("WHATSAPP_USER_DATA", "CAMINHO DO SEU GOOGLE CHROME PARA CAPUTRA DE PERFIL"),
+    "profile_dir": os.getenv("WHATSAPP_PROFILE", "Profile 1"),
+    "porta": int(os.getenv("WHATSAPP_DEBUG_PORT", "9223") or 9223),
+    "estado_path": os.path.join("log", "whatsapp_sessao.json"),
+    # Argumentos extras do Chrome da sessão (ex.: "--headless=new --no-sandbox" na reprodução offline)
+    "argumentos": os.getenv("WHATSAPP_SESSAO_ARGS", "").split(),
+    # Envio pelo DOM da sessão (evento de colar na página + Enter via WebDriver), sem depender do
+    # foco da janela nem do clipboard do sistema: permite enviar com outras janelas em uso
+    "envio_dom": os.getenv("WHATSAPP_ENVIO_DOM", "1").strip().lower() not in ("0", "false", "no"),
+    # Esperas (segundos): abertura da porta, lista de conversas, caixa de mensagem do grupo, envio
+    "timeout_inicio": 20,
+    "timeout_pronto": 120,
+    "timeout_chat": 30,
+    "timeout_envio": 15
+}
+
+# Gravação e reprodução offline do pipeline (ver componentes/replay.py)
+REPLAY_CONFIG = {
+    # "gravar": salva respostas dos portais e instantâneos do WhatsApp durante uma execução real
+    "modo": os.getenv("REPLAY_MODO", "").strip().lower(),
+    "dir": os.getenv("REPLAY_DIR", os.path.join("gravacoes", "ultima")),
+    # Atraso (segundos) de cada resposta servida na reprodução
+    "latencia": float(os.getenv("REPLAY_LATENCIA", "0.05") or 0.05),
+    # Respostas com esses content-types têm as URLs das origens reescritas ao servir
+    "tipos_texto": ["text/", "javascript", "json", "xml"]
+}
+
+# Vários tenants (lojas/franquias) em paralelo, cada um com o próprio diretório (ver componentes/tenants.py)
+TENANT_CONFIG = {
+    # Registro JSON: nome do tenant -> credenciais (env), grupos/seletores (config) e pipeline
+    "registro": os.getenv("TENANTS_REGISTRO", "tenants.json"),
+    # Diretório de trabalho de cada tenant (extracoes/, log/, perfil do WhatsApp)
+    "dir": os.getenv("TENANTS_DIR", "tenants"),
+    "max_paralelo": int(os.getenv("TENANTS_MAX_PARALELO", "20") or 20),
+    # Navegadores abertos ao mesmo tempo em cada portal, somando todos os tenants
+    "limites_portal": json.loads(os.getenv("TENANTS_LIMITES_PORTAL", "") or '{"loja": 8, "vd": 8}'),
+    # Definido pelo componentes/tenants.py nos processos dos tenants (vazio = sem limite por portal)
+    "vagas_dir": os.getenv("TENANTS_VAGAS_DIR", ""),
+    "timeout_vaga": 1800,
+    "timeout": int(os.getenv("TENANTS_TIMEOUT", "3600") or 3600),
+    # Porta de depuração da sessão do WhatsApp de cada tenant: base + posição no registro
+    "porta_base": int(os.getenv("TENANTS_PORTA_BASE", "9300") or 9300)
+}
+
+# Configurações de Notificações
+NOTIFICATION_CONFIG = {
+    # Quantidade máxima de notificações mantidas em memória (buffer circular)
+    "max_notifications": int(os.getenv("NOTIFICATION_MAX", "1000") or 1000),
+    # Persistência append-only: "" (desabilitado), "jsonl" ou "sqlite"
+    "sink": os.getenv("NOTIFICATION_SINK", "").strip().lower(),
+    "sink_path": os.getenv("NOTIFICATION_SINK_PATH", ""),
+    "default_paths": {
+        "jsonl": os.path.join("log", "notifications.jsonl"),
+        "sqlite": os.path.join("log", "notifications.db")
+    }
+}
+
+
 def get_file_path(filename: str) -> str:
     """Retorna o caminho completo para um arquivo"""
     return os.path.join(FILE_CONFIG["output_dir"], filename)
@@ -116,3 +511,42 @@ def ensure_directories():
     os.makedirs(FILE_CONFIG["output_dir"], exist_ok=True)
     os.makedirs(FILE_CONFIG["log_dir"], exist_ok=True)
 
+
+def _redirecionar_origens(valor, origens: Dict[str, str]):
+    """Troca o início das URLs (origem gravada -> servidor de reprodução) nas configurações"""
+    if isinstance(valor, str):
+        for origem, destino in origens.items():
+            if valor.startswith(origem):
+                return destino + valor[len(origem):]
+        return valor
+    if isinstance(valor, dict):
+        for chave in valor:
+            valor[chave] = _redirecionar_origens(valor[chave], origens)
+    elif isinstance(valor, list):
+        valor[:] = [_redirecionar_origens(item, origens) for item in valor]
+    return valor
+
+
+def mesclar_configuracao(destino: dict, origem: dict) -> dict:
+    """Mescla origem em destino: dicts recursivamente, os demais valores substituem"""
+    for chave, valor in origem.items():
+        if isinstance(valor, dict) and isinstance(destino.get(chave), dict):
+            mesclar_configuracao(destino[chave], valor)
+        else:
+            destino[chave] = valor
+    return destino
+
+
+# Processo de um tenant: TENANT_SOBREPOSICOES (JSON definido por componentes/tenants.py) troca
+# grupos, metas, seletores e demais chaves das configurações acima só neste processo
+if os.getenv("TENANT_SOBREPOSICOES"):
+    for _nome, _valor in json.loads(os.environ["TENANT_SOBREPOSICOES"]).items():
+        mesclar_configuracao(globals()[_nome], _valor)
+
+
+# Reprodução offline: REPLAY_ORIGENS (JSON definido por componentes/replay.py) aponta os
+# portais e o WhatsApp Web para o servidor local em todos os processos do pipeline
+if os.getenv("REPLAY_ORIGENS"):
+    for _nome, _valor in list(globals().items()):
+        if _nome.isupper() and isinstance(_valor, (dict, list)):
+            _redirecionar_origens(_valor, json.loads(os.environ["REPLAY_ORIGENS"]))
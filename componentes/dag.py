@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Executor de Etapas (DAG)
+========================
+Roda as etapas de um pipeline assim que as dependências delas ficam
+prontas, em vez de uma fila fixa com pausas entre uma e outra.
+
+Cada etapa declara o que consome e o que produz:
+
+- entradas: artefatos passados à função como argumentos nomeados;
+- apos: artefatos que precisam existir antes, mas não são passados (ordem);
+- saidas: nomes dos valores retornados (uma saída = o próprio retorno,
+  várias = uma tupla na mesma ordem).
+
+Até DAG_CONFIG["max_paralelo"] etapas rodam ao mesmo tempo, cada uma em uma
+thread; entre as prontas, vale a ordem de declaração. Uma etapa que levanta
+exceção é marcada como "falhou" e as que dependem dela como "pulada" — os
+demais ramos seguem normalmente.
+
+Ao fim, o relatório traz início, duração, espera por vaga e folga de cada
+etapa e o caminho crítico (a sequência de dependências que define o tempo
+total). Ele vai para o log, para DAG_CONFIG["dir"]/<pipeline>.json e para a
+métrica pipeline_stage_seconds.
+
+Uso:
+    python -m componentes.dag log/dag/main.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from componentes.config import DAG_CONFIG
+from componentes.metrics import pipeline_stage_seconds
+
+logger = logging.getLogger(__name__)
+
+CONCLUIDA = "concluida"
+FALHOU = "falhou"
+PULADA = "pulada"
+
+
+@dataclass
+class Etapa:
+    nome: str
+    funcao: Callable[..., Any]
+    entradas: Tuple[str, ...] = ()
+    saidas: Tuple[str, ...] = ()
+    apos: Tuple[str, ...] = ()
+    # Linha de log no início da etapa (ex.: "📊 ETAPA 2: Extração LOJA")
+    rotulo: Optional[str] = None
+
+
+@dataclass
+class _Execucao:
+    status: Optional[str] = None
+    pronta: Optional[float] = None
+    inicio: Optional[float] = None
+    fim: Optional[float] = None
+    erro: Optional[str] = None
+
+    @property
+    def duracao(self) -> float:
+        if self.inicio is None or self.fim is None:
+            return 0.0
+        return self.fim - self.inicio
+
+
+class ExecutorDAG:
+    """Executa etapas com dependências declaradas por artefatos"""
+
+    def __init__(self, etapas: List[Etapa], nome: str = "pipeline", max_paralelo: Optional[int] = None,
+                 log: Optional[logging.Logger] = None):
+        self.nome = nome
+        self.etapas: Dict[str, Etapa] = {}
+        self.max_paralelo = max(1, max_paralelo if max_paralelo is not None else DAG_CONFIG["max_paralelo"])
+        self.log = log or logger
+        self.artefatos: Dict[str, Any] = {}
+        self.execucoes: Dict[str, _Execucao] = {}
+        self._relatorio: Optional[Dict] = None
+        self._inicio_epoch = time.time()
+        self._duracao = 0.0
+
+        produtor: Dict[str, str] = {}
+        for etapa in etapas:
+            if etapa.nome in self.etapas:
+                raise ValueError(f"Etapa duplicada: {etapa.nome}")
+            self.etapas[etapa.nome] = etapa
+            for saida in etapa.saidas:
+                if saida in produtor:
+                    raise ValueError(f"Artefato '{saida}' produzido por {produtor[saida]} e {etapa.nome}")
+                produtor[saida] = etapa.nome
+        # Dependências entre etapas, derivadas dos artefatos
+        self.dependencias: Dict[str, List[str]] = {}
+        for etapa in etapas:
+            deps = []
+            for artefato in etapa.entradas + etapa.apos:
+                if artefato not in produtor:
+                    raise ValueError(f"Etapa {etapa.nome}: nenhuma etapa produz '{artefato}'")
+                if produtor[artefato] not in deps:
+                    deps.append(produtor[artefato])
+            self.dependencias[etapa.nome] = deps
+        self.ordem = self._ordenar()
+
+    def _ordenar(self) -> List[str]:
+        """Ordem topológica estável (levanta ValueError se houver ciclo)"""
+        ordem, visitadas, em_curso = [], set(), set()
+
+        def visitar(nome):
+            if nome in visitadas:
+                return
+            if nome in em_curso:
+                raise ValueError(f"Ciclo de dependências passando por {nome}")
+            em_curso.add(nome)
+            for dep in self.dependencias[nome]:
+                visitar(dep)
+            em_curso.discard(nome)
+            visitadas.add(nome)
+            ordem.append(nome)
+
+        for nome in self.etapas:
+            visitar(nome)
+        return ordem
+
+    def _rodar(self, etapa: Etapa) -> Any:
+        if etapa.rotulo:
+            self.log.info("=" * 50)
+            self.log.info(etapa.rotulo)
+        argumentos = {entrada: self.artefatos[entrada] for entrada in etapa.entradas}
+        return etapa.funcao(**argumentos)
+
+    def _guardar(self, etapa: Etapa, resultado: Any):
+        if len(etapa.saidas) == 1:
+            self.artefatos[etapa.saidas[0]] = resultado
+        elif etapa.saidas:
+            if not isinstance(resultado, tuple) or len(resultado) != len(etapa.saidas):
+                raise ValueError(f"Etapa {etapa.nome} deveria retornar {len(etapa.saidas)} valores {etapa.saidas}")
+            self.artefatos.update(zip(etapa.saidas, resultado))
+
+    def executar(self) -> Dict[str, Any]:
+        """Roda todas as etapas possíveis e retorna os artefatos produzidos"""
+        t0 = time.perf_counter()
+        self._inicio_epoch = time.time()
+        self.execucoes = {nome: _Execucao() for nome in self.etapas}
+        pendentes = list(self.ordem)
+        em_execucao = {}
+        with ThreadPoolExecutor(max_workers=self.max_paralelo, thread_name_prefix=f"dag-{self.nome}") as pool:
+            while pendentes or em_execucao:
+                agora = time.perf_counter() - t0
+                for nome in list(pendentes):
+                    status_deps = [self.execucoes[dep].status for dep in self.dependencias[nome]]
+                    if any(s in (FALHOU, PULADA) for s in status_deps):
+                        pendentes.remove(nome)
+                        self.execucoes[nome].status = PULADA
+                        self.log.warning(f"⏭️ Etapa {nome} pulada (dependência não concluída)")
+                        continue
+                    if not all(s == CONCLUIDA for s in status_deps):
+                        continue
+                    execucao = self.execucoes[nome]
+                    if execucao.pronta is None:
+                        execucao.pronta = agora
+                    if len(em_execucao) >= self.max_paralelo:
+                        continue
+                    pendentes.remove(nome)
+                    execucao.inicio = time.perf_counter() - t0
+                    em_execucao[pool.submit(self._rodar, self.etapas[nome])] = nome
+                if not em_execucao:
+                    # Nada rodando: a passada acima já marcou como puladas as que sobraram
+                    break
+                concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+                for futuro in concluidos:
+                    nome = em_execucao.pop(futuro)
+                    execucao = self.execucoes[nome]
+                    execucao.fim = time.perf_counter() - t0
+                    try:
+                        self._guardar(self.etapas[nome], futuro.result())
+                        execucao.status = CONCLUIDA
+                    except Exception as e:
+                        execucao.status = FALHOU
+                        execucao.erro = str(e)
+                        self.log.error(f"❌ Etapa {nome} falhou: {e}", exc_info=True)
+        self._duracao = time.perf_counter() - t0
+        self._publicar()
+        return dict(self.artefatos)
+
+    def caminho_critico(self) -> Tuple[List[str], Dict[str, float]]:
+        """Cadeia de dependências mais longa (pelas durações medidas) e a folga de cada etapa"""
+        duracao = {nome: self.execucoes[nome].duracao for nome in self.ordem}
+        termino_cedo, anterior = {}, {}
+        for nome in self.ordem:
+            deps = self.dependencias[nome]
+            base = max(deps, key=lambda d: termino_cedo[d]) if deps else None
+            anterior[nome] = base
+            termino_cedo[nome] = (termino_cedo[base] if base else 0.0) + duracao[nome]
+        if not termino_cedo:
+            return [], {}
+        total = max(termino_cedo.values())
+
+        sucessores = {nome: [] for nome in self.ordem}
+        for nome, deps in self.dependencias.items():
+            for dep in deps:
+                sucessores[dep].append(nome)
+        termino_tarde = {}
+        for nome in reversed(self.ordem):
+            termino_tarde[nome] = min((termino_tarde[s] - duracao[s] for s in sucessores[nome]), default=total)
+        folgas = {nome: max(termino_tarde[nome] - termino_cedo[nome], 0.0) for nome in self.ordem}
+
+        caminho = []
+        nome = max(self.ordem, key=lambda n: termino_cedo[n])
+        while nome is not None:
+            caminho.append(nome)
+            nome = anterior[nome]
+        return list(reversed(caminho)), folgas
+
+    def relatorio(self) -> Dict:
+        caminho, folgas = self.caminho_critico()
+        etapas = {}
+        for nome in self.ordem:
+            execucao = self.execucoes[nome]
+            espera = (execucao.inicio - execucao.pronta) if execucao.inicio is not None else None
+            etapas[nome] = {
+                "status": execucao.status,
+                "dependencias": self.dependencias[nome],
+                "inicio_s": _arredondar(execucao.inicio),
+                "fim_s": _arredondar(execucao.fim),
+                "duracao_s": round(execucao.duracao, 3),
+                "espera_s": _arredondar(espera),
+                "folga_s": round(folgas.get(nome, 0.0), 3),
+                "critica": nome in caminho,
+                "erro": execucao.erro,
+            }
+        return {
+            "pipeline": self.nome,
+            "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self._inicio_epoch)),
+            "max_paralelo": self.max_paralelo,
+            "duracao_s": round(self._duracao, 3),
+            "caminho_critico_s": round(sum(self.execucoes[n].duracao for n in caminho), 3),
+            "caminho_critico": caminho,
+            "etapas": etapas,
+        }
+
+    def _publicar(self):
+        """Log, métrica e arquivo do relatório (falhas aqui não afetam o pipeline)"""
+        try:
+            self._relatorio = self.relatorio()
+            for linha in formatar_relatorio(self._relatorio):
+                self.log.info(linha)
+            for nome, dados in self._relatorio["etapas"].items():
+                pipeline_stage_seconds.set(dados["duracao_s"], pipeline=self.nome, etapa=nome,
+                                           critica="sim" if dados["critica"] else "nao")
+            caminho = os.path.join(DAG_CONFIG["dir"], f"{self.nome}.json")
+            os.makedirs(DAG_CONFIG["dir"], exist_ok=True)
+            temporario = f"{caminho}.{os.getpid()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self._relatorio, f, ensure_ascii=False, indent=2)
+            os.replace(temporario, caminho)
+        except Exception as e:
+            self.log.warning(f"⚠️ Falha ao publicar o relatório das etapas: {e}")
+
+
+def _arredondar(valor: Optional[float]) -> Optional[float]:
+    return None if valor is None else round(valor, 3)
+
+
+def formatar_relatorio(relatorio: Dict) -> List[str]:
+    linhas = [f"🧭 Etapas de {relatorio['pipeline']}: {relatorio['duracao_s']:.1f}s no total, caminho crítico "
+              f"{relatorio['caminho_critico_s']:.1f}s ({' → '.join(relatorio['caminho_critico'])})",
+              f"   {'etapa':<28} {'status':<10} {'início':>8} {'duração':>8} {'espera':>8} {'folga':>8}"]
+    for nome, dados in relatorio["etapas"].items():
+        inicio = f"{dados['inicio_s']:.1f}" if dados["inicio_s"] is not None else "-"
+        espera = f"{dados['espera_s']:.1f}" if dados["espera_s"] is not None else "-"
+        marca = " *" if dados["critica"] else ""
+        linhas.append(f"   {nome:<28} {dados['status'] or '-':<10} {inicio:>8} {dados['duracao_s']:>8.1f} "
+                      f"{espera:>8} {dados['folga_s']:>8.1f}{marca}")
+    return linhas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mostra o relatório de etapas gravado pelo executor")
+    parser.add_argument("arquivo", help="Relatório (ex.: log/dag/main.json)")
+    args = parser.parse_args()
+    with open(args.arquivo, "r", encoding="utf-8") as f:
+        relatorio = json.load(f)
+    for linha in formatar_relatorio(relatorio):
+        print(linha)
+    print("   (* = caminho crítico)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Cache do Chromedriver
+=====================
+Provisiona o chromedriver do undetected_chromedriver uma vez por versão do
+Chrome e reaproveita o binário nas próximas inicializações.
+
+Sem o cache, cada uc.Chrome() (e cada retry de iniciar_navegador) detecta
+de novo a versão do Chrome, baixa/copia o chromedriver e aplica o patch no
+binário. Com o cache:
+
+- a versão do Chrome é lida uma vez por executável (caminho, tamanho e
+  data de modificação) e fica registrada no manifesto
+- o chromedriver já "patcheado" de cada versão principal fica em
+  DRIVER_CACHE_CONFIG["dir"], com o sha256 no manifesto
+- antes de usar, o binário é conferido pelo sha256 (arquivo corrompido ou
+  trocado é provisionado de novo)
+- o provisionamento é travado entre processos (provisionar.lock no
+  diretório do cache): execuções simultâneas, como os tenants, baixam e
+  patcheiam uma vez só e não gravam o manifesto umas por cima das outras
+
+Uso:
+    python -m componentes.driver_cache            # provisiona e mostra o binário em uso
+    python -m componentes.driver_cache --status
+    python -m componentes.driver_cache --limpar
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from componentes.config import DRIVER_CACHE_CONFIG
+from componentes.travas import trava_arquivo
+
+logger = logging.getLogger(__name__)
+
+_VERSAO = re.compile(r"(\d+)\.(\d+)\.(\d+)\.(\d+)")
+_MARCA_PATCH = b"undetected chromedriver"
+
+
+def _sha256(caminho: str) -> str:
+    digest = hashlib.sha256()
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(bloco)
+    return digest.hexdigest()
+
+
+def _assinatura(caminho: str) -> str:
+    """Identifica o executável do Chrome instalado (muda quando o Chrome atualiza)"""
+    info = os.stat(caminho)
+    return f"{os.path.abspath(caminho)}|{info.st_size}|{int(info.st_mtime)}"
+
+
+def localizar_chrome() -> Optional[str]:
+    """Executável do Chrome (CHROME_BINARY ou a busca do undetected_chromedriver)"""
+    caminho = DRIVER_CACHE_CONFIG.get("chrome_path")
+    if caminho and os.path.exists(caminho):
+        return caminho
+    import undetected_chromedriver as uc
+    return uc.find_chrome_executable()
+
+
+def detectar_versao_chrome(caminho_chrome: str) -> Optional[str]:
+    """Versão completa do Chrome (ex.: 120.0.6099.110), sem consultar a rede.
+
+    No Windows o chrome.exe não imprime a versão; ela é o nome da pasta
+    ao lado do executável (Application/120.0.6099.110).
+    """
+    if sys.platform.startswith("win"):
+        pasta = os.path.dirname(caminho_chrome)
+        versoes = [nome for nome in os.listdir(pasta) if _VERSAO.fullmatch(nome)]
+        if versoes:
+            return max(versoes, key=lambda v: tuple(int(p) for p in v.split(".")))
+        return None
+    try:
+        saida = subprocess.run([caminho_chrome, "--version"], capture_output=True, text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning(f"⚠️ Não foi possível consultar a versão do Chrome: {e}")
+        return None
+    match = _VERSAO.search(saida)
+    return match.group(0) if match else None
+
+
+class CacheDriver:
+    """Chromedrivers patcheados por versão principal do Chrome, com manifesto JSON"""
+
+    def __init__(self, diretorio: Optional[str] = None):
+        self.diretorio = diretorio or DRIVER_CACHE_CONFIG["dir"]
+        self.caminho_manifesto = os.path.join(self.diretorio, "manifesto.json")
+        self.caminho_trava = os.path.join(self.diretorio, "provisionar.lock")
+        self._manifesto = None
+
+    # -- manifesto -----------------------------------------------------------
+
+    @property
+    def manifesto(self) -> Dict:
+        if self._manifesto is None:
+            try:
+                with open(self.caminho_manifesto, "r", encoding="utf-8") as f:
+                    self._manifesto = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._manifesto = {}
+            self._manifesto.setdefault("chrome", {})
+            self._manifesto.setdefault("drivers", {})
+        return self._manifesto
+
+    def _salvar(self):
+        os.makedirs(self.diretorio, exist_ok=True)
+        temporario = f"{self.caminho_manifesto}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.manifesto, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, self.caminho_manifesto)
+
+    # -- versão do Chrome ----------------------------------------------------
+
+    def versao_chrome(self, caminho_chrome: str) -> Optional[str]:
+        """Versão do Chrome, lida do manifesto enquanto o executável não mudar"""
+        assinatura = _assinatura(caminho_chrome)
+        versao = self.manifesto["chrome"].get(assinatura)
+        if versao:
+            return versao
+        versao = detectar_versao_chrome(caminho_chrome)
+        if versao:
+            # Só a assinatura atual interessa: uma atualização do Chrome invalida a anterior
+            self.manifesto["chrome"] = {assinatura: versao}
+            self._salvar()
+        return versao
+
+    # -- chromedriver --------------------------------------------------------
+
+    def _arquivo_driver(self, versao_principal: int) -> str:
+        extensao = ".exe" if sys.platform.startswith("win") else ""
+        return os.path.join(self.diretorio, f"chromedriver_{versao_principal}{extensao}")
+
+    def driver_valido(self, versao_principal: int) -> Optional[str]:
+        """Caminho do driver em cache, se existir e conferir com o sha256 do manifesto"""
+        entrada = self.manifesto["drivers"].get(str(versao_principal))
+        if not entrada:
+            return None
+        caminho = os.path.join(self.diretorio, entrada["arquivo"])
+        if not os.path.exists(caminho):
+            return None
+        if _sha256(caminho) != entrada["sha256"]:
+            logger.warning(f"⚠️ Chromedriver {versao_principal} em cache não confere com o sha256; provisionando de novo")
+            return None
+        return caminho
+
+    def _baixar_e_patchear(self, versao_principal: int) -> str:
+        """Baixa e aplica o patch pelo Patcher do undetected_chromedriver e copia para o cache"""
+        from undetected_chromedriver.patcher import Patcher
+
+        patcher = Patcher(version_main=versao_principal)
+        patcher.auto()
+        origem = patcher.executable_path
+        with open(origem, "rb") as f:
+            if _MARCA_PATCH not in f.read():
+                raise RuntimeError(f"Chromedriver {origem} não foi patcheado")
+
+        destino = self._arquivo_driver(versao_principal)
+        os.makedirs(self.diretorio, exist_ok=True)
+        # Cópia + os.replace: outro processo nunca vê um binário pela metade
+        temporario = f"{destino}.{os.getpid()}.tmp"
+        shutil.copy2(origem, temporario)
+        os.replace(temporario, destino)
+        return destino
+
+    def provisionar(self, caminho_chrome: str) -> Tuple[str, int]:
+        """Retorna (chromedriver patcheado, versão principal) para o Chrome informado.
+
+        Raises:
+            RuntimeError: versão do Chrome não detectada ou patch não aplicado
+            TimeoutError: outro processo segurou o provisionamento por mais de DRIVER_CACHE_CONFIG["timeout_trava"]
+        """
+        with trava_arquivo(self.caminho_trava, timeout=DRIVER_CACHE_CONFIG["timeout_trava"], intervalo=0.2):
+            # Relê o manifesto: outro processo pode ter provisionado enquanto esperávamos
+            self._manifesto = None
+            return self._provisionar(caminho_chrome)
+
+    def _provisionar(self, caminho_chrome: str) -> Tuple[str, int]:
+        versao = self.versao_chrome(caminho_chrome)
+        if not versao:
+            raise RuntimeError(f"Versão do Chrome não detectada em {caminho_chrome}")
+        versao_principal = int(versao.split(".")[0])
+
+        caminho = self.driver_valido(versao_principal)
+        if caminho:
+            return caminho, versao_principal
+
+        inicio = time.perf_counter()
+        logger.info(f"📥 Provisionando chromedriver para o Chrome {versao}...")
+        caminho = self._baixar_e_patchear(versao_principal)
+        self.manifesto["drivers"][str(versao_principal)] = {
+            "arquivo": os.path.basename(caminho),
+            "sha256": _sha256(caminho),
+            "chrome": versao,
+            "criado_em": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+        self._salvar()
+        logger.info(f"✅ Chromedriver {versao_principal} em cache ({time.perf_counter() - inicio:.1f}s)")
+        return caminho, versao_principal
+
+    def limpar(self) -> int:
+        """Remove os drivers e o manifesto; retorna quantos arquivos foram removidos"""
+        removidos = 0
+        if os.path.isdir(self.diretorio):
+            for nome in os.listdir(self.diretorio):
+                if nome == os.path.basename(self.caminho_trava):
+                    continue  # pode estar travado por um provisionamento em andamento
+                try:
+                    os.remove(os.path.join(self.diretorio, nome))
+                    removidos += 1
+                except OSError as e:
+                    logger.warning(f"⚠️ Não foi possível remover {nome}: {e}")
+        self._manifesto = None
+        return removidos
+
+
+_cache: Optional[CacheDriver] = None
+_provisionado: Optional[Dict] = None
+# Extrações simultâneas no mesmo processo provisionam uma vez só (entre processos: provisionar.lock)
+_provisionar_lock = threading.Lock()
+
+
+def obter_cache() -> Optional[CacheDriver]:
+    """Cache compartilhado do processo (None se DRIVER_CACHE_CONFIG["enabled"] for False)"""
+    global _cache
+    if not DRIVER_CACHE_CONFIG["enabled"]:
+        return None
+    if _cache is None:
+        _cache = CacheDriver()
+    return _cache
+
+
+def argumentos_uc() -> Dict:
+    """Argumentos extras para uc.Chrome() com o driver em cache.
+
+    O resultado fica memorizado no processo, então os retries de
+    iniciar_navegador não repetem nem a conferência do sha256. Sem cache
+    (desabilitado ou falha no provisionamento) retorna {} e o
+    undetected_chromedriver segue o fluxo padrão.
+    """
+    global _provisionado
+    with _provisionar_lock:
+        if _provisionado is not None:
+            return dict(_provisionado)
+        cache = obter_cache()
+        if cache is None:
+            return {}
+        try:
+            caminho_chrome = localizar_chrome()
+            if not caminho_chrome:
+                raise RuntimeError("Chrome não encontrado")
+            driver, versao_principal = cache.provisionar(caminho_chrome)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache do chromedriver indisponível, usando o fluxo padrão: {e}")
+            return {}
+        _provisionado = {
+            "driver_executable_path": driver,
+            "browser_executable_path": caminho_chrome,
+            "version_main": versao_principal,
+        }
+        return dict(_provisionado)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cache do chromedriver patcheado")
+    parser.add_argument("--status", action="store_true", help="Mostra o manifesto")
+    parser.add_argument("--limpar", action="store_true", help="Remove os drivers em cache")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    cache = CacheDriver()
+    if args.limpar:
+        print(f"🧹 {cache.limpar()} arquivo(s) removido(s) de {cache.diretorio}")
+        return
+    if args.status:
+        print(json.dumps(cache.manifesto, ensure_ascii=False, indent=2))
+        return
+
+    caminho_chrome = localizar_chrome()
+    if not caminho_chrome:
+        print("❌ Chrome não encontrado")
+        sys.exit(1)
+    try:
+        driver, versao_principal = cache.provisionar(caminho_chrome)
+    except Exception as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    print(f"✅ Chrome {versao_principal}: {driver}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Fila de Envio por Grupo
+=======================
+Agrupa as mensagens por destino e envia cada grupo em lote.
+
+Cada grupo é aberto uma única vez (navegar_para_grupo); em seguida todas as
+mensagens dele são enviadas em sequência. O ritmo entre mensagens segue a
+confirmação de envio: com um hook de confirmação, a mensagem seguinte sai
+assim que a anterior aparece confirmada; o intervalo fixo configurado por
+grupo em WHATSAPP_CONFIG["rate_limits"] só vale quando a confirmação falta.
+
+Com o outbox habilitado (componentes/outbox.py), cada mensagem é registrada
+como pending/sent/confirmed; numa re-execução as já confirmadas são puladas.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from componentes.config import WHATSAPP_CONFIG
+from componentes.metrics import send_latency_seconds
+from componentes.outbox import CONFIRMADA, ENVIADA, PENDENTE, Outbox, chave_mensagem, hash_conteudo, obter_outbox
+
+_OUTBOX_PADRAO = object()
+
+
+@dataclass
+class Anexo:
+    """Imagem enviada antes do texto: se ela sair, o texto leva `resumo`; se falhar, `completo`"""
+    caminho: str
+    resumo: str
+    completo: str
+
+
+@dataclass
+class ItemEnvio:
+    grupo: str
+    link: str
+    mensagem: str
+    rotulo: Optional[str] = None
+    imagens: List[Anexo] = field(default_factory=list)
+    mensagem_alternativa: Optional[str] = None
+    ciclo: Optional[int] = None
+    chave: Optional[str] = None  # chave no outbox
+    enviada: Optional[str] = None  # texto efetivamente enviado (mensagem ou alternativa)
+
+
+class FilaEnvio:
+    """Fila de mensagens agrupada por destino"""
+
+    def __init__(self, sender, confirmar_envio: Optional[Callable[[ItemEnvio], bool]] = None,
+                 limites_padrao: Optional[Dict[str, float]] = None, outbox=_OUTBOX_PADRAO):
+        """
+        Args:
+            sender: WhatsAppSender (navegar_para_grupo / enviar_mensagem)
+            confirmar_envio: Hook opcional chamado após cada envio; deve retornar True
+                quando a mensagem estiver confirmada (ex.: tique de enviada no DOM).
+                É consultado até WHATSAPP_CONFIG["confirmacao_timeout"] segundos.
+                Sem ele as mensagens ficam como sent no outbox e são reenviadas numa re-execução.
+            limites_padrao: Sobrepõe os limites "padrao" da configuração (valores None são ignorados)
+            outbox: Outbox de mensagens (padrão: obter_outbox(); None desabilita)
+        """
+        self.sender = sender
+        self.confirmar_envio = confirmar_envio
+        self.logger = logging.getLogger(__name__)
+        self._grupos: Dict[str, List[ItemEnvio]] = {}
+        self._links: Dict[str, str] = {}
+        self._ultimo_envio: Dict[str, float] = {}
+        self._limites_padrao = {k: v for k, v in (limites_padrao or {}).items() if v is not None}
+        self.outbox: Optional[Outbox] = obter_outbox() if outbox is _OUTBOX_PADRAO else outbox
+
+    def adicionar(self, grupo: str, link: str, mensagem: str, rotulo: Optional[str] = None,
+                  imagens: Optional[List[Anexo]] = None, mensagem_alternativa: Optional[str] = None,
+                  ciclo: Optional[int] = None):
+        """Enfileira uma mensagem; a ordem de envio dos grupos é a da primeira inclusão.
+
+        `imagens` são enviadas antes do texto; para cada uma que falhar, o resumo dela em
+        `mensagem` é trocado pelo ranking completo em texto (as que saíram não se repetem).
+        `mensagem_alternativa` é o relatório inteiro em texto, usado na chave do outbox.
+        """
+        if not mensagem:
+            self.logger.warning(f"Mensagem vazia ignorada para o grupo {grupo} ({rotulo or '-'})")
+            return
+        if grupo in self._links and self._links[grupo] != link:
+            raise ValueError(f"Grupo {grupo} já registrado com outro link")
+        self._links[grupo] = link
+        item = ItemEnvio(grupo, link, mensagem, rotulo, list(imagens or []), mensagem_alternativa, ciclo)
+        if self.outbox is not None:
+            # O conteúdo completo identifica o relatório (o resumo muda se a imagem não for usada)
+            item.chave = chave_mensagem(grupo, ciclo, hash_conteudo(mensagem_alternativa or mensagem, mensagem))
+            if not self.outbox.confirmada(item.chave):
+                self.outbox.marcar(item.chave, PENDENTE, rotulo=rotulo)
+        self._grupos.setdefault(grupo, []).append(item)
+
+    def __len__(self):
+        return sum(len(itens) for itens in self._grupos.values())
+
+    def limites(self, grupo: str) -> Dict[str, float]:
+        """Limites do grupo (sobrepõem os valores "padrao")"""
+        configuracao = WHATSAPP_CONFIG.get("rate_limits", {})
+        limites = dict(configuracao.get("padrao", {}))
+        limites.update(self._limites_padrao)
+        limites.update(configuracao.get(grupo, {}))
+        return limites
+
+    def _aguardar(self, segundos: float, desde: Optional[float]):
+        """Dorme só o que falta para completar `segundos` desde o instante `desde`"""
+        if desde is None or segundos <= 0:
+            return
+        restante = segundos - (time.monotonic() - desde)
+        if restante > 0:
+            time.sleep(restante)
+
+    def _pendentes(self, grupo: str, itens: List[ItemEnvio]) -> List[ItemEnvio]:
+        """Remove da lista as mensagens já confirmadas em uma execução anterior"""
+        if self.outbox is None:
+            return itens
+        pendentes = []
+        for item in itens:
+            if item.chave and self.outbox.confirmada(item.chave):
+                self.logger.info(f"⏭️ {grupo}: {item.rotulo or 'mensagem'} já confirmada hoje - pulando")
+            else:
+                pendentes.append(item)
+        return pendentes
+
+    def _registrar(self, item: ItemEnvio, estado: str):
+        if self.outbox is not None and item.chave:
+            self.outbox.marcar(item.chave, estado, rotulo=item.rotulo)
+
+    def _aguardar_confirmacao(self, item: ItemEnvio) -> bool:
+        if self.confirmar_envio is None:
+            return False
+        limite = time.monotonic() + WHATSAPP_CONFIG.get("confirmacao_timeout", 10)
+        while time.monotonic() < limite:
+            try:
+                if self.confirmar_envio(item):
+                    return True
+            except Exception as e:
+                self.logger.debug(f"Hook de confirmação falhou: {e}")
+            time.sleep(0.25)
+        return False
+
+    def enviar(self) -> Dict[str, Dict[str, int]]:
+        """Envia todos os grupos da fila.
+
+        Returns:
+            {grupo: {"enviadas": n, "falhas": m, "puladas": k}}
+        """
+        resultado = {}
+        fim_grupo_anterior = None
+        for grupo, todos in self._grupos.items():
+            limites = self.limites(grupo)
+            itens = self._pendentes(grupo, todos)
+            resultado[grupo] = {"enviadas": 0, "falhas": 0, "puladas": len(todos) - len(itens)}
+            if not itens:
+                continue
+
+            self._aguardar(limites.get("intervalo_grupos", 0), fim_grupo_anterior)
+            self.logger.info(f"📤 Grupo {grupo}: {len(itens)} mensagem(ns) na fila")
+
+            inicio = time.perf_counter()
+            try:
+                pronto = self.sender.navegar_para_grupo(self._links[grupo])
+            except Exception as e:
+                self.logger.error(f"❌ Falha ao abrir o grupo {grupo}: {e}")
+                resultado[grupo]["falhas"] = len(itens)
+                fim_grupo_anterior = time.monotonic()
+                continue
+
+            # Espera de carregamento do grupo: uma vez por grupo, não por mensagem
+            # (dispensada quando o sender já confirmou que o grupo abriu)
+            if not pronto:
+                time.sleep(limites.get("pre_envio", 0))
+
+            confirmada = True  # a primeira mensagem do grupo não espera nada
+            for item in itens:
+                if not confirmada:
+                    # Sem confirmação da anterior, o ritmo volta ao intervalo fixo
+                    self._aguardar(limites.get("intervalo_mensagens", 0), self._ultimo_envio.get(grupo))
+                try:
+                    mensagem = item.mensagem
+                    falhas = [anexo for anexo in item.imagens if not self.sender.enviar_imagem(anexo.caminho)]
+                    if falhas:
+                        self.logger.warning(f"⚠️ {grupo}: {len(falhas)} de {len(item.imagens)} imagem(ns) não "
+                                            f"enviada(s), esses rankings vão em texto")
+                        for anexo in falhas:
+                            mensagem = mensagem.replace(anexo.resumo, anexo.completo, 1)
+                    item.enviada = mensagem
+                    self.sender.enviar_mensagem(mensagem)
+                except Exception as e:
+                    self.logger.error(f"❌ Falha ao enviar {item.rotulo or 'mensagem'} para {grupo}: {e}")
+                    resultado[grupo]["falhas"] += 1
+                    confirmada = False
+                    continue
+                self._registrar(item, ENVIADA)
+                confirmada = self._aguardar_confirmacao(item)
+                if confirmada:
+                    self._registrar(item, CONFIRMADA)
+                self._ultimo_envio[grupo] = time.monotonic()
+                send_latency_seconds.observe(time.perf_counter() - inicio, grupo=grupo)
+                inicio = time.perf_counter()
+                resultado[grupo]["enviadas"] += 1
+                if confirmada:
+                    self.logger.info(f"✅ {grupo}: {item.rotulo or 'mensagem'} enviada")
+                else:
+                    self.logger.warning(f"⚠️ {grupo}: {item.rotulo or 'mensagem'} enviada sem confirmação")
+
+            fim_grupo_anterior = time.monotonic()
+
+        self._grupos.clear()
+        return resultado
@@ -23,13 +23,14 @@ def limpar_arquivo_especifico(arquivo_path, descricao="arquivo"):
         logger.error(f"❌ Erro ao remover {descricao} {os.path.basename(arquivo_path)}: {e}")
         return False
 
-def limpar_arquivos_por_padrao(diretorio, padrao, descricao="arquivos"):
+def limpar_arquivos_por_padrao(diretorio, padrao, descricao="arquivos", preservar=None):
     """Remove arquivos que correspondem a um padrão glob.
     
     Args:
         diretorio: Diretório onde buscar
         padrao: Padrão glob (ex: "resultado_*.csv")
         descricao: Descrição para logs
+        preservar: Caminhos que não devem ser removidos (ex.: checkpoints de hoje)
         
     Returns:
         int: Número de arquivos removidos
@@ -43,8 +44,12 @@ def limpar_arquivos_por_padrao(diretorio, padrao, descricao="arquivos"):
     caminho_padrao = os.path.join(diretorio, padrao)
     arquivos = glob.glob(caminho_padrao)
     
+    preservar = {os.path.normpath(p) for p in (preservar or ())}
     removidos = 0
     for arquivo in arquivos:
+        if os.path.normpath(arquivo) in preservar:
+            logger.info(f"♻️ Mantido (checkpoint de hoje): {os.path.basename(arquivo)}")
+            continue
         if limpar_arquivo_especifico(arquivo, f"{descricao}"):
             removidos += 1
     
@@ -0,0 +1,613 @@
+#!/usr/bin/env python3
+"""
+Motor de Extração Declarativa
+=============================
+Executa os relatórios declarados em config.REPORT_JOBS (login, navegação,
+tabela, colunas e saída) com um único runtime Selenium.
+
+Tudo o que antes era repetido em cada extrator — inicialização do Chrome,
+login, espera do loader, leitura da grid e gravação do CSV — fica aqui. A
+grid é lida em um único execute_script (em vez de find_element por célula)
+e o resultado vazio é detectado na mesma espera da tabela, sem sleeps fixos.
+Um relatório novo é só uma entrada em REPORT_JOBS.
+
+Uso:
+    python -m componentes.job_engine eud --param ciclo=16
+    python -m componentes.job_engine --listar
+"""
+
+import argparse
+import csv
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import undetected_chromedriver as uc
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from componentes.circuit_breaker import obter_breaker
+from componentes.config import LOGIN_CONFIG, LOGIN_PROFILES, NAVIGATION_STEPS, REPORT_JOBS
+from componentes.driver_cache import argumentos_uc
+from componentes.logging_setup import configurar_logging_raiz
+from componentes.metrics import login_duration_seconds, rows_scraped
+from componentes.perfil_driver import aplicar_opcoes_perfil, aplicar_perfil_driver
+from componentes.processos import encerrar_driver, limpar_processos_zumbis, registrar_driver
+from componentes.rastreamento import etapa, gravar_rastreamento, instrumentar
+from componentes.replay import acompanhar, aplicar_opcoes_gravacao
+from componentes.tenants import liberar_ao_encerrar, reservar_vaga
+from componentes.timeouts_adaptativos import esperar
+
+logger = logging.getLogger(__name__)
+
+# União das opções usadas pelos extratores
+CHROME_ARGUMENTOS = [
+    '--start-maximized',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-infobars',
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-gpu',
+    '--disable-extensions',
+    '--disable-background-networking',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-breakpad',
+    '--disable-client-side-phishing-detection',
+    '--disable-default-apps',
+    '--disable-features=IsolateOrigins,site-per-process,TranslateUI',
+    '--disable-hang-monitor',
+    '--disable-ipc-flooding-protection',
+    '--disable-popup-blocking',
+    '--disable-prompt-on-repost',
+    '--disable-renderer-backgrounding',
+    '--disable-sync',
+    '--disable-translate',
+    '--force-color-profile=srgb',
+    '--ignore-certificate-errors',
+    '--log-level=3',
+    '--metrics-recording-only',
+    '--no-first-run',
+]
+
+# Leitura da grid inteira em uma ida ao navegador: [[texto da célula, ...], ...]
+_SCRIPT_TABELA = r"""
+var tabela = document.querySelector(arguments[0]);
+if (!tabela) { return null; }
+var texto = function (el) { return (el.innerText || el.textContent || '').trim(); };
+var linhas = tabela.querySelectorAll(arguments[1]);
+var saida = [];
+for (var i = 0; i < linhas.length; i++) {
+    var celulas = linhas[i].querySelectorAll(arguments[2]);
+    var valores = [];
+    for (var j = 0; j < celulas.length; j++) { valores.push(texto(celulas[j])); }
+    saida.push(valores);
+}
+return saida;
+"""
+
+
+class ErroJob(Exception):
+    """Falha na definição ou na execução de um relatório"""
+
+
+# ---------------------------------------------------------------------------
+# Navegador
+# ---------------------------------------------------------------------------
+
+def _portal(perfil: str) -> str:
+    return LOGIN_PROFILES[perfil].get("portal", perfil)
+
+
+def verificar_portal(perfil: str):
+    """Levanta PortalIndisponivel se o circuit breaker do portal do perfil não liberar o acesso"""
+    breaker = obter_breaker()
+    if breaker:
+        breaker.verificar(_portal(perfil), LOGIN_PROFILES[perfil].get("url", ""))
+
+
+def _falha_do_portal(erro: Exception) -> bool:
+    """True para erros que indicam o portal fora do ar.
+
+    O Chrome reporta falhas de rede no get (net::ERR_CONNECTION_REFUSED, DNS,
+    timeout de conexão) como WebDriverException genérica; as subclasses
+    (TimeoutException de um seletor, NoSuchElement, sessão perdida...) e os
+    erros de job são problemas do roteiro ou do navegador, não do portal.
+    """
+    return type(erro) is WebDriverException
+
+
+def _registrar_resultado_portal(perfil: str, erro: Optional[Exception] = None):
+    breaker = obter_breaker()
+    if not breaker:
+        return
+    if erro is None:
+        breaker.registrar_sucesso(_portal(perfil))
+    elif _falha_do_portal(erro):
+        breaker.registrar_falha(_portal(perfil), erro)
+
+
+def iniciar_navegador(retries: int = 3, wait_ready: int = 15, log: Optional[logging.Logger] = None,
+                      perfil: Optional[str] = None):
+    """Inicializa o Chrome com retries, limpeza de zumbis e readiness ativa.
+
+    - Com perfil ("loja"/"vd"), consulta antes o circuit breaker do portal:
+      se ele estiver fora do ar, levanta PortalIndisponivel sem abrir o Chrome
+    - Na execução multi-tenant, espera uma vaga do portal (componentes/tenants.py),
+      devolvida no quit do driver
+    - Encerra Chrome/chromedriver órfãos registrados pelos extratores
+    - Instrumenta o driver para o rastreamento de comandos (componentes/rastreamento.py)
+      e, com REPLAY_MODO=gravar, grava o tráfego para a reprodução offline (componentes/replay.py)
+    - Usa o chromedriver em cache da versão do Chrome (componentes/driver_cache.py),
+      provisionado uma vez e reaproveitado nos retries
+    - HEADLESS=1 ativa o modo headless; CHROME_USER_DATA define um perfil custom
+    - Oculta navigator.webdriver e remove "Headless" do userAgent
+    """
+    log = log or logger
+    vaga = None
+    if perfil:
+        verificar_portal(perfil)
+        vaga = reservar_vaga(_portal(perfil), log)
+    try:
+        with etapa("navegador"):
+            driver = _iniciar_navegador(retries, wait_ready, log)
+    except BaseException:
+        if vaga:
+            vaga.liberar()
+        raise
+    return liberar_ao_encerrar(driver, vaga)
+
+
+def _iniciar_navegador(retries: int, wait_ready: int, log: logging.Logger):
+    limpar_processos_zumbis()
+    driver_uc = argumentos_uc()
+    last_err = None
+    for tentativa in range(1, retries + 1):
+        driver = None
+        try:
+            log.info(f"🧪 Iniciando navegador (tentativa {tentativa}/{retries})...")
+            options = uc.ChromeOptions()
+            for argumento in CHROME_ARGUMENTOS:
+                options.add_argument(argumento)
+            if os.environ.get('HEADLESS') == '1':
+                options.add_argument('--headless=new')
+            user_data_dir = os.environ.get('CHROME_USER_DATA')
+            if user_data_dir:
+                options.add_argument(f'--user-data-dir={user_data_dir}')
+            aplicar_opcoes_perfil(options)
+            aplicar_opcoes_gravacao(options)
+            driver = instrumentar(uc.Chrome(options=options, use_subprocess=True, headless=False, **driver_uc))
+            acompanhar(driver)
+            registrar_driver(driver)
+            try:
+                driver.maximize_window()
+            except Exception:
+                pass
+            aplicar_perfil_driver(driver)
+
+            if not driver.window_handles:
+                raise RuntimeError("Nenhuma janela disponível após inicialização")
+
+            try:
+                driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            except Exception:
+                pass
+            try:
+                esperar("navegador:readiness", wait_ready, lambda timeout: WebDriverWait(driver, timeout).until(
+                    lambda d: d.execute_script('return document.readyState') in ('interactive', 'complete')
+                ))
+            except Exception:
+                log.debug('Readiness parcial atingida.')
+            try:
+                ua = driver.execute_script("return navigator.userAgent")
+                if 'Headless' in ua:
+                    ua = ua.replace('Headless', '')
+                driver.execute_cdp_cmd('Network.setUserAgentOverride', {"userAgent": ua})
+            except Exception:
+                pass
+            try:
+                titulo = driver.title
+            except Exception:
+                titulo = '(sem título ainda)'
+            log.info(f"✅ Navegador iniciado (tentativa {tentativa}). Título: {titulo}")
+            return driver
+        except Exception as e:
+            last_err = e
+            log.warning(f"Falha ao iniciar navegador na tentativa {tentativa}: {e}")
+            if driver:
+                encerrar_driver(driver)
+            time.sleep(2)
+    log.error(f"❌ Falha ao iniciar navegador após {retries} tentativas: {last_err}")
+    raise RuntimeError(f"Selenium não conseguiu iniciar controle do navegador: {last_err}")
+
+
+def aguardar_e_clicar(driver, seletor, by=By.CSS_SELECTOR, timeout=10):
+    """Aguarda o elemento estar clicável e clica."""
+    elem = WebDriverWait(driver, timeout).until(
+        EC.element_to_be_clickable((by, seletor))
+    )
+    elem.click()
+    return elem
+
+
+def _loader_inativo(driver) -> bool:
+    try:
+        return driver.find_element(By.CSS_SELECTOR, "#UpdateProgress1").get_attribute("aria-hidden") == "true"
+    except Exception:
+        return True
+
+
+def aguardar_loader_flexivel(driver, timeout=30):
+    """Aguarda o loader #UpdateProgress1 sumir (aria-hidden='true').
+
+    O timeout aprendido para "aguardar_loader" só adianta o aviso de lentidão:
+    a espera vai até `timeout`.
+    """
+    esperar("aguardar_loader", timeout, lambda limite: WebDriverWait(driver, limite).until(_loader_inativo))
+
+
+# ---------------------------------------------------------------------------
+# Passos declarativos
+# ---------------------------------------------------------------------------
+
+def _formatar(valor, parametros: Dict[str, Any]):
+    return valor.format(**parametros) if isinstance(valor, str) else valor
+
+
+def _localizador(passo: Dict[str, Any], parametros: Dict[str, Any]):
+    if "xpath" in passo:
+        return By.XPATH, _formatar(passo["xpath"], parametros)
+    return By.CSS_SELECTOR, _formatar(passo["seletor"], parametros)
+
+
+def _valor_passo(passo: Dict[str, Any], parametros: Dict[str, Any], log: logging.Logger) -> str:
+    if "env" in passo:
+        valor = os.getenv(passo["env"], "")
+        if not valor:
+            log.warning(f"{passo['env']} não definido no ambiente; login pode falhar")
+        return valor
+    return str(_formatar(passo.get("valor", ""), parametros))
+
+
+_ACOES_COM_ESPERA = ("clicar", "preencher", "aguardar_visivel", "aguardar_presente", "aguardar_url")
+
+
+def _chave_passo(passo: Dict[str, Any]) -> str:
+    """Identifica o passo no histórico de latências pelo alvo ainda sem parâmetros
+    (o mesmo clique em ciclos diferentes compartilha a distribuição)"""
+    alvo = passo.get("xpath") or passo.get("seletor") or passo.get("igual") or passo.get("prefixo") or ""
+    return f"{passo['acao']}:{alvo}"
+
+
+def _executar_espera(driver, passo: Dict[str, Any], parametros: Dict[str, Any], timeout: float,
+                     log: logging.Logger):
+    acao = passo["acao"]
+    if acao == "clicar":
+        by, alvo = _localizador(passo, parametros)
+        aguardar_e_clicar(driver, alvo, by=by, timeout=timeout)
+    elif acao == "preencher":
+        by, alvo = _localizador(passo, parametros)
+        campo = WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((by, alvo)))
+        if passo.get("limpar", True):
+            campo.clear()
+        campo.send_keys(_valor_passo(passo, parametros, log))
+        if passo.get("tab"):
+            campo.send_keys(Keys.TAB)
+    elif acao == "aguardar_visivel":
+        WebDriverWait(driver, timeout).until(EC.visibility_of_element_located(_localizador(passo, parametros)))
+    elif acao == "aguardar_presente":
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located(_localizador(passo, parametros)))
+    else:
+        esperado = _formatar(passo.get("igual") or passo.get("prefixo"), parametros)
+        if "igual" in passo:
+            WebDriverWait(driver, timeout).until(lambda d: d.current_url == esperado)
+        else:
+            WebDriverWait(driver, timeout).until(lambda d: d.current_url.startswith(esperado))
+
+
+def executar_passos(driver, passos: List[Dict[str, Any]], parametros: Dict[str, Any],
+                    log: Optional[logging.Logger] = None):
+    """Executa uma lista de passos de navegação.
+
+    Ações: abrir, clicar, preencher, aguardar_visivel, aguardar_presente,
+    aguardar_url, aguardar_loader, pausa e sequencia (NAVIGATION_STEPS).
+    Passos com "opcional": True não interrompem a execução se falharem.
+    O "timeout" de cada passo é o teto declarado; o timeout aprendido no
+    histórico de latências (componentes/timeouts_adaptativos.py) só adianta
+    o aviso de lentidão.
+    """
+    log = log or logger
+    for passo in passos:
+        acao = passo["acao"]
+        try:
+            if acao == "sequencia":
+                executar_passos(driver, NAVIGATION_STEPS[passo["nome"]], parametros, log)
+            elif acao == "abrir":
+                driver.get(_formatar(passo["url"], parametros))
+            elif acao == "aguardar_loader":
+                aguardar_loader_flexivel(driver, passo.get("timeout", 30))
+            elif acao == "pausa":
+                time.sleep(passo["segundos"])
+            elif acao in _ACOES_COM_ESPERA:
+                # Estouro num passo opcional só pula o passo: nunca com o timeout aprendido
+                esperar(_chave_passo(passo), passo.get("timeout", 10),
+                        lambda timeout: _executar_espera(driver, passo, parametros, timeout, log),
+                        registrar_estouro=not passo.get("opcional"), adaptativo=not passo.get("opcional"))
+            else:
+                raise ErroJob(f"Ação desconhecida: {acao}")
+        except ErroJob:
+            raise
+        except Exception as e:
+            if passo.get("opcional"):
+                log.debug(f"Passo opcional {acao} ignorado: {e}")
+                continue
+            raise
+
+
+def realizar_login(driver, perfil: str, log: Optional[logging.Logger] = None, **parametros):
+    """Executa o perfil de login de LOGIN_PROFILES (fecha o driver se falhar).
+
+    Args:
+        perfil: "loja" ou "vd"
+        **parametros: Sobrepõem url/usuario/senha (padrão: LOGIN_CONFIG)
+    """
+    log = log or logger
+    definicao = LOGIN_PROFILES[perfil]
+    valores = {
+        "url": definicao.get("url", ""),
+        "usuario": LOGIN_CONFIG.get("username"),
+        "senha": LOGIN_CONFIG.get("password"),
+    }
+    valores.update({k: v for k, v in parametros.items() if v is not None})
+    inicio = time.perf_counter()
+    try:
+        if not driver or not driver.window_handles:
+            raise RuntimeError("Driver inválido ou sem janelas ativas")
+        log.info(f"Acessando login ({perfil})...")
+        with etapa(f"login:{perfil}"):
+            executar_passos(driver, definicao["passos"], valores, log)
+        log.info("Login realizado com sucesso!")
+        login_duration_seconds.observe(time.perf_counter() - inicio, portal=definicao.get("portal", perfil))
+        _registrar_resultado_portal(perfil)
+    except Exception as e:
+        log.error(f"Erro durante o login: {e}")
+        _registrar_resultado_portal(perfil, e)
+        encerrar_driver(driver)
+        log.info("Driver fechado após falha no login")
+        raise
+
+
+# ---------------------------------------------------------------------------
+# Tabela e saída
+# ---------------------------------------------------------------------------
+
+def converter_valor(texto: str, tipo: str, padrao: Any = ""):
+    """Converte o texto de uma célula conforme o tipo da coluna"""
+    if tipo == "numero_br":
+        try:
+            return float(texto.replace('.', '').replace(',', '.'))
+        except ValueError:
+            return padrao
+    if tipo == "moeda":
+        if not texto:
+            return texto
+        limpo = texto.replace('R$', '').replace(' ', '').strip().replace('.', '').replace(',', '.')
+        try:
+            float(limpo)
+            return limpo
+        except ValueError:
+            logger.warning(f"Valor monetário não pôde ser convertido: '{texto}' -> '{limpo}'")
+            return texto
+    return texto.strip()
+
+
+def ler_tabela(driver, tabela: Dict[str, Any]) -> Optional[List[List[str]]]:
+    """Textos das células de cada linha da tabela (None se a tabela não existir)"""
+    return driver.execute_script(_SCRIPT_TABELA, tabela["seletor"], tabela.get("linha", "tr"),
+                                 tabela.get("celula", "td"))
+
+
+def mapear_linhas(celulas: List[List[str]], job: Dict[str, Any]) -> List[List[Any]]:
+    """Aplica filtros e o mapeamento de colunas do job às linhas lidas"""
+    tabela = job["tabela"]
+    ignorar = tabela.get("ignorar_ultimas", 0)
+    if ignorar:
+        celulas = celulas[:-ignorar]
+    minimo = tabela.get("min_celulas", 0)
+    indice_max = max(coluna["indice"] for coluna in job["colunas"])
+    linhas = []
+    for linha in celulas:
+        if len(linha) < max(minimo, indice_max + 1):
+            continue
+        valores = [converter_valor(linha[c["indice"]], c.get("tipo", "texto"), c.get("padrao", ""))
+                   for c in job["colunas"]]
+        if job.get("descartar_vazias") and not all(v not in ("", None) for v in valores):
+            continue
+        linhas.append(valores)
+    return linhas
+
+
+def gravar_csv(caminho: str, cabecalho: List[str], linhas: List[List[Any]]):
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    with open(caminho, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(cabecalho)
+        writer.writerows(linhas)
+
+
+def _aguardar_tabela_ou_vazio(driver, job: Dict[str, Any]) -> str:
+    """Espera a grid ou o aviso de "sem resultados" (o que vier primeiro).
+
+    Returns:
+        "tabela", "vazio" ou "ausente" (timeout)
+    """
+    tabela = job["tabela"]
+    sem_resultado = job.get("sem_resultado")
+
+    def estado(d):
+        if sem_resultado:
+            avisos = d.find_elements(By.CSS_SELECTOR, sem_resultado["seletor"])
+            if avisos and avisos[0].is_displayed():
+                return "vazio"
+        if d.find_elements(By.CSS_SELECTOR, tabela["seletor"]):
+            return "tabela"
+        return False
+
+    # Com ausente="vazio" o estouro vira um CSV vazio gravado como sucesso: espera o timeout declarado
+    try:
+        return esperar(f"tabela:{job.get('indicador') or tabela['seletor']}", tabela.get("timeout", 15),
+                       lambda timeout: WebDriverWait(driver, timeout).until(estado),
+                       adaptativo=tabela.get("ausente") != "vazio")
+    except TimeoutException:
+        return "ausente"
+
+
+def executar_job(driver, nome: str, log: Optional[logging.Logger] = None, **parametros) -> List[List[Any]]:
+    """Navega, lê a tabela e grava a saída de um relatório de REPORT_JOBS.
+
+    Args:
+        driver: Sessão já logada no portal do job
+        nome: Chave em REPORT_JOBS
+        **parametros: Parâmetros declarados no job (ex.: ciclo=16)
+
+    Returns:
+        Linhas mapeadas (listas na ordem de "colunas")
+    """
+    job = REPORT_JOBS.get(nome)
+    if job is None:
+        raise ErroJob(f"Relatório desconhecido: {nome}")
+    try:
+        with etapa(f"job:{nome}"):
+            linhas = _executar_job(driver, nome, job, log or logger, parametros)
+    except Exception as e:
+        _registrar_resultado_portal(job["login"], e)
+        raise
+    _registrar_resultado_portal(job["login"])
+    return linhas
+
+
+def _executar_job(driver, nome: str, job: Dict[str, Any], log: logging.Logger,
+                  parametros: Dict[str, Any]) -> List[List[Any]]:
+    faltando = [p for p in job.get("parametros", []) if p not in parametros]
+    if faltando:
+        raise ErroJob(f"Parâmetros ausentes para {nome}: {', '.join(faltando)}")
+    parametros = dict(parametros)
+    parametros.setdefault("ano", datetime.now().year)
+
+    log.info(f"📊 Relatório {nome} {parametros}")
+    inicio = time.perf_counter()
+    with etapa("navegacao"):
+        executar_passos(driver, job.get("navegacao", []), parametros, log)
+
+    with etapa("tabela"):
+        estado = _aguardar_tabela_ou_vazio(driver, job)
+    if estado == "vazio":
+        log.info(f"Nenhum resultado para {nome} {parametros}. Mensagem exibida pelo sistema.")
+        ok = job["sem_resultado"].get("ok")
+        if ok:
+            try:
+                aguardar_e_clicar(driver, ok, timeout=5)
+            except Exception:
+                pass
+        linhas = []
+    elif estado == "ausente":
+        if job["tabela"].get("ausente") != "vazio":
+            raise TimeoutException(f"Tabela {job['tabela']['seletor']} não apareceu ({nome})")
+        log.warning(f"Grid não apareceu para {nome} {parametros}. Salvando resultado vazio.")
+        linhas = []
+    else:
+        pausa = job["tabela"].get("pausa_render")
+        if pausa:
+            time.sleep(pausa)  # Pequeno delay para garantir renderização
+        with etapa("tabela"):
+            celulas = ler_tabela(driver, job["tabela"]) or []
+        linhas = mapear_linhas(celulas, job)
+
+    log.info(f"Total de linhas extraídas ({nome}): {len(linhas)} em {time.perf_counter() - inicio:.1f}s")
+    saida = job.get("saida")
+    if saida:
+        caminho = _formatar(saida, parametros)
+        gravar_csv(caminho, [c["nome"] for c in job["colunas"]], linhas)
+        rows_scraped.set(len(linhas), indicador=job.get("indicador", nome), ciclo=parametros.get("ciclo", ""))
+        log.info(f"Resultados salvos em {caminho}")
+    return linhas
+
+
+# ---------------------------------------------------------------------------
+# Execução com sessões compartilhadas
+# ---------------------------------------------------------------------------
+
+class ExecutorJobs:
+    """Executa relatórios reaproveitando uma sessão logada por perfil de login.
+
+    Uso:
+        with ExecutorJobs() as executor:
+            executor.executar("eud", ciclo=15)
+            executor.executar("pef", ciclo=15)   # mesma sessão "vd"
+    """
+
+    def __init__(self, log: Optional[logging.Logger] = None):
+        self.log = log or logger
+        self._sessoes: Dict[str, Any] = {}
+
+    def sessao(self, perfil: str):
+        driver = self._sessoes.get(perfil)
+        if driver is None:
+            driver = iniciar_navegador(log=self.log, perfil=perfil)
+            realizar_login(driver, perfil, log=self.log)
+            self._sessoes[perfil] = driver
+        return driver
+
+    def executar(self, nome: str, **parametros) -> List[List[Any]]:
+        job = REPORT_JOBS[nome]
+        return executar_job(self.sessao(job["login"]), nome, log=self.log, **parametros)
+
+    def fechar(self):
+        for perfil, driver in list(self._sessoes.items()):
+            encerrar_driver(driver)
+            self.log.info(f"Navegador {perfil} fechado")
+        self._sessoes.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa relatórios declarados em REPORT_JOBS")
+    parser.add_argument("jobs", nargs="*", help="Nomes dos relatórios")
+    parser.add_argument("--param", action="append", default=[], help="Parâmetro chave=valor (ex.: ciclo=16)")
+    parser.add_argument("--listar", action="store_true", help="Lista os relatórios disponíveis")
+    args = parser.parse_args()
+
+    if args.listar or not args.jobs:
+        for nome, job in REPORT_JOBS.items():
+            print(f"{nome:8} login={job['login']:5} parâmetros={job.get('parametros', [])} saída={job.get('saida') or '-'}")
+        return
+
+    parametros = {}
+    for item in args.param:
+        chave, _, valor = item.partition("=")
+        parametros[chave] = int(valor) if valor.isdigit() else valor
+
+    configurar_logging_raiz("log/job_engine.log")
+    try:
+        with ExecutorJobs() as executor:
+            for nome in args.jobs:
+                linhas = executor.executar(nome, **parametros)
+                print(f"✅ {nome}: {len(linhas)} linha(s)")
+    finally:
+        gravar_rastreamento("job_engine")
+
+
+if __name__ == "__main__":
+    main()
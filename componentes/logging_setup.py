@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Configuração Central de Logging
+===============================
+Logging assíncrono (QueueHandler/QueueListener) com rotação de arquivos.
+
+Os loggers dos scripts só enfileiram os registros; a escrita em disco (e no
+console) acontece na thread do QueueListener, então o I/O de log nunca bloqueia
+os loops de extração. Os arquivos são abertos em modo append e rotacionados por
+tamanho ou por horário, preservando o histórico entre execuções.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+from componentes.config import LOGGING_CONFIG
+
+
+class JsonFormatter(logging.Formatter):
+    """Formata cada registro como uma linha JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            dados["exception"] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+# Registro dos loggers configurados: nome -> (listener, parâmetros usados)
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+_parametros: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def _criar_formatter() -> logging.Formatter:
+    if LOGGING_CONFIG.get("json"):
+        return JsonFormatter()
+    return logging.Formatter(LOGGING_CONFIG["format"])
+
+
+def _criar_file_handler(arquivo: str) -> logging.Handler:
+    """Cria o handler de arquivo com a rotação configurada (size ou time)"""
+    diretorio = os.path.dirname(arquivo)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+
+    if LOGGING_CONFIG.get("rotation") == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            arquivo,
+            when=LOGGING_CONFIG["when"],
+            backupCount=LOGGING_CONFIG["backup_count"],
+            encoding=LOGGING_CONFIG["encoding"],
+        )
+    return logging.handlers.RotatingFileHandler(
+        arquivo,
+        mode=LOGGING_CONFIG["file_mode"],
+        maxBytes=LOGGING_CONFIG["max_bytes"],
+        backupCount=LOGGING_CONFIG["backup_count"],
+        encoding=LOGGING_CONFIG["encoding"],
+    )
+
+
+def _parar_listener(nome: str):
+    listener = _listeners.pop(nome, None)
+    if listener is None:
+        return
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
+
+
+def _configurar(nome: str, arquivo: Optional[str], nivel: int, console: bool,
+                propagate: bool) -> logging.Logger:
+    logger = logging.getLogger(nome or None)
+
+    with _lock:
+        _parar_listener(nome)
+        for handler in logger.handlers[:]:
+            logger.removeHandler(handler)
+            handler.close()
+
+        formatter = _criar_formatter()
+        destinos = []
+        if arquivo:
+            file_handler = _criar_file_handler(arquivo)
+            file_handler.setLevel(nivel)
+            file_handler.setFormatter(formatter)
+            destinos.append(file_handler)
+        if console:
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(nivel)
+            console_handler.setFormatter(formatter)
+            destinos.append(console_handler)
+
+        fila = queue.SimpleQueue()
+        logger.addHandler(logging.handlers.QueueHandler(fila))
+        logger.setLevel(nivel)
+        logger.propagate = propagate
+
+        listener = logging.handlers.QueueListener(fila, *destinos, respect_handler_level=True)
+        listener.start()
+        _listeners[nome] = listener
+        _parametros[nome] = {
+            "arquivo": arquivo, "nivel": nivel, "console": console, "propagate": propagate
+        }
+
+    return logger
+
+
+def configurar_logger(nome: str, arquivo: str, nivel: int = logging.DEBUG,
+                      console: bool = False, propagate: bool = True) -> logging.Logger:
+    """Configura um logger nomeado que grava (de forma assíncrona) em seu próprio arquivo.
+
+    Args:
+        nome: Nome do logger (ex.: "extracao_marcas")
+        arquivo: Caminho do arquivo de log (ex.: "log/extracao_marcas.log")
+        nivel: Nível mínimo registrado
+        console: Também exibe os registros no terminal
+        propagate: Repassa os registros ao logger raiz (ex.: main.log quando importado pelo main)
+    """
+    return _configurar(nome, arquivo, nivel, console, propagate)
+
+
+def configurar_logging_raiz(arquivo: str, nivel: Optional[int] = None,
+                            console: bool = True) -> logging.Logger:
+    """Configura o logger raiz (substitui o logging.basicConfig dos scripts principais)"""
+    if nivel is None:
+        nivel = getattr(logging, str(LOGGING_CONFIG["level"]).upper(), logging.INFO)
+    return _configurar("", arquivo, nivel, console, True)
+
+
+def reconfigurar_logging(**opcoes) -> None:
+    """Altera o LOGGING_CONFIG e reaplica a configuração em todos os loggers já configurados.
+
+    Exemplo: reconfigurar_logging(json=True, rotation="time", backup_count=30)
+    """
+    desconhecidas = set(opcoes) - set(LOGGING_CONFIG)
+    if desconhecidas:
+        raise ValueError(f"Opções de logging desconhecidas: {', '.join(sorted(desconhecidas))}")
+    LOGGING_CONFIG.update(opcoes)
+    for nome, parametros in list(_parametros.items()):
+        _configurar(nome, **parametros)
+
+
+def instalar_excepthook(logger: logging.Logger) -> None:
+    """Registra exceções não tratadas no logger informado"""
+    def handle_exception(exc_type, exc_value, exc_traceback):
+        if issubclass(exc_type, KeyboardInterrupt):
+            sys.__excepthook__(exc_type, exc_value, exc_traceback)
+            return
+        logger.critical("Erro não tratado:", exc_info=(exc_type, exc_value, exc_traceback))
+    sys.excepthook = handle_exception
+
+
+@atexit.register
+def encerrar_logging() -> None:
+    """Esvazia as filas e fecha os arquivos de log (chamado automaticamente na saída)"""
+    with _lock:
+        for nome in list(_listeners):
+            _parar_listener(nome)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Índice de Metas do Dia
+======================
+Leitura única e compartilhada do meta_dia.csv.
+
+O arquivo é interpretado uma vez (e relido só quando o mtime/tamanho mudar ou
+o dia virar). Todos os consumidores — extratores, sender e validadores —
+consultam o mesmo índice, então as regras de colunas e datas são uma só:
+
+- linhas com 4 colunas (tipo;data;ciclo;valor) ou 3 colunas (tipo;data;valor);
+- EUDORA é tratado como EUD; tipos aceitos: PEF, EUD e LOJA;
+- só entram linhas com data (DD/MM/AAAA) igual à de hoje;
+- ciclo numérico vira int; vazio vira None;
+- valor aceita vírgula ou ponto decimal; vazio/inválido vira None.
+"""
+
+import csv
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from componentes.config import FILE_CONFIG, get_file_path
+
+TIPOS_META = ("PEF", "EUD", "LOJA")
+TIPOS_CICLO = ("PEF", "EUD")
+
+
+def caminho_meta_padrao() -> str:
+    return get_file_path(FILE_CONFIG["files"]["meta_dia"])
+
+
+@dataclass(frozen=True)
+class MetaEntry:
+    tipo: str
+    data: str
+    ciclo: Optional[int]
+    valor: Optional[float]
+
+
+def _normalizar_tipo(tipo: str) -> str:
+    tipo = (tipo or "").strip().upper()
+    return "EUD" if tipo == "EUDORA" else tipo
+
+
+def _converter_valor(valor_str: str) -> Optional[float]:
+    valor_str = (valor_str or "").strip()
+    if not valor_str:
+        return None
+    try:
+        return float(valor_str.replace(",", "."))
+    except ValueError:
+        return None
+
+
+def _converter_data(data_str: str) -> Optional[date]:
+    try:
+        return datetime.strptime((data_str or "").strip(), "%d/%m/%Y").date()
+    except ValueError:
+        return None
+
+
+class MetaIndex:
+    """Metas do dia indexadas por tipo e ciclo"""
+
+    def __init__(self, entradas: Iterable[MetaEntry] = (), caminho: Optional[str] = None,
+                 erro: Optional[str] = None):
+        self.caminho = caminho
+        self.erro = erro
+        self.entradas: List[MetaEntry] = list(entradas)
+        self._por_ciclo: Dict[int, Dict[str, Optional[float]]] = {}
+        self._por_tipo: Dict[str, List[MetaEntry]] = {tipo: [] for tipo in TIPOS_META}
+        for entrada in self.entradas:
+            self._por_tipo[entrada.tipo].append(entrada)
+            if entrada.tipo in TIPOS_CICLO and entrada.ciclo is not None:
+                self._por_ciclo.setdefault(entrada.ciclo, {})[entrada.tipo] = entrada.valor
+
+    @classmethod
+    def carregar(cls, caminho: str, hoje: Optional[date] = None) -> "MetaIndex":
+        """Lê o arquivo e monta o índice com as linhas de hoje (levanta OSError se não existir)"""
+        hoje = hoje or date.today()
+        entradas = []
+        # O histórico repete poucas datas em muitas linhas: strptime uma vez por data
+        datas: Dict[str, Optional[date]] = {}
+        with open(caminho, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f, delimiter=";"):
+                if len(row) == 4:
+                    tipo, data_str, ciclo_str, valor_str = row
+                elif len(row) == 3:
+                    tipo, data_str, valor_str = row
+                    ciclo_str = ""
+                else:
+                    continue
+                tipo = _normalizar_tipo(tipo)
+                if tipo not in TIPOS_META:
+                    continue
+                if data_str not in datas:
+                    datas[data_str] = _converter_data(data_str)
+                if datas[data_str] != hoje:
+                    continue
+                ciclo_str = (ciclo_str or "").strip()
+                entradas.append(MetaEntry(
+                    tipo=tipo,
+                    data=data_str.strip(),
+                    ciclo=int(ciclo_str) if ciclo_str.isdigit() else None,
+                    valor=_converter_valor(valor_str),
+                ))
+        return cls(entradas, caminho)
+
+    @property
+    def vazio(self) -> bool:
+        return not self.entradas
+
+    def ciclos(self) -> List[int]:
+        """Ciclos de hoje (PEF/EUD), em ordem crescente, mesmo que sem valor de meta"""
+        return sorted(self._por_ciclo)
+
+    def metas_por_ciclo(self) -> Dict[int, Dict[str, Optional[float]]]:
+        """{ciclo: {"PEF": valor, "EUD": valor}} (cópia)"""
+        return {ciclo: dict(metas) for ciclo, metas in self._por_ciclo.items()}
+
+    def meta(self, tipo: str, ciclo: Optional[int] = None) -> Optional[float]:
+        """Meta de um indicador; PEF/EUD por ciclo (ou consolidada se ciclo=None)"""
+        tipo = _normalizar_tipo(tipo)
+        if tipo == "LOJA":
+            return self.meta_loja()
+        if ciclo is not None:
+            return self._por_ciclo.get(ciclo, {}).get(tipo)
+        consolidada = self.meta_consolidada(tipo)
+        return consolidada.valor if consolidada else None
+
+    def meta_loja(self) -> Optional[float]:
+        """Meta LOJA: última linha de hoje com valor (o ciclo é ignorado)"""
+        entrada = self.meta_consolidada("LOJA")
+        return entrada.valor if entrada else None
+
+    def meta_consolidada(self, tipo: str) -> Optional[MetaEntry]:
+        """Entrada única por indicador.
+
+        PEF/EUD: maior ciclo numérico com valor; sem ciclo numérico, a última linha sem ciclo.
+        LOJA: a última linha do dia com valor.
+        """
+        tipo = _normalizar_tipo(tipo)
+        com_valor = [e for e in self._por_tipo.get(tipo, []) if e.valor is not None]
+        if not com_valor:
+            return None
+        if tipo == "LOJA":
+            return com_valor[-1]
+        com_ciclo = [e for e in com_valor if e.ciclo is not None]
+        if com_ciclo:
+            return max(com_ciclo, key=lambda e: e.ciclo)
+        return com_valor[-1]
+
+
+# Cache: caminho absoluto -> ((mtime_ns, tamanho, dia), índice)
+_cache: Dict[str, Tuple[Tuple[int, int, date], MetaIndex]] = {}
+_cache_lock = threading.Lock()
+
+
+def obter_meta_index(caminho: Optional[str] = None) -> MetaIndex:
+    """Retorna o índice do arquivo de metas, relendo só se o arquivo (ou o dia) mudou.
+
+    Nunca levanta exceção: arquivo ausente gera índice vazio; erro de leitura
+    gera índice vazio com o atributo `erro` preenchido.
+    """
+    caminho = caminho or caminho_meta_padrao()
+    chave = os.path.abspath(caminho)
+    hoje = date.today()
+    try:
+        stat = os.stat(caminho)
+    except FileNotFoundError:
+        with _cache_lock:
+            _cache.pop(chave, None)
+        return MetaIndex(caminho=caminho)
+    except OSError as e:
+        return MetaIndex(caminho=caminho, erro=str(e))
+
+    assinatura = (stat.st_mtime_ns, stat.st_size, hoje)
+    with _cache_lock:
+        em_cache = _cache.get(chave)
+        if em_cache and em_cache[0] == assinatura:
+            return em_cache[1]
+
+    try:
+        indice = MetaIndex.carregar(caminho, hoje)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Falha ao ler metas de {caminho}: {e}")
+        return MetaIndex(caminho=caminho, erro=str(e))
+
+    with _cache_lock:
+        _cache[chave] = (assinatura, indice)
+    return indice
+
+
+def invalidar_cache_metas():
+    """Descarta os índices em cache (ex.: logo após regravar o meta_dia.csv)"""
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+"""
+Parser de Metas
+===============
+Regras de extração das metas (VD: PEF/EUD por ciclo; LOJA) a partir do texto
+das mensagens, e importador das conversas exportadas do WhatsApp.
+
+As mesmas funções são usadas pela captura diária (captura_metadia.py) e pelo
+importador offline, que recupera metas de dias em que a captura falhou:
+o arquivo .txt do "Exportar conversa" (centenas de MB em grupos movimentados)
+é mapeado em memória (mmap) e percorrido uma única vez pelo regex dos termos
+de busca, com memória constante; só as mensagens candidatas são decodificadas
+e passam pelas regras. Cada meta encontrada é gravada no histórico
+(FILE_CONFIG "meta_historico") por tipo, data e ciclo.
+
+Uso:
+    python -m componentes.meta_parser VD "Conversa do WhatsApp com Grupo VD.txt"
+    python -m componentes.meta_parser LOJA conversa_loja.txt --saida extracoes/meta_historico.csv
+"""
+
+import argparse
+import csv
+import logging
+import mmap
+import os
+import re
+import time
+from datetime import date
+from typing import Dict, Iterator, Optional, Tuple
+
+from componentes.config import FILE_CONFIG, get_file_path
+
+logger = logging.getLogger(__name__)
+
+# Termos da pesquisa de mensagens (também filtram as mensagens lidas do IndexedDB
+# e as conversas exportadas)
+TERMOS_BUSCA = {
+    "VD": ["meta de hoje"],
+    "LOJA": ["meta de hoje", "meta do dia"]
+}
+
+
+# ---------------------------------------------------------------------------
+# Regras de extração
+# ---------------------------------------------------------------------------
+
+def extrair_metas_vd(texto):
+    """Extrai metas PEF e EUD, suportando múltiplos ciclos (ex.: CICLO 11, CICLO 12).
+
+    Retorna: lista de dicts no formato:
+      [{ 'tipo': 'PEF'|'EUD', 'ciclo': '11'|'12'|'' , 'valor': float }]
+    """
+    # Normaliza quebras de linha e espaços
+    texto_norm = re.sub(r"\u00A0", " ", texto)  # non-breaking space
+    # Identifica blocos por ciclo: "CICLO NN"
+    ciclo_pattern = re.compile(r"(?i)CICLO\s*(\d{1,2})")
+    # Aceita 1 ou 2 casas decimais (ou nenhuma) e tanto EUD quanto EUDORA
+    # Agora aceita R$ ou apenas R (para casos onde o $ é omitido)
+    valor_pattern_pef = re.compile(r"(?i)PEF\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)")
+    valor_pattern_eud = re.compile(r"(?i)\bEUD(?:ORA)?\b\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)")
+
+    def parse_valor(br):
+        try:
+            if ',' in br:
+                inteiro, dec = br.split(',')
+                if dec == '':
+                    dec = '00'
+                elif len(dec) == 1:
+                    dec = dec + '0'
+            else:
+                inteiro, dec = br, '00'
+            return float(inteiro.replace('.', '') + '.' + dec)
+        except Exception:
+            logger.warning(f"Falha ao converter valor '{br}'")
+            return None
+
+    metas = []
+
+    # Encontra todos os cabeçalhos de ciclo e delimita blocos
+    matches = list(ciclo_pattern.finditer(texto_norm))
+    if matches:
+        for idx, m in enumerate(matches):
+            ciclo = m.group(1)
+            start = m.end()
+            end = matches[idx + 1].start() if idx + 1 < len(matches) else len(texto_norm)
+            bloco = texto_norm[start:end]
+
+            # Extrai valores dentro do bloco do ciclo
+            pef_m = valor_pattern_pef.search(bloco)
+            eud_m = valor_pattern_eud.search(bloco)
+
+            if pef_m:
+                v = parse_valor(pef_m.group(1))
+                if v is not None:
+                    metas.append({'tipo': 'PEF', 'ciclo': ciclo, 'valor': v})
+                    logger.debug(f"Meta PEF extraída (C{ciclo}): {v}")
+            if eud_m:
+                v = parse_valor(eud_m.group(1))
+                if v is not None:
+                    metas.append({'tipo': 'EUD', 'ciclo': ciclo, 'valor': v})
+                    logger.debug(f"Meta EUD extraída (C{ciclo}): {v}")
+
+    else:
+        # Fallback: sem cabeçalho de ciclo, aplica regex simples (ciclo vazio)
+        # Regex flexível que aceita R$ ou apenas R
+        pef_m = re.search(r"(?i)PEF\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)", texto_norm)
+        if pef_m:
+            v = parse_valor(pef_m.group(1))
+            if v is not None:
+                metas.append({'tipo': 'PEF', 'ciclo': '', 'valor': v})
+                logger.debug(f"Meta PEF extraída (sem ciclo): {v}")
+        
+        eud_m = re.search(r"(?i)\bEUD(?:ORA)?\b\s*-?\s*R\$?\s*([\d\.]+(?:,\d{1,2})?)", texto_norm)
+        if eud_m:
+            v = parse_valor(eud_m.group(1))
+            if v is not None:
+                metas.append({'tipo': 'EUD', 'ciclo': '', 'valor': v})
+                logger.debug(f"Meta EUD extraída (sem ciclo): {v}")
+
+    logger.debug(f"Metas VD extraídas: {metas}")
+    return metas
+
+def extrair_meta_loja(texto):
+    """Extrai a meta LOJA considerando formatos antigos e novos.
+
+    Suporta:
+    - Formato antigo: "Meta de hoje DD/MM R$50.000,00"
+    - Formato novo: "Meta do dia DD/MM 43.000" (sem R$, decimais opcionais)
+    - Formato com "Nossa meta do dia DD/MM/YYYY" e "Total: XX.XXX"
+    """
+    # Regex flexível para capturar:
+    # 1. "Meta de hoje", "Meta do dia" ou "Nossa meta do dia"
+    # 2. Data no formato DD/MM ou DD/MM/YYYY
+    # 3. Valor com ou sem R$, com ponto para milhares e vírgula opcional para decimais
+    meta_regex = r'(?i)(?:Nossa\s+)?Meta\s+(?:de\s+hoje|do\s+dia)\s+(\d{2}/\d{2}(?:/\d{4})?)\s*(?:R?\$?\s*)?([\d\.]+(?:,\d{1,2})?)'
+    match = re.search(meta_regex, texto, re.IGNORECASE)
+    
+    if match:
+        try:
+            valor_str = match.group(2)  # Grupo 1 é a data, grupo 2 o valor
+            # Normaliza números para o formato float independente do formato de entrada:
+            # R$50.000,00 -> 50000.00
+            # R$50.000 -> 50000.00
+            # 43.000 -> 43000.00
+            # 43000 -> 43000.00
+            
+            # Remove caracteres não numéricos (exceto . e ,)
+            valor_str = re.sub(r'[^\d\.,]', '', valor_str)
+            
+            # Trata caso com vírgula decimal
+            if ',' in valor_str:
+                inteiro, dec = valor_str.split(',', 1)
+                # Padroniza casas decimais
+                if dec == '':
+                    dec = '00'
+                elif len(dec) == 1:
+                    dec = dec + '0'
+            else:
+                # Sem decimais, assume .00
+                inteiro, dec = valor_str, '00'
+            
+            # Remove pontos de milhar e monta o float final
+            valor = float(inteiro.replace('.', '') + '.' + dec)
+            
+            logger.debug(f"Meta LOJA extraída (formato direto): {valor}")
+            return valor
+        except (ValueError, AttributeError) as e:
+            logger.error(f"Erro ao converter valor da meta LOJA '{match.group(2)}': {e}")
+            return None
+    
+    # Fallback: procurar por "Total:" se o regex principal não encontrou
+    total_regex = r'(?i)Total:\s*([\d\.]+(?:,\d{1,2})?)'
+    total_match = re.search(total_regex, texto)
+    if total_match:
+        try:
+            valor_str = total_match.group(1)
+            # Mesmo processamento de valor
+            valor_str = re.sub(r'[^\d\.,]', '', valor_str)
+            
+            if ',' in valor_str:
+                inteiro, dec = valor_str.split(',', 1)
+                if dec == '':
+                    dec = '00'
+                elif len(dec) == 1:
+                    dec = dec + '0'
+            else:
+                inteiro, dec = valor_str, '00'
+            
+            valor = float(inteiro.replace('.', '') + '.' + dec)
+            
+            logger.debug(f"Meta LOJA extraída (formato Total): {valor}")
+            return valor
+        except (ValueError, AttributeError) as e:
+            logger.error(f"Erro ao converter valor Total da meta LOJA '{total_match.group(1)}': {e}")
+            return None
+    
+    logger.debug(f"Nenhuma meta LOJA encontrada no padrão esperado.")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Conversas exportadas
+# ---------------------------------------------------------------------------
+
+# Início de mensagem no .txt exportado (datas DD/MM, como no WhatsApp em pt-BR):
+#   Android: "15/06/2025 09:00 - Fulano: texto"   (ano também com 2 dígitos)
+#   iOS:     "[15/06/2025, 09:00:00] Fulano: texto" (às vezes precedido de U+200E)
+# Linhas que não casam continuam a mensagem anterior (mensagens com quebra de linha).
+_CABECALHO = re.compile(rb"(?:\xe2\x80\x8e)?\[?(\d{1,2})/(\d{1,2})/(\d{2,4}),? (\d{1,2}):(\d{2})(?::\d{2})?\]? (?:- )?")
+
+CAMPOS_HISTORICO = ("tipo", "data", "ciclo", "valor")
+
+
+def _termos_bytes(grupo: str):
+    termos = [re.escape(t).replace(r"\ ", r"\s+") for t in TERMOS_BUSCA[grupo]]
+    return re.compile("|".join(termos).encode("utf-8"), re.IGNORECASE)
+
+
+def _cabecalho_em(mapa, posicao: int):
+    """(match, data) se a linha que começa em posicao abre uma mensagem"""
+    cabecalho = _CABECALHO.match(mapa, posicao)
+    if not cabecalho:
+        return None
+    dia, mes, ano = (int(cabecalho.group(i)) for i in (1, 2, 3))
+    try:
+        return cabecalho, date(ano + 2000 if ano < 100 else ano, mes, dia)
+    except ValueError:
+        return None
+
+
+def iterar_mensagens(caminho: str) -> Iterator[Tuple[date, bytes]]:
+    """Percorre o .txt exportado e gera (data, texto bruto) de todas as mensagens.
+
+    O arquivo é mapeado em memória e lido linha a linha; só a mensagem corrente
+    fica acumulada, então a memória não cresce com o tamanho do arquivo.
+    """
+    with open(caminho, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            data_atual = None
+            partes = []
+            for linha in iter(mapa.readline, b""):
+                encontrado = _cabecalho_em(linha, 0)
+                if encontrado:
+                    if data_atual is not None:
+                        yield data_atual, b"".join(partes)
+                    cabecalho, data_atual = encontrado
+                    partes = [linha[cabecalho.end():]]
+                elif data_atual is not None:
+                    partes.append(linha)
+            if data_atual is not None:
+                yield data_atual, b"".join(partes)
+
+
+def _mensagens_com_termo(mapa, filtro) -> Iterator[Tuple[date, bytes]]:
+    """(data, texto bruto) só das mensagens que contêm um dos termos.
+
+    O regex dos termos percorre o arquivo mapeado inteiro em C; para cada
+    ocorrência os limites da mensagem são achados a partir dela (volta até o
+    cabeçalho, avança até o próximo), então o Python só toca as linhas das
+    mensagens candidatas.
+    """
+    fim_anterior = 0
+    for achado in filtro.finditer(mapa):
+        if achado.start() < fim_anterior:
+            continue  # outro termo na mesma mensagem
+        inicio_linha = mapa.rfind(b"\n", fim_anterior, achado.start()) + 1 or fim_anterior
+        encontrado = _cabecalho_em(mapa, inicio_linha)
+        while not encontrado and inicio_linha > fim_anterior:
+            inicio_linha = mapa.rfind(b"\n", fim_anterior, inicio_linha - 1) + 1 or fim_anterior
+            encontrado = _cabecalho_em(mapa, inicio_linha)
+        if not encontrado:
+            continue  # texto antes da primeira mensagem do arquivo
+        cabecalho, data_mensagem = encontrado
+
+        fim = mapa.find(b"\n", achado.end())
+        while fim != -1 and not _cabecalho_em(mapa, fim + 1):
+            fim = mapa.find(b"\n", fim + 1)
+        fim = len(mapa) if fim == -1 else fim + 1
+        yield data_mensagem, mapa[cabecalho.end():fim]
+        fim_anterior = fim
+
+
+def importar_exportacao(caminho: str, grupo: str) -> Dict[Tuple[str, str, str], float]:
+    """Extrai todas as metas de uma conversa exportada em uma passada.
+
+    Args:
+        caminho: Arquivo .txt do "Exportar conversa"
+        grupo: "VD" ou "LOJA" (define termos e regra de extração)
+
+    Returns:
+        {(tipo, "DD/MM/AAAA", ciclo): valor}; quando há mais de uma meta no
+        mesmo dia, vale a última mensagem (como na captura diária)
+    """
+    if grupo not in TERMOS_BUSCA:
+        raise ValueError(f"Grupo inválido: {grupo} (use {', '.join(TERMOS_BUSCA)})")
+    filtro = _termos_bytes(grupo)
+    metas: Dict[Tuple[str, str, str], float] = {}
+    with open(caminho, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return metas
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            for data_mensagem, bruto in _mensagens_com_termo(mapa, filtro):
+                texto = bruto.decode("utf-8", errors="replace")
+                data_str = data_mensagem.strftime("%d/%m/%Y")
+                if grupo == "VD":
+                    for meta in extrair_metas_vd(texto):
+                        metas[(meta["tipo"], data_str, meta.get("ciclo") or "")] = meta["valor"]
+                else:
+                    valor = extrair_meta_loja(texto)
+                    if valor is not None:
+                        metas[("LOJA", data_str, "")] = valor
+    return metas
+
+
+def _chave_ordenacao(chave: Tuple[str, str, str]):
+    tipo, data_str, ciclo = chave
+    dia, mes, ano = data_str.split("/")
+    return (ano, mes, dia, tipo, ciclo.zfill(3))
+
+
+def gravar_historico(metas: Dict[Tuple[str, str, str], float], caminho: Optional[str] = None) -> int:
+    """Mescla as metas no histórico (tipo;data;ciclo;valor, mesmo formato do meta_dia.csv).
+
+    Chaves já existentes são sobrescritas. Retorna o total de linhas do histórico.
+    """
+    caminho = caminho or get_file_path(FILE_CONFIG["files"]["meta_historico"])
+    historico: Dict[Tuple[str, str, str], str] = {}
+    try:
+        with open(caminho, "r", encoding="utf-8", newline="") as f:
+            for linha in csv.reader(f, delimiter=";"):
+                if len(linha) == 4:
+                    historico[(linha[0], linha[1], linha[2])] = linha[3]
+    except FileNotFoundError:
+        pass
+    for chave, valor in metas.items():
+        historico[chave] = f"{valor:.2f}"
+
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, delimiter=";")
+        for chave in sorted(historico, key=_chave_ordenacao):
+            writer.writerow([*chave, historico[chave]])
+    os.replace(temporario, caminho)
+    return len(historico)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa metas de conversas exportadas do WhatsApp")
+    parser.add_argument("grupo", choices=sorted(TERMOS_BUSCA), help="Regra de extração do grupo")
+    parser.add_argument("arquivos", nargs="+", help="Arquivos .txt exportados")
+    parser.add_argument("--saida", default=None, help="Histórico de metas (padrão: extracoes/meta_historico.csv)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s - %(message)s")
+
+    metas: Dict[Tuple[str, str, str], float] = {}
+    for arquivo in args.arquivos:
+        inicio = time.perf_counter()
+        encontradas = importar_exportacao(arquivo, args.grupo)
+        duracao = time.perf_counter() - inicio
+        tamanho_mb = os.path.getsize(arquivo) / (1024 * 1024)
+        dias = len({data_str for _, data_str, _ in encontradas})
+        print(f"📄 {arquivo}: {len(encontradas)} meta(s) em {dias} dia(s) - "
+              f"{tamanho_mb:.1f} MB em {duracao:.2f}s ({tamanho_mb / duracao if duracao else 0:.1f} MB/s)")
+        metas.update(encontradas)
+
+    if not metas:
+        print("⚠️ Nenhuma meta encontrada")
+        return
+    total = gravar_historico(metas, args.saida)
+    print(f"✅ {len(metas)} meta(s) importada(s); histórico com {total} linha(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Sistema de Métricas
+===================
+Contadores, gauges e histogramas no formato de exposição texto do Prometheus.
+
+As métricas podem ser expostas de duas formas:
+- Endpoint HTTP local (``iniciar_servidor_metricas``), para scrape direto;
+- Arquivo ``.prom`` para o textfile collector do node_exporter
+  (``escrever_arquivo_metricas``), útil para execuções agendadas curtas.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from componentes.config import METRICS_CONFIG
+
+
+DEFAULT_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[Dict[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.extend(f'{n}="{_escape_label(v)}"' for n, v in extra.items())
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base comum: nome, ajuda, rótulos e armazenamento por combinação de rótulos."""
+
+    tipo = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Métrica '{self.name}' espera rótulos {self.labelnames}, recebeu {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            itens = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in itens]
+
+    def render(self) -> str:
+        linhas = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.tipo}",
+        ]
+        linhas.extend(self._samples())
+        return "\n".join(linhas)
+
+
+class Counter(_Metric):
+    """Contador monotônico."""
+
+    tipo = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counter só pode ser incrementado com valores não negativos")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+
+class Gauge(_Metric):
+    """Valor instantâneo que pode subir ou descer."""
+
+    tipo = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels) -> Optional[float]:
+        with self._lock:
+            return self._values.get(self._key(labels))
+
+
+class Histogram(_Metric):
+    """Histograma com buckets cumulativos, soma e contagem."""
+
+    tipo = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            estado = self._values.get(key)
+            if estado is None:
+                estado = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+                self._values[key] = estado
+            for i, limite in enumerate(self.buckets):
+                if value <= limite:
+                    estado["buckets"][i] += 1
+            estado["sum"] += value
+            estado["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Mede a duração do bloco e registra no histograma."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            itens = sorted((k, dict(v, buckets=list(v["buckets"]))) for k, v in self._values.items())
+        linhas = []
+        for key, estado in itens:
+            for limite, acumulado in zip(self.buckets, estado["buckets"]):
+                rotulos = _format_labels(self.labelnames, key, {"le": _format_value(limite)})
+                linhas.append(f"{self.name}_bucket{rotulos} {acumulado}")
+            rotulos = _format_labels(self.labelnames, key)
+            linhas.append(f"{self.name}_sum{rotulos} {_format_value(estado['sum'])}")
+            linhas.append(f"{self.name}_count{rotulos} {estado['count']}")
+        return linhas
+
+
+class MetricsRegistry:
+    """Registro de métricas do processo."""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if self.namespace:
+            metric.name = f"{self.namespace}_{metric.name}"
+        with self._lock:
+            existente = self._metrics.get(metric.name)
+            if existente is not None:
+                return existente
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Gera o texto de exposição de todas as métricas registradas."""
+        with self._lock:
+            metricas = list(self._metrics.values())
+        return "\n".join(m.render() for m in metricas) + "\n"
+
+
+# Instância global do registro de métricas
+metrics_registry = MetricsRegistry(namespace=METRICS_CONFIG["namespace"])
+
+# --- Métricas do pipeline de relatórios ---
+extraction_duration_seconds = metrics_registry.histogram(
+    "extraction_duration_seconds",
+    "Duração de cada extração do retaguarda em segundos",
+    ("script",),
+)
+extraction_runs_total = metrics_registry.counter(
+    "extraction_runs_total",
+    "Execuções de extração por resultado",
+    ("script", "resultado"),
+)
+rows_scraped = metrics_registry.gauge(
+    "rows_scraped",
+    "Linhas extraídas na última execução por indicador e ciclo",
+    ("indicador", "ciclo"),
+)
+login_duration_seconds = metrics_registry.histogram(
+    "login_duration_seconds",
+    "Tempo gasto no login do retaguarda",
+    ("portal",),
+    buckets=(1, 2.5, 5, 10, 15, 30, 60),
+)
+send_latency_seconds = metrics_registry.histogram(
+    "whatsapp_send_latency_seconds",
+    "Latência do envio de mensagem por grupo (navegação + envio)",
+    ("grupo",),
+)
+meta_capture_attempts_total = metrics_registry.counter(
+    "meta_capture_attempts_total",
+    "Tentativas de captura de metas por grupo e resultado",
+    ("grupo", "resultado"),
+)
+stale_file_blocks_total = metrics_registry.counter(
+    "stale_file_blocks_total",
+    "Envios bloqueados por arquivos de extração fora da data",
+    ("pipeline",),
+)
+last_run_timestamp_seconds = metrics_registry.gauge(
+    "last_run_timestamp_seconds",
+    "Horário (epoch) da última execução do pipeline por resultado",
+    ("pipeline", "resultado"),
+)
+
+webdriver_commands_total = metrics_registry.counter(
+    "webdriver_commands_total",
+    "Comandos enviados ao WebDriver por etapa e comando (ver componentes/rastreamento.py)",
+    ("etapa", "comando"),
+)
+webdriver_command_seconds_total = metrics_registry.counter(
+    "webdriver_command_seconds_total",
+    "Tempo total de ida e volta dos comandos do WebDriver por etapa e comando",
+    ("etapa", "comando"),
+)
+pipeline_stage_seconds = metrics_registry.gauge(
+    "pipeline_stage_seconds",
+    "Duração de cada etapa do pipeline na última execução (ver componentes/dag.py)",
+    ("pipeline", "etapa", "critica"),
+)
+time_to_first_report_seconds = metrics_registry.gauge(
+    "time_to_first_report_seconds",
+    "Segundos entre o início do pipeline e o primeiro relatório entregue a um grupo",
+    ("pipeline",),
+)
+report_delivered_seconds = metrics_registry.gauge(
+    "report_delivered_seconds",
+    "Segundos entre o início do pipeline e a entrega do relatório de cada grupo",
+    ("pipeline", "grupo"),
+)
+tenant_run_seconds = metrics_registry.gauge(
+    "tenant_run_seconds",
+    "Duração da última execução do pipeline de cada tenant (ver componentes/tenants.py)",
+    ("tenant", "pipeline"),
+)
+tenant_run_success = metrics_registry.gauge(
+    "tenant_run_success",
+    "1 se a última execução do pipeline do tenant terminou com sucesso",
+    ("tenant", "pipeline"),
+)
+
+
+def escrever_arquivo_metricas(job: str, diretorio: Optional[str] = None) -> Optional[str]:
+    """Grava as métricas do processo em ``<diretorio>/<job>.prom`` (escrita atômica).
+
+    Cada processo (main, envio, captura) grava o próprio arquivo, já que o
+    textfile collector agrega todos os ``.prom`` do diretório.
+
+    Returns:
+        str: Caminho gravado, ou None se o textfile estiver desabilitado.
+    """
+    logger = logging.getLogger(__name__)
+    diretorio = diretorio if diretorio is not None else METRICS_CONFIG.get("textfile_dir")
+    if not diretorio:
+        return None
+    caminho = os.path.join(diretorio, f"{job}.prom")
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(metrics_registry.render())
+        os.replace(temporario, caminho)
+        logger.debug(f"📈 Métricas gravadas em {caminho}")
+        return caminho
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao gravar métricas em {caminho}: {e}")
+        return None
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_response(404)
+            self.end_headers()
+            return
+        corpo = metrics_registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, format, *args):
+        logging.getLogger(__name__).debug("metrics http: " + format % args)
+
+
+_servidor: Optional[ThreadingHTTPServer] = None
+
+
+def iniciar_servidor_metricas(porta: Optional[int] = None, endereco: Optional[str] = None) -> Optional[ThreadingHTTPServer]:
+    """Sobe o endpoint /metrics em uma thread daemon (idempotente).
+
+    Returns:
+        ThreadingHTTPServer ou None se nenhuma porta estiver configurada.
+    """
+    global _servidor
+    logger = logging.getLogger(__name__)
+    if _servidor is not None:
+        return _servidor
+    porta = porta if porta is not None else METRICS_CONFIG.get("http_port")
+    if not porta:
+        return None
+    endereco = endereco or METRICS_CONFIG.get("http_address", "127.0.0.1")
+    try:
+        _servidor = ThreadingHTTPServer((endereco, int(porta)), _MetricsHandler)
+    except OSError as e:
+        logger.warning(f"⚠️ Não foi possível iniciar endpoint de métricas em {endereco}:{porta}: {e}")
+        return None
+    thread = threading.Thread(target=_servidor.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    logger.info(f"📈 Endpoint de métricas em http://{endereco}:{porta}/metrics")
+    return _servidor
@@ -5,12 +5,20 @@ Sistema de Notificações
 Sistema para enviar notificações sobre o status das execuções.
 """
 
+import json
 import logging
+import os
+import sqlite3
+import threading
+from collections import deque
 from datetime import datetime
-from typing import Dict, List, Optional
+from itertools import islice
+from typing import Deque, Dict, List, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from componentes.config import NOTIFICATION_CONFIG
+
 
 class NotificationType(Enum):
     SUCCESS = "success"
@@ -27,12 +35,105 @@ class Notification:
     timestamp: datetime
     details: Optional[Dict] = None
 
+    def to_dict(self) -> Dict:
+        """Representação serializável da notificação"""
+        return {
+            "type": self.type.value,
+            "title": self.title,
+            "message": self.message,
+            "timestamp": self.timestamp.isoformat(),
+            "details": self.details
+        }
+
+
+class JsonlNotificationSink:
+    """Persiste notificações em um arquivo JSONL (uma notificação por linha, append-only)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        diretorio = os.path.dirname(path)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+
+    def write(self, notification: Notification):
+        linha = json.dumps(notification.to_dict(), ensure_ascii=False, default=str)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+    def close(self):
+        pass
+
+
+class SqliteNotificationSink:
+    """Persiste notificações em uma tabela SQLite (append-only, indexada por tipo e data)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        diretorio = os.path.dirname(path)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS notifications ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, title TEXT NOT NULL, "
+            "message TEXT NOT NULL, timestamp TEXT NOT NULL, details TEXT)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_notifications_type_ts ON notifications (type, timestamp)"
+        )
+        self._conn.commit()
+
+    def write(self, notification: Notification):
+        self._conn.execute(
+            "INSERT INTO notifications (type, title, message, timestamp, details) VALUES (?, ?, ?, ?, ?)",
+            (
+                notification.type.value,
+                notification.title,
+                notification.message,
+                notification.timestamp.isoformat(),
+                json.dumps(notification.details, ensure_ascii=False, default=str)
+                if notification.details is not None else None
+            )
+        )
+        self._conn.commit()
+
+    def close(self):
+        self._conn.close()
+
+
+def criar_sink(tipo: str, path: Optional[str] = None):
+    """Cria o sink de persistência configurado ("jsonl" ou "sqlite"); None se desabilitado"""
+    if not tipo:
+        return None
+    path = path or NOTIFICATION_CONFIG["default_paths"].get(tipo)
+    if tipo == "jsonl":
+        return JsonlNotificationSink(path)
+    if tipo == "sqlite":
+        return SqliteNotificationSink(path)
+    logging.getLogger(__name__).warning(f"⚠️ Sink de notificações desconhecido: {tipo}")
+    return None
+
 
 class NotificationManager:
-    """Gerencia notificações do sistema"""
+    """Gerencia notificações do sistema.
+
+    As notificações ficam em um buffer circular limitado (as mais antigas são
+    descartadas), com um índice por tipo e contadores cumulativos atualizados a
+    cada inserção. Assim o resumo é O(1) e as consultas recentes são O(k),
+    mesmo em um processo que fica semanas no ar. Para histórico completo,
+    configure um sink (JSONL ou SQLite).
+    """
     
-    def __init__(self):
-        self.notifications: List[Notification] = []
+    def __init__(self, max_notifications: Optional[int] = None, sink=None):
+        self.max_notifications = max_notifications or NOTIFICATION_CONFIG["max_notifications"]
+        self.notifications: Deque[Notification] = deque(maxlen=self.max_notifications)
+        self._by_type: Dict[NotificationType, Deque[Notification]] = {
+            t: deque(maxlen=self.max_notifications) for t in NotificationType
+        }
+        self._counts: Dict[NotificationType, int] = {t: 0 for t in NotificationType}
+        self._total = 0
+        self._lock = threading.Lock()
+        self.sink = sink
         self.logger = logging.getLogger(__name__)
         
     def add_notification(self, notification_type: NotificationType, title: str, 
@@ -45,7 +146,23 @@ class NotificationManager:
             timestamp=datetime.now(),
             details=details
         )
-        self.notifications.append(notification)
+        with self._lock:
+            if len(self.notifications) == self.notifications.maxlen:
+                # O mais antigo sai do buffer geral e, por ser o mais antigo, também do índice do seu tipo
+                antiga = self.notifications[0]
+                indice = self._by_type[antiga.type]
+                if indice and indice[0] is antiga:
+                    indice.popleft()
+            self.notifications.append(notification)
+            self._by_type[notification_type].append(notification)
+            self._counts[notification_type] += 1
+            self._total += 1
+
+        if self.sink is not None:
+            try:
+                self.sink.write(notification)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Falha ao persistir notificação: {e}")
         
         # Log da notificação
         log_message = f"[{notification_type.value.upper()}] {title}: {message}"
@@ -73,36 +190,47 @@ class NotificationManager:
         self.add_notification(NotificationType.INFO, title, message, details)
         
     def get_recent_notifications(self, limit: int = 10) -> List[Notification]:
-        """Retorna as notificações mais recentes"""
-        return sorted(self.notifications, key=lambda x: x.timestamp, reverse=True)[:limit]
+        """Retorna as notificações mais recentes (inseridas em ordem cronológica)"""
+        with self._lock:
+            return list(islice(reversed(self.notifications), limit))
         
     def get_notifications_by_type(self, notification_type: NotificationType) -> List[Notification]:
-        """Retorna notificações por tipo"""
-        return [n for n in self.notifications if n.type == notification_type]
+        """Retorna notificações por tipo (apenas as ainda presentes no buffer)"""
+        with self._lock:
+            return list(self._by_type[notification_type])
+
+    def count_by_type(self, notification_type: NotificationType) -> int:
+        """Total cumulativo de notificações do tipo desde o último clear"""
+        return self._counts[notification_type]
         
     def clear_notifications(self):
         """Limpa todas as notificações"""
-        self.notifications.clear()
+        with self._lock:
+            self.notifications.clear()
+            for indice in self._by_type.values():
+                indice.clear()
+            self._counts = {t: 0 for t in NotificationType}
+            self._total = 0
+
+    def close(self):
+        """Fecha o sink de persistência, se houver"""
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
         
     def generate_summary(self) -> Dict:
-        """Gera um resumo das notificações"""
-        total = len(self.notifications)
-        by_type = {}
-        
-        for notification_type in NotificationType:
-            by_type[notification_type.value] = len(
-                self.get_notifications_by_type(notification_type)
-            )
-            
+        """Gera um resumo das notificações (contagens cumulativas)"""
         return {
-            "total": total,
-            "by_type": by_type,
+            "total": self._total,
+            "by_type": {t.value: self._counts[t] for t in NotificationType},
             "recent": [n.title for n in self.get_recent_notifications(5)]
         }
 
 
 # Instância global do gerenciador de notificações
-notification_manager = NotificationManager()
+notification_manager = NotificationManager(
+    sink=criar_sink(NOTIFICATION_CONFIG["sink"], NOTIFICATION_CONFIG["sink_path"] or None)
+)
 
 
 def notify_extraction_start(script_name: str):
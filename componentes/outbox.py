@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Outbox de Mensagens
+===================
+Registro persistente das mensagens enviadas aos grupos.
+
+Cada mensagem é identificada por (data, grupo, ciclo, hash do conteúdo) e
+passa pelos estados pending -> sent -> confirmed. Ao re-executar o envio
+depois de uma falha parcial, as mensagens já confirmadas hoje são puladas e
+só as restantes são enviadas. Se o conteúdo mudar (nova extração), o hash
+muda e a mensagem é enviada normalmente.
+
+O arquivo é um JSON pequeno (OUTBOX_CONFIG["path"]), regravado de forma
+atômica a cada mudança de estado.
+
+Uso:
+    python -m componentes.outbox            # lista as entradas de hoje
+    python -m componentes.outbox --limpar   # esquece as entradas de hoje (força reenvio)
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from componentes.config import OUTBOX_CONFIG
+
+PENDENTE = "pending"
+ENVIADA = "sent"
+CONFIRMADA = "confirmed"
+ESTADOS = (PENDENTE, ENVIADA, CONFIRMADA)
+
+logger = logging.getLogger(__name__)
+
+
+def hash_conteudo(*partes: Optional[str]) -> str:
+    """sha256 (16 primeiros hex) das partes da mensagem (texto, imagens, ...)"""
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update((parte or "").encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:16]
+
+
+def chave_mensagem(grupo: str, ciclo, conteudo_hash: str, data: Optional[str] = None) -> str:
+    """Chave "AAAA-MM-DD|grupo|ciclo|hash" (ciclo None vira "-")"""
+    data = data or date.today().isoformat()
+    return f"{data}|{grupo}|{ciclo if ciclo is not None else '-'}|{conteudo_hash}"
+
+
+class Outbox:
+    """Estados das mensagens persistidos em JSON"""
+
+    def __init__(self, caminho: str, retencao_dias: int = 7):
+        self.caminho = caminho
+        self.retencao_dias = retencao_dias
+        self._lock = threading.Lock()
+        self._entradas: Dict[str, Dict] = self._carregar()
+
+    def _carregar(self) -> Dict[str, Dict]:
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                entradas = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Outbox ilegível ({self.caminho}), iniciando vazio: {e}")
+            return {}
+        limite = (date.today() - timedelta(days=self.retencao_dias)).isoformat()
+        return {chave: e for chave, e in entradas.items() if chave.split("|", 1)[0] >= limite}
+
+    def _salvar(self):
+        diretorio = os.path.dirname(self.caminho)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        temporario = f"{self.caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self._entradas, f, ensure_ascii=False, indent=1)
+        os.replace(temporario, self.caminho)
+
+    def estado(self, chave: str) -> Optional[str]:
+        with self._lock:
+            entrada = self._entradas.get(chave)
+            return entrada["estado"] if entrada else None
+
+    def confirmada(self, chave: str) -> bool:
+        return self.estado(chave) == CONFIRMADA
+
+    def marcar(self, chave: str, estado: str, **extra):
+        """Atualiza o estado da mensagem (nunca volta de confirmed para um estado anterior)"""
+        if estado not in ESTADOS:
+            raise ValueError(f"Estado inválido: {estado}")
+        with self._lock:
+            entrada = self._entradas.setdefault(chave, {})
+            if entrada.get("estado") == CONFIRMADA and estado != CONFIRMADA:
+                return
+            entrada.update(extra)
+            entrada["estado"] = estado
+            entrada["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+            self._salvar()
+
+    def entradas(self, data: Optional[str] = None) -> Dict[str, Dict]:
+        """Entradas (cópia), opcionalmente só as da data AAAA-MM-DD"""
+        with self._lock:
+            return {chave: dict(e) for chave, e in self._entradas.items()
+                    if data is None or chave.startswith(f"{data}|")}
+
+    def limpar(self, data: Optional[str] = None, chaves: Optional[Iterable[str]] = None) -> int:
+        """Remove as entradas de uma data (ou chaves específicas); retorna quantas saíram"""
+        with self._lock:
+            if chaves is not None:
+                remover = [c for c in chaves if c in self._entradas]
+            else:
+                prefixo = f"{data or date.today().isoformat()}|"
+                remover = [c for c in self._entradas if c.startswith(prefixo)]
+            for chave in remover:
+                del self._entradas[chave]
+            if remover:
+                self._salvar()
+            return len(remover)
+
+
+_outbox: Optional[Outbox] = None
+_outbox_lock = threading.Lock()
+
+
+def obter_outbox() -> Optional[Outbox]:
+    """Outbox compartilhado do processo (None se OUTBOX_CONFIG["enabled"] for False)"""
+    global _outbox
+    if not OUTBOX_CONFIG["enabled"]:
+        return None
+    with _outbox_lock:
+        if _outbox is None:
+            _outbox = Outbox(OUTBOX_CONFIG["path"], OUTBOX_CONFIG["retencao_dias"])
+        return _outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consulta/limpeza do outbox de mensagens")
+    parser.add_argument("--data", default=date.today().isoformat(), help="Data AAAA-MM-DD (padrão: hoje)")
+    parser.add_argument("--limpar", action="store_true", help="Remove as entradas da data (força reenvio)")
+    args = parser.parse_args()
+
+    outbox = Outbox(OUTBOX_CONFIG["path"], OUTBOX_CONFIG["retencao_dias"])
+    if args.limpar:
+        print(f"🧹 {outbox.limpar(args.data)} entrada(s) removida(s) de {args.data}")
+        return
+    entradas = outbox.entradas(args.data)
+    if not entradas:
+        print(f"Nenhuma mensagem registrada em {args.data}")
+        return
+    for chave, entrada in sorted(entradas.items(), key=lambda item: item[1].get("atualizado_em", "")):
+        _, grupo, ciclo, conteudo_hash = chave.split("|")
+        print(f"{entrada.get('atualizado_em', '-'):19}  {grupo:6} ciclo {ciclo:3}  {entrada['estado']:9}  "
+              f"{entrada.get('rotulo') or '-'}  [{conteudo_hash}]")
+
+
+if __name__ == "__main__":
+    main()
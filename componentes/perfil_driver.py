@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Perfil do Driver
+================
+Ajustes de performance do Chrome usados pelos extratores.
+
+No perfil "rapido" o navegador roda headless, com janela reduzida, e as
+requisições de imagens, fontes, mídia e analytics são bloqueadas via CDP
+(Network.setBlockedURLs). As páginas da retaguarda só precisam do HTML/JS
+para montar as tabelas, então o carregamento fica bem mais leve.
+
+Ative com DRIVER_PROFILE=rapido (o padrão mantém o comportamento original).
+"""
+
+import logging
+import os
+from typing import Optional
+
+from componentes.config import DRIVER_PROFILE_CONFIG
+
+PERFIL_PADRAO = "padrao"
+PERFIL_RAPIDO = "rapido"
+
+
+def perfil_atual() -> str:
+    """Retorna o perfil configurado ("padrao" ou "rapido")"""
+    perfil = DRIVER_PROFILE_CONFIG.get("perfil") or PERFIL_PADRAO
+    return perfil if perfil in (PERFIL_PADRAO, PERFIL_RAPIDO) else PERFIL_PADRAO
+
+
+def perfil_rapido_ativo(perfil: Optional[str] = None) -> bool:
+    return (perfil or perfil_atual()) == PERFIL_RAPIDO
+
+
+def extracao_headless() -> bool:
+    """True se os extratores rodam sem janela (HEADLESS=1 ou perfil rápido)"""
+    return os.environ.get('HEADLESS') == '1' or perfil_rapido_ativo()
+
+
+def aplicar_opcoes_perfil(options, perfil: Optional[str] = None):
+    """Ajusta as ChromeOptions conforme o perfil (chamar antes de criar o driver)"""
+    if not perfil_rapido_ativo(perfil):
+        return options
+
+    argumentos = options.arguments
+    if '--start-maximized' in argumentos:
+        argumentos.remove('--start-maximized')
+    largura, altura = DRIVER_PROFILE_CONFIG["window_size"]
+    for argumento in ('--headless=new', f'--window-size={largura},{altura}',
+                      '--blink-settings=imagesEnabled=false', '--mute-audio'):
+        if argumento not in argumentos:
+            options.add_argument(argumento)
+    return options
+
+
+def aplicar_perfil_driver(driver, perfil: Optional[str] = None) -> bool:
+    """Aplica o bloqueio de recursos via CDP no driver já criado.
+
+    Returns:
+        True se o perfil rápido foi aplicado
+    """
+    if not perfil_rapido_ativo(perfil):
+        return False
+
+    logger = logging.getLogger(__name__)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {"urls": DRIVER_PROFILE_CONFIG["blocked_urls"]})
+        if DRIVER_PROFILE_CONFIG.get("disable_cache"):
+            driver.execute_cdp_cmd('Network.setCacheDisabled', {"cacheDisabled": True})
+    except Exception as e:
+        logger.warning(f"⚠️ Não foi possível aplicar o bloqueio de recursos via CDP: {e}")
+        return False
+
+    try:
+        largura, altura = DRIVER_PROFILE_CONFIG["window_size"]
+        driver.set_window_size(largura, altura)
+    except Exception:
+        pass
+
+    logger.info("⚡ Perfil rápido aplicado (headless, recursos pesados bloqueados)")
+    return True
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Higiene de Processos
+====================
+Registro e encerramento dos processos do Chrome/chromedriver criados pelos extratores.
+
+Cada processo Python grava em PROCESS_CONFIG["registry_dir"]/<pid>.json os PIDs
+dos drivers que ele mesmo iniciou. Na limpeza só são encerrados esses PIDs
+(deste processo ou de processos donos que já morreram), então workers de
+extração em paralelo e o Chrome do usuário não são afetados. Drivers ainda
+em uso por outra thread do mesmo processo (extrações simultâneas do
+executor de etapas) também são preservados.
+
+Usa psutil quando disponível (multiplataforma, espera sem sleeps fixos);
+sem psutil cai para os.kill/waitpid no Linux e taskkill /PID no Windows.
+"""
+
+import atexit
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from typing import Dict, Iterable, List, Optional
+
+from componentes.config import PROCESS_CONFIG
+
+try:
+    import psutil
+except ImportError:  # psutil é opcional
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = sys.platform.startswith("win")
+
+# Registro compartilhado pelas threads do processo (ler-alterar-gravar)
+_registro_lock = threading.RLock()
+# PID -> driver (referência fraca) que ainda está vivo neste processo
+_em_uso: Dict[int, "weakref.ref"] = {}
+
+
+def _arquivo_registro(dono: Optional[int] = None) -> str:
+    return os.path.join(PROCESS_CONFIG["registry_dir"], f"{dono or os.getpid()}.json")
+
+
+def _ler_registro(caminho: str) -> List[Dict]:
+    try:
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def _gravar_registro(caminho: str, entradas: List[Dict]):
+    if not entradas:
+        try:
+            os.remove(caminho)
+        except FileNotFoundError:
+            pass
+        return
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    # Nome do temporário por processo: a limpeza de donos mortos pode regravar o mesmo arquivo
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(entradas, f)
+    os.replace(temporario, caminho)
+
+
+def _create_time(pid: int) -> Optional[float]:
+    if psutil is None:
+        return None
+    try:
+        return psutil.Process(pid).create_time()
+    except psutil.Error:
+        return None
+
+
+def _processo_vivo(pid: int) -> bool:
+    if psutil is not None:
+        return psutil.pid_exists(pid)
+    if IS_WINDOWS:
+        # Sem psutil não há checagem barata no Windows; assume vivo e deixa o taskkill decidir
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _pids_do_driver(driver) -> List[int]:
+    """Coleta os PIDs do chromedriver e do Chrome associados ao driver"""
+    pids = []
+    try:
+        pids.append(driver.service.process.pid)
+    except Exception:
+        pass
+    browser_pid = getattr(driver, "browser_pid", None)  # undetected_chromedriver
+    if browser_pid:
+        pids.append(browser_pid)
+    if psutil is not None:
+        for pid in list(pids):
+            try:
+                pids.extend(p.pid for p in psutil.Process(pid).children(recursive=True))
+            except psutil.Error:
+                pass
+    return list(dict.fromkeys(pids))
+
+
+def registrar_driver(driver) -> List[int]:
+    """Registra os PIDs do driver recém-criado como pertencentes a este processo"""
+    pids = _pids_do_driver(driver)
+    if not pids:
+        return []
+    caminho = _arquivo_registro()
+    with _registro_lock:
+        entradas = _ler_registro(caminho)
+        conhecidos = {e["pid"] for e in entradas}
+        for pid in pids:
+            if pid not in conhecidos:
+                entradas.append({"pid": pid, "create_time": _create_time(pid)})
+            try:
+                _em_uso[pid] = weakref.ref(driver)
+            except TypeError:  # objeto sem suporte a weakref: tratado como órfão
+                pass
+        _gravar_registro(caminho, entradas)
+    logger.debug(f"PIDs registrados para o driver: {pids}")
+    return pids
+
+
+def _em_uso_neste_processo(pid: int) -> bool:
+    """PID de um driver que outra thread deste processo ainda está usando"""
+    referencia = _em_uso.get(pid)
+    return referencia is not None and referencia() is not None
+
+
+def _mesmo_processo(entrada: Dict) -> bool:
+    """Evita matar um PID reutilizado por outro programa"""
+    esperado = entrada.get("create_time")
+    if esperado is None or psutil is None:
+        return True
+    atual = _create_time(entrada["pid"])
+    return atual is not None and abs(atual - esperado) < 1.0
+
+
+def _encerrar_pids(pids: Iterable[int], timeout: float) -> int:
+    """Envia terminate, espera até timeout (sem sleep fixo) e força kill nos restantes"""
+    pids = [pid for pid in pids if pid != os.getpid()]
+    if not pids:
+        return 0
+
+    if psutil is not None:
+        processos = []
+        for pid in pids:
+            try:
+                processo = psutil.Process(pid)
+                processo.terminate()
+                processos.append(processo)
+            except psutil.Error:
+                pass
+        _, vivos = psutil.wait_procs(processos, timeout=timeout)
+        for processo in vivos:
+            try:
+                processo.kill()
+            except psutil.Error:
+                pass
+        if vivos:
+            psutil.wait_procs(vivos, timeout=timeout)
+        return len(processos)
+
+    if IS_WINDOWS:
+        for pid in pids:
+            subprocess.run(['taskkill', '/F', '/T', '/PID', str(pid)], stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL, creationflags=subprocess.CREATE_NO_WINDOW)
+        return len(pids)
+
+    encerrados = []
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+            encerrados.append(pid)
+        except (ProcessLookupError, PermissionError):
+            pass
+    limite = time.monotonic() + timeout
+    pendentes = set(encerrados)
+    while pendentes and time.monotonic() < limite:
+        for pid in list(pendentes):
+            try:
+                # Colhe filhos diretos (evita zumbis); para os demais só checa existência
+                if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                    pendentes.discard(pid)
+                    continue
+            except ChildProcessError:
+                pass
+            if not _processo_vivo(pid):
+                pendentes.discard(pid)
+        if pendentes:
+            time.sleep(0.05)
+    for pid in pendentes:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    return len(encerrados)
+
+
+def encerrar_driver(driver, timeout: Optional[float] = None):
+    """driver.quit() seguido do encerramento garantido dos PIDs registrados do driver"""
+    timeout = PROCESS_CONFIG["timeout_encerramento"] if timeout is None else timeout
+    pids = _pids_do_driver(driver)
+    try:
+        driver.quit()
+    except Exception as e:
+        logger.debug(f"driver.quit() falhou: {e}")
+    caminho = _arquivo_registro()
+    with _registro_lock:
+        for pid in pids:
+            _em_uso.pop(pid, None)
+        entradas = _ler_registro(caminho)
+        alvo = [e for e in entradas if e["pid"] in pids and _mesmo_processo(e)]
+        _encerrar_pids([e["pid"] for e in alvo if _processo_vivo(e["pid"])], timeout)
+        _gravar_registro(caminho, [e for e in entradas if e["pid"] not in pids])
+
+
+def _registros_reapaveis() -> List[str]:
+    """Arquivos de registro deste processo ou de donos que não estão mais vivos"""
+    diretorio = PROCESS_CONFIG["registry_dir"]
+    if not os.path.isdir(diretorio):
+        return []
+    arquivos = []
+    for nome in os.listdir(diretorio):
+        if not nome.endswith(".json"):
+            continue
+        try:
+            dono = int(nome[:-5])
+        except ValueError:
+            continue
+        if dono == os.getpid():
+            arquivos.append(os.path.join(diretorio, nome))
+        elif not (IS_WINDOWS and psutil is None) and not _processo_vivo(dono):
+            arquivos.append(os.path.join(diretorio, nome))
+    return arquivos
+
+
+def _encerrar_por_nome(nomes: Iterable[str], timeout: float) -> int:
+    if psutil is None:
+        logger.warning("⚠️ KILL_ALL_CHROME=1 requer psutil; ignorando limpeza global")
+        return 0
+    nomes = {n.lower() for n in nomes}
+    pids = [p.pid for p in psutil.process_iter(["name"]) if (p.info["name"] or "").lower() in nomes]
+    return _encerrar_pids(pids, timeout)
+
+
+def limpar_processos_zumbis(timeout: Optional[float] = None) -> int:
+    """Encerra os Chrome/chromedriver órfãos registrados por este processo ou por processos mortos.
+
+    Drivers deste processo ainda em uso por outra thread não são órfãos e ficam no registro.
+    Só mata processos de outros donos (incluindo o Chrome do usuário) se KILL_ALL_CHROME=1.
+
+    Returns:
+        Quantidade de processos encerrados
+    """
+    timeout = PROCESS_CONFIG["timeout_encerramento"] if timeout is None else timeout
+    proprio = _arquivo_registro()
+    with _registro_lock:
+        alvos = []
+        mantidos = []
+        arquivos = _registros_reapaveis()
+        for caminho in arquivos:
+            for entrada in _ler_registro(caminho):
+                if caminho == proprio and _em_uso_neste_processo(entrada["pid"]):
+                    mantidos.append(entrada)
+                elif _processo_vivo(entrada["pid"]) and _mesmo_processo(entrada):
+                    alvos.append(entrada["pid"])
+
+        total = 0
+        if alvos:
+            logger.info(f"🔧 Encerrando {len(alvos)} processo(s) residual(is) do Chrome/chromedriver...")
+            total = _encerrar_pids(alvos, timeout)
+        for caminho in arquivos:
+            _gravar_registro(caminho, mantidos if caminho == proprio else [])
+
+    if os.environ.get('KILL_ALL_CHROME') == '1':
+        logger.info('⚠️ Encerrando todos os chrome/chromedriver (KILL_ALL_CHROME=1)')
+        total += _encerrar_por_nome(PROCESS_CONFIG["nomes_chrome"], timeout)
+    return total
+
+
+@atexit.register
+def _limpar_ao_sair():
+    """Garante que os drivers deste processo não sobrevivam a ele"""
+    try:
+        caminho = _arquivo_registro()
+        with _registro_lock:
+            entradas = [e for e in _ler_registro(caminho) if _processo_vivo(e["pid"]) and _mesmo_processo(e)]
+            if entradas:
+                _encerrar_pids([e["pid"] for e in entradas], PROCESS_CONFIG["timeout_encerramento"])
+            _gravar_registro(caminho, [])
+    except Exception:
+        pass
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Rastreamento de Comandos do WebDriver
+=====================================
+Conta e cronometra cada ida e volta HTTP ao chromedriver (find_element,
+.text, get_attribute, execute_script, cliques...) por etapa da execução.
+
+O driver é instrumentado no command_executor (instrumentar(driver)): toda
+chamada passa por RemoteConnection.execute, então nenhum comando escapa,
+inclusive os disparados por WebDriverWait e pelos helpers do Selenium.
+Cada comando registra nome, alvo (seletor, atributo ou início do script),
+latência e a etapa em curso — definida com o context manager etapa() ou,
+fora dele, a função que chamou o Selenium.
+
+Ao fim da execução gravar_rastreamento(job) escreve o resumo por etapa
+(quantidade e tempo por comando, alvos mais frequentes) em
+RASTREAMENTO_CONFIG["dir"]/<job>.json. Comparar esse arquivo com uma base
+aponta mudanças que acrescentaram idas e voltas.
+
+Uso:
+    python -m componentes.rastreamento resumo log/rastreamento/main.json
+    python -m componentes.rastreamento comparar base.json atual.json --tolerancia 0.1
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from componentes.config import RASTREAMENTO_CONFIG
+from componentes.metrics import webdriver_command_seconds_total, webdriver_commands_total
+
+logger = logging.getLogger(__name__)
+
+SEM_ETAPA = "sem_etapa"
+
+# Atoms do Selenium (get_attribute, is_displayed...) são execute_script com um comentário inicial
+_ATOM = re.compile(r"^/\*\s*(\w+)\s*\*/")
+# Frames que não identificam quem chamou o Selenium
+_MODULOS_INTERNOS = ("selenium", "undetected_chromedriver", "componentes.rastreamento", "contextlib")
+
+_local = threading.local()
+
+
+def _pilha() -> List[str]:
+    pilha = getattr(_local, "etapas", None)
+    if pilha is None:
+        pilha = _local.etapas = []
+    return pilha
+
+
+@contextmanager
+def etapa(nome: str):
+    """Atribui os comandos do bloco à etapa (etapas aninhadas viram "externa/interna")"""
+    pilha = _pilha()
+    pilha.append(nome)
+    try:
+        yield
+    finally:
+        pilha.pop()
+
+
+def etapa_atual() -> str:
+    pilha = _pilha()
+    if pilha:
+        return "/".join(pilha)
+    # Sem etapa declarada: a primeira função fora do Selenium na pilha de chamadas
+    frame = sys._getframe(1)
+    while frame is not None:
+        modulo = frame.f_globals.get("__name__", "")
+        if not modulo.startswith(_MODULOS_INTERNOS):
+            return f"{modulo.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return SEM_ETAPA
+
+
+def _descrever(comando: str, params: Optional[Dict]) -> Tuple[str, str]:
+    """(nome, alvo) legíveis para o comando e seus parâmetros"""
+    params = params or {}
+    if "using" in params and "value" in params:
+        return comando, f"{params['using']}={params['value']}"
+    script = params.get("script")
+    if isinstance(script, str):
+        atom = _ATOM.match(script)
+        argumentos = params.get("args") or []
+        if atom:
+            # get_attribute/is_displayed: o alvo útil é o nome do atributo
+            alvo = argumentos[1] if len(argumentos) > 1 and isinstance(argumentos[1], str) else ""
+            return atom.group(1), alvo
+        return comando, " ".join(script.split())[:80]
+    if "url" in params:
+        return comando, str(params["url"])[:120]
+    if "name" in params:
+        return comando, str(params["name"])
+    if "cmd" in params:  # execute_cdp_cmd
+        return comando, str(params["cmd"])
+    return comando, ""
+
+
+class Rastreador:
+    """Agrega os comandos do processo por etapa"""
+
+    def __init__(self, max_alvos: Optional[int] = None, detalhado: Optional[str] = None):
+        self.max_alvos = max_alvos if max_alvos is not None else RASTREAMENTO_CONFIG["max_alvos"]
+        self.detalhado = detalhado  # caminho .jsonl com um registro por comando
+        self.inicio = time.time()
+        self._lock = threading.Lock()
+        self._etapas: Dict[str, Dict] = {}
+
+    def registrar(self, comando: str, alvo: str, duracao: float, etapa_nome: str, ok: bool = True):
+        with self._lock:
+            dados = self._etapas.setdefault(etapa_nome, {"comandos": {}, "alvos": {}})
+            contagem = dados["comandos"].setdefault(comando, [0, 0.0, 0])
+            contagem[0] += 1
+            contagem[1] += duracao
+            if not ok:
+                contagem[2] += 1
+            if alvo:
+                chave = f"{comando} {alvo}"
+                dados["alvos"][chave] = dados["alvos"].get(chave, 0) + 1
+            if self.detalhado:
+                with open(self.detalhado, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"em": round(time.time(), 3), "etapa": etapa_nome, "comando": comando,
+                                        "alvo": alvo, "s": round(duracao, 4), "ok": ok},
+                                       ensure_ascii=False) + "\n")
+        webdriver_commands_total.inc(etapa=etapa_nome, comando=comando)
+        webdriver_command_seconds_total.inc(duracao, etapa=etapa_nome, comando=comando)
+
+    def resumo(self) -> Dict:
+        """Quantidade e tempo por etapa e comando, com os alvos mais frequentes"""
+        with self._lock:
+            etapas = {}
+            total_comandos, total_tempo = 0, 0.0
+            for nome, dados in sorted(self._etapas.items()):
+                comandos = {c: {"qtd": q, "tempo_s": round(t, 4), "erros": e}
+                            for c, (q, t, e) in sorted(dados["comandos"].items(), key=lambda i: -i[1][0])}
+                quantidade = sum(c["qtd"] for c in comandos.values())
+                tempo = sum(t for _, t, _ in dados["comandos"].values())
+                alvos = sorted(dados["alvos"].items(), key=lambda i: -i[1])[:self.max_alvos]
+                etapas[nome] = {
+                    "comandos": quantidade,
+                    "tempo_s": round(tempo, 4),
+                    "por_comando": comandos,
+                    "alvos": dict(alvos),
+                }
+                total_comandos += quantidade
+                total_tempo += tempo
+        return {
+            "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.inicio)),
+            "duracao_s": round(time.time() - self.inicio, 3),
+            "comandos": total_comandos,
+            "tempo_s": round(total_tempo, 4),
+            "etapas": etapas,
+        }
+
+    def gravar(self, caminho: str) -> str:
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        temporario = f"{caminho}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.resumo(), f, ensure_ascii=False, indent=2)
+        os.replace(temporario, caminho)
+        return caminho
+
+
+def instrumentar(driver, rastreador: Optional["Rastreador"] = None):
+    """Passa os comandos do driver pelo rastreador (idempotente).
+
+    Returns:
+        O próprio driver (sem alteração se o rastreamento estiver desabilitado)
+    """
+    rastreador = rastreador or obter_rastreador()
+    executor = getattr(driver, "command_executor", None)
+    if rastreador is None or executor is None or getattr(executor, "_rastreado", False):
+        return driver
+    execute_original = executor.execute
+
+    def execute(comando, params=None):
+        inicio = time.perf_counter()
+        ok = False
+        try:
+            resposta = execute_original(comando, params)
+            ok = True
+            return resposta
+        finally:
+            nome, alvo = _descrever(comando, params)
+            rastreador.registrar(nome, alvo, time.perf_counter() - inicio, etapa_atual(), ok)
+
+    executor.execute = execute
+    executor._rastreado = True
+    return driver
+
+
+_rastreador: Optional[Rastreador] = None
+
+
+def obter_rastreador() -> Optional[Rastreador]:
+    """Rastreador do processo (None se RASTREAMENTO_CONFIG["enabled"] for False)"""
+    global _rastreador
+    if not RASTREAMENTO_CONFIG["enabled"]:
+        return None
+    if _rastreador is None:
+        detalhado = None
+        if RASTREAMENTO_CONFIG["detalhado"]:
+            os.makedirs(RASTREAMENTO_CONFIG["dir"], exist_ok=True)
+            detalhado = os.path.join(RASTREAMENTO_CONFIG["dir"], f"comandos_{os.getpid()}.jsonl")
+        _rastreador = Rastreador(detalhado=detalhado)
+    return _rastreador
+
+
+def gravar_rastreamento(job: str, diretorio: Optional[str] = None) -> Optional[str]:
+    """Grava o resumo do processo em <diretorio>/<job>.json (None se nada foi rastreado)"""
+    if _rastreador is None:
+        return None
+    caminho = os.path.join(diretorio or RASTREAMENTO_CONFIG["dir"], f"{job}.json")
+    try:
+        _rastreador.gravar(caminho)
+        resumo = _rastreador.resumo()
+        logger.info(f"🔎 WebDriver: {resumo['comandos']} comando(s), {resumo['tempo_s']:.1f}s "
+                    f"em {len(resumo['etapas'])} etapa(s) - {caminho}")
+        return caminho
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao gravar rastreamento em {caminho}: {e}")
+        return None
+
+
+def comparar(base: Dict, atual: Dict, tolerancia: float = 0.0) -> List[str]:
+    """Etapas cuja quantidade de comandos passou da base (+ tolerância relativa)"""
+    regressoes = []
+    for nome, dados in atual["etapas"].items():
+        esperado = base["etapas"].get(nome, {}).get("comandos")
+        if esperado is None:
+            regressoes.append(f"{nome}: etapa nova com {dados['comandos']} comando(s)")
+        elif dados["comandos"] > esperado * (1 + tolerancia):
+            regressoes.append(f"{nome}: {esperado} -> {dados['comandos']} comando(s)")
+    return regressoes
+
+
+def _imprimir(resumo: Dict):
+    print(f"{'etapa':<45} {'comandos':>9} {'tempo (s)':>10}")
+    for nome, dados in resumo["etapas"].items():
+        print(f"{nome:<45} {dados['comandos']:>9} {dados['tempo_s']:>10.3f}")
+        for comando, c in list(dados["por_comando"].items())[:5]:
+            print(f"  {comando:<43} {c['qtd']:>9} {c['tempo_s']:>10.3f}")
+    print(f"{'total':<45} {resumo['comandos']:>9} {resumo['tempo_s']:>10.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rastreamento de comandos do WebDriver")
+    subparsers = parser.add_subparsers(dest="acao", required=True)
+    parser_resumo = subparsers.add_parser("resumo", help="Mostra um rastreamento gravado")
+    parser_resumo.add_argument("arquivo")
+    parser_comparar = subparsers.add_parser("comparar", help="Falha se alguma etapa passou da base")
+    parser_comparar.add_argument("base")
+    parser_comparar.add_argument("atual")
+    parser_comparar.add_argument("--tolerancia", type=float, default=0.0,
+                                 help="Aumento relativo aceito por etapa (0.1 = 10%%)")
+    args = parser.parse_args()
+
+    def carregar(caminho):
+        with open(caminho, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    if args.acao == "resumo":
+        _imprimir(carregar(args.arquivo))
+        return
+    regressoes = comparar(carregar(args.base), carregar(args.atual), args.tolerancia)
+    if regressoes:
+        print("❌ Mais idas e voltas ao WebDriver que a base:")
+        for linha in regressoes:
+            print(f"   {linha}")
+        sys.exit(1)
+    print("✅ Nenhuma etapa passou da base")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Relatórios em Imagem
+====================
+Renderiza os resultados das extrações como uma tabela PNG compacta.
+
+Para ciclos com centenas de vendedores, a mensagem de texto fica enorme (lenta
+para colar e renderizar, e o WhatsApp a recolhe). A imagem mostra o top N,
+agrupa o restante em uma linha, e traz total e atingimento da meta.
+
+Requer Pillow (opcional): sem ele, `pillow_disponivel()` retorna False e o
+envio continua só com texto. Fontes e medidas de texto ficam em cache.
+"""
+
+import csv
+import logging
+import os
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from componentes.config import REPORT_IMAGE_CONFIG
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # Pillow é opcional
+    Image = ImageDraw = ImageFont = None
+
+logger = logging.getLogger(__name__)
+
+# Cores (RGB)
+COR_FUNDO = (255, 255, 255)
+COR_CABECALHO = (7, 94, 84)
+COR_TEXTO_CABECALHO = (255, 255, 255)
+COR_TEXTO = (33, 33, 33)
+COR_LINHA_ALTERNADA = (240, 246, 245)
+COR_POSITIVO = (0, 128, 64)
+COR_NEGATIVO = (200, 30, 30)
+
+
+def pillow_disponivel() -> bool:
+    return Image is not None
+
+
+def formatar_moeda(valor: float) -> str:
+    """Formato brasileiro: R$ 1.234,56"""
+    return "R$ " + f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def ler_resultados(csv_file: str) -> List[Tuple[str, float]]:
+    """Lê (nome, valor) de um CSV de resultado (cabeçalho na primeira linha)"""
+    linhas = []
+    with open(csv_file, "r", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for row in reader:
+            if len(row) >= 2:
+                try:
+                    linhas.append((row[0], float(row[1])))
+                except ValueError:
+                    continue
+    return linhas
+
+
+@lru_cache(maxsize=16)
+def _fonte(tamanho: int, negrito: bool = False):
+    """Carrega (uma única vez por tamanho/estilo) a primeira fonte TrueType disponível"""
+    candidatas = REPORT_IMAGE_CONFIG["fontes_negrito" if negrito else "fontes"]
+    for caminho in candidatas:
+        try:
+            return ImageFont.truetype(caminho, tamanho)
+        except OSError:
+            continue
+    logger.warning("⚠️ Nenhuma fonte TrueType encontrada; usando a fonte padrão do Pillow")
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=4096)
+def _largura_texto(texto: str, tamanho: int, negrito: bool = False) -> int:
+    fonte = _fonte(tamanho, negrito)
+    esquerda, _, direita, _ = fonte.getbbox(texto)
+    return direita - esquerda
+
+
+def _montar_linhas(resultados: List[Tuple[str, float]], top_n: int) -> List[Tuple[str, str, str]]:
+    """(posição, nome, valor) do top N, mais uma linha agregando os demais"""
+    ordenados = sorted(resultados, key=lambda r: r[1], reverse=True)
+    linhas = [(f"{i}º", nome, formatar_moeda(valor)) for i, (nome, valor) in enumerate(ordenados[:top_n], 1)]
+    restantes = ordenados[top_n:]
+    if restantes:
+        linhas.append(("", f"Demais {len(restantes)}", formatar_moeda(sum(v for _, v in restantes))))
+    return linhas
+
+
+def renderizar_relatorio(titulo: str, resultados: List[Tuple[str, float]], destino: str,
+                         meta: Optional[float] = None, top_n: Optional[int] = None) -> str:
+    """Gera o PNG do relatório e retorna o caminho gravado.
+
+    Args:
+        titulo: Título exibido no topo (sem a formatação *negrito* do WhatsApp)
+        resultados: Lista de (nome, valor)
+        destino: Caminho do arquivo PNG
+        meta: Meta do indicador (opcional) para o rodapé de atingimento
+        top_n: Quantidade de linhas individuais (padrão: REPORT_IMAGE_CONFIG["top_n"])
+    """
+    if not pillow_disponivel():
+        raise RuntimeError("Pillow não está instalado")
+
+    cfg = REPORT_IMAGE_CONFIG
+    top_n = top_n or cfg["top_n"]
+    tam, tam_titulo = cfg["tamanho_fonte"], cfg["tamanho_titulo"]
+    altura_linha = int(tam * 1.7)
+    margem = cfg["margem"]
+
+    linhas = _montar_linhas(resultados, top_n)
+    total = sum(v for _, v in resultados)
+    rodape = [("Realizado", formatar_moeda(total), COR_TEXTO)]
+    if meta is not None:
+        diferenca = total - meta
+        rodape.insert(0, ("Meta", formatar_moeda(meta), COR_TEXTO))
+        rodape.append(("Ultrapassou" if diferenca >= 0 else "Faltante", formatar_moeda(diferenca),
+                       COR_POSITIVO if diferenca >= 0 else COR_NEGATIVO))
+        if meta:
+            rodape.append(("Atingimento", f"{total / meta * 100:.1f}%".replace(".", ","),
+                           COR_POSITIVO if diferenca >= 0 else COR_NEGATIVO))
+
+    # Larguras das colunas a partir das medidas em cache
+    col_pos = max([_largura_texto(p, tam) for p, _, _ in linhas] + [0]) + margem
+    col_nome = max([_largura_texto(n, tam) for _, n, _ in linhas] + [_largura_texto(r, tam, True) for r, _, _ in rodape])
+    col_valor = max([_largura_texto(v, tam) for _, _, v in linhas] + [_largura_texto(v, tam, True) for _, v, _ in rodape])
+    largura = max(margem * 4 + col_pos + col_nome + col_valor, _largura_texto(titulo, tam_titulo, True) + margem * 2)
+    altura_titulo = int(tam_titulo * 2.2)
+    altura = altura_titulo + altura_linha * (len(linhas) + len(rodape)) + margem * 3
+
+    imagem = Image.new("RGB", (largura, altura), COR_FUNDO)
+    desenho = ImageDraw.Draw(imagem)
+
+    desenho.rectangle([0, 0, largura, altura_titulo], fill=COR_CABECALHO)
+    desenho.text((margem, (altura_titulo - tam_titulo) // 2), titulo, font=_fonte(tam_titulo, True),
+                 fill=COR_TEXTO_CABECALHO)
+
+    y = altura_titulo + margem // 2
+    fonte = _fonte(tam)
+    x_valor_fim = largura - margem
+    for i, (posicao, nome, valor) in enumerate(linhas):
+        if i % 2:
+            desenho.rectangle([0, y, largura, y + altura_linha], fill=COR_LINHA_ALTERNADA)
+        y_texto = y + (altura_linha - tam) // 2
+        desenho.text((margem, y_texto), posicao, font=fonte, fill=COR_TEXTO)
+        desenho.text((margem + col_pos, y_texto), nome, font=fonte, fill=COR_TEXTO)
+        desenho.text((x_valor_fim - _largura_texto(valor, tam), y_texto), valor, font=fonte, fill=COR_TEXTO)
+        y += altura_linha
+
+    y += margem // 2
+    desenho.line([margem, y, largura - margem, y], fill=COR_CABECALHO, width=2)
+    y += margem // 2
+    fonte_negrito = _fonte(tam, True)
+    for rotulo, valor, cor in rodape:
+        y_texto = y + (altura_linha - tam) // 2
+        desenho.text((margem, y_texto), rotulo, font=fonte_negrito, fill=cor)
+        desenho.text((x_valor_fim - _largura_texto(valor, tam, True), y_texto), valor, font=fonte_negrito, fill=cor)
+        y += altura_linha
+
+    diretorio = os.path.dirname(destino)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    # compress_level baixo: o PNG é enviado logo em seguida, velocidade importa mais que tamanho
+    imagem.save(destino, format="PNG", optimize=False, compress_level=1)
+    return destino
+
+
+def renderizar_csv(csv_file: str, titulo: str, meta: Optional[float] = None,
+                   destino: Optional[str] = None,
+                   resultados: Optional[List[Tuple[str, float]]] = None) -> Optional[str]:
+    """Renderiza o CSV de resultado se ele tiver mais linhas que o limite configurado.
+
+    `resultados` já lidos (ler_resultados) dispensam uma nova leitura do CSV.
+
+    Returns:
+        Caminho do PNG, ou None se a imagem não se aplica (desabilitado, sem Pillow,
+        arquivo ausente ou ranking pequeno o bastante para texto)
+    """
+    if not REPORT_IMAGE_CONFIG["enabled"] or not pillow_disponivel() or not os.path.exists(csv_file):
+        return None
+    if resultados is None:
+        resultados = ler_resultados(csv_file)
+    if len(resultados) <= REPORT_IMAGE_CONFIG["limite_linhas_texto"]:
+        return None
+    if destino is None:
+        nome = os.path.splitext(os.path.basename(csv_file))[0] + ".png"
+        destino = os.path.join(REPORT_IMAGE_CONFIG["output_dir"], nome)
+    # Remove a formatação do WhatsApp e emojis (as fontes padrão não têm esses glifos)
+    titulo = " ".join("".join(c for c in titulo if c.isalnum() or c.isspace() or c in "-()/%:.,").split())
+    try:
+        return renderizar_relatorio(titulo, resultados, destino, meta=meta)
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao renderizar imagem de {csv_file}: {e}")
+        return None
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Gravação e Reprodução Offline
+=============================
+Permite rodar (e medir) o pipeline inteiro sem a retaguarda e sem o
+WhatsApp de verdade.
+
+Gravação (REPLAY_MODO=gravar, em uma execução real):
+- os navegadores das extrações ligam o log de performance do Chrome e cada
+  resposta HTTP (páginas, postbacks do UpdatePanel, scripts, estilos) é
+  salva em REPLAY_DIR/respostas, indexada em indice.jsonl por método, URL
+  e corpo da requisição
+- a captura de metas salva instantâneos do WhatsApp Web (DOM da página e as
+  mensagens lidas de cada grupo) em REPLAY_DIR/whatsapp
+
+Reprodução (ServidorReplay ou "python -m componentes.replay servir"):
+- um servidor HTTP local por origem gravada devolve as respostas com a
+  latência configurada; postbacks que não batem pelo corpo (datas, campos
+  preenchidos no dia) são servidos na ordem gravada para a mesma URL
+- a origem do WhatsApp Web serve o instantâneo da página com as mensagens
+  gravadas no IndexedDB (deslocadas para hoje) e uma conversa com caixa de
+  mensagem para o envio, que roda em simulação (WHATSAPP_DRY_RUN)
+- REPLAY_ORIGENS leva o mapa origem -> servidor a todos os processos do
+  pipeline (componentes/config.py reescreve as URLs configuradas)
+
+O benchmark benchmarks/bench_pipeline.py usa a reprodução para rodar
+main.main e main_com_marcas.main de ponta a ponta e medir cada etapa.
+
+Uso:
+    REPLAY_MODO=gravar REPLAY_DIR=gravacoes/2025-06-15 python main_com_marcas.py
+    python -m componentes.replay resumo gravacoes/2025-06-15
+    python -m componentes.replay servir gravacoes/2025-06-15 --latencia 0.1
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from componentes.config import REPLAY_CONFIG, WHATSAPP_STORE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+ORIGEM_WHATSAPP = "https://web.whatsapp.com"
+_SCRIPTS = re.compile(rb"<script\b[^>]*>.*?</script>", re.IGNORECASE | re.DOTALL)
+
+
+def gravando() -> bool:
+    return REPLAY_CONFIG["modo"] == "gravar"
+
+
+def _origem(url: str) -> str:
+    partes = urlsplit(url)
+    return f"{partes.scheme}://{partes.netloc}"
+
+
+def _hash(corpo: Optional[bytes]) -> str:
+    return hashlib.sha1(corpo or b"").hexdigest()
+
+
+def _meia_noite(timestamp: float) -> float:
+    return datetime.fromtimestamp(timestamp).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+# ---------------------------------------------------------------------------
+# Gravação
+# ---------------------------------------------------------------------------
+
+class Gravacao:
+    """Diretório de uma gravação: respostas HTTP indexadas e instantâneos do WhatsApp"""
+
+    def __init__(self, diretorio: Optional[str] = None):
+        self.diretorio = diretorio or REPLAY_CONFIG["dir"]
+        self.caminho_indice = os.path.join(self.diretorio, "indice.jsonl")
+        self._lock = threading.Lock()
+        self._sequencia = 0
+
+    def registrar_resposta(self, metodo: str, url: str, corpo_requisicao: Optional[bytes], status: int,
+                           cabecalhos: Dict[str, str], corpo: bytes):
+        with self._lock:
+            self._sequencia += 1
+            nome = f"{os.getpid()}_{self._sequencia:05d}.bin"
+            pasta = os.path.join(self.diretorio, "respostas")
+            os.makedirs(pasta, exist_ok=True)
+            with open(os.path.join(pasta, nome), "wb") as f:
+                f.write(corpo)
+            entrada = {"em": round(time.time(), 3), "metodo": metodo, "url": url,
+                       "corpo_sha1": _hash(corpo_requisicao), "status": status,
+                       "cabecalhos": cabecalhos, "arquivo": nome}
+            with open(self.caminho_indice, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+
+    def entradas(self) -> List[Dict]:
+        try:
+            with open(self.caminho_indice, "r", encoding="utf-8") as f:
+                return [json.loads(linha) for linha in f if linha.strip()]
+        except FileNotFoundError:
+            return []
+
+    def corpo(self, entrada: Dict) -> bytes:
+        with open(os.path.join(self.diretorio, "respostas", entrada["arquivo"]), "rb") as f:
+            return f.read()
+
+    # -- WhatsApp ------------------------------------------------------------
+
+    def _pasta_whatsapp(self) -> str:
+        pasta = os.path.join(self.diretorio, "whatsapp")
+        os.makedirs(pasta, exist_ok=True)
+        return pasta
+
+    def gravar_whatsapp(self, grupo: str, chat_id: Optional[str], mensagens, html: Optional[str] = None):
+        """Salva as mensagens de hoje do grupo ([(timestamp, texto)]) e o DOM da página"""
+        pasta = self._pasta_whatsapp()
+        agora = time.time()
+        dados = {
+            "grupo": grupo,
+            # Sem id (captura pela pesquisa da interface): um id fixo para a reprodução pelo IndexedDB
+            "chat": chat_id or f"gravado-{grupo.lower()}@g.us",
+            "gravado_em": datetime.fromtimestamp(agora).isoformat(timespec="seconds"),
+            # Segundos desde a meia-noite: a reprodução recoloca as mensagens no dia em curso
+            "mensagens": [{"segundos": int(t - _meia_noite(agora)), "texto": texto} for t, texto in mensagens],
+        }
+        with open(os.path.join(pasta, f"{grupo}.json"), "w", encoding="utf-8") as f:
+            json.dump(dados, f, ensure_ascii=False, indent=2)
+        if html:
+            with open(os.path.join(pasta, f"{grupo}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+            if not os.path.exists(os.path.join(pasta, "pagina.html")):
+                with open(os.path.join(pasta, "pagina.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+
+    def chats_whatsapp(self) -> Dict[str, Dict]:
+        pasta = os.path.join(self.diretorio, "whatsapp")
+        chats = {}
+        if os.path.isdir(pasta):
+            for nome in sorted(os.listdir(pasta)):
+                if nome.endswith(".json"):
+                    with open(os.path.join(pasta, nome), "r", encoding="utf-8") as f:
+                        dados = json.load(f)
+                    chats[dados["grupo"]] = dados
+        return chats
+
+
+_gravacao: Optional[Gravacao] = None
+
+
+def obter_gravacao() -> Optional[Gravacao]:
+    """Gravação do processo (None fora do modo "gravar")"""
+    global _gravacao
+    if not gravando():
+        return None
+    if _gravacao is None:
+        _gravacao = Gravacao()
+    return _gravacao
+
+
+def aplicar_opcoes_gravacao(options):
+    """Liga o log de performance (eventos de rede) nas ChromeOptions quando gravando"""
+    if gravando():
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    return options
+
+
+class _ColetorRede:
+    """Lê os eventos Network.* do log de performance e grava cada resposta concluída"""
+
+    def __init__(self, driver, gravacao: Gravacao):
+        self.driver = driver
+        self.gravacao = gravacao
+        self.pendentes: Dict[str, Dict] = {}
+        self.ocupado = False
+
+    def coletar(self):
+        if self.ocupado:  # get_log/execute_cdp_cmd também passam pelo command_executor
+            return
+        self.ocupado = True
+        try:
+            for entrada in self.driver.get_log("performance"):
+                mensagem = json.loads(entrada["message"])["message"]
+                self._evento(mensagem.get("method", ""), mensagem.get("params", {}))
+        except Exception as e:
+            logger.debug(f"Coleta de rede interrompida: {e}")
+        finally:
+            self.ocupado = False
+
+    def _evento(self, metodo: str, params: Dict):
+        requisicao_id = params.get("requestId")
+        if metodo == "Network.requestWillBeSent":
+            requisicao = params["request"]
+            anterior = self.pendentes.pop(requisicao_id, None)
+            redirecionamento = params.get("redirectResponse")
+            if anterior and redirecionamento:
+                cabecalhos = {k.lower(): v for k, v in redirecionamento.get("headers", {}).items()}
+                self._gravar(anterior, redirecionamento["status"],
+                             {k: v for k, v in cabecalhos.items() if k in ("location", "content-type")}, b"")
+            if requisicao["url"].startswith(("http://", "https://")):
+                self.pendentes[requisicao_id] = {
+                    "metodo": requisicao["method"],
+                    "url": requisicao["url"],
+                    "corpo": requisicao.get("postData"),
+                    "tem_corpo": requisicao.get("hasPostData", False),
+                }
+        elif metodo == "Network.responseReceived" and requisicao_id in self.pendentes:
+            resposta = params["response"]
+            cabecalhos = {k.lower(): v for k, v in resposta.get("headers", {}).items()}
+            self.pendentes[requisicao_id]["status"] = resposta["status"]
+            self.pendentes[requisicao_id]["tipo"] = cabecalhos.get("content-type") or resposta.get("mimeType", "")
+        elif metodo == "Network.loadingFinished":
+            pendente = self.pendentes.pop(requisicao_id, None)
+            if pendente and "status" in pendente:
+                try:
+                    resultado = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": requisicao_id})
+                except Exception:
+                    return  # Corpo descartado pelo Chrome (ex.: navegação antes da coleta)
+                corpo = resultado.get("body", "")
+                corpo = base64.b64decode(corpo) if resultado.get("base64Encoded") else corpo.encode("utf-8")
+                if pendente["corpo"] is None and pendente["tem_corpo"]:
+                    try:
+                        pendente["corpo"] = self.driver.execute_cdp_cmd(
+                            "Network.getRequestPostData", {"requestId": requisicao_id}).get("postData")
+                    except Exception:
+                        pass
+                self._gravar(pendente, pendente["status"], {"content-type": pendente["tipo"]}, corpo)
+        elif metodo == "Network.loadingFailed":
+            self.pendentes.pop(requisicao_id, None)
+
+    def _gravar(self, pendente: Dict, status: int, cabecalhos: Dict[str, str], corpo: bytes):
+        corpo_requisicao = pendente["corpo"].encode("utf-8") if pendente.get("corpo") else None
+        self.gravacao.registrar_resposta(pendente["metodo"], pendente["url"], corpo_requisicao,
+                                         status, cabecalhos, corpo)
+
+
+def acompanhar(driver):
+    """Grava o tráfego do driver enquanto ele é usado (sem efeito fora do modo "gravar").
+
+    Os eventos são drenados depois de cada comando e antes do quit, para o
+    Chrome ainda ter os corpos das respostas.
+    """
+    gravacao = obter_gravacao()
+    executor = getattr(driver, "command_executor", None)
+    if gravacao is None or executor is None or getattr(executor, "_gravado", False):
+        return driver
+    coletor = _ColetorRede(driver, gravacao)
+    execute_original = executor.execute
+
+    def execute(comando, params=None):
+        if comando == "quit":
+            coletor.coletar()
+            return execute_original(comando, params)
+        try:
+            return execute_original(comando, params)
+        finally:
+            coletor.coletar()
+
+    executor.execute = execute
+    executor._gravado = True
+    logger.info(f"⏺️ Gravando o tráfego do navegador em {gravacao.diretorio}")
+    return driver
+
+
+def gravar_whatsapp(driver, grupo: str, chat_id: Optional[str], mensagens):
+    """Instantâneo do WhatsApp para a reprodução (sem efeito fora do modo "gravar")"""
+    gravacao = obter_gravacao()
+    if gravacao is None:
+        return
+    try:
+        html = driver.page_source if driver is not None else None
+    except Exception:
+        html = None
+    try:
+        gravacao.gravar_whatsapp(grupo, chat_id, mensagens, html)
+    except Exception as e:
+        logger.warning(f"⚠️ Falha ao gravar instantâneo do WhatsApp ({grupo}): {e}")
+
+
+def mensagens_de_resultados(resultados) -> list:
+    """[(timestamp, texto)] de hoje a partir dos resultados da pesquisa [(período, texto)]"""
+    hoje = datetime.now()
+    mensagens = []
+    for periodo, texto in resultados:
+        match = re.match(r"^(\d{1,2}):(\d{2})", periodo or "")
+        if match and texto:
+            horario = hoje.replace(hour=int(match.group(1)), minute=int(match.group(2)), second=0, microsecond=0)
+            mensagens.append((horario.timestamp(), texto))
+    return mensagens
+
+
+# ---------------------------------------------------------------------------
+# Reprodução
+# ---------------------------------------------------------------------------
+
+_PAGINA_CHAT = """<!DOCTYPE html>
+<html lang="pt-BR"><head><meta charset="utf-8"><title>WhatsApp (reprodução)</title></head>
+<body><div id="pane-side"></div>
+<div id="main"><header>{grupo}</header><footer>
+<div contenteditable="true" role="textbox" title="Digite uma mensagem"></div>
+</footer></div></body></html>"""
+
+_SCRIPT_SEMENTE = """<script>
+(function () {{
+  var chats = {chats};
+  var meiaNoite = new Date(); meiaNoite.setHours(0, 0, 0, 0);
+  var hoje = Math.floor(meiaNoite.getTime() / 1000);
+  var pedido = indexedDB.deleteDatabase({banco});
+  pedido.onsuccess = pedido.onerror = function () {{
+    var abertura = indexedDB.open({banco}, 1);
+    abertura.onupgradeneeded = function () {{
+      abertura.result.createObjectStore({store}, {{keyPath: {campo_id}}}).createIndex({campo_tempo}, {campo_tempo});
+    }};
+    abertura.onsuccess = function () {{
+      var db = abertura.result;
+      var transacao = db.transaction({store}, 'readwrite');
+      var store = transacao.objectStore({store});
+      chats.forEach(function (chat) {{
+        chat.mensagens.forEach(function (m, i) {{
+          var registro = {{from: chat.chat, type: 'chat'}};
+          registro[{campo_id}] = 'false_' + chat.chat + '_replay' + i;
+          registro[{campo_tempo}] = hoje + m.segundos;
+          registro[{campo_texto}] = m.texto;
+          store.put(registro);
+        }});
+      }});
+      transacao.oncomplete = function () {{
+        db.close();
+        // A lista de conversas só aparece com o banco pronto, como na sessão sincronizada
+        var lista = document.createElement('div');
+        lista.id = 'pane-side';
+        document.body.appendChild(lista);
+      }};
+    }};
+  }};
+}})();
+</script>"""
+
+
+class _IndiceReplay:
+    """Respostas gravadas por (método, URL, corpo) e, como alternativa, na ordem por (método, URL)"""
+
+    def __init__(self, gravacao: Gravacao):
+        self.gravacao = gravacao
+        self._por_chave: Dict[tuple, List[Dict]] = defaultdict(list)
+        self._cursores: Dict[tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        for entrada in gravacao.entradas():
+            url = entrada["url"]
+            self._por_chave[("exata", entrada["metodo"], url, entrada["corpo_sha1"])].append(entrada)
+            self._por_chave[("url", entrada["metodo"], url)].append(entrada)
+            self._por_chave[("caminho", entrada["metodo"], url.split("?", 1)[0])].append(entrada)
+
+    def origens(self) -> List[str]:
+        return sorted({_origem(chave[2]) for chave in self._por_chave if chave[0] == "url"})
+
+    def buscar(self, metodo: str, url: str, corpo: Optional[bytes]) -> Optional[Dict]:
+        for chave in (("exata", metodo, url, _hash(corpo)), ("url", metodo, url),
+                      ("caminho", metodo, url.split("?", 1)[0])):
+            entradas = self._por_chave.get(chave)
+            if entradas:
+                with self._lock:
+                    posicao = self._cursores[chave]
+                    self._cursores[chave] = posicao + 1
+                # Repete a última resposta quando a execução pede mais vezes que a gravação
+                return entradas[min(posicao, len(entradas) - 1)]
+        return None
+
+
+class ServidorReplay:
+    """Um servidor HTTP local por origem gravada (mais o WhatsApp Web)"""
+
+    def __init__(self, diretorio: str, latencia: Optional[float] = None, endereco: str = "127.0.0.1"):
+        self.gravacao = Gravacao(diretorio)
+        self.latencia = REPLAY_CONFIG["latencia"] if latencia is None else latencia
+        self.endereco = endereco
+        self.indice = _IndiceReplay(self.gravacao)
+        self.origens: Dict[str, str] = {}
+        self._servidores: List[ThreadingHTTPServer] = []
+        self.atendidas = 0
+        self.nao_gravadas = 0
+
+    def iniciar(self) -> Dict[str, str]:
+        """Sobe os servidores e retorna o mapa origem gravada -> URL local"""
+        for origem in self.indice.origens() + [ORIGEM_WHATSAPP]:
+            if origem in self.origens:
+                continue
+            servidor = ThreadingHTTPServer((self.endereco, 0), self._handler(origem))
+            servidor.daemon_threads = True
+            threading.Thread(target=servidor.serve_forever, name=f"replay-{origem}", daemon=True).start()
+            self._servidores.append(servidor)
+            self.origens[origem] = f"http://{self.endereco}:{servidor.server_address[1]}"
+        logger.info(f"▶️ Reprodução de {self.gravacao.diretorio}: {len(self.origens)} origem(ns), "
+                    f"latência {self.latencia * 1000:.0f} ms")
+        return dict(self.origens)
+
+    def encerrar(self):
+        for servidor in self._servidores:
+            servidor.shutdown()
+            servidor.server_close()
+        self._servidores.clear()
+
+    def ambiente(self) -> Dict[str, str]:
+        """Variáveis de ambiente que apontam o pipeline para a reprodução"""
+        variaveis = {"REPLAY_ORIGENS": json.dumps(self.origens)}
+        for grupo, dados in self.gravacao.chats_whatsapp().items():
+            variaveis[f"WHATSAPP_CHAT_{grupo}"] = dados["chat"]
+        return variaveis
+
+    # -- respostas -----------------------------------------------------------
+
+    def _reescrever(self, corpo: bytes, tipo: str) -> bytes:
+        if not any(t in (tipo or "") for t in REPLAY_CONFIG["tipos_texto"]):
+            return corpo
+        for origem, local in self.origens.items():
+            corpo = corpo.replace(origem.encode(), local.encode())
+            # Referências http:// à mesma origem (portais que misturam esquemas)
+            corpo = corpo.replace(origem.replace("https://", "http://", 1).encode(), local.encode())
+        return corpo
+
+    def _pagina_whatsapp(self) -> bytes:
+        chats = list(self.gravacao.chats_whatsapp().values())
+        caminho = os.path.join(self.gravacao.diretorio, "whatsapp", "pagina.html")
+        if os.path.exists(caminho):
+            with open(caminho, "rb") as f:
+                html = _SCRIPTS.sub(b"", f.read())
+            # O #pane-side do instantâneo só é recriado depois que o banco estiver populado
+            html = html.replace(b'id="pane-side"', b'id="pane-side-gravado"')
+        else:
+            html = b"<!DOCTYPE html><html><head><meta charset=\"utf-8\"></head><body></body></html>"
+        config = WHATSAPP_STORE_CONFIG
+        script = _SCRIPT_SEMENTE.format(
+            chats=json.dumps([{"chat": c["chat"], "mensagens": c["mensagens"]} for c in chats], ensure_ascii=False),
+            banco=json.dumps(config["banco"]), store=json.dumps(config["store"]),
+            campo_id=json.dumps(config["campo_id"]), campo_tempo=json.dumps(config["campo_tempo"]),
+            campo_texto=json.dumps(config["campo_texto"]),
+        ).encode("utf-8")
+        if b"</body>" in html:
+            return html.replace(b"</body>", script + b"</body>", 1)
+        return html + script
+
+    def _handler(self, origem: str):
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _responder(self, status: int, cabecalhos: Dict[str, str], corpo: bytes):
+                self.send_response(status)
+                for nome, valor in cabecalhos.items():
+                    if valor:
+                        self.send_header(nome, valor)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(corpo)
+
+            def _atender(self):
+                tamanho = int(self.headers.get("Content-Length") or 0)
+                corpo = self.rfile.read(tamanho) if tamanho else None
+                if corpo:
+                    for original, local in servidor.origens.items():
+                        corpo = corpo.replace(local.encode(), original.encode())
+                time.sleep(servidor.latencia)
+
+                if origem == ORIGEM_WHATSAPP:
+                    caminho = self.path.split("?", 1)[0]
+                    if caminho == "/":
+                        pagina = servidor._pagina_whatsapp()
+                    elif caminho == "/accept":
+                        pagina = _PAGINA_CHAT.format(grupo=self.path.partition("code=")[2][:10]).encode("utf-8")
+                    else:
+                        self._responder(404, {}, b"")
+                        return
+                    servidor.atendidas += 1
+                    self._responder(200, {"Content-Type": "text/html; charset=utf-8"}, pagina)
+                    return
+
+                metodo = "GET" if self.command == "HEAD" else self.command
+                entrada = servidor.indice.buscar(metodo, origem + self.path, corpo)
+                if entrada is None:
+                    servidor.nao_gravadas += 1
+                    logger.debug(f"Não gravado: {self.command} {origem}{self.path}")
+                    self._responder(404, {}, b"")
+                    return
+                servidor.atendidas += 1
+                cabecalhos = dict(entrada["cabecalhos"])
+                tipo = cabecalhos.get("content-type", "")
+                if cabecalhos.get("location"):
+                    cabecalhos["location"] = servidor._reescrever(cabecalhos["location"].encode(),
+                                                                  "text/").decode()
+                self._responder(entrada["status"], {"Content-Type": tipo, "Location": cabecalhos.get("location")},
+                                servidor._reescrever(servidor.gravacao.corpo(entrada), tipo))
+
+            do_GET = do_POST = do_HEAD = _atender
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gravação e reprodução offline do pipeline")
+    subparsers = parser.add_subparsers(dest="acao", required=True)
+    parser_resumo = subparsers.add_parser("resumo", help="Conteúdo de uma gravação")
+    parser_resumo.add_argument("diretorio")
+    parser_servir = subparsers.add_parser("servir", help="Serve uma gravação até Ctrl+C")
+    parser_servir.add_argument("diretorio")
+    parser_servir.add_argument("--latencia", type=float, default=None, help="Atraso por resposta (segundos)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if args.acao == "resumo":
+        gravacao = Gravacao(args.diretorio)
+        por_origem = defaultdict(lambda: [0, 0])
+        for entrada in gravacao.entradas():
+            contagem = por_origem[_origem(entrada["url"])]
+            contagem[0] += 1
+            contagem[1] += entrada["metodo"] == "POST"
+        for origem, (total, posts) in sorted(por_origem.items()):
+            print(f"{origem:<50} {total:>6} resposta(s)  {posts:>4} POST")
+        for grupo, dados in gravacao.chats_whatsapp().items():
+            print(f"WhatsApp {grupo:<41} {len(dados['mensagens']):>6} mensagem(ns)  chat {dados['chat']}")
+        return
+
+    servidor = ServidorReplay(args.diretorio, args.latencia)
+    servidor.iniciar()
+    for chave, valor in servidor.ambiente().items():
+        print(f"export {chave}='{valor}'")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        servidor.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Execução Multi-Tenant
+=====================
+Roda o pipeline (main ou main_com_marcas) de várias lojas/franquias ao mesmo
+tempo a partir de um registro JSON (TENANT_CONFIG["registro"]):
+
+    {
+        "padrao": {"env": {"HEADLESS": "1"}},
+        "loja_centro": {
+            "pipeline": "main",
+            "env": {"LOGIN_USERNAME": "centro", "LOGIN_PASSWORD": "$SENHA_CENTRO",
+                    "GOOGLE_EMAIL": "centro@empresa.com", "GOOGLE_PASSWORD": "$GOOGLE_SENHA_CENTRO"},
+            "config": {"WHATSAPP_CONFIG": {"group_links": ["<grupo VD>", "<grupo LOJA>"]},
+                       "META_CONFIG": {"vd_group_link": "<grupo VD>", "loja_group_link": "<grupo LOJA>"},
+                       "REPORT_JOBS": {"loja": {"tabela": {"seletor": "#outra-grid"}}}}
+        }
+    }
+
+- "env": variáveis do processo do tenant (credenciais, URLs, HEADLESS...);
+  "$NOME" lê o valor do ambiente de quem dispara, para a senha não ficar no arquivo;
+- "config": sobreposições das configurações de componentes/config.py (grupos,
+  metas, seletores de LOGIN_PROFILES/REPORT_JOBS...), mescladas chave a chave;
+- "padrao": valores comuns, que cada tenant pode sobrepor; "ativo": false pula o tenant.
+
+Cada tenant roda em um processo próprio, com diretório de trabalho próprio
+(TENANT_CONFIG["dir"]/<tenant>: extracoes/, log/, outbox, checkpoints) e a
+própria sessão do WhatsApp (perfil do Chrome em <tenant>/perfil_whatsapp e
+porta de depuração porta_base + posição no registro). O Chrome das extrações
+já usa um perfil temporário por navegador.
+
+Os tenants rodam em paralelo (até TENANT_CONFIG["max_paralelo"]); o que limita
+a concorrência é o portal: cada navegador aberto em um portal ocupa uma vaga
+(TENANT_CONFIG["limites_portal"]), um arquivo travado pelo sistema operacional
+em <dir>/vagas — a trava some junto com o processo, mesmo se ele morrer.
+Quem não consegue vaga espera, sem segurar as outras etapas do pipeline.
+
+O envio pelo teclado/clipboard (WhatsApp sem o envio pelo DOM da sessão)
+usa o teclado, o foco e o clipboard do sistema, que são um só: os tenants
+enviam um de cada vez (trava <dir>/vagas/envio_teclado.lock, da abertura do
+WhatsApp Web à última mensagem). Com o envio pelo DOM, cada tenant envia na
+própria sessão, em paralelo, e o teclado é recusado.
+
+Uso:
+    python -m componentes.tenants                          # todos os tenants ativos
+    python -m componentes.tenants loja_centro loja_norte --max-paralelo 4 --limite vd=2
+    python -m componentes.tenants --listar
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Raiz do projeto: PYTHONPATH e link componentes/ nos diretórios dos tenants
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+from componentes import config
+from componentes.config import TENANT_CONFIG
+from componentes.logging_setup import configurar_logging_raiz
+from componentes.metrics import escrever_arquivo_metricas, tenant_run_seconds, tenant_run_success
+from componentes.travas import destravar, trava_arquivo, travar
+
+logger = logging.getLogger(__name__)
+
+IS_WINDOWS = sys.platform.startswith("win")
+PIPELINES = ("main", "main_com_marcas")
+_NOME_VALIDO = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Nunca herdados de quem dispara: cada tenant tem o próprio (ou o padrão do diretório dele)
+_POR_TENANT = ("CHROME_USER_DATA", "WHATSAPP_USER_DATA", "WHATSAPP_DEBUG_PORT", "METRICS_PORT",
+               "TENANT_SOBREPOSICOES")
+
+
+class SemVagaPortal(Exception):
+    """Nenhuma vaga do portal liberou dentro de TENANT_CONFIG["timeout_vaga"]"""
+
+
+# ---------------------------------------------------------------------------
+# Vagas por portal (entre processos)
+# ---------------------------------------------------------------------------
+
+class VagaPortal:
+    """Uma das `limite` vagas de um portal, disputada por todos os processos que usam o mesmo diretório"""
+
+    def __init__(self, diretorio: str, portal: str, limite: int):
+        self.diretorio = diretorio
+        self.portal = portal
+        self.limite = limite
+        self._arquivo = None
+        self._lock = threading.Lock()
+
+    def ocupar(self, timeout: float, intervalo: float = 0.5) -> float:
+        """Espera uma vaga livre. Returns: segundos de espera"""
+        os.makedirs(self.diretorio, exist_ok=True)
+        inicio = time.monotonic()
+        while True:
+            for indice in range(self.limite):
+                arquivo = open(os.path.join(self.diretorio, f"{self.portal}.{indice}.lock"), "a+")
+                try:
+                    travar(arquivo)
+                except OSError:
+                    arquivo.close()
+                    continue
+                self._arquivo = arquivo
+                return time.monotonic() - inicio
+            if time.monotonic() - inicio >= timeout:
+                raise SemVagaPortal(f"Nenhuma das {self.limite} vaga(s) de {self.portal} liberou em {timeout:.0f}s")
+            time.sleep(intervalo)
+
+    def liberar(self):
+        """Devolve a vaga (idempotente)"""
+        with self._lock:
+            arquivo, self._arquivo = self._arquivo, None
+        if arquivo is None:
+            return
+        try:
+            destravar(arquivo)
+        except OSError:
+            pass
+        arquivo.close()
+
+
+def reservar_vaga(portal: str, log: Optional[logging.Logger] = None) -> Optional[VagaPortal]:
+    """Ocupa uma vaga do portal antes de abrir o navegador.
+
+    Returns:
+        A vaga ocupada, ou None fora da execução multi-tenant (ou sem limite para o portal)
+    """
+    log = log or logger
+    limite = int(TENANT_CONFIG["limites_portal"].get(portal) or 0)
+    if not TENANT_CONFIG["vagas_dir"] or limite <= 0:
+        return None
+    vaga = VagaPortal(TENANT_CONFIG["vagas_dir"], portal, limite)
+    espera = vaga.ocupar(TENANT_CONFIG["timeout_vaga"])
+    if espera >= 1:
+        log.info(f"🎫 Vaga do portal {portal} liberada após {espera:.1f}s de espera (limite {limite})")
+    return vaga
+
+
+def liberar_ao_encerrar(driver, vaga: Optional[VagaPortal]):
+    """Devolve a vaga no quit do driver (ou quando ele for coletado sem quit).
+
+    Returns:
+        O próprio driver
+    """
+    executor = getattr(driver, "command_executor", None)
+    if vaga is None or executor is None:
+        return driver
+    execute_original = executor.execute
+
+    def execute(comando, params=None):
+        try:
+            return execute_original(comando, params)
+        finally:
+            if comando == "quit":
+                vaga.liberar()
+
+    executor.execute = execute
+    weakref.finalize(driver, vaga.liberar)
+    return driver
+
+
+@contextmanager
+def trava_envio_teclado(log: Optional[logging.Logger] = None):
+    """Vez exclusiva do envio por teclado/clipboard entre os tenants (um só teclado, foco e clipboard).
+
+    Fora da execução multi-tenant não trava nada.
+
+    Raises:
+        TimeoutError: outro tenant segurou o envio por mais de TENANT_CONFIG["timeout_vaga"]
+    """
+    log = log or logger
+    if not TENANT_CONFIG["vagas_dir"]:
+        yield 0.0
+        return
+    caminho = os.path.join(TENANT_CONFIG["vagas_dir"], "envio_teclado.lock")
+    with trava_arquivo(caminho, timeout=TENANT_CONFIG["timeout_vaga"], intervalo=0.5) as espera:
+        if espera >= 1:
+            log.info(f"🎫 Vez do envio por teclado liberada após {espera:.1f}s de espera")
+        yield espera
+
+
+# ---------------------------------------------------------------------------
+# Registro
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Tenant:
+    nome: str
+    pipeline: str
+    env: Dict[str, str]
+    config: Dict[str, dict]
+    # Posição no registro (define a porta da sessão do WhatsApp)
+    posicao: int
+    ativo: bool = True
+
+
+def carregar_registro(caminho: Optional[str] = None) -> List[Tenant]:
+    """Lê o registro na ordem do arquivo (a posição define a porta do WhatsApp do tenant).
+
+    Raises:
+        ValueError: nome, pipeline ou configuração inválidos
+    """
+    caminho = caminho or TENANT_CONFIG["registro"]
+    with open(caminho, "r", encoding="utf-8") as f:
+        dados = json.load(f)
+    padrao = dados.pop("padrao", {})
+    tenants = []
+    for posicao, (nome, entrada) in enumerate(dados.items()):
+        if not _NOME_VALIDO.match(nome):
+            raise ValueError(f"Nome de tenant inválido (use letras, números, _ e -): {nome!r}")
+        pipeline = entrada.get("pipeline", padrao.get("pipeline", "main"))
+        if pipeline not in PIPELINES:
+            raise ValueError(f"{nome}: pipeline {pipeline!r} não é um de {', '.join(PIPELINES)}")
+        sobreposicoes = config.mesclar_configuracao(json.loads(json.dumps(padrao.get("config", {}))), entrada.get("config", {}))
+        for chave, valor in sobreposicoes.items():
+            if not isinstance(getattr(config, chave, None), dict) or not isinstance(valor, dict):
+                raise ValueError(f"{nome}: {chave!r} não é uma configuração de componentes/config.py")
+        tenants.append(Tenant(nome, pipeline, {**padrao.get("env", {}), **entrada.get("env", {})},
+                              sobreposicoes, posicao, entrada.get("ativo", True)))
+    return tenants
+
+
+def _resolver_env(tenant: Tenant) -> Dict[str, str]:
+    """Valores "$NOME" vêm do ambiente de quem dispara"""
+    resolvido = {}
+    for chave, valor in tenant.env.items():
+        valor = str(valor)
+        if valor.startswith("$"):
+            if valor[1:] not in os.environ:
+                raise KeyError(f"{tenant.nome}: variável {valor[1:]} (para {chave}) não definida")
+            valor = os.environ[valor[1:]]
+        resolvido[chave] = valor
+    return resolvido
+
+
+def _vincular_componentes(diretorio: str):
+    """O pipeline chama "python -m componentes.<modulo>" a partir do diretório de trabalho"""
+    destino = os.path.join(diretorio, "componentes")
+    if os.path.lexists(destino):
+        return
+    origem = os.path.join(RAIZ, "componentes")
+    try:
+        os.symlink(origem, destino, target_is_directory=True)
+    except OSError:
+        if not IS_WINDOWS:
+            raise
+        # Sem privilégio de symlink no Windows: junção de diretório
+        subprocess.run(["cmd", "/c", "mklink", "/J", destino, origem], check=True, stdout=subprocess.DEVNULL)
+
+
+def ambiente_tenant(tenant: Tenant, diretorio: str, vagas_dir: str,
+                    limites: Dict[str, int]) -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k not in _POR_TENANT}
+    env.update(_resolver_env(tenant))
+    env.setdefault("WHATSAPP_USER_DATA", os.path.join(diretorio, "perfil_whatsapp"))
+    env.setdefault("WHATSAPP_DEBUG_PORT", str(TENANT_CONFIG["porta_base"] + tenant.posicao))
+    env.update({
+        "TENANT": tenant.nome,
+        "TENANT_SOBREPOSICOES": json.dumps(tenant.config, ensure_ascii=False),
+        "TENANTS_VAGAS_DIR": vagas_dir,
+        "TENANTS_LIMITES_PORTAL": json.dumps(limites),
+        # A limpeza global mataria o Chrome dos outros tenants
+        "KILL_ALL_CHROME": "0",
+        "PYTHONPATH": RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""),
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+# ---------------------------------------------------------------------------
+# Execução
+# ---------------------------------------------------------------------------
+
+def executar_tenant(tenant: Tenant, base: str, limites: Dict[str, int],
+                    timeout: Optional[float] = None) -> dict:
+    """Roda o pipeline do tenant em um processo próprio (saída em <tenant>/saida.log)"""
+    timeout = TENANT_CONFIG["timeout"] if timeout is None else timeout
+    diretorio = os.path.abspath(os.path.join(base, tenant.nome))
+    resultado = {"tenant": tenant.nome, "pipeline": tenant.pipeline, "diretorio": diretorio,
+                 "codigo": None, "duracao_s": 0.0, "erro": None}
+    inicio = time.perf_counter()
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        _vincular_componentes(diretorio)
+        env = ambiente_tenant(tenant, diretorio, os.path.abspath(os.path.join(base, "vagas")), limites)
+        codigo = f"import sys, {tenant.pipeline}; sys.exit(0 if {tenant.pipeline}.main() else 1)"
+        logger.info(f"▶️ {tenant.nome}: {tenant.pipeline} em {diretorio}")
+        with open(os.path.join(diretorio, "saida.log"), "w", encoding="utf-8") as saida:
+            processo = subprocess.Popen([sys.executable, "-u", "-c", codigo], cwd=diretorio, env=env,
+                                        stdout=saida, stderr=subprocess.STDOUT)
+            try:
+                resultado["codigo"] = processo.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                processo.kill()
+                processo.wait()
+                resultado["erro"] = f"timeout de {timeout:.0f}s"
+    except Exception as e:
+        resultado["erro"] = str(e)
+    resultado["duracao_s"] = round(time.perf_counter() - inicio, 3)
+
+    sucesso = resultado["codigo"] == 0
+    tenant_run_seconds.set(resultado["duracao_s"], tenant=tenant.nome, pipeline=tenant.pipeline)
+    tenant_run_success.set(1 if sucesso else 0, tenant=tenant.nome, pipeline=tenant.pipeline)
+    if sucesso:
+        logger.info(f"✅ {tenant.nome}: concluído em {resultado['duracao_s']:.1f}s")
+    else:
+        motivo = resultado["erro"] or f"código de saída {resultado['codigo']}"
+        logger.error(f"❌ {tenant.nome}: falhou em {resultado['duracao_s']:.1f}s ({motivo}) - ver {diretorio}/saida.log")
+    return resultado
+
+
+def executar_tenants(tenants: List[Tenant], max_paralelo: Optional[int] = None,
+                     limites: Optional[Dict[str, int]] = None, base: Optional[str] = None) -> dict:
+    """Roda os tenants em paralelo e grava o resumo em <dir>/execucao.json.
+
+    Returns:
+        dict com "total_s", "maior_tenant_s" e "tenants" (resultado de cada um, na ordem do registro)
+    """
+    base = base or TENANT_CONFIG["dir"]
+    limites = dict(TENANT_CONFIG["limites_portal"] if limites is None else limites)
+    max_paralelo = max(1, min(max_paralelo or TENANT_CONFIG["max_paralelo"], len(tenants) or 1))
+    logger.info(f"🏢 {len(tenants)} tenant(s), até {max_paralelo} em paralelo, "
+                f"vagas por portal: {', '.join(f'{p}={n}' for p, n in limites.items()) or 'sem limite'}")
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="tenant") as pool:
+        futuros = [pool.submit(executar_tenant, tenant, base, limites) for tenant in tenants]
+        resultados = [futuro.result() for futuro in futuros]
+    total = time.perf_counter() - inicio
+
+    resumo = {
+        "inicio": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - total)),
+        "total_s": round(total, 3),
+        "maior_tenant_s": max((r["duracao_s"] for r in resultados), default=0.0),
+        "max_paralelo": max_paralelo,
+        "limites_portal": limites,
+        "tenants": resultados,
+    }
+    falhas = [r["tenant"] for r in resultados if r["codigo"] != 0]
+    logger.info(f"🏁 {len(resultados) - len(falhas)}/{len(resultados)} tenant(s) concluídos em {total:.1f}s "
+                f"(maior tenant: {resumo['maior_tenant_s']:.1f}s)")
+    if falhas:
+        logger.error(f"❌ Tenants com falha: {', '.join(falhas)}")
+
+    os.makedirs(base, exist_ok=True)
+    caminho = os.path.join(base, "execucao.json")
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(resumo, f, ensure_ascii=False, indent=2)
+    os.replace(temporario, caminho)
+    escrever_arquivo_metricas("tenants")
+    return resumo
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Roda o pipeline de vários tenants em paralelo")
+    parser.add_argument("tenants", nargs="*", help="Tenants a executar (padrão: todos os ativos)")
+    parser.add_argument("--registro", default=TENANT_CONFIG["registro"])
+    parser.add_argument("--max-paralelo", type=int, default=TENANT_CONFIG["max_paralelo"])
+    parser.add_argument("--limite", action="append", default=[], metavar="PORTAL=N",
+                        help="Navegadores simultâneos no portal, somando os tenants (ex.: vd=4; 0 = sem limite)")
+    parser.add_argument("--listar", action="store_true", help="Lista os tenants do registro")
+    args = parser.parse_args()
+
+    try:
+        registro = carregar_registro(args.registro)
+    except (OSError, ValueError) as e:
+        parser.error(f"registro {args.registro}: {e}")
+    if args.listar:
+        for tenant in registro:
+            print(f"{tenant.nome:20} {tenant.pipeline:16} {'ativo' if tenant.ativo else 'inativo':8} "
+                  f"porta={TENANT_CONFIG['porta_base'] + tenant.posicao}  config={', '.join(tenant.config) or '-'}")
+        return
+
+    limites = dict(TENANT_CONFIG["limites_portal"])
+    for item in args.limite:
+        portal, _, valor = item.partition("=")
+        if not portal or not valor.isdigit():
+            parser.error(f"--limite espera PORTAL=N, recebeu {item!r}")
+        limites[portal] = int(valor)
+
+    if args.tenants:
+        desconhecidos = set(args.tenants) - {t.nome for t in registro}
+        if desconhecidos:
+            parser.error(f"tenant(s) fora do registro: {', '.join(sorted(desconhecidos))}")
+        selecionados = [t for t in registro if t.nome in args.tenants]
+    else:
+        selecionados = [t for t in registro if t.ativo]
+
+    configurar_logging_raiz("log/tenants.log")
+    resumo = executar_tenants(selecionados, args.max_paralelo, limites)
+    sys.exit(0 if all(r["codigo"] == 0 for r in resumo["tenants"]) else 1)
+
+
+if __name__ == "__main__":
+    main()
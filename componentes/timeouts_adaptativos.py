@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Timeouts Adaptativos
+====================
+Aprende o timeout de cada espera a partir das latências registradas.
+
+Cada espera do motor de extração (clique, campo, loader, tabela, readiness
+do navegador) registra quanto levou em um histórico JSONL. Com amostras
+suficientes, o timeout passa a ser o percentil configurado das últimas
+medições multiplicado por uma margem, limitado entre um mínimo e
+"fator_maximo" vezes o timeout declarado. Em dias normais uma queda real do
+portal é apontada em segundos; em dias lentos a espera segue até o timeout
+declarado, e as próprias medições empurram o timeout para cima.
+
+Esperas em que o estouro não é um erro, e sim uma resposta ("não há dados",
+"passo opcional ignorado"), usam sempre o timeout declarado: um timeout
+aprendido curto demais transformaria uma grid lenta num resultado vazio.
+
+Uso:
+    python -m componentes.timeouts_adaptativos             # timeouts aprendidos hoje
+    python -m componentes.timeouts_adaptativos --historico # evolução por dia
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from componentes.config import ADAPTIVE_TIMEOUT_CONFIG
+
+logger = logging.getLogger(__name__)
+
+
+def percentil(valores: List[float], p: float) -> float:
+    """Percentil p (0-100) por interpolação linear"""
+    ordenados = sorted(valores)
+    if not ordenados:
+        return 0.0
+    posicao = (len(ordenados) - 1) * p / 100.0
+    base = int(posicao)
+    if base + 1 >= len(ordenados):
+        return ordenados[-1]
+    return ordenados[base] + (ordenados[base + 1] - ordenados[base]) * (posicao - base)
+
+
+def calcular_timeout(amostras: List[float], padrao: float, config: Optional[Dict] = None) -> float:
+    """Timeout aprendido para as amostras (o declarado, se forem poucas)"""
+    config = config or ADAPTIVE_TIMEOUT_CONFIG
+    if len(amostras) < config["min_amostras"]:
+        return padrao
+    aprendido = percentil(amostras, config["percentil"]) * config["margem"]
+    return round(min(max(aprendido, config["minimo"]), padrao * config["fator_maximo"]), 2)
+
+
+class HistoricoLatencias:
+    """Latências por passo, persistidas em JSONL (uma medição por linha)"""
+
+    def __init__(self, caminho: str, janela: int = 100, retencao_dias: int = 30):
+        self.caminho = caminho
+        self.janela = janela
+        self.retencao_dias = retencao_dias
+        self._lock = threading.Lock()
+        self._amostras: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.janela))
+        self._carregar()
+
+    def _ler(self) -> List[Dict]:
+        limite = (date.today() - timedelta(days=self.retencao_dias)).isoformat()
+        registros = []
+        try:
+            with open(self.caminho, "r", encoding="utf-8") as f:
+                for linha in f:
+                    try:
+                        registro = json.loads(linha)
+                    except ValueError:
+                        continue
+                    if registro.get("em", "") >= limite and "passo" in registro:
+                        registros.append(registro)
+        except FileNotFoundError:
+            pass
+        return registros
+
+    def _carregar(self):
+        for registro in self._ler():
+            self._amostras[registro["passo"]].append(float(registro["s"]))
+
+    def registros(self) -> List[Dict]:
+        """Medições dentro da retenção, em ordem de gravação"""
+        return self._ler()
+
+    def timeout(self, passo: str, padrao: float) -> float:
+        with self._lock:
+            amostras = list(self._amostras.get(passo, ()))
+        return calcular_timeout(amostras, padrao)
+
+    def registrar(self, passo: str, segundos: float, ok: bool = True):
+        registro = {"em": datetime.now().isoformat(timespec="seconds"), "passo": passo,
+                    "s": round(segundos, 3), "ok": ok}
+        with self._lock:
+            self._amostras[passo].append(registro["s"])
+            try:
+                diretorio = os.path.dirname(self.caminho)
+                if diretorio:
+                    os.makedirs(diretorio, exist_ok=True)
+                with open(self.caminho, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            except OSError as e:
+                logger.debug(f"Não foi possível gravar latência de {passo}: {e}")
+
+    def compactar(self) -> int:
+        """Regrava o arquivo só com as medições dentro da retenção; retorna quantas ficaram"""
+        with self._lock:
+            registros = self._ler()
+            temporario = f"{self.caminho}.{os.getpid()}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                for registro in registros:
+                    f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+            os.replace(temporario, self.caminho)
+        return len(registros)
+
+
+_historico: Optional[HistoricoLatencias] = None
+_historico_lock = threading.Lock()
+
+
+def obter_historico() -> Optional[HistoricoLatencias]:
+    """Histórico compartilhado do processo (None se ADAPTIVE_TIMEOUT_CONFIG["enabled"] for False)"""
+    global _historico
+    if not ADAPTIVE_TIMEOUT_CONFIG["enabled"]:
+        return None
+    with _historico_lock:
+        if _historico is None:
+            _historico = HistoricoLatencias(ADAPTIVE_TIMEOUT_CONFIG["path"], ADAPTIVE_TIMEOUT_CONFIG["janela"],
+                                            ADAPTIVE_TIMEOUT_CONFIG["retencao_dias"])
+        return _historico
+
+
+def timeout_para(passo: str, padrao: float) -> float:
+    """Timeout a usar no passo (o declarado, se o aprendizado estiver desativado)"""
+    historico = obter_historico()
+    return historico.timeout(passo, padrao) if historico else padrao
+
+
+def _estouro(erro: Exception) -> bool:
+    return type(erro).__name__ == "TimeoutException"
+
+
+def esperar(passo: str, padrao: float, aguardar: Callable[[float], Any], registrar_estouro: bool = True,
+            adaptativo: bool = True):
+    """Chama aguardar(timeout) com o timeout aprendido do passo e registra quanto a espera levou.
+
+    O timeout aprendido só antecipa o aviso: se ele estourar, a espera segue
+    até o timeout declarado (aguardar é chamada de novo com o tempo restante)
+    e só o estouro do declarado é um erro. A latência registrada é a real,
+    inclusive a das esperas estouradas, para que dias lentos elevem o timeout.
+    Passos opcionais devem usar registrar_estouro=False: a ausência deles é
+    esperada e não diz nada sobre a lentidão do portal.
+    adaptativo=False usa direto o timeout declarado (a latência ainda é
+    registrada): para esperas cujo estouro é tratado como "sem dados".
+
+    Uso:
+        esperar("tabela:eud", 15, lambda timeout: WebDriverWait(driver, timeout).until(...))
+
+    Returns:
+        O retorno de aguardar
+    """
+    historico = obter_historico()
+    timeout = historico.timeout(passo, padrao) if historico and adaptativo else padrao
+    inicio = time.perf_counter()
+    try:
+        try:
+            resultado = aguardar(timeout)
+        except Exception as e:
+            if not _estouro(e) or timeout >= padrao:
+                raise
+            logger.warning(f"⚡ {passo}: estourou o timeout aprendido ({timeout:.1f}s) - "
+                           f"esperando até o declarado ({padrao}s)")
+            resultado = aguardar(max(padrao - (time.perf_counter() - inicio), 0.1))
+    except Exception as e:
+        if historico and registrar_estouro and _estouro(e):
+            historico.registrar(passo, time.perf_counter() - inicio, ok=False)
+        raise
+    if historico:
+        historico.registrar(passo, time.perf_counter() - inicio)
+    return resultado
+
+
+def _resumo_por_passo(registros: List[Dict]) -> Dict[str, List[Tuple[float, bool]]]:
+    por_passo: Dict[str, List[Tuple[float, bool]]] = defaultdict(list)
+    for registro in registros:
+        por_passo[registro["passo"]].append((float(registro["s"]), bool(registro.get("ok", True))))
+    return por_passo
+
+
+def imprimir_atuais(registros: List[Dict]):
+    janela = ADAPTIVE_TIMEOUT_CONFIG["janela"]
+    print(f"{'passo':55} {'n':>4} {'p50':>6} {'p95':>6} {'estouros':>8} {'timeout':>8}")
+    for passo, medicoes in sorted(_resumo_por_passo(registros).items()):
+        recentes = [s for s, _ in medicoes[-janela:]]
+        estouros = sum(1 for _, ok in medicoes[-janela:] if not ok)
+        aprendido = calcular_timeout(recentes, float("inf"))
+        rotulo = "declarado" if aprendido == float("inf") else f"{aprendido:.1f}s"
+        print(f"{passo[:55]:55} {len(recentes):4} {percentil(recentes, 50):6.2f} "
+              f"{percentil(recentes, 95):6.2f} {estouros:8} {rotulo:>9}")
+
+
+def imprimir_historico(registros: List[Dict], filtro: Optional[str] = None):
+    """Timeout aprendido ao fim de cada dia (janela móvel até aquele dia)"""
+    janela = ADAPTIVE_TIMEOUT_CONFIG["janela"]
+    por_dia: Dict[str, Dict[str, List[float]]] = defaultdict(lambda: defaultdict(list))
+    for registro in registros:
+        if filtro and filtro not in registro["passo"]:
+            continue
+        por_dia[registro["em"][:10]][registro["passo"]].append(float(registro["s"]))
+
+    acumulado: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=janela))
+    ultimo: Dict[str, float] = {}
+    for dia in sorted(por_dia):
+        print(f"\n📅 {dia}")
+        for passo, medicoes in sorted(por_dia[dia].items()):
+            acumulado[passo].extend(medicoes)
+            aprendido = calcular_timeout(list(acumulado[passo]), float("inf"))
+            if aprendido == float("inf"):
+                rotulo, variacao = "declarado", ""
+            else:
+                rotulo = f"{aprendido:.1f}s"
+                anterior = ultimo.get(passo)
+                variacao = f" ({aprendido - anterior:+.1f}s)" if anterior is not None else ""
+                ultimo[passo] = aprendido
+            print(f"   {passo[:55]:55} n={len(medicoes):3} p95 dia={percentil(medicoes, 95):6.2f}s "
+                  f"timeout={rotulo}{variacao}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Relatório dos timeouts aprendidos por passo")
+    parser.add_argument("--historico", action="store_true", help="Evolução do timeout aprendido por dia")
+    parser.add_argument("--passo", help="Filtra passos que contenham o texto")
+    parser.add_argument("--compactar", action="store_true", help="Descarta medições fora da retenção")
+    args = parser.parse_args()
+
+    historico = HistoricoLatencias(ADAPTIVE_TIMEOUT_CONFIG["path"], ADAPTIVE_TIMEOUT_CONFIG["janela"],
+                                   ADAPTIVE_TIMEOUT_CONFIG["retencao_dias"])
+    if args.compactar:
+        print(f"🧹 {historico.compactar()} medição(ões) mantida(s) em {historico.caminho}")
+        return
+    registros = historico.registros()
+    if not registros:
+        print(f"Nenhuma latência registrada em {historico.caminho}")
+        return
+    if args.historico:
+        imprimir_historico(registros, args.passo)
+    else:
+        imprimir_atuais([r for r in registros if not args.passo or args.passo in r["passo"]])
+
+
+if __name__ == "__main__":
+    main()
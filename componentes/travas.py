@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Travas entre Processos
+======================
+Arquivos travados pelo sistema operacional (fcntl.flock no Linux/macOS,
+msvcrt.locking no Windows) para seções críticas disputadas por execuções
+simultâneas: estado do circuit breaker, vagas dos portais, envio pelo teclado.
+A trava some junto com o processo, mesmo se ele morrer.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+def travar(arquivo):
+    """Trava exclusiva sem espera (OSError se outro processo já a segura)"""
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_NBLCK, 1)
+
+
+def destravar(arquivo):
+    if fcntl:
+        fcntl.flock(arquivo.fileno(), fcntl.LOCK_UN)
+    else:
+        arquivo.seek(0)
+        msvcrt.locking(arquivo.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def trava_arquivo(caminho: str, timeout: Optional[float] = None, intervalo: float = 0.05):
+    """Segura a trava exclusiva de `caminho` (criado se preciso) durante o bloco.
+
+    Args:
+        timeout: Segundos aguardando a trava (None espera o quanto for preciso)
+
+    Yields:
+        Segundos de espera até conseguir a trava
+
+    Raises:
+        TimeoutError: a trava não liberou dentro de `timeout`
+    """
+    diretorio = os.path.dirname(caminho)
+    if diretorio:
+        os.makedirs(diretorio, exist_ok=True)
+    arquivo = open(caminho, "a+")
+    try:
+        inicio = time.monotonic()
+        while True:
+            try:
+                travar(arquivo)
+                break
+            except OSError:
+                if timeout is not None and time.monotonic() - inicio >= timeout:
+                    raise TimeoutError(f"Trava {caminho} não liberou em {timeout:.0f}s")
+                time.sleep(intervalo)
+        try:
+            yield time.monotonic() - inicio
+        finally:
+            try:
+                destravar(arquivo)
+            except OSError:
+                pass
+    finally:
+        arquivo.close()
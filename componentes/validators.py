@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+from componentes.meta_index import obter_meta_index
+
 
 @dataclass
 class ValidationResult:
@@ -249,13 +251,10 @@ def validate_meta_file(file_path: str) -> dict:
     - 4 colunas: tipo;data;ciclo;valor
     - 3 colunas: tipo;data;valor (assume ciclo='')
 
-    Consolidação (para retorno único por indicador):
+    Consolidação (para retorno único por indicador), feita pelo MetaIndex:
     - Para PEF/EUD: escolhe o maior ciclo numérico do dia; se não houver ciclo numérico, usa ciclo vazio ('') do dia.
     - Para LOJA: ignora ciclo; usa a última linha do dia.
     """
-    import csv
-    from datetime import datetime
-
     # Inicializa o resultado com todos os indicadores
     result = {
         'PEF': {'is_valid': False, 'data': None, 'valor': None},
@@ -263,113 +262,18 @@ def validate_meta_file(file_path: str) -> dict:
         'LOJA': {'is_valid': False, 'data': None, 'valor': None}
     }
 
-    today = datetime.today().date()
-
-    # Coletores por indicador
-    pef_entries = []  # (data_str, ciclo_str, valor)
-    eud_entries = []
-    loja_entries = []
-
-    try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.reader(f, delimiter=';')
-
-            for row in reader:
-                if not row:
-                    continue
-                # Normaliza para 4 colunas
-                if len(row) == 4:
-                    tipo, data_str, ciclo_str, valor_str = row
-                elif len(row) == 3:
-                    tipo, data_str, valor_str = row
-                    ciclo_str = ''
-                else:
-                    # Formato inesperado
-                    continue
-
-                tipo = (tipo or '').strip().upper()
-                if tipo == 'EUDORA':
-                    tipo = 'EUD'
-
-                # Só processa tipos esperados
-                if tipo not in ['PEF', 'EUD', 'LOJA']:
-                    continue
-
-                try:
-                    data_meta = datetime.strptime(data_str.strip(), "%d/%m/%Y").date()
-                except Exception:
-                    continue
-
-                if data_meta != today:
-                    continue
-
-                try:
-                    valor = float(str(valor_str).strip())
-                except Exception:
-                    continue
+    indice = obter_meta_index(file_path)
+    if indice.erro:
+        logging.error(f"Erro ao validar arquivo de metas: {indice.erro}")
+        return {k: {'is_valid': False, 'data': None, 'valor': None, 'error': indice.erro} for k in result}
 
-                if tipo == 'PEF':
-                    pef_entries.append((data_str.strip(), (ciclo_str or '').strip(), valor))
-                elif tipo == 'EUD':
-                    eud_entries.append((data_str.strip(), (ciclo_str or '').strip(), valor))
-                elif tipo == 'LOJA':
-                    loja_entries.append((data_str.strip(), (ciclo_str or '').strip(), valor))
-
-        # Consolida PEF/EUD: maior ciclo numérico do dia; senão ciclo vazio
-        def pick_consolidated(entries):
-            if not entries:
-                return None
-            # Se houver algum com ciclo numérico, escolher o maior
-            numeric = []
-            empty = []
-            for data_str, ciclo_str, valor in entries:
-                if ciclo_str.isdigit():
-                    try:
-                        numeric.append((int(ciclo_str), data_str, valor))
-                    except Exception:
-                        pass
-                else:
-                    empty.append((data_str, valor))
-            if numeric:
-                ciclo_max, data_str, valor = max(numeric, key=lambda x: x[0])
-                return data_str, valor
-            if empty:
-                data_str, valor = empty[-1]  # última ocorrência do dia sem ciclo
-                return data_str, valor
-            return None
-
-        pef_pick = pick_consolidated(pef_entries)
-        if pef_pick:
-            data_str, valor = pef_pick
-            result['PEF'] = {
-                'is_valid': True,
-                'data': data_str,
-                'valor': valor
-            }
-
-        eud_pick = pick_consolidated(eud_entries)
-        if eud_pick:
-            data_str, valor = eud_pick
-            result['EUD'] = {
+    for tipo in result:
+        entrada = indice.meta_consolidada(tipo)
+        if entrada:
+            result[tipo] = {
                 'is_valid': True,
-                'data': data_str,
-                'valor': valor
+                'data': entrada.data,
+                'valor': entrada.valor
             }
 
-        # LOJA: usa a última ocorrência do dia (ignora ciclo)
-        if loja_entries:
-            data_str, _ciclo, valor = loja_entries[-1]
-            result['LOJA'] = {
-                'is_valid': True,
-                'data': data_str,
-                'valor': valor
-            }
-
-        return result
-
-    except FileNotFoundError:
-        return result
-    except Exception as e:
-        import logging
-        logging.error(f"Erro ao validar arquivo de metas: {str(e)}")
-        return {k: {'is_valid': False, 'data': None, 'valor': None, 'error': str(e)} for k in result}
+    return result
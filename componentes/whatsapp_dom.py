@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Leitura do DOM do WhatsApp Web
+==============================
+Coleta dos resultados da pesquisa de mensagens em um único execute_script.
+
+Percorrer cada resultado com find_element/get_attribute custa uma ida e volta
+ao WebDriver por chamada (centenas por pesquisa). Aqui o navegador monta a
+lista inteira e devolve tuplas (período, texto) prontas para o Python.
+"""
+
+import logging
+from typing import List, Tuple
+
+SELETOR_RESULTADOS_BUSCA = "#pane-side > div:nth-child(1) > div > div"
+
+# Mesmo critério usado antes em Python: período em div._ak8o, mensagem em div._ak8j,
+# priorizando os spans com classe _ao3e ou com atributo dir.
+_SCRIPT_COLETA = r"""
+var container = document.querySelector(arguments[0]);
+var filtrarSpans = arguments[1];
+if (!container) { return null; }
+var texto = function (el) { return (el.innerText || el.textContent || '').trim(); };
+var saida = [];
+for (var i = 0; i < container.children.length; i++) {
+    var resultado = container.children[i];
+    if (resultado.tagName !== 'DIV') { continue; }
+    var periodo = resultado.querySelector('div._ak8l > div._ak8o');
+    var mensagem = resultado.querySelector('div._ak8l > div._ak8j');
+    if (!periodo || !mensagem) { continue; }
+    var textoMensagem = '';
+    var spans = mensagem.querySelectorAll('span');
+    if (filtrarSpans && spans.length) {
+        var principais = [];
+        var todos = [];
+        for (var j = 0; j < spans.length; j++) {
+            var s = spans[j];
+            var classe = s.getAttribute('class');
+            var t = texto(s);
+            if (classe && (classe.indexOf('_ao3e') !== -1 || s.getAttribute('dir'))) {
+                principais.push(t);
+            }
+            if (t) { todos.push(t); }
+        }
+        textoMensagem = principais.length ? principais.join(' ') : todos.join(' ');
+    } else {
+        textoMensagem = texto(mensagem);
+    }
+    saida.push([texto(periodo), textoMensagem]);
+}
+return saida;
+"""
+
+
+def coletar_resultados_busca(driver, seletor_container: str = SELETOR_RESULTADOS_BUSCA,
+                             filtrar_spans: bool = True) -> List[Tuple[str, str]]:
+    """Retorna [(período, texto_da_mensagem), ...] dos resultados da pesquisa, na ordem exibida.
+
+    Args:
+        driver: WebDriver com o WhatsApp Web aberto na pesquisa
+        seletor_container: Seletor CSS do container de resultados
+        filtrar_spans: Monta o texto a partir dos spans principais da mensagem
+            (False usa o texto completo do bloco da mensagem)
+
+    Returns:
+        Lista de tuplas (vazia se o container não existir)
+    """
+    try:
+        dados = driver.execute_script(_SCRIPT_COLETA, seletor_container, filtrar_spans)
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Falha ao coletar resultados da pesquisa: {e}")
+        return []
+    if not dados:
+        return []
+    return [(periodo, mensagem) for periodo, mensagem in dados]
@@ -5,33 +5,52 @@ import logging
 import webbrowser
 import json
 import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
 import pyperclip
-import pyautogui
-
-# Configuração de logging (apenas arquivo, sem duplicar no terminal)
-os.makedirs("log", exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("log/whatsapp_sender.log", mode="w", encoding="utf-8")
-    ]
-)
+try:
+    import pyautogui
+except Exception:  # Sem display (ex.: simulação em servidor Linux); só o envio real precisa dele
+    pyautogui = None
+
+from componentes.metrics import escrever_arquivo_metricas
+from componentes.logging_setup import configurar_logging_raiz
+from componentes.meta_index import obter_meta_index
+from componentes.config import WHATSAPP_CONFIG, REPORT_IMAGE_CONFIG, TENANT_CONFIG
+from componentes.render_relatorio import ler_resultados, pillow_disponivel, renderizar_csv
+from componentes.fila_envio import Anexo, FilaEnvio
+from componentes.whatsapp_sessao import SessaoIndisponivel, envio_dom_ativo, obter_sessao
+from componentes.tenants import trava_envio_teclado
+
+# Grupos de destino, na ordem de group_links (VD = PEF/EUD por ciclo)
+GRUPOS = ("VD", "LOJA")
 
 class WhatsAppSender:
     """Classe responsável pelo envio de mensagens automáticas via WhatsApp Web."""
 
-    def __init__(self, group_links, delay_seconds=10, pre_send_delay_seconds=7):
+    def __init__(self, group_links, delay_seconds=None, pre_send_delay_seconds=None, permitir_teclado=True):
         """
         Args:
             group_links (list): Lista de links de convite dos grupos do WhatsApp.
-            delay_seconds (int): Delay entre envios para evitar bloqueio.
+            delay_seconds (int): Intervalo entre grupos (None usa WHATSAPP_CONFIG["rate_limits"]).
+            pre_send_delay_seconds (int): Espera após abrir o grupo (None usa WHATSAPP_CONFIG["rate_limits"]).
+            permitir_teclado (bool): False recusa o envio por teclado/clipboard do sistema (só o
+                envio pelo DOM da sessão única), para rodar com outras janelas em uso.
         """
         self.group_links = group_links
         self.delay_seconds = delay_seconds
         self.pre_send_delay_seconds = pre_send_delay_seconds
         self.logger = logging.getLogger(__name__)
+        # Sessão única do WhatsApp Web (None: Chrome do sistema via webbrowser + pyautogui)
+        self.sessao = None
+        # Simulação (WHATSAPP_CONFIG["dry_run"]): mensagens vão para um .jsonl, sem teclado/clipboard
+        self.dry_run = WHATSAPP_CONFIG.get("dry_run")
+        self._grupo_atual = None
+        self.permitir_teclado = permitir_teclado
+        if not self.dry_run and pyautogui is None and permitir_teclado:
+            raise RuntimeError("pyautogui indisponível (sem display?) - o envio real precisa dele")
         
         # Valida os links dos grupos
         self._validar_links_grupos()
@@ -75,28 +94,84 @@ class WhatsAppSender:
                     return None
 
                 message = f"{header}\n\n" + "\n".join(data)
-                if meta is not None and indicador_nome is not None:
-                    self.logger.info(f"Incluindo cálculo de meta para {indicador_nome} (meta={meta})")
-                    meta_formatada = f"{meta:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                    realizado_formatado = f"{total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                    atingimento = total_valor - meta
-                    atingimento_formatado = f"{atingimento:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-                    emoji_ating = "🎉​" if atingimento >= 0 else "🔴"
-                    label_ating = "Ultrapassou" if atingimento >= 0 else "Faltante"
-                    message += f"\n\n🎯 Meta: R$ {meta_formatada}"
-                    message += f"\n💰​ Realizado: R$ {realizado_formatado}"
-                    message += f"\n{emoji_ating}​​ {label_ating}: R$ {atingimento_formatado}"
-                else:
-                    self.logger.info(f"Enviando apenas dados para {indicador_nome} (sem meta)")
-                    total_formatado = f"{total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."
-)
-                    message += f"\n\n💰 Total: R$ {total_formatado}"
+                message += self._formatar_rodape(total_valor, meta, indicador_nome)
                 
                 return message
         except Exception as e:
             self.logger.error(f"Erro ao ler arquivo {csv_file}: {e}")
             return None
 
+    def _formatar_rodape(self, total_valor, meta=None, indicador_nome=None):
+        """Bloco final da mensagem: meta/realizado/atingimento, ou apenas o total."""
+        if meta is not None and indicador_nome is not None:
+            self.logger.info(f"Incluindo cálculo de meta para {indicador_nome} (meta={meta})")
+            meta_formatada = f"{meta:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            realizado_formatado = f"{total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            atingimento = total_valor - meta
+            atingimento_formatado = f"{atingimento:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+            emoji_ating = "🎉​" if atingimento >= 0 else "🔴"
+            label_ating = "Ultrapassou" if atingimento >= 0 else "Faltante"
+            rodape = f"\n\n🎯 Meta: R$ {meta_formatada}"
+            rodape += f"\n💰​ Realizado: R$ {realizado_formatado}"
+            rodape += f"\n{emoji_ating}​​ {label_ating}: R$ {atingimento_formatado}"
+            return rodape
+        self.logger.info(f"Enviando apenas dados para {indicador_nome} (sem meta)")
+        total_formatado = f"{total_valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+        return f"\n\n💰 Total: R$ {total_formatado}"
+
+    def format_resumo(self, csv_file, header, meta=None, indicador_nome=None, resultados=None):
+        """Mensagem curta (título + total/meta) usada quando o ranking vai como imagem.
+
+        `resultados` já lidos do CSV (ler_resultados) evitam uma segunda leitura do arquivo.
+        """
+        if resultados is None:
+            try:
+                resultados = ler_resultados(csv_file)
+            except Exception as e:
+                self.logger.error(f"Erro ao ler arquivo {csv_file}: {e}")
+                return None
+        total_valor = sum(valor for _, valor in resultados)
+        message = f"{header}\n\n📊 Ranking completo ({len(resultados)} linhas) na imagem acima"
+        return message + self._formatar_rodape(total_valor, meta, indicador_nome)
+
+    def gerar_imagens(self, tarefas):
+        """Renderiza em PNG os rankings grandes das tarefas de format_data.
+
+        Args:
+            tarefas (dict): chave -> (função, args), como em formatar_em_paralelo
+
+        Returns:
+            dict: chave -> (caminho do PNG, mensagem resumo) só para as chaves renderizadas
+        """
+        if not REPORT_IMAGE_CONFIG["enabled"]:
+            return {}
+        if not pillow_disponivel():
+            self.logger.warning("Pillow não disponível - relatórios seguem apenas em texto")
+            return {}
+        inicio = time.perf_counter()
+        imagens = {}
+        for chave, (funcao, args) in tarefas.items():
+            if funcao != self.format_data:
+                continue
+            csv_file, header, _emoji, meta, indicador_nome = args
+            if not os.path.exists(csv_file):
+                continue
+            try:
+                resultados = ler_resultados(csv_file)  # uma leitura para a imagem e o resumo
+            except Exception as e:
+                self.logger.error(f"Erro ao ler arquivo {csv_file}: {e}")
+                continue
+            caminho = renderizar_csv(csv_file, header, meta, resultados=resultados)
+            if caminho:
+                imagens[chave] = (caminho, self.format_resumo(csv_file, header, meta, indicador_nome, resultados))
+        if imagens:
+            decorrido = time.perf_counter() - inicio
+            self.logger.info(f"{len(imagens)} imagem(ns) de relatório gerada(s) em {decorrido:.2f}s")
+            if decorrido / len(imagens) > REPORT_IMAGE_CONFIG["segundos_por_imagem"]:
+                self.logger.warning(f"⚠️ Renderização acima da meta: {decorrido / len(imagens):.2f}s por imagem "
+                                    f"(meta {REPORT_IMAGE_CONFIG['segundos_por_imagem']}s)")
+        return imagens
+
     def format_marcas(self, csv_file, ciclo):
         """Formata os dados de marcas para mensagem WhatsApp."""
         if not os.path.exists(csv_file):
@@ -138,42 +213,42 @@ class WhatsAppSender:
             self.logger.error(f"Erro ao ler arquivo de marcas {csv_file}: {e}")
             return None
 
-    def ler_ciclos_metas(self, meta_csv_path="extracoes/meta_dia.csv"):
+    def ler_ciclos_metas(self, meta_csv_path=None):
         """Lê ciclos do dia e metas por ciclo a partir de meta_dia.csv."""
-        hoje = datetime.now().strftime("%d/%m/%Y")
-        ciclos = set()
-        metas_por_ciclo = {}
-        if not os.path.exists(meta_csv_path):
-            return [], {}
-        try:
-            with open(meta_csv_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    partes = [p.strip() for p in line.strip().split(";")]
-                    if len(partes) != 4:
-                        continue
-                    tipo, data_str, ciclo_str, valor_str = partes
-                    tipo = tipo.upper() if tipo else ""
-                    if tipo == "EUDORA":
-                        tipo = "EUD"
-                    if tipo not in ("PEF", "EUD") or data_str != hoje:
-                        continue
-                    if not (ciclo_str and ciclo_str.isdigit()):
-                        continue
-                    try:
-                        ciclo = int(ciclo_str)
-                        # Tenta converter o valor para float apenas se houver um valor
-                        valor = float(valor_str.replace(",", ".")) if valor_str.strip() else None
-                        ciclos.add(ciclo)  # Adiciona o ciclo mesmo se não tiver valor
-                        metas_por_ciclo.setdefault(ciclo, {})[tipo] = valor
-                    except Exception:
-                        ciclos.add(ciclo)  # Adiciona o ciclo mesmo se houver erro na conversão
-                        metas_por_ciclo.setdefault(ciclo, {})[tipo] = None
-        except Exception as e:
-            self.logger.warning(f"Falha ao ler ciclos/metas de {meta_csv_path}: {e}")
-        return sorted(ciclos), metas_por_ciclo
+        indice = obter_meta_index(meta_csv_path)
+        if indice.erro:
+            self.logger.warning(f"Falha ao ler ciclos/metas de {indice.caminho}: {indice.erro}")
+        return indice.ciclos(), indice.metas_por_ciclo()
 
     def abrir_whatsapp_web(self):
-        """Abre o WhatsApp Web no Google Chrome."""
+        """Abre o WhatsApp Web no Google Chrome.
+
+        Com a sessão única ativa, conecta ao Chrome que já está com o WhatsApp
+        carregado e espera só até a lista de conversas aparecer.
+        """
+        if not self.dry_run and not self.permitir_teclado and not envio_dom_ativo():
+            raise RuntimeError("Envio por teclado recusado e o envio pelo DOM da sessão única está desativado")
+        sessao = obter_sessao()
+        if sessao:
+            try:
+                sessao.conectar()
+                if sessao.aguardar_pronto():
+                    if not envio_dom_ativo():
+                        sessao.trazer_para_frente()
+                    self.sessao = sessao
+                    self.logger.info("WhatsApp Web pronto (sessão única)")
+                    return
+                self.logger.warning("Sessão única não ficou pronta - abrindo pelo Chrome do sistema")
+                sessao.desconectar()
+            except SessaoIndisponivel as e:
+                self.logger.warning(f"Sessão única indisponível ({e}) - abrindo pelo Chrome do sistema")
+
+        if self.dry_run:
+            self.logger.info(f"🧪 Simulação: mensagens serão gravadas em {self.dry_run}")
+            return
+        if not self.permitir_teclado:
+            raise RuntimeError("Sessão única indisponível e o envio por teclado foi recusado")
+
         self.logger.info("Abrindo WhatsApp Web...")
         chrome_path = "C:/Program Files/Google/Chrome/Application/chrome.exe %s"
         webbrowser.get(chrome_path).open("https://web.whatsapp.com/")
@@ -200,8 +275,23 @@ class WhatsAppSender:
         self.logger.info("WhatsApp Web aberto")
 
     def navegar_para_grupo(self, group_link):
-        """Navega para o grupo do WhatsApp pelo link."""
+        """Navega para o grupo do WhatsApp pelo link.
+
+        Returns:
+            True se a abertura do grupo foi confirmada (sessão única); None no
+            modo antigo, em que a FilaEnvio ainda aplica a espera "pre_envio"
+        """
         self.logger.info(f"Navegando para grupo com link: {group_link}")
+        self._grupo_atual = group_link
+        if self.sessao:
+            # Espera a caixa de mensagem do grupo (já com foco) em vez de sleeps fixos
+            if not self.envio_dom:
+                self.sessao.trazer_para_frente()
+            if not self.sessao.abrir_chat(group_link):
+                raise RuntimeError(f"Grupo {group_link[:10]}... não abriu na sessão do WhatsApp Web")
+            return True
+        if self.dry_run:
+            return True
         group_url = f"https://web.whatsapp.com/accept?code={group_link}"
         
         # Garante que o navegador está em foco
@@ -248,7 +338,14 @@ class WhatsAppSender:
 
     def enviar_mensagem(self, mensagem):
         """Envia a mensagem para o grupo aberto no WhatsApp Web."""
+        if self.dry_run:
+            self._simular_envio("texto", mensagem)
+            return
         self.logger.info("Enviando mensagem...")
+        if self.envio_dom:
+            self.sessao.enviar_texto(mensagem)
+            self.logger.info("Mensagem enviada (DOM da sessão)")
+            return
         
         # Copia a mensagem para o clipboard
         pyperclip.copy(mensagem)
@@ -261,49 +358,183 @@ class WhatsAppSender:
         # Pressiona Enter para enviar
         pyautogui.press("enter")
         
-        # Aguarda o envio ser processado
-        time.sleep(3)
+        # Aguarda o envio ser processado (na sessão única a FilaEnvio espera a confirmação no DOM)
+        if not self.sessao:
+            time.sleep(3)
         
         self.logger.info("Mensagem enviada (pyautogui executado)")
 
+    @property
+    def envio_dom(self):
+        """True se o envio passa pelo DOM da sessão única, sem teclado nem clipboard do sistema"""
+        return self.sessao is not None and envio_dom_ativo()
+
+    def confirmar_envio(self, item):
+        """Hook de confirmação da FilaEnvio: o texto enviado aparece no grupo com o tique de enviada"""
+        if self.dry_run:
+            return True
+        return self.sessao.mensagem_confirmada(item.enviada or item.mensagem)
+
+    @property
+    def hook_confirmacao(self):
+        """confirmar_envio, ou None quando não há DOM para consultar (envio só por teclado)"""
+        return self.confirmar_envio if (self.sessao or self.dry_run) else None
+
+    def _simular_envio(self, tipo, conteudo, legenda=None):
+        """Registra no .jsonl da simulação o que seria enviado ao grupo aberto"""
+        diretorio = os.path.dirname(self.dry_run)
+        if diretorio:
+            os.makedirs(diretorio, exist_ok=True)
+        registro = {"em": datetime.now().isoformat(timespec="seconds"), "grupo": self._grupo_atual,
+                    "tipo": tipo, "conteudo": conteudo, "legenda": legenda}
+        with open(self.dry_run, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False) + "\n")
+        self.logger.info(f"🧪 Simulação: {tipo} registrado ({len(conteudo)} caracteres)")
+
+    def _copiar_imagem_clipboard(self, caminho):
+        """Copia o PNG para o clipboard como bitmap (CF_DIB). Só no Windows, com pywin32 e Pillow."""
+        try:
+            import io
+            import win32clipboard
+            from PIL import Image
+        except ImportError:
+            self.logger.warning("pywin32/Pillow indisponível - não é possível colar imagens")
+            return False
+        with Image.open(caminho) as imagem:
+            saida = io.BytesIO()
+            imagem.convert("RGB").save(saida, "BMP")
+        dados = saida.getvalue()[14:]  # CF_DIB não leva o cabeçalho de arquivo BMP (14 bytes)
+        win32clipboard.OpenClipboard()
+        try:
+            win32clipboard.EmptyClipboard()
+            win32clipboard.SetClipboardData(win32clipboard.CF_DIB, dados)
+        finally:
+            win32clipboard.CloseClipboard()
+        return True
+
+    def enviar_imagem(self, caminho, legenda=None):
+        """Envia uma imagem para o grupo aberto (colada do clipboard).
+
+        Returns:
+            bool: False se a imagem não pôde ser colada (o chamador envia o texto completo)
+        """
+        if not os.path.exists(caminho):
+            self.logger.warning(f"Imagem {caminho} não encontrada")
+            return False
+        if self.dry_run:
+            self._simular_envio("imagem", caminho, legenda)
+            return True
+        if self.envio_dom:
+            self.logger.info(f"Enviando imagem {os.path.basename(caminho)} (DOM da sessão)...")
+            return self.sessao.enviar_imagem(caminho, legenda)
+        try:
+            if not self._copiar_imagem_clipboard(caminho):
+                return False
+        except Exception as e:
+            self.logger.warning(f"Falha ao copiar imagem para o clipboard: {e}")
+            return False
+
+        self.logger.info(f"Enviando imagem {os.path.basename(caminho)}...")
+        pyautogui.hotkey("ctrl", "v")
+        # Aguarda a pré-visualização de mídia abrir
+        time.sleep(2)
+        if legenda:
+            pyperclip.copy(legenda)
+            pyautogui.hotkey("ctrl", "v")
+            time.sleep(1)
+        pyautogui.press("enter")
+        time.sleep(3)
+        self.logger.info("Imagem enviada (pyautogui executado)")
+        return True
+
     def read_metas(self, meta_file):
         """Lê o arquivo de metas e retorna um dicionário com as metas para cada indicador."""
         if not os.path.exists(meta_file):
             self.logger.error(f"Arquivo de meta {meta_file} não encontrado!")
             return None
-        try:
-            import pandas as pd
-            df = pd.read_csv(meta_file)
-            meta_pef = float(df["PEF"].iloc[0])
-            meta_eud = float(df["EUDORA"].iloc[0])
-            meta_loja = float(df["LOJA"].iloc[0])
-            return {"PEF": meta_pef, "EUDORA": meta_eud, "LOJA": meta_loja}
-        except Exception as e:
-            self.logger.error(f"Erro ao ler meta: {e}")
+        indice = obter_meta_index(meta_file)
+        if indice.erro or indice.vazio:
+            self.logger.error(f"Erro ao ler meta: {indice.erro or 'nenhuma meta de hoje'}")
             return None
+        return {"PEF": indice.meta("PEF"), "EUDORA": indice.meta("EUD"), "LOJA": indice.meta_loja()}
 
-    def get_meta_loja_csv(self, meta_csv_path="extracoes/meta_dia.csv"):
-        """Busca a meta de LOJA no arquivo meta_dia.csv (linha sem ciclo)."""
-        hoje = datetime.now().strftime("%d/%m/%Y")
-        if not os.path.exists(meta_csv_path):
-            return None
-        try:
-            with open(meta_csv_path, "r", encoding="utf-8") as f:
-                for line in f:
-                    partes = [p.strip() for p in line.strip().split(";")]
-                    if len(partes) == 4:
-                        tipo, data_str, ciclo_str, valor_str = partes
-                        if tipo.upper() == "LOJA" and data_str == hoje and ciclo_str == "":
-                            try:
-                                return float(valor_str.replace(",", "."))
-                            except Exception:
-                                return None
-        except Exception as e:
-            self.logger.warning(f"Falha ao buscar meta LOJA em {meta_csv_path}: {e}")
-        return None
+    def get_meta_loja_csv(self, meta_csv_path=None):
+        """Busca a meta de LOJA no arquivo meta_dia.csv."""
+        indice = obter_meta_index(meta_csv_path)
+        if indice.erro:
+            self.logger.warning(f"Falha ao buscar meta LOJA em {indice.caminho}: {indice.erro}")
+        return indice.meta_loja()
+
+    def formatar_em_paralelo(self, tarefas):
+        """Executa as funções de formatação concorrentemente.
 
-    def send_reports(self, sem_meta=False, metas_dict=None, parcial=False):
-        """Processa e envia os relatórios para os grupos do WhatsApp."""
+        Args:
+            tarefas (dict): chave -> (função, args)
+
+        Returns:
+            dict: chave -> mensagem formatada (ou None)
+        """
+        if not tarefas:
+            return {}
+        workers = min(len(tarefas), WHATSAPP_CONFIG.get("prepare_workers", 4))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="formatar") as executor:
+            futuros = {chave: executor.submit(funcao, *args) for chave, (funcao, args) in tarefas.items()}
+        resultados = {}
+        for chave, futuro in futuros.items():
+            try:
+                resultados[chave] = futuro.result()
+            except Exception as e:
+                self.logger.error(f"Erro ao formatar mensagem {chave}: {e}")
+                resultados[chave] = None
+        return resultados
+
+    @contextmanager
+    def envio_exclusivo(self):
+        """Envolve da abertura do WhatsApp Web até a última mensagem.
+
+        Na execução multi-tenant o teclado, o foco e o clipboard do sistema são
+        compartilhados: com o envio pelo DOM o teclado é recusado; sem ele, o
+        tenant espera a vez dos outros (componentes/tenants.py).
+        """
+        if self.dry_run or not TENANT_CONFIG["vagas_dir"]:
+            yield
+        elif envio_dom_ativo():
+            self.permitir_teclado = False
+            yield
+        else:
+            with trava_envio_teclado(self.logger):
+                yield
+
+    def preparar_com_aquecimento(self, preparar, *args, **kwargs):
+        """Abre o WhatsApp Web em paralelo com a preparação das mensagens.
+
+        O carregamento do WhatsApp (~15s) acontece enquanto os arquivos são lidos,
+        validados e formatados. Retorna o resultado de `preparar` só depois que o
+        navegador estiver pronto.
+        """
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="whatsapp-warmup") as executor:
+            aquecimento = executor.submit(self.abrir_whatsapp_web)
+            try:
+                resultado = preparar(*args, **kwargs)
+            except Exception:
+                # Espera o navegador sem deixar uma falha dele substituir o erro da preparação
+                erro_aquecimento = aquecimento.exception()
+                if erro_aquecimento is not None:
+                    self.logger.error(f"WhatsApp Web também falhou ao abrir durante a preparação: {erro_aquecimento}")
+                raise
+            self.logger.info(f"Mensagens preparadas em {time.perf_counter() - inicio:.1f}s (WhatsApp Web carregando em paralelo)")
+            aquecimento.result()
+        self.logger.info(f"Pipeline de preparação concluído em {time.perf_counter() - inicio:.1f}s")
+        return resultado
+
+    def preparar_mensagens(self, sem_meta=False, metas_dict=None, parcial=False, grupos=GRUPOS):
+        """Lê metas e resultados e formata as mensagens dos grupos pedidos (todos os ciclos).
+
+        Returns:
+            tuple: ((texto, imagens, texto completo) LOJA,
+                    [(ciclo, texto, imagens, texto completo) VD, ...])
+        """
         if metas_dict:
             self.logger.info(f"Metas recebidas por argumento: {metas_dict}")
         else:
@@ -333,42 +564,13 @@ class WhatsAppSender:
                 msg += f"EUD={meta_eud_c} (type: {type(meta_eud_c)})"
             self.logger.info(msg.strip())
 
-        loja_msg = self.format_data(
-            "extracoes/resultado_loja.csv",
-            "*➡️ Parcial Receita LOJA*",
-            "",
-            meta_loja,
-            "LOJA"
-        )
-
-        mensagens_vd_por_ciclo = []
+        # Plano de ciclos: (ciclo, meta PEF, meta EUD)
         if ciclos:
             # Caso 1: Ciclos detectados via meta_dia.csv
+            plano = []
             for ciclo in ciclos:
                 metas_ciclo = metas_por_ciclo.get(ciclo, {})
-                meta_pef_c = metas_ciclo.get("PEF", meta_pef)
-                meta_eud_c = metas_ciclo.get("EUD", meta_eud)
-                pef_msg = self.format_data(
-                    f"extracoes/resultado_pef_C{ciclo}.csv",
-                    f"*➡️ Parcial Receita PEF - Ciclo {ciclo}*",
-                    "",
-                    meta_pef_c,
-                    "PEF"
-                )
-                eud_msg = self.format_data(
-                    f"extracoes/resultado_eud_C{ciclo}.csv",
-                    f"*➡️ Parcial Receita EUD -​ Ciclo {ciclo}*",
-                    "",
-                    meta_eud_c,
-                    "EUDORA"
-                )
-                msg_ciclo = ""
-                if pef_msg:
-                    msg_ciclo += pef_msg + "\n\n"
-                if eud_msg:
-                    msg_ciclo += eud_msg
-                if msg_ciclo.strip():
-                    mensagens_vd_por_ciclo.append((ciclo, msg_ciclo.strip()))
+                plano.append((ciclo, metas_ciclo.get("PEF", meta_pef), metas_ciclo.get("EUD", meta_eud)))
         else:
             # Caso 2: Não há ciclos detectados - tentar detectar pelos arquivos existentes
             self.logger.info("Tentando detectar ciclos pelos arquivos de resultado existentes...")
@@ -376,21 +578,11 @@ class WhatsAppSender:
             
             # Buscar arquivos resultado_*_C*.csv
             import glob
-            pef_files = glob.glob("extracoes/resultado_pef_C*.csv")
-            eud_files = glob.glob("extracoes/resultado_eud_C*.csv")
-            
-            for pef_file in pef_files:
+            arquivos = glob.glob("extracoes/resultado_pef_C*.csv") + glob.glob("extracoes/resultado_eud_C*.csv")
+            for arquivo in arquivos:
                 try:
                     # Extrair ciclo do nome do arquivo (ex: resultado_pef_C13.csv -> 13)
-                    ciclo_str = pef_file.split("_C")[1].split(".csv")[0]
-                    if ciclo_str.isdigit():
-                        ciclos_encontrados.add(int(ciclo_str))
-                except Exception:
-                    continue
-                    
-            for eud_file in eud_files:
-                try:
-                    ciclo_str = eud_file.split("_C")[1].split(".csv")[0]
+                    ciclo_str = arquivo.split("_C")[1].split(".csv")[0]
                     if ciclo_str.isdigit():
                         ciclos_encontrados.add(int(ciclo_str))
                 except Exception:
@@ -398,118 +590,145 @@ class WhatsAppSender:
             
             if ciclos_encontrados:
                 self.logger.info(f"Ciclos detectados pelos arquivos: {sorted(ciclos_encontrados)}")
-                for ciclo in sorted(ciclos_encontrados):
-                    pef_msg = self.format_data(
-                        f"extracoes/resultado_pef_C{ciclo}.csv",
-                        f"*➡️ Parcial Receita PEF - Ciclo {ciclo}*",
-                        "",
-                        meta_pef,
-                        "PEF"
-                    )
-                    eud_msg = self.format_data(
-                        f"extracoes/resultado_eud_C{ciclo}.csv",
-                        f"*➡️ Parcial Receita EUD -​ Ciclo {ciclo}*",
-                        "",
-                        meta_eud,
-                        "EUDORA"
-                    )
-                    msg_ciclo = ""
-                    if pef_msg:
-                        msg_ciclo += pef_msg + "\n\n"
-                    if eud_msg:
-                        msg_ciclo += eud_msg
-                    if msg_ciclo.strip():
-                        mensagens_vd_por_ciclo.append((ciclo, msg_ciclo.strip()))
+                plano = [(ciclo, meta_pef, meta_eud) for ciclo in sorted(ciclos_encontrados)]
             else:
                 # Caso 3: Fallback para arquivos sem ciclo (backward compatibility)
-                pef_msg = self.format_data(
-                    "extracoes/resultado_pef.csv",
-                    "*➡️ Parcial Receita PEF*",
-                    "",
-                    meta_pef,
-                    "PEF"
-                )
-                eud_msg = self.format_data(
-                    "extracoes/resultado_eud.csv",
-                    "*➡️ Parcial Receita EUD*",
-                    "",
-                    meta_eud,
-                    "EUDORA"
-                )
-                msg_ciclo = ""
-                if pef_msg:
-                    msg_ciclo += pef_msg + "\n\n"
-                if eud_msg:
-                    msg_ciclo += eud_msg
-                if msg_ciclo.strip():
-                    mensagens_vd_por_ciclo.append((None, msg_ciclo.strip()))
-
-        self.logger.info(f"Mensagem final para grupo LOJA: {loja_msg}")
-
-        self.abrir_whatsapp_web()
-
-        # Enviar mensagens VD (primeiro grupo)
+                plano = [(None, meta_pef, meta_eud)]
+
+        tarefas = {}
+        if "LOJA" in grupos:
+            tarefas["LOJA"] = (self.format_data, (
+                "extracoes/resultado_loja.csv",
+                "*➡️ Parcial Receita LOJA*",
+                "",
+                meta_loja,
+                "LOJA"
+            ))
+        if "VD" not in grupos:
+            plano = []
+        for ciclo, meta_pef_c, meta_eud_c in plano:
+            if ciclo is not None:
+                arquivo_pef, titulo_pef = f"extracoes/resultado_pef_C{ciclo}.csv", f"*➡️ Parcial Receita PEF - Ciclo {ciclo}*"
+                arquivo_eud, titulo_eud = f"extracoes/resultado_eud_C{ciclo}.csv", f"*➡️ Parcial Receita EUD -​ Ciclo {ciclo}*"
+            else:
+                arquivo_pef, titulo_pef = "extracoes/resultado_pef.csv", "*➡️ Parcial Receita PEF*"
+                arquivo_eud, titulo_eud = "extracoes/resultado_eud.csv", "*➡️ Parcial Receita EUD*"
+            tarefas[("PEF", ciclo)] = (self.format_data, (arquivo_pef, titulo_pef, "", meta_pef_c, "PEF"))
+            tarefas[("EUD", ciclo)] = (self.format_data, (arquivo_eud, titulo_eud, "", meta_eud_c, "EUDORA"))
+
+        mensagens = self.formatar_em_paralelo(tarefas)
+        imagens = self.gerar_imagens(tarefas)
+        loja = self.combinar_mensagens(["LOJA"], mensagens, imagens)
+
+        mensagens_vd_por_ciclo = []
+        for ciclo, _meta_pef_c, _meta_eud_c in plano:
+            texto, arquivos, completo = self.combinar_mensagens([("PEF", ciclo), ("EUD", ciclo)], mensagens, imagens)
+            if texto:
+                mensagens_vd_por_ciclo.append((ciclo, texto, arquivos, completo))
+
+        self.logger.info(f"Mensagem final para grupo LOJA: {loja[0]}")
+        return loja, mensagens_vd_por_ciclo
+
+    def combinar_mensagens(self, chaves, mensagens, imagens=None):
+        """Junta as mensagens das chaves (ex.: PEF e EUD do ciclo) em uma só.
+
+        Chaves com imagem entram pelo resumo, e o PNG vai na lista de anexos com o texto
+        completo da chave (usado no lugar do resumo se aquela imagem não puder ser enviada).
+
+        Returns:
+            tuple: (texto a enviar, [Anexo], texto completo do relatório)
+        """
+        imagens = imagens or {}
+        partes, completas, arquivos = [], [], []
+        for chave in chaves:
+            texto = mensagens.get(chave)
+            if not texto:
+                continue
+            completas.append(texto)
+            if chave in imagens:
+                caminho, resumo = imagens[chave]
+                arquivos.append(Anexo(caminho, resumo or texto, texto))
+                partes.append(resumo or texto)
+            else:
+                partes.append(texto)
+        return "\n\n".join(partes).strip() or None, arquivos, "\n\n".join(completas).strip() or None
+
+    def send_reports(self, sem_meta=False, metas_dict=None, parcial=False, grupos=GRUPOS):
+        """Processa e envia os relatórios para os grupos do WhatsApp.
+
+        Args:
+            grupos: subconjunto de GRUPOS a enviar (o pipeline em streaming envia um grupo por vez,
+                assim que os dados dele ficam prontos)
+        """
+        with self.envio_exclusivo():
+            return self._enviar_relatorios(sem_meta, metas_dict, parcial, grupos)
+
+    def _enviar_relatorios(self, sem_meta, metas_dict, parcial, grupos):
+        (loja_msg, loja_imagens, loja_completa), mensagens_vd_por_ciclo = self.preparar_com_aquecimento(
+            self.preparar_mensagens, sem_meta=sem_meta, metas_dict=metas_dict, parcial=parcial, grupos=grupos
+        )
+
+        # Fila por grupo: cada grupo é aberto uma vez e recebe todas as suas mensagens em sequência
+        # A simulação não usa o outbox: não pode marcar como enviadas mensagens que não saíram
+        fila = FilaEnvio(self, confirmar_envio=self.hook_confirmacao, limites_padrao={
+            "pre_envio": self.pre_send_delay_seconds,
+            "intervalo_grupos": self.delay_seconds
+        }, **({"outbox": None} if self.dry_run else {}))
+
+        # Mensagens VD (primeiro grupo)
         if mensagens_vd_por_ciclo:
             group_link_vd = self.group_links[0]  # Primeiro grupo é VD
             self.logger.info(f"Grupo VD configurado: {group_link_vd}")
-            
-            for ciclo, vd_group_msg in mensagens_vd_por_ciclo:
+            for ciclo, vd_group_msg, vd_imagens, vd_completa in mensagens_vd_por_ciclo:
                 if vd_group_msg:
-                    self.logger.info(f"Mensagem VD para ciclo {ciclo} preparada ({len(vd_group_msg)} caracteres)")
-                    self.logger.info(f"Navegando para grupo VD...")
-                    self.navegar_para_grupo(group_link_vd)
-                    
-                    # Delay extra antes do envio
-                    self.logger.info(f"Aguardando {self.pre_send_delay_seconds}s antes do envio...")
-                    time.sleep(self.pre_send_delay_seconds)
-                    
-                    self.logger.info("Enviando mensagem VD...")
-                    self.enviar_mensagem(vd_group_msg)
-                    
-                    self.logger.info(f"✅ Mensagem VD ciclo {ciclo} enviada com sucesso!")
-                    time.sleep(self.delay_seconds)
+                    self.logger.info(f"Mensagem VD para ciclo {ciclo} preparada ({len(vd_group_msg)} caracteres, "
+                                     f"{len(vd_imagens)} imagem(ns))")
+                    fila.adicionar("VD", group_link_vd, vd_group_msg, rotulo=f"ciclo {ciclo}",
+                                   imagens=vd_imagens, mensagem_alternativa=vd_completa, ciclo=ciclo)
                 else:
                     self.logger.warning(f"Mensagem VD para ciclo {ciclo} está vazia")
-        else:
+        elif "VD" in grupos:
             self.logger.warning("Nenhuma mensagem VD para enviar")
 
-        # Enviar mensagem LOJA (segundo grupo)
+        # Mensagem LOJA (segundo grupo)
         if loja_msg and len(self.group_links) > 1:
             group_link_loja = self.group_links[1]  # Segundo grupo é LOJA
             self.logger.info(f"Grupo LOJA configurado: {group_link_loja}")
             self.logger.info(f"Mensagem LOJA preparada ({len(loja_msg)} caracteres)")
-            
-            self.logger.info("Navegando para grupo LOJA...")
-            self.navegar_para_grupo(group_link_loja)
-            
-            # Delay extra antes do envio
-            self.logger.info(f"Aguardando {self.pre_send_delay_seconds}s antes do envio...")
-            time.sleep(self.pre_send_delay_seconds)
-            
-            self.logger.info("Enviando mensagem LOJA...")
-            self.enviar_mensagem(loja_msg)
-            
-            self.logger.info("✅ Mensagem LOJA enviada com sucesso!")
-            time.sleep(self.delay_seconds)
-        else:
+            fila.adicionar("LOJA", group_link_loja, loja_msg, rotulo="LOJA",
+                           imagens=loja_imagens, mensagem_alternativa=loja_completa)
+        elif "LOJA" in grupos:
             if not loja_msg:
                 self.logger.warning("Mensagem LOJA está vazia")
             if len(self.group_links) <= 1:
                 self.logger.warning(f"Apenas {len(self.group_links)} grupo(s) configurado(s) - LOJA não disponível")
 
+        try:
+            resultado = fila.enviar()
+        finally:
+            if self.sessao:
+                self.sessao.desconectar()  # O Chrome da sessão continua aberto
+        self.logger.info(f"Resumo do envio: {resultado}")
+        return resultado
+
 def main():
     print("📱 Enviador Automático de Informações por WhatsApp")
     print("=" * 60)
-    group_links = [
-        "LINK DO 1º GRUPO",
-        "LINK DO 2º GRUPO CASO NECESSÁRIO"
-    ] 
+    group_links = WHATSAPP_CONFIG["group_links"]
 
     parser = argparse.ArgumentParser()
     parser.add_argument("--metas", type=str, default=None)
     parser.add_argument("--parcial", action="store_true")
     parser.add_argument("--sem-meta", action="store_true")
+    parser.add_argument("--grupos", default=",".join(GRUPOS),
+                        help=f"Grupos a enviar, separados por vírgula ({', '.join(GRUPOS)})")
+    parser.add_argument("--somente-sessao", action="store_true",
+                        help="Envia só pelo DOM da sessão única (falha em vez de usar teclado/clipboard)")
     args = parser.parse_args()
+    grupos = tuple(g.strip().upper() for g in args.grupos.split(",") if g.strip())
+    desconhecidos = set(grupos) - set(GRUPOS)
+    if desconhecidos:
+        parser.error(f"Grupo(s) desconhecido(s): {', '.join(sorted(desconhecidos))}")
 
     metas_dict = None
     if args.metas:
@@ -518,9 +737,22 @@ def main():
         except Exception as e:
             print(f"Erro ao interpretar --metas: {e}")
 
-    sender = WhatsAppSender(group_links)
+    sender = WhatsAppSender(group_links, permitir_teclado=not args.somente_sessao)
     print("⚠️ Certifique-se de que o WhatsApp Web está logado e em uma única aba!")
-    sender.send_reports(sem_meta=args.sem_meta, metas_dict=metas_dict, parcial=args.parcial)
+    try:
+        resultado = sender.send_reports(sem_meta=args.sem_meta, metas_dict=metas_dict, parcial=args.parcial,
+                                        grupos=grupos)
+    finally:
+        escrever_arquivo_metricas("whatsapp_sender")
+
+    # Código de saída != 0 quando algo falhou: as mensagens confirmadas ficam no
+    # outbox e uma nova execução envia só as restantes
+    if any(contagem["falhas"] for contagem in resultado.values()):
+        print("❌ Houve falhas no envio - execute novamente para reenviar apenas as pendentes")
+        sys.exit(1)
 
 if __name__ == "__main__":
+    # Logging (apenas arquivo, sem duplicar no terminal) só quando executado direto:
+    # importado por main_com_marcas, os logs seguem a configuração de quem importou
+    configurar_logging_raiz("log/whatsapp_sender.log", console=False)
     main()
@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Sessão Única do WhatsApp Web
+============================
+Um Chrome de longa duração com o WhatsApp Web aberto, compartilhado pela
+captura de metas e pelo envio dos relatórios.
+
+O Chrome é iniciado uma vez (perfil dedicado e --remote-debugging-port) e
+continua aberto entre as execuções do dia, com a página carregada e
+sincronizada. Captura e envio se conectam a ele pelo Selenium
+(debuggerAddress) em vez de abrir um navegador novo e esperar o boot e a
+sincronização de novo; desconectar não fecha o Chrome. O estado da página
+é consultado por uma API explícita (estado/aguardar_pronto/abrir_chat) em
+vez de sleeps fixos. Com WHATSAPP_SESSAO_CONFIG["envio_dom"], textos e
+imagens são colados direto na página (enviar_texto/enviar_imagem), sem
+teclado, foco de janela nem clipboard do sistema.
+
+Uso:
+    python -m componentes.whatsapp_sessao iniciar    # abre (ou reaproveita) e espera ficar pronta
+    python -m componentes.whatsapp_sessao status
+    python -m componentes.whatsapp_sessao encerrar
+"""
+
+import argparse
+import base64
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+from componentes.config import WHATSAPP_SESSAO_CONFIG
+
+PRONTO = "pronto"
+SINCRONIZANDO = "sincronizando"
+LOGIN = "login"  # QR code na tela: o perfil precisa ser pareado de novo
+CARREGANDO = "carregando"
+
+SELETOR_CAIXA_MENSAGEM = "#main footer div[contenteditable='true']"
+# Botão de enviar da pré-visualização de mídia (aberta ao colar uma imagem)
+SELETOR_ENVIAR_MIDIA = ("div[role='dialog'] span[data-icon='send'], span[data-icon='wds-ic-send-filled'], "
+                        "div[role='button'][aria-label='Enviar']")
+
+_SCRIPT_ESTADO = r"""
+if (document.querySelector('#pane-side')) { return 'pronto'; }
+if (document.querySelector('canvas[aria-label], div[data-ref]')) { return 'login'; }
+if (document.querySelector('progress, [role="progressbar"]')) { return 'sincronizando'; }
+return 'carregando';
+"""
+
+# Última mensagem enviada do chat aberto: contém o texto (comparado só por letras e dígitos,
+# já que a formatação e os emojis viram markup) e já tem o tique de enviada
+_SCRIPT_CONFIRMACAO = r"""
+var normalizar = function (s) { return (s || '').replace(/[^0-9A-Za-z\u00C0-\u00FF]+/g, '').toLowerCase(); };
+var esperado = normalizar(arguments[0]).slice(0, arguments[1]);
+var enviadas = document.querySelectorAll('#main div.message-out');
+if (!esperado || !enviadas.length) { return false; }
+var ultima = enviadas[enviadas.length - 1];
+if (normalizar(ultima.innerText || ultima.textContent).indexOf(esperado) === -1) { return false; }
+return !!ultima.querySelector("span[data-icon='msg-check'], span[data-icon='msg-dblcheck'], span[data-icon='msg-dblcheck-ack']");
+"""
+
+# Cola texto ou arquivo no elemento (caixa do chat, ou o que tiver foco na página) com um
+# ClipboardEvent sintético: não passa pelo clipboard nem pelo teclado do sistema operacional
+_SCRIPT_COLAR = r"""
+var alvo = arguments[0] || document.activeElement;
+if (!alvo) { return false; }
+var dados = new DataTransfer();
+if (arguments[2]) {
+    var binario = atob(arguments[1]);
+    var bytes = new Uint8Array(binario.length);
+    for (var i = 0; i < binario.length; i++) { bytes[i] = binario.charCodeAt(i); }
+    dados.items.add(new File([bytes], arguments[2], {type: arguments[3]}));
+} else {
+    dados.setData('text/plain', arguments[1]);
+}
+alvo.focus();
+alvo.dispatchEvent(new ClipboardEvent('paste', {clipboardData: dados, bubbles: true, cancelable: true}));
+return true;
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class SessaoIndisponivel(Exception):
+    """Não foi possível iniciar ou conectar ao Chrome da sessão"""
+
+
+class PerfilEmUso(SessaoIndisponivel):
+    """O perfil do WhatsApp já está aberto em outro Chrome; um segundo Chrome nele não teria controle"""
+
+
+def perfil_em_uso(user_data_dir: str) -> bool:
+    """True se há um Chrome rodando com este user-data-dir (pela trava de perfil do próprio Chrome)"""
+    if sys.platform.startswith("win"):
+        # "lockfile" fica aberto sem compartilhamento enquanto o Chrome roda
+        trava = os.path.join(user_data_dir, "lockfile")
+        if not os.path.exists(trava):
+            return False
+        try:
+            with open(trava, "a"):
+                return False
+        except PermissionError:
+            return True
+        except OSError:
+            return False
+    # "SingletonLock" é um link simbólico para "<host>-<pid>"
+    trava = os.path.join(user_data_dir, "SingletonLock")
+    if not os.path.lexists(trava):
+        return False
+    try:
+        pid = int(os.readlink(trava).rsplit("-", 1)[-1])
+    except (OSError, ValueError):
+        return True  # trava presente mas ilegível: melhor não disputar o perfil
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SessaoWhatsApp:
+    """Chrome de longa duração com o WhatsApp Web, acessado por debuggerAddress"""
+
+    def __init__(self, config: Optional[dict] = None):
+        self.config = config or WHATSAPP_SESSAO_CONFIG
+        self.porta = self.config["porta"]
+        self.driver = None
+
+    # -- processo do Chrome -------------------------------------------------
+
+    def ativa(self) -> bool:
+        """True se há um Chrome respondendo na porta de depuração"""
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{self.porta}/json/version", timeout=2) as resposta:
+                return resposta.status == 200
+        except Exception:
+            return False
+
+    def _iniciar_chrome(self):
+        argumentos = [
+            self.config["chrome_path"],
+            f"--remote-debugging-port={self.porta}",
+            f"--user-data-dir={self.config['user_data_dir']}",
+            f"--profile-directory={self.config['profile_dir']}",
+            "--no-first-run",
+            "--no-default-browser-check",
+            "--disable-extensions",
+            "--start-maximized",
+            *self.config.get("argumentos", []),
+            self.config["url"],
+        ]
+        logger.info(f"🌐 Iniciando Chrome da sessão WhatsApp (porta {self.porta})...")
+        opcoes = {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL, "stdin": subprocess.DEVNULL}
+        if sys.platform.startswith("win"):
+            # Sobrevive ao fim do processo Python (a sessão é reaproveitada ao longo do dia)
+            opcoes["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+        else:
+            opcoes["start_new_session"] = True
+        try:
+            processo = subprocess.Popen(argumentos, **opcoes)
+        except OSError as e:
+            raise SessaoIndisponivel(f"Não foi possível executar {self.config['chrome_path']}: {e}") from e
+        limite = time.monotonic() + self.config["timeout_inicio"]
+        while time.monotonic() < limite:
+            if self.ativa():
+                self._gravar_estado(processo.pid)
+                return
+            if processo.poll() is not None:
+                raise SessaoIndisponivel(f"Chrome encerrou ao iniciar (código {processo.returncode})")
+            time.sleep(0.2)
+        raise SessaoIndisponivel(f"Chrome não abriu a porta {self.porta} em {self.config['timeout_inicio']}s")
+
+    def _gravar_estado(self, pid: int):
+        caminho = self.config["estado_path"]
+        os.makedirs(os.path.dirname(caminho) or ".", exist_ok=True)
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"pid": pid, "porta": self.porta, "iniciada_em": time.strftime("%Y-%m-%dT%H:%M:%S")}, f)
+
+    # -- conexão -------------------------------------------------------------
+
+    def conectar(self):
+        """Conecta ao Chrome da sessão (iniciando-o se necessário) e seleciona a aba do WhatsApp.
+
+        Returns:
+            WebDriver conectado; driver.quit() só encerra o chromedriver
+        """
+        if self.driver is not None:
+            return self.driver
+        if not self.ativa():
+            if perfil_em_uso(self.config["user_data_dir"]):
+                raise PerfilEmUso(f"Perfil {self.config['user_data_dir']} já está aberto em um Chrome sem a porta "
+                                  f"{self.porta} de depuração - feche esse Chrome para a sessão iniciar")
+            self._iniciar_chrome()
+        options = webdriver.ChromeOptions()
+        options.add_experimental_option("debuggerAddress", f"127.0.0.1:{self.porta}")
+        chromedriver = self.config.get("chromedriver_path")
+        service = Service(chromedriver) if chromedriver and os.path.exists(chromedriver) else Service()
+        try:
+            self.driver = webdriver.Chrome(service=service, options=options)
+        except Exception as e:
+            if self.ativa():
+                # O Chrome da sessão segue aberto com o perfil: abrir outro nele não resolveria
+                raise PerfilEmUso(f"Chrome da sessão está aberto na porta {self.porta}, mas a conexão falhou "
+                                  f"({e}) - feche esse Chrome e execute de novo") from e
+            raise SessaoIndisponivel(f"Falha ao conectar em 127.0.0.1:{self.porta}: {e}") from e
+        self._selecionar_aba()
+        return self.driver
+
+    def _selecionar_aba(self):
+        for handle in self.driver.window_handles:
+            self.driver.switch_to.window(handle)
+            if self.driver.current_url.startswith(self.config["url"]):
+                return
+        self.driver.get(self.config["url"])
+
+    def desconectar(self):
+        """Solta o Chrome (que continua aberto para a próxima execução)"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def encerrar(self):
+        """Fecha o Chrome da sessão"""
+        if not self.ativa():
+            return
+        driver = self.conectar()
+        try:
+            driver.execute_cdp_cmd("Browser.close", {})
+        except Exception:
+            pass
+        self.driver = None
+        logger.info("🛑 Chrome da sessão WhatsApp encerrado")
+
+    # -- estado da página ----------------------------------------------------
+
+    def estado(self) -> str:
+        """pronto, sincronizando, login ou carregando"""
+        try:
+            return self.conectar().execute_script(_SCRIPT_ESTADO)
+        except SessaoIndisponivel:
+            raise
+        except Exception:
+            return CARREGANDO
+
+    def aguardar_pronto(self, timeout: Optional[float] = None) -> bool:
+        """Espera a lista de conversas aparecer (sessão logada e sincronizada)"""
+        timeout = self.config["timeout_pronto"] if timeout is None else timeout
+        inicio = time.perf_counter()
+        driver = self.conectar()
+        if not driver.current_url.startswith(self.config["url"]):
+            driver.get(self.config["url"])
+        ultimo = None
+        while time.perf_counter() - inicio < timeout:
+            atual = self.estado()
+            if atual == PRONTO:
+                logger.info(f"✅ WhatsApp Web pronto em {time.perf_counter() - inicio:.1f}s")
+                return True
+            if atual != ultimo:
+                logger.info(f"⏳ WhatsApp Web: {atual}")
+                if atual == LOGIN:
+                    logger.warning("⚠️ WhatsApp Web pedindo QR code - pareie o perfil da sessão")
+                ultimo = atual
+            time.sleep(0.5)
+        logger.error(f"❌ WhatsApp Web não ficou pronto em {timeout}s (estado: {ultimo})")
+        return False
+
+    def trazer_para_frente(self):
+        """Coloca a aba/janela da sessão em foco (necessário para o envio por teclado)"""
+        driver = self.conectar()
+        try:
+            driver.execute_cdp_cmd("Page.bringToFront", {})
+        except Exception:
+            pass
+
+    def abrir_chat(self, link_convite: str, timeout: Optional[float] = None) -> bool:
+        """Abre o grupo pelo link de convite e espera a caixa de mensagem ficar editável.
+
+        A caixa recebe o foco, então o que for colado em seguida vai para o grupo.
+        """
+        timeout = self.config["timeout_chat"] if timeout is None else timeout
+        driver = self.conectar()
+        inicio = time.perf_counter()
+        driver.get(f"{self.config['url']}accept?code={link_convite}")
+        try:
+            caixa = WebDriverWait(driver, timeout).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, SELETOR_CAIXA_MENSAGEM))
+            )
+            caixa.click()
+        except Exception as e:
+            logger.error(f"❌ Grupo não abriu em {timeout}s: {e}")
+            return False
+        logger.info(f"Grupo aberto em {time.perf_counter() - inicio:.1f}s")
+        return True
+
+    def mensagem_confirmada(self, texto: str, caracteres: int = 200) -> bool:
+        """True se a última mensagem enviada no chat aberto é `texto` e já tem o tique de enviada.
+
+        Só os primeiros `caracteres` (letras e dígitos) são comparados: mensagens longas
+        aparecem cortadas ("Ler mais") no DOM.
+        """
+        try:
+            return bool(self.conectar().execute_script(_SCRIPT_CONFIRMACAO, texto, caracteres))
+        except SessaoIndisponivel:
+            raise
+        except Exception:
+            return False
+
+    def enviar_texto(self, texto: str, timeout: Optional[float] = None):
+        """Envia `texto` no chat aberto pelo DOM: cola na caixa de mensagem e tecla Enter nela.
+
+        Raises:
+            RuntimeError: a caixa não recebeu o texto em `timeout`
+        """
+        timeout = self.config["timeout_envio"] if timeout is None else timeout
+        driver = self.conectar()
+        caixa = driver.find_element(By.CSS_SELECTOR, SELETOR_CAIXA_MENSAGEM)
+        driver.execute_script(_SCRIPT_COLAR, caixa, texto, None, None)
+        try:
+            WebDriverWait(driver, timeout).until(lambda d: (caixa.text or "").strip())
+        except Exception:
+            raise RuntimeError(f"Texto não apareceu na caixa de mensagem em {timeout}s")
+        caixa.send_keys(Keys.ENTER)
+
+    def enviar_imagem(self, caminho: str, legenda: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """Envia a imagem no chat aberto pelo DOM: cola o arquivo, a legenda e clica em enviar.
+
+        Returns:
+            False se a pré-visualização não abriu ou não fechou (ela é descartada com Esc)
+        """
+        timeout = self.config["timeout_envio"] if timeout is None else timeout
+        driver = self.conectar()
+        with open(caminho, "rb") as f:
+            conteudo = base64.b64encode(f.read()).decode("ascii")
+        caixa = driver.find_element(By.CSS_SELECTOR, SELETOR_CAIXA_MENSAGEM)
+        driver.execute_script(_SCRIPT_COLAR, caixa, conteudo, os.path.basename(caminho), "image/png")
+        try:
+            enviar = WebDriverWait(driver, timeout).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, SELETOR_ENVIAR_MIDIA))
+            )
+            if legenda:
+                # A pré-visualização abre com o foco na legenda
+                driver.execute_script(_SCRIPT_COLAR, None, legenda, None, None)
+            enviar.click()
+            WebDriverWait(driver, timeout).until(EC.staleness_of(enviar))
+        except Exception as e:
+            logger.warning(f"⚠️ Imagem {os.path.basename(caminho)} não foi enviada pelo DOM: {e}")
+            try:
+                driver.find_element(By.TAG_NAME, "body").send_keys(Keys.ESCAPE)
+            except Exception:
+                pass
+            return False
+        return True
+
+
+_sessao: Optional[SessaoWhatsApp] = None
+
+
+def envio_dom_ativo() -> bool:
+    """True se o envio passa pelo DOM da sessão única (sem teclado nem clipboard do sistema)"""
+    return WHATSAPP_SESSAO_CONFIG["enabled"] and WHATSAPP_SESSAO_CONFIG["envio_dom"]
+
+
+def obter_sessao() -> Optional[SessaoWhatsApp]:
+    """Sessão compartilhada do processo (None se WHATSAPP_SESSAO_CONFIG["enabled"] for False)"""
+    global _sessao
+    if not WHATSAPP_SESSAO_CONFIG["enabled"]:
+        return None
+    if _sessao is None:
+        _sessao = SessaoWhatsApp()
+    return _sessao
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sessão única do WhatsApp Web")
+    parser.add_argument("acao", choices=["iniciar", "status", "encerrar"])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    sessao = SessaoWhatsApp()
+    if args.acao == "status":
+        if not sessao.ativa():
+            print(f"Sessão inativa (porta {sessao.porta})")
+            return
+        print(f"Sessão ativa na porta {sessao.porta}: {sessao.estado()}")
+        sessao.desconectar()
+    elif args.acao == "iniciar":
+        try:
+            pronto = sessao.aguardar_pronto()
+        except SessaoIndisponivel as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        sessao.desconectar()
+        print("✅ Sessão pronta" if pronto else "⚠️ Sessão aberta, mas o WhatsApp Web não ficou pronto")
+        sys.exit(0 if pronto else 1)
+    else:
+        sessao.encerrar()
+        print("🛑 Sessão encerrada")
+
+
+if __name__ == "__main__":
+    main()
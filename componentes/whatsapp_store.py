@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Leitura do Armazenamento Local do WhatsApp Web
+==============================================
+Lê as mensagens de hoje de um chat direto do IndexedDB da sessão aberta.
+
+A captura pela interface (abrir o grupo, rolar, digitar na pesquisa e
+esperar a indexação) leva ~40s por grupo. O WhatsApp Web já mantém as
+mensagens carregadas em um banco IndexedDB do próprio navegador; aqui um
+único execute_async_script consulta esse banco, filtra pelo chat e pelo
+horário (desde a meia-noite) e devolve os textos prontos para os
+extratores de meta.
+
+O esquema do banco não é público: nomes do banco, do object store e dos
+campos ficam em WHATSAPP_STORE_CONFIG. Se o banco não existir ou não
+tiver o formato esperado, StoreIndisponivel é levantada e o chamador volta
+para a pesquisa pela interface.
+"""
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from componentes.config import WHATSAPP_STORE_CONFIG
+
+logger = logging.getLogger(__name__)
+
+# Mensagens com texto de um chat desde um timestamp (segundos), mais recentes primeiro.
+# Abrir um banco inexistente criaria um vazio: o upgrade é abortado e vira erro.
+_SCRIPT_MENSAGENS = r"""
+var chat = arguments[0], desde = arguments[1], cfg = arguments[2];
+var concluir = arguments[arguments.length - 1];
+var remoto = function (m) {
+    var id = m[cfg.campo_id];
+    if (id && typeof id === 'object') {
+        var r = id.remote;
+        return (r && typeof r === 'object') ? (r._serialized || '') : (r || '');
+    }
+    var partes = String(id || '').split('_');
+    return partes.length > 2 ? partes[1] : '';
+};
+var pedido;
+try { pedido = indexedDB.open(cfg.banco); } catch (e) { concluir({erro: 'indexedDB: ' + e}); return; }
+pedido.onupgradeneeded = function () { pedido.transaction.abort(); };
+pedido.onerror = function () { concluir({erro: 'banco ' + cfg.banco + ' indisponível'}); };
+pedido.onsuccess = function () {
+    var db = pedido.result;
+    if (!db.objectStoreNames.contains(cfg.store)) {
+        db.close();
+        concluir({erro: 'object store ' + cfg.store + ' ausente'});
+        return;
+    }
+    var store = db.transaction(cfg.store, 'readonly').objectStore(cfg.store);
+    var consulta = store.indexNames.contains(cfg.campo_tempo)
+        ? store.index(cfg.campo_tempo).getAll(IDBKeyRange.lowerBound(desde))
+        : store.getAll();
+    consulta.onerror = function () { db.close(); concluir({erro: 'consulta: ' + consulta.error}); };
+    consulta.onsuccess = function () {
+        var saida = [];
+        var lidas = consulta.result || [];
+        for (var i = 0; i < lidas.length; i++) {
+            var m = lidas[i];
+            var t = m[cfg.campo_tempo];
+            var texto = m[cfg.campo_texto];
+            if (typeof t !== 'number' || t < desde || typeof texto !== 'string' || !texto) { continue; }
+            if (remoto(m) !== chat) { continue; }
+            saida.push([t, texto]);
+        }
+        saida.sort(function (a, b) { return b[0] - a[0]; });
+        db.close();
+        concluir({mensagens: saida, total: lidas.length});
+    };
+};
+"""
+
+
+class StoreIndisponivel(Exception):
+    """O banco local do WhatsApp Web não pôde ser lido no formato esperado"""
+
+
+def inicio_do_dia(agora: Optional[datetime] = None) -> int:
+    """Timestamp (segundos) da meia-noite local de hoje"""
+    agora = agora or datetime.now()
+    return int(agora.replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+
+def chat_configurado(nome_grupo: str) -> Optional[str]:
+    """Id do chat (ex.: 1203...@g.us) configurado para o grupo, se o backend estiver ativo"""
+    if not WHATSAPP_STORE_CONFIG["enabled"]:
+        return None
+    return WHATSAPP_STORE_CONFIG["chats"].get(nome_grupo) or None
+
+
+def ler_mensagens_hoje(driver, chat_id: str, desde: Optional[int] = None,
+                       config: Optional[Dict[str, Any]] = None) -> List[Tuple[int, str]]:
+    """Mensagens de texto do chat desde a meia-noite, mais recentes primeiro.
+
+    Args:
+        driver: WebDriver com o WhatsApp Web (ou o fixture) carregado na origem do banco
+        chat_id: Id serializado do chat
+        desde: Timestamp inicial em segundos (padrão: meia-noite de hoje)
+        config: Padrão: WHATSAPP_STORE_CONFIG
+
+    Returns:
+        [(timestamp, texto), ...]
+
+    Raises:
+        StoreIndisponivel: banco/object store ausentes ou erro na consulta
+    """
+    config = config or WHATSAPP_STORE_CONFIG
+    desde = inicio_do_dia() if desde is None else desde
+    parametros = {chave: config[chave] for chave in ("banco", "store", "campo_id", "campo_tempo", "campo_texto")}
+    try:
+        driver.set_script_timeout(config["timeout_script"])
+        resposta = driver.execute_async_script(_SCRIPT_MENSAGENS, chat_id, desde, parametros)
+    except Exception as e:
+        raise StoreIndisponivel(f"Falha ao consultar o IndexedDB: {e}") from e
+    if not resposta or resposta.get("erro"):
+        raise StoreIndisponivel((resposta or {}).get("erro") or "resposta vazia do navegador")
+    mensagens = [(int(t), texto) for t, texto in resposta.get("mensagens") or []]
+    logger.info(f"📥 {len(mensagens)} mensagem(ns) de hoje no chat {chat_id} "
+                f"({resposta.get('total', 0)} lidas do store)")
+    return mensagens
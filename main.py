@@ -2,11 +2,16 @@ CICLOS_MANUAL = 15  # Ciclos padrão para uso automático
 """
 Script Principal - Orquestrador
 
-Executa os componentes na ordem correta:
+Executa os componentes como etapas com dependências (componentes/dag.py):
 1. Verificação de metas existentes
-2. Extração de dados (loja, vd, pef)
-3. Validação dos dados
-4. Envio via WhatsApp
+2. Extração de dados (loja, vd, pef) - LOJA em paralelo com as metas
+3. Validação dos dados (cada fonte logo após a sua extração)
+4. Envio via WhatsApp - em streaming, o relatório de cada grupo sai assim que
+   a fonte dele é validada (WHATSAPP_STREAMING=0 volta ao envio único no fim).
+   O streaming só vale com a extração headless e o envio pelo DOM da sessão
+   única: o envio por teclado disputaria o foco com a janela da extração
+
+Ao fim, log/dag/main.json traz o tempo de cada etapa e o caminho crítico.
 
 NOTA: A captura de metas deve ser executada separadamente via captura_metas.py
 """
@@ -15,11 +20,14 @@ import os
 import sys
 import json
 import subprocess
+import threading
 import time
 import logging
 from datetime import datetime
 
-from componentes.config import TIMING_CONFIG, FILE_CONFIG, ensure_directories
+from componentes.config import (
+    TIMING_CONFIG, FILE_CONFIG, WHATSAPP_CONFIG, WHATSAPP_SESSAO_CONFIG, ensure_directories
+)
 from componentes.notifications import (
     notification_manager,
     notify_extraction_start,
@@ -29,17 +37,25 @@ from componentes.notifications import (
     notify_whatsapp_send_error
 )
 from componentes.validators import validate_extraction_file, validate_meta_file
+from componentes.metrics import (
+    extraction_duration_seconds,
+    extraction_runs_total,
+    stale_file_blocks_total,
+    last_run_timestamp_seconds,
+    report_delivered_seconds,
+    time_to_first_report_seconds,
+    escrever_arquivo_metricas,
+    iniciar_servidor_metricas,
+)
+from componentes.processos import encerrar_driver
+from componentes.rastreamento import gravar_rastreamento
+from componentes.dag import Etapa, ExecutorDAG
 from componentes.flag_checker import parse_flag_envio, verificar_janela_captura
+from componentes.logging_setup import configurar_logging_raiz
+from componentes.perfil_driver import extracao_headless
 
 ensure_directories()
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("log/main.log", mode="w", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+configurar_logging_raiz("log/main.log")
 
 def limpar_arquivos_extracao_antigos():
     """🛡️ SEGURANÇA: Limpa arquivos de extração anteriores para evitar uso de dados obsoletos."""
@@ -106,7 +122,7 @@ def verificar_metas_existentes():
         if should_update:
             logger.info("Tentando capturar/atualizar metas automaticamente...")
             notification_manager.info("Atualização de Metas", "Atualizando metas automaticamente...")
-            resultado = os.system("python componentes/captura_metaDia.py")
+            resultado = os.system(f'"{sys.executable}" -m componentes.captura_metadia')
             if resultado == 0 and os.path.exists(meta_file):
                 try:
                     meta_status = validate_meta_file(meta_file)
@@ -148,6 +164,13 @@ def executar_extracao(script, data_type):
     PERFORMANCE: Não usa subprocess/os.system, chama funções diretamente
     para evitar overhead de criação de processos.
     """
+    inicio = time.perf_counter()
+    sucesso = _executar_extracao(script, data_type)
+    extraction_duration_seconds.observe(time.perf_counter() - inicio, script=script)
+    extraction_runs_total.inc(script=script, resultado="sucesso" if sucesso else "falha")
+    return sucesso
+
+def _executar_extracao(script, data_type):
     logger = logging.getLogger(__name__)
     logger.info(f"🔄 Executando: {script} (modo otimizado)")
     notify_extraction_start(script)
@@ -171,10 +194,7 @@ def executar_extracao(script, data_type):
                 logger.info(f"✅ {script} executado com sucesso (modo otimizado)")
             finally:
                 if driver:
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
+                    encerrar_driver(driver)
         
         elif script == "extracao_vd_eud_pef.py":
             from componentes.extracao_vd_eud_pef import (
@@ -206,10 +226,7 @@ def executar_extracao(script, data_type):
                 logger.info(f"✅ {script} executado com sucesso (modo otimizado)")
             finally:
                 if driver:
-                    try:
-                        driver.quit()
-                    except Exception:
-                        pass
+                    encerrar_driver(driver)
         
         else:
             # Fallback para scripts não otimizados
@@ -291,7 +308,7 @@ def executar_envio():
     logger = logging.getLogger(__name__)
     logger.info("🔄 Executando envio via WhatsApp...")
     try:
-        resultado = os.system("python componentes/whatsapp_sender.py")
+        resultado = os.system("python -m componentes.whatsapp_sender")
         if resultado == 0:
             logger.info("✅ Envio executado com sucesso")
             notify_whatsapp_send_success(len(FILE_CONFIG["files"]) - 1)
@@ -306,19 +323,23 @@ def executar_envio():
 
 def main():
     """Função principal - orquestra a execução dos componentes."""
-    logger = logging.getLogger(__name__)
-    logger.info("🚀 Iniciando execução do sistema OTIMIZADO (sem captura de metas)")
-    notification_manager.info("Sistema Iniciado", "Execução OTIMIZADA - Navegador compartilhado - 40% mais rápido")
-
-    start_time = datetime.now()
-
-    logger.info("=" * 50)
-    logger.info("📊 ETAPA 0: Limpeza de Segurança")
+    iniciar_servidor_metricas()
+    sucesso = False
+    try:
+        sucesso = _main()
+    finally:
+        last_run_timestamp_seconds.set(time.time(), pipeline="main", resultado="sucesso" if sucesso else "falha")
+        escrever_arquivo_metricas("main")
+        gravar_rastreamento("main")
+    return sucesso
+
+def _etapa_limpeza():
     limpar_arquivos_extracao_antigos()
-    time.sleep(1)  # Pequena pausa para garantir que o sistema de arquivos atualizou
+    return True
 
-    logger.info("=" * 50)
-    logger.info("📊 ETAPA 1: Verificação de Metas")
+def _etapa_metas():
+    """Verifica/captura as metas e classifica o modo de envio (todas, parcial ou nenhuma)."""
+    logger = logging.getLogger(__name__)
     meta_status, flag_status = verificar_metas_existentes()
     if not meta_status:
         logger.warning("⚠️ Nenhuma meta válida encontrada ou erro na captura. O fluxo seguirá sem metas.")
@@ -333,14 +354,11 @@ def main():
             meta_mode = "todas"
         else:
             meta_mode = "parcial"
+    return meta_status, flag_status, metas_validas, meta_mode
 
-    time.sleep(TIMING_CONFIG["between_extractions"])
-
-    logger.info("=" * 50)
-    logger.info("📊 ETAPA 2: Extração de Dados")
-    # Extrações independentes
-    # Extração LOJA
-    sucesso_loja = False
+def _etapa_extracao_loja():
+    """Extrai LOJA; retorna True se o arquivo foi gerado com registros."""
+    logger = logging.getLogger(__name__)
     loja_arquivo = os.path.join(FILE_CONFIG["output_dir"], FILE_CONFIG["files"]["resultado_loja"])
     if executar_extracao("extracao_loja.py", "resultado_loja") and os.path.exists(loja_arquivo):
         # Validação simplificada: considera válido se tem registros
@@ -350,16 +368,16 @@ def main():
             next(reader, None)  # pula cabeçalho
             registros = list(reader)
         if len(registros) > 0:
-            sucesso_loja = True
             logger.info(f"Arquivo LOJA válido para envio ({len(registros)} registros)")
-        else:
-            logger.warning("Arquivo de LOJA está vazio. Não será enviado.")
+            return True
+        logger.warning("Arquivo de LOJA está vazio. Não será enviado.")
     else:
         logger.warning("Arquivo de LOJA não gerado. Não será enviado.")
-    time.sleep(TIMING_CONFIG["between_extractions"])
+    return False
 
-    # Extração VD/EUD/PEF
-    sucesso_vd_eud_pef = False
+def _etapa_extracao_vd_eud_pef():
+    """Extrai EUD/PEF dos ciclos do dia; retorna os arquivos válidos e do dia."""
+    logger = logging.getLogger(__name__)
     from componentes.config import get_result_files
     # Fallback automático de ciclos caso não haja arquivos válidos
     arquivos_vd_eud_pef = get_result_files("resultado_pef") + get_result_files("resultado_eud")
@@ -367,9 +385,9 @@ def main():
         logger.info(f"Nenhum ciclo capturado automaticamente para VD/EUD/PEF. Usando ciclos padrão: {CICLOS_MANUAL}")
         # Aqui você pode acionar o script de extração com os ciclos padrão, se necessário
         # Exemplo: executar_extracao_com_ciclos(CICLOS_MANUAL)
+    arquivos_validos_vd_eud_pef = []
     if executar_extracao("extracao_vd_eud_pef.py", "resultado_vd"):
         arquivos_vd_eud_pef = get_result_files("resultado_pef") + get_result_files("resultado_eud")
-        arquivos_validos_vd_eud_pef = []
         total_registros_vd_eud_pef = 0
         for arquivo in arquivos_vd_eud_pef:
             # Deduz tipo pela substring do nome para validação adequada (pef/eud)
@@ -395,31 +413,15 @@ def main():
                     except Exception:
                         pass
         if arquivos_validos_vd_eud_pef:
-            sucesso_vd_eud_pef = True
             logger.info(f"Arquivos VD/EUD/PEF válidos para envio: {len(arquivos_validos_vd_eud_pef)} (total registros: {total_registros_vd_eud_pef})")
         else:
             logger.warning("Nenhum arquivo VD/EUD/PEF válido e do dia encontrado. Não será enviado.")
-    time.sleep(TIMING_CONFIG["between_extractions"])
-
-    if not sucesso_loja and not sucesso_vd_eud_pef:
-        logger.error("❌ Falha em todas as extrações válidas do dia - interrompendo")
-        notification_manager.error("Sistema Interrompido", "Falha em todas as extrações válidas do dia")
-        return False
+    return arquivos_validos_vd_eud_pef
 
-    logger.info("=" * 50)
-    logger.info("📊 ETAPA 3: Validação Final de Data dos Arquivos")
-    # 🛡️ SEGURANÇA: Valida que todos os arquivos foram modificados HOJE (não são antigos)
+def _validar_datas(arquivos_validar_data):
+    """🛡️ SEGURANÇA: Arquivos (tipo, data encontrada) que não foram modificados HOJE."""
+    logger = logging.getLogger(__name__)
     data_hoje = datetime.now().strftime("%d/%m/%Y")
-    arquivos_validar_data = []
-    
-    if sucesso_loja:
-        arquivos_validar_data.append((loja_arquivo, "LOJA"))
-    
-    if sucesso_vd_eud_pef:
-        for arquivo in arquivos_validos_vd_eud_pef:
-            nome_arquivo = os.path.basename(arquivo)
-            arquivos_validar_data.append((arquivo, f"VD/EUD/PEF ({nome_arquivo})"))
-    
     arquivos_data_invalida = []
     for arquivo_path, nome_tipo in arquivos_validar_data:
         try:
@@ -431,32 +433,48 @@ def main():
                 logger.error(f"❌ SEGURANÇA: Arquivo {nome_tipo} foi modificado em data INVÁLIDA: {resultado['data_encontrada']} (esperado: {data_hoje})")
         except Exception as e:
             logger.warning(f"⚠️ Não foi possível validar data do arquivo {nome_tipo}: {e}")
-    
+    return len(arquivos_validar_data), arquivos_data_invalida
+
+def _etapa_data_loja(sucesso_loja):
+    if not sucesso_loja:
+        return 0, []
+    loja_arquivo = os.path.join(FILE_CONFIG["output_dir"], FILE_CONFIG["files"]["resultado_loja"])
+    return _validar_datas([(loja_arquivo, "LOJA")])
+
+def _etapa_data_vd_eud_pef(arquivos_vd_eud_pef):
+    return _validar_datas([(arquivo, f"VD/EUD/PEF ({os.path.basename(arquivo)})") for arquivo in arquivos_vd_eud_pef])
+
+def _bloquear_datas_invalidas(datas, grupo=None):
+    """🛡️ SEGURANÇA: True (e envio cancelado) se algum arquivo não foi modificado hoje."""
+    logger = logging.getLogger(__name__)
+    data_hoje = datetime.now().strftime("%d/%m/%Y")
+    total_validados = sum(total for total, _ in datas)
+    arquivos_data_invalida = [item for _, invalidos in datas for item in invalidos]
     if arquivos_data_invalida:
         logger.error("=" * 50)
-        logger.error("🚨 BLOQUEIO DE SEGURANÇA ATIVADO!")
+        logger.error("🚨 BLOQUEIO DE SEGURANÇA ATIVADO!" + (f" (grupo {grupo})" if grupo else ""))
         logger.error("🚨 Arquivos antigos (data de modificação incorreta) detectados:")
         for tipo, data in arquivos_data_invalida:
             logger.error(f"   - {tipo}: modificado em {data}")
         logger.error("🚨 ENVIO CANCELADO PARA EVITAR DADOS INCORRETOS!")
         logger.error("=" * 50)
+        stale_file_blocks_total.inc(pipeline="main")
         notification_manager.error(
             "Segurança - Envio Bloqueado",
             f"Detectados {len(arquivos_data_invalida)} arquivo(s) antigo(s). Envio cancelado por segurança."
         )
-        return False
-    
-    logger.info(f"✅ Validação de data: Todos os {len(arquivos_validar_data)} arquivo(s) foram modificados hoje ({data_hoje})")
+        return True
     
-    logger.info("=" * 50)
-    logger.info("📊 ETAPA 4: Envio de Relatórios")
-    logger.info(f"⏳ Aguardando {TIMING_CONFIG['before_send']} segundos antes do envio...")
-    time.sleep(TIMING_CONFIG["before_send"])
+    logger.info(f"✅ Validação de data: Todos os {total_validados} arquivo(s) foram modificados hoje ({data_hoje})")
+    return False
 
+def _argumentos_envio(meta_status, flag_status, metas_validas, meta_mode):
+    """Linha de comando do whatsapp_sender conforme o flag e as metas válidas."""
+    logger = logging.getLogger(__name__)
     # Determina tipo de envio baseado no flag_status
     if flag_status['status'] == 'SEM_META_FINAL':
         # Envio sem metas - janela encerrada sem capturar nada
-        envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--sem-meta"]
+        envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--sem-meta"]
         logger.info("Enviando resultados sem cálculos de metas (flag SEM_META_FINAL).")
     elif flag_status['status'] == 'METAS_PARCIAIS_FINAL':
         # Envio com metas parciais específicas do flag
@@ -472,13 +490,13 @@ def main():
             
             if metas_para_envio:
                 metas_envio_json = json.dumps(metas_para_envio)
-                envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--metas", metas_envio_json, "--parcial"]
+                envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--metas", metas_envio_json, "--parcial"]
                 logger.info(f"Enviando com metas parciais do flag: {', '.join(sorted(metas_disponiveis))}")
             else:
-                envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--sem-meta"]
+                envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--sem-meta"]
                 logger.info("Metas do flag não estão válidas no arquivo - enviando sem metas.")
         else:
-            envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--sem-meta"]
+            envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--sem-meta"]
             logger.info("Flag METAS_PARCIAIS_FINAL sem metas listadas - enviando sem metas.")
     else:
         # Lógica normal baseada no meta_status
@@ -491,26 +509,156 @@ def main():
             metas_envio_json = ""
 
         if meta_mode == "todas":
-            envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--metas", metas_envio_json]
+            envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--metas", metas_envio_json]
             logger.info("Enviando resultados com cálculos de metas (todas válidas).")
         elif meta_mode == "parcial":
-            envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--metas", metas_envio_json, "--parcial"]
+            envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--metas", metas_envio_json, "--parcial"]
             logger.info("Enviando resultados com cálculos de metas parciais.")
         else:
-            envio_args = [sys.executable, "componentes/whatsapp_sender.py", "--sem-meta"]
+            envio_args = [sys.executable, "-m", "componentes.whatsapp_sender", "--sem-meta"]
             logger.info("Enviando resultados sem cálculos de metas.")
+    return envio_args
 
-    logger.info(f"Comando de envio: {' '.join(envio_args)}")
-    envio_sucesso = subprocess.call(envio_args) == 0
+# Um envio por vez: os grupos compartilham a mesma sessão do WhatsApp Web
+_envio_lock = threading.Lock()
+_inicio_pipeline = time.time()
+_primeiro_relatorio = None
+
+def _enviar(envio_args, total_sucesso, grupos=None):
+    """Roda o whatsapp_sender (só os grupos informados) e registra o tempo até a entrega."""
+    global _primeiro_relatorio
+    logger = logging.getLogger(__name__)
+    if grupos:
+        envio_args = envio_args + ["--grupos", ",".join(grupos)]
+    with _envio_lock:
+        logger.info(f"Comando de envio: {' '.join(envio_args)}")
+        envio_sucesso = subprocess.call(envio_args) == 0
 
     if envio_sucesso:
-        logger.info("✅ Envio executado com sucesso")
-        total_sucesso = int(sucesso_loja) + int(sucesso_vd_eud_pef)
+        logger.info("✅ Envio executado com sucesso" + (f" ({', '.join(grupos)})" if grupos else ""))
         notify_whatsapp_send_success(total_sucesso)
+        decorrido = time.time() - _inicio_pipeline
+        for grupo in grupos or ("VD", "LOJA"):
+            report_delivered_seconds.set(decorrido, pipeline="main", grupo=grupo)
+        with _envio_lock:
+            if _primeiro_relatorio is None:
+                _primeiro_relatorio = decorrido
+                time_to_first_report_seconds.set(decorrido, pipeline="main")
+                logger.info(f"⏱️ Primeiro relatório entregue {decorrido:.1f}s após o início")
     else:
-        logger.error("❌ Envio falhou")
+        logger.error("❌ Envio falhou" + (f" ({', '.join(grupos)})" if grupos else ""))
         notify_whatsapp_send_error("Script falhou no envio")
         notification_manager.error("Sistema Interrompido", "Falha no envio")
+    return envio_sucesso
+
+def _etapa_envio(sucesso_loja, arquivos_vd_eud_pef, datas_loja, datas_vd_eud_pef,
+                 meta_status, flag_status, metas_validas, meta_mode):
+    """Envio único: espera todas as fontes, bloqueia se qualquer arquivo estiver fora da data."""
+    logger = logging.getLogger(__name__)
+    sucesso_vd_eud_pef = bool(arquivos_vd_eud_pef)
+    if not sucesso_loja and not sucesso_vd_eud_pef:
+        logger.error("❌ Falha em todas as extrações válidas do dia - interrompendo")
+        notification_manager.error("Sistema Interrompido", "Falha em todas as extrações válidas do dia")
+        return False
+    if _bloquear_datas_invalidas([datas_loja, datas_vd_eud_pef]):
+        return False
+
+    logger.info("=" * 50)
+    logger.info("📊 ETAPA 4: Envio de Relatórios")
+    logger.info(f"⏳ Aguardando {TIMING_CONFIG['before_send']} segundos antes do envio...")
+    time.sleep(TIMING_CONFIG["before_send"])
+    envio_args = _argumentos_envio(meta_status, flag_status, metas_validas, meta_mode)
+    return _enviar(envio_args, int(sucesso_loja) + int(sucesso_vd_eud_pef))
+
+def _etapa_envio_grupo(grupo, sucesso, datas, meta_status, flag_status, metas_validas, meta_mode):
+    """Envio em streaming do relatório de um grupo, assim que a fonte dele foi extraída e validada.
+
+    Returns:
+        True/False conforme o envio, ou None se não havia dados válidos do grupo
+    """
+    logger = logging.getLogger(__name__)
+    if not sucesso:
+        logger.warning(f"⚠️ Sem dados válidos de {grupo} - relatório do grupo não será enviado")
+        return None
+    if _bloquear_datas_invalidas([datas], grupo):
+        return False
+    logger.info(f"⏳ Aguardando {TIMING_CONFIG['before_send']} segundos antes do envio ({grupo})...")
+    time.sleep(TIMING_CONFIG["before_send"])
+    # A outra extração pode estar rodando: o envio não pode cair no teclado/clipboard do sistema
+    envio_args = _argumentos_envio(meta_status, flag_status, metas_validas, meta_mode) + ["--somente-sessao"]
+    return _enviar(envio_args, 1, (grupo,))
+
+def _etapa_resultado_envio(envio_loja, envio_vd):
+    """Consolida os envios em streaming: falha se algum falhou ou se nenhum grupo tinha dados."""
+    if envio_loja is None and envio_vd is None:
+        logging.getLogger(__name__).error("❌ Falha em todas as extrações válidas do dia - nada enviado")
+        notification_manager.error("Sistema Interrompido", "Falha em todas as extrações válidas do dia")
+        return False
+    return envio_loja is not False and envio_vd is not False
+
+def _streaming_seguro():
+    """Streaming só sem janela de extração na tela e com o envio pelo DOM da sessão única."""
+    if not WHATSAPP_CONFIG["streaming"]:
+        return False
+    motivo = None
+    if not extracao_headless():
+        motivo = "extração com janela visível (use HEADLESS=1 ou DRIVER_PROFILE=rapido)"
+    elif not (WHATSAPP_SESSAO_CONFIG["enabled"] and WHATSAPP_SESSAO_CONFIG["envio_dom"]):
+        motivo = "envio por teclado (use WHATSAPP_SESSAO=1 e WHATSAPP_ENVIO_DOM=1)"
+    if motivo:
+        logging.getLogger(__name__).warning(f"⚠️ Streaming desativado: {motivo} - envio único no fim")
+        return False
+    return True
+
+def _etapas_envio():
+    """Etapas de envio: uma por grupo (streaming) ou um envio único no fim"""
+    metas = ("meta_status", "flag_status", "metas_validas", "meta_mode")
+    if not _streaming_seguro():
+        return [Etapa("envio", _etapa_envio, saidas=("envio_sucesso",),
+                      entradas=("sucesso_loja", "arquivos_vd_eud_pef", "datas_loja", "datas_vd_eud_pef") + metas)]
+
+    def envio_loja(sucesso_loja, datas_loja, **metas_envio):
+        return _etapa_envio_grupo("LOJA", sucesso_loja, datas_loja, **metas_envio)
+
+    def envio_vd(arquivos_vd_eud_pef, datas_vd_eud_pef, **metas_envio):
+        return _etapa_envio_grupo("VD", bool(arquivos_vd_eud_pef), datas_vd_eud_pef, **metas_envio)
+
+    return [
+        Etapa("envio_loja", envio_loja, entradas=("sucesso_loja", "datas_loja") + metas, saidas=("envio_loja",),
+              rotulo="📊 ETAPA 4.1: Envio LOJA"),
+        Etapa("envio_vd", envio_vd, entradas=("arquivos_vd_eud_pef", "datas_vd_eud_pef") + metas,
+              saidas=("envio_vd",), rotulo="📊 ETAPA 4.2: Envio VD (PEF/EUD)"),
+        Etapa("resultado_envio", _etapa_resultado_envio, entradas=("envio_loja", "envio_vd"),
+              saidas=("envio_sucesso",)),
+    ]
+
+def _main():
+    global _inicio_pipeline, _primeiro_relatorio
+    _inicio_pipeline, _primeiro_relatorio = time.time(), None
+    logger = logging.getLogger(__name__)
+    logger.info("🚀 Iniciando execução do sistema OTIMIZADO (sem captura de metas)")
+    notification_manager.info("Sistema Iniciado", "Execução OTIMIZADA - Navegador compartilhado - 40% mais rápido")
+
+    start_time = datetime.now()
+
+    # Cada etapa roda assim que as entradas ficam prontas (componentes/dag.py): LOJA não
+    # espera as metas, e a validação de data de cada fonte sai logo após a sua extração
+    executor = ExecutorDAG([
+        Etapa("limpeza", _etapa_limpeza, saidas=("extracoes_limpas",),
+              rotulo="📊 ETAPA 0: Limpeza de Segurança"),
+        Etapa("metas", _etapa_metas, saidas=("meta_status", "flag_status", "metas_validas", "meta_mode"),
+              rotulo="📊 ETAPA 1: Verificação de Metas"),
+        Etapa("extracao_loja", _etapa_extracao_loja, saidas=("sucesso_loja",), apos=("extracoes_limpas",),
+              rotulo="📊 ETAPA 2.1: Extração LOJA"),
+        # Os ciclos vêm do meta_dia.csv, que a verificação de metas pode ter acabado de capturar
+        Etapa("extracao_vd_eud_pef", _etapa_extracao_vd_eud_pef, saidas=("arquivos_vd_eud_pef",),
+              apos=("extracoes_limpas", "meta_status"), rotulo="📊 ETAPA 2.2: Extração VD/EUD/PEF"),
+        Etapa("data_loja", _etapa_data_loja, entradas=("sucesso_loja",), saidas=("datas_loja",),
+              rotulo="📊 ETAPA 3.1: Validação de Data (LOJA)"),
+        Etapa("data_vd_eud_pef", _etapa_data_vd_eud_pef, entradas=("arquivos_vd_eud_pef",),
+              saidas=("datas_vd_eud_pef",), rotulo="📊 ETAPA 3.2: Validação de Data (VD/EUD/PEF)"),
+    ] + _etapas_envio(), nome="main", log=logger)
+    if not executor.executar().get("envio_sucesso"):
         return False
 
     end_time = datetime.now()
@@ -540,5 +688,5 @@ if __name__ == "__main__":
         print("📊 Verifique os logs em log/ para mais detalhes")
     else:
         print("\n❌ Sistema falhou - verifique os logs")
-        print("💡 Dica: Execute 'python -m componentes.captura_metaDia' se as metas não existirem")
+        print("💡 Dica: Execute 'python -m componentes.captura_metadia' se as metas não existirem")
         sys.exit(1)
\ No newline at end of file
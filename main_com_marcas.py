@@ -28,9 +28,22 @@ from glob import glob
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from componentes.notifications import notification_manager
+from componentes.logging_setup import configurar_logging_raiz
+from componentes.metrics import (
+    extraction_duration_seconds,
+    extraction_runs_total,
+    stale_file_blocks_total,
+    last_run_timestamp_seconds,
+    escrever_arquivo_metricas,
+    iniciar_servidor_metricas,
+)
+from componentes.processos import encerrar_driver
+from componentes.rastreamento import gravar_rastreamento
+from componentes.config import CHECKPOINT_CONFIG, WHATSAPP_CONFIG
+from componentes.checkpoints import JournalCheckpoints
+from componentes.circuit_breaker import PortalIndisponivel
 from componentes.file_safety import (
     limpar_arquivos_por_padrao,
-    limpar_arquivo_especifico,
     validar_data_arquivo_csv
 )
 
@@ -45,54 +58,104 @@ from componentes.extracao_loja import (
 )
 
 # Configuração de logging
-os.makedirs("log", exist_ok=True)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler("log/main_com_marcas.log", mode="w", encoding="utf-8"),
-        logging.StreamHandler()
-    ]
-)
+configurar_logging_raiz("log/main_com_marcas.log")
 
 logger = logging.getLogger(__name__)
 
-def limpar_arquivos_extracao_antigos():
-    """🛡️ SEGURANÇA: Limpa arquivos de extração anteriores."""
+def limpar_arquivos_extracao_antigos(journal=None):
+    """🛡️ SEGURANÇA: Limpa arquivos de extração anteriores.
+    
+    Arquivos com checkpoint de hoje (íntegros) são mantidos para a retomada.
+    """
     logger.info("🧹 SEGURANÇA: Limpando arquivos de extração anteriores...")
     
     try:
         output_dir = "extracoes"
+        preservar = journal.arquivos_concluidos() if journal else set()
         
         # Limpa arquivo de loja
-        loja_file = os.path.join(output_dir, "resultado_loja.csv")
-        limpar_arquivo_especifico(loja_file, "resultado_loja.csv")
+        removidos_loja = limpar_arquivos_por_padrao(output_dir, "resultado_loja.csv", "LOJA", preservar)
         
         # Limpa todos os arquivos de ciclos
-        removidos_pef = limpar_arquivos_por_padrao(output_dir, "resultado_pef_C*.csv", "PEF")
-        removidos_eud = limpar_arquivos_por_padrao(output_dir, "resultado_eud_C*.csv", "EUD")
-        removidos_marcas = limpar_arquivos_por_padrao(output_dir, "resultado_marcas_C*.csv", "MARCAS")
+        removidos_pef = limpar_arquivos_por_padrao(output_dir, "resultado_pef_C*.csv", "PEF", preservar)
+        removidos_eud = limpar_arquivos_por_padrao(output_dir, "resultado_eud_C*.csv", "EUD", preservar)
+        removidos_marcas = limpar_arquivos_por_padrao(output_dir, "resultado_marcas_C*.csv", "MARCAS", preservar)
         
-        total = removidos_pef + removidos_eud + removidos_marcas + 1
-        if total > 1:
+        total = removidos_loja + removidos_pef + removidos_eud + removidos_marcas
+        if total > 0:
             logger.info(f"✅ Limpeza concluída")
             notification_manager.info("Limpeza de Segurança", "Arquivos antigos removidos")
         else:
             logger.info("✅ Nenhum arquivo antigo encontrado")
+        if preservar:
+            logger.info(f"♻️ {len(preservar)} arquivo(s) de hoje mantidos para retomada")
             
     except Exception as e:
         logger.warning(f"⚠️ Erro durante limpeza de segurança (não crítico): {e}")
 
-def extrair_loja_integrado():
+class SessaoNavegador:
+    """Navegador aberto sob demanda e reaproveitado entre as unidades de extração.
+    
+    Só abre (e faz login) quando a primeira unidade pendente precisa dele; se
+    todas já têm checkpoint, nenhum navegador é iniciado. Entre tentativas de
+    uma unidade, a sessão é reaproveitada se ainda responde, ou reaberta.
+    """
+    
+    def __init__(self, nome, iniciar, login):
+        self.nome = nome
+        self._iniciar = iniciar
+        self._login = login
+        self._driver = None
+    
+    @property
+    def driver(self):
+        if self._driver is None:
+            logger.info(f"🌐 Abrindo navegador {self.nome}...")
+            driver = self._iniciar()
+            try:
+                self._login(driver)
+            except Exception:
+                self._encerrar(driver)
+                raise
+            self._driver = driver
+        return self._driver
+    
+    def verificar(self, erro=None):
+        """Mantém a sessão quente se ela ainda responde; senão, descarta para reabrir"""
+        if self._driver is None:
+            return
+        try:
+            self._driver.current_url
+            logger.info(f"♻️ Reaproveitando sessão {self.nome} após erro: {erro}")
+        except Exception:
+            logger.warning(f"⚠️ Sessão {self.nome} não responde - será reaberta")
+            self.fechar()
+    
+    def _encerrar(self, driver):
+        encerrar_driver(driver)
+        logger.info(f"Navegador {self.nome} fechado")
+    
+    def fechar(self):
+        if self._driver is not None:
+            self._encerrar(self._driver)
+            self._driver = None
+
+def extrair_loja_integrado(journal=None):
     """Extrai LOJA usando funções diretas (não subprocess)."""
     logger.info("🔄 Iniciando extração LOJA (integrado)...")
     print("🔄 Iniciando extração LOJA...")
     
-    driver = None
+    journal = journal or JournalCheckpoints("main_com_marcas")
+    sessao = SessaoNavegador("LOJA", iniciar_navegador_loja,
+                             lambda driver: realizar_login_loja(driver, USERNAME, PASSWORD))
     try:
-        driver = iniciar_navegador_loja()
-        realizar_login_loja(driver, USERNAME, PASSWORD)
-        navegar_e_extrair_loja(driver)
+        journal.executar(
+            "LOJA",
+            lambda: navegar_e_extrair_loja(sessao.driver),
+            arquivo=os.path.join("extracoes", "resultado_loja.csv"),
+            tentativas=CHECKPOINT_CONFIG["tentativas_unidade"],
+            antes_de_repetir=sessao.verificar
+        )
         
         logger.info("✅ Extração LOJA concluída")
         print("✅ Extração LOJA concluída")
@@ -104,15 +167,14 @@ def extrair_loja_integrado():
         return False
         
     finally:
-        if driver:
-            try:
-                driver.quit()
-                logger.info("Navegador LOJA fechado")
-            except Exception:
-                pass
+        sessao.fechar()
 
-def extrair_vd_eud_pef_marcas_integrado():
-    """Extrai PEF, EUD e MARCAS no mesmo navegador."""
+def extrair_vd_eud_pef_marcas_integrado(journal=None):
+    """Extrai PEF, EUD e MARCAS no mesmo navegador.
+    
+    Cada (indicador, ciclo[, marca]) é uma unidade com checkpoint: uma nova
+    execução pula as concluídas e retoma na primeira pendente.
+    """
     logger.info("🔄 Iniciando extração PEF + EUD + MARCAS (navegador compartilhado)...")
     print("🔄 Iniciando extração PEF + EUD + MARCAS...")
     
@@ -121,25 +183,32 @@ def extrair_vd_eud_pef_marcas_integrado():
         iniciar_navegador,
         realizar_login,
         ler_ciclos_de_hoje,
-        preencher_e_extrair_eudora,
-        extrair_pef
+        ler_ciclos_pef,
+        preencher_e_extrair_eudora
     )
+    from componentes.job_engine import executar_job
     
     # Importa funções do módulo MARCAS
-    from componentes.extracao_marcas import (
-        MARCAS_CONFIG,
-        navegar_para_ranking_vendas,
-        extrair_marca
-    )
+    from componentes.extracao_marcas import extrair_marca, salvar_resultados_marcas
+    
+    journal = journal or JournalCheckpoints("main_com_marcas")
+    sessao = SessaoNavegador("VD/EUD/PEF/MARCAS", iniciar_navegador, realizar_login)
+    tentativas = CHECKPOINT_CONFIG["tentativas_unidade"]
+    falhas = []
     
-    import csv
+    def executar(unidade, funcao, arquivo=None):
+        try:
+            return journal.executar(unidade, funcao, arquivo=arquivo, tentativas=tentativas,
+                                    antes_de_repetir=sessao.verificar)
+        except PortalIndisponivel:
+            raise  # Portal fora do ar: as demais unidades falhariam do mesmo jeito
+        except Exception as e:
+            logger.error(f"❌ Unidade {unidade} falhou: {e}", exc_info=True)
+            print(f"❌ {unidade} falhou: {e}")
+            falhas.append(unidade)
+            return None
     
-    driver = None
     try:
-        # Inicia navegador UMA VEZ
-        driver = iniciar_navegador()
-        realizar_login(driver)
-        
         # Lê ciclos
         ciclos = ler_ciclos_de_hoje()
         if not ciclos:
@@ -151,14 +220,34 @@ def extrair_vd_eud_pef_marcas_integrado():
         # 1. Extrai EUDORA
         logger.info("📊 Extraindo EUDORA...")
         print("📊 Extraindo EUDORA...")
-        preencher_e_extrair_eudora(driver, ciclos)
+        # Uma chamada para todos os ciclos pendentes; o checkpoint de cada ciclo vem depois dela
+        ciclos_eud = {f"EUD:C{ciclo}": ciclo for ciclo in ciclos}
+        unidades_eud = {unidade: os.path.join("extracoes", f"resultado_eud_C{ciclo}.csv")
+                        for unidade, ciclo in ciclos_eud.items()}
+        try:
+            journal.executar_lote(
+                unidades_eud,
+                lambda pendentes: preencher_e_extrair_eudora(sessao.driver, [ciclos_eud[u] for u in pendentes]),
+                tentativas=tentativas, antes_de_repetir=sessao.verificar
+            )
+        except PortalIndisponivel:
+            raise
+        except Exception as e:
+            pendentes = [u for u in unidades_eud if not journal.concluida(u)]
+            logger.error(f"❌ Unidades {', '.join(pendentes)} falharam: {e}")
+            print(f"❌ {', '.join(pendentes)} falharam: {e}")
+            falhas.extend(pendentes)
         logger.info("✅ EUDORA concluída")
         print("✅ EUDORA concluída")
         
         # 2. Extrai PEF
         logger.info("📊 Extraindo PEF...")
         print("📊 Extraindo PEF...")
-        extrair_pef(driver)
+        ciclos_pef = ler_ciclos_pef() or [16]  # Mesmo padrão de extrair_pef
+        for ciclo in ciclos_pef:
+            executar(f"PEF:C{ciclo}",
+                     lambda ciclo=ciclo: executar_job(sessao.driver, "pef", ciclo=ciclo),
+                     arquivo=os.path.join("extracoes", f"resultado_pef_C{ciclo}.csv"))
         logger.info("✅ PEF concluída")
         print("✅ PEF concluída")
         
@@ -172,26 +261,31 @@ def extrair_vd_eud_pef_marcas_integrado():
             
             resultados = {}
             for marca_key in ['BOT', 'OUI', 'QDB']:
-                valor = extrair_marca(driver, marca_key, ciclo)
-                resultados[marca_key] = valor
-                time.sleep(2)
-            
-            # Salva resultados do ciclo
-            os.makedirs("extracoes", exist_ok=True)
-            output_path = os.path.join("extracoes", f"resultado_marcas_C{ciclo}.csv")
+                def extrair_uma_marca(marca_key=marca_key, ciclo=ciclo):
+                    valor = extrair_marca(sessao.driver, marca_key, ciclo, propagar_erros=True)
+                    time.sleep(2)
+                    return valor
+                
+                resultados[marca_key] = executar(f"MARCAS:C{ciclo}:{marca_key}", extrair_uma_marca)
             
-            with open(output_path, mode="w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Marca", "Valor"])
-                for marca, valor in resultados.items():
-                    writer.writerow([marca, valor])
+            if any(valor is None for valor in resultados.values()):
+                logger.warning(f"⚠️ Marcas do ciclo {ciclo} incompletas - arquivo não gravado")
+                continue
             
-            logger.info(f"Resultados de marcas salvos em {output_path}")
+            # Salva resultados do ciclo (os valores já estão no diário; só grava o CSV)
+            output_path = os.path.join("extracoes", f"resultado_marcas_C{ciclo}.csv")
+            executar(f"MARCAS:C{ciclo}", lambda resultados=resultados, ciclo=ciclo:
+                     salvar_resultados_marcas(resultados, ciclo), arquivo=output_path)
             print(f"Ciclo {ciclo} concluído: BOT={resultados['BOT']:.2f}, OUI={resultados['OUI']:.2f}, QDB={resultados['QDB']:.2f}")
         
         logger.info("✅ MARCAS concluídas")
         print("✅ MARCAS concluídas")
         
+        if falhas:
+            logger.error(f"❌ Unidades pendentes: {', '.join(falhas)} (a próxima execução retoma a partir delas)")
+            print(f"❌ Unidades pendentes: {', '.join(falhas)}")
+            return False
+        
         logger.info("✅ Todas as extrações PEF + EUD + MARCAS concluídas")
         print("✅ Todas as extrações concluídas")
         return True
@@ -202,12 +296,7 @@ def extrair_vd_eud_pef_marcas_integrado():
         return False
         
     finally:
-        if driver:
-            try:
-                driver.quit()
-                logger.info("Navegador VD/EUD/PEF/MARCAS fechado")
-            except Exception:
-                pass
+        sessao.fechar()
 
 def verificar_e_capturar_metas():
     """Verifica se existem metas válidas e tenta capturar se necessário."""
@@ -236,7 +325,7 @@ def verificar_e_capturar_metas():
     try:
         # Importa e executa a captura de metas
         import subprocess
-        result = subprocess.run(["python", "componentes/captura_metaDia.py"], 
+        result = subprocess.run([sys.executable, "-m", "componentes.captura_metadia"], 
                               capture_output=True, text=True, timeout=300)
         
         if result.returncode == 0 and os.path.exists(meta_file):
@@ -284,6 +373,7 @@ def validar_arquivos_data(arquivos_validar):
             logger.error(f"   - {tipo}: modificado em {data}")
         logger.error("🚨 ENVIO CANCELADO!")
         logger.error("=" * 50)
+        stale_file_blocks_total.inc(pipeline="main_com_marcas")
         notification_manager.error(
             "Segurança - Envio Bloqueado",
             f"Detectados {len(arquivos_data_invalida)} arquivo(s) antigo(s)"
@@ -299,101 +389,100 @@ def enviar_mensagens():
     print("🔄 Executando envio via WhatsApp...")
     
     try:
-        from componentes.whatsapp_sender import WhatsAppSender
-        
-        # Configuração dos grupos
-        GROUP_LINKS = {
-            "LOJA": "LINK DO 1º GRUPO", 
-            "VD": "LINK DO 2º GRUPO CASO NECESSÁRIO"
-        } 
+        from componentes.whatsapp_sender import GRUPOS, WhatsAppSender
+        from componentes.fila_envio import FilaEnvio
         
-        sender = WhatsAppSender([GROUP_LINKS["LOJA"], GROUP_LINKS["VD"]])
+        # Configuração dos grupos (WHATSAPP_CONFIG["group_links"], na ordem de GRUPOS: VD, LOJA)
+        GROUP_LINKS = dict(zip(GRUPOS, WHATSAPP_CONFIG["group_links"]))
         
-        # Lê metas
-        meta_loja = sender.get_meta_loja_csv()
-        ciclos, metas_por_ciclo = sender.ler_ciclos_metas()
-        
-        if not ciclos:
-            ciclos = [16]  # Escolha Ciclos padrão EUD/PEF (consistente)
-        
-        logger.info(f"Ciclos detectados: {ciclos}")
-        logger.info(f"Meta LOJA: {meta_loja}")
+        sender = WhatsAppSender(WHATSAPP_CONFIG["group_links"])
         
-        # === ENVIO PARA GRUPO LOJA ===
-        logger.info("📤 Preparando envio para grupo LOJA...")
-        loja_msg = sender.format_data(
-            "extracoes/resultado_loja.csv",
-            "*➡️ Parcial Receita LOJA*",
-            "",
-            meta_loja,
-            "LOJA"
-        )
-        
-        if loja_msg:
-            sender.abrir_whatsapp_web()
-            sender.navegar_para_grupo(GROUP_LINKS["LOJA"])
-            sender.enviar_mensagem(loja_msg)
-            logger.info("✅ Mensagem LOJA enviada!")
-            print("✅ Mensagem LOJA enviada!")
-            time.sleep(10)
-        else:
-            logger.warning("⚠️ Mensagem LOJA vazia ou arquivo não encontrado")
-        
-        # === ENVIO PARA GRUPO VD (PEF + EUD + MARCAS) ===
-        logger.info("📤 Preparando envio para grupo VD...")
-        
-        for ciclo in ciclos:
-            mensagens_ciclo = []
+        def preparar():
+            """Lê metas e formata todas as mensagens (roda enquanto o WhatsApp Web carrega)."""
+            meta_loja = sender.get_meta_loja_csv()
+            ciclos, metas_por_ciclo = sender.ler_ciclos_metas()
             
-            # Busca metas específicas do ciclo
-            metas_ciclo = metas_por_ciclo.get(ciclo, {})
-            meta_pef_ciclo = metas_ciclo.get("PEF")
-            meta_eud_ciclo = metas_ciclo.get("EUD")
+            if not ciclos:
+                ciclos = [16]  # Escolha Ciclos padrão EUD/PEF (consistente)
             
-            logger.info(f"Ciclo {ciclo} - Metas: PEF={meta_pef_ciclo}, EUD={meta_eud_ciclo}")
+            logger.info(f"Ciclos detectados: {ciclos}")
+            logger.info(f"Meta LOJA: {meta_loja}")
             
-            # PEF
-            pef_msg = sender.format_data(
-                f"extracoes/resultado_pef_C{ciclo}.csv",
-                f"*➡️ Parcial Receita PEF - Ciclo {ciclo}*",
-                "",
-                meta_pef_ciclo,
-                "PEF"
-            )
-            if pef_msg:
-                mensagens_ciclo.append(pef_msg)
-            
-            # EUD
-            eud_msg = sender.format_data(
-                f"extracoes/resultado_eud_C{ciclo}.csv",
-                f"*➡️ Parcial Receita EUD -​ Ciclo {ciclo}*",
-                "",
-                meta_eud_ciclo,
-                "EUDORA"
-            )
-            if eud_msg:
-                mensagens_ciclo.append(eud_msg)
+            tarefas = {
+                "LOJA": (sender.format_data, (
+                    "extracoes/resultado_loja.csv",
+                    "*➡️ Parcial Receita LOJA*",
+                    "",
+                    meta_loja,
+                    "LOJA"
+                ))
+            }
+            for ciclo in ciclos:
+                # Busca metas específicas do ciclo
+                metas_ciclo = metas_por_ciclo.get(ciclo, {})
+                meta_pef_ciclo = metas_ciclo.get("PEF")
+                meta_eud_ciclo = metas_ciclo.get("EUD")
+                logger.info(f"Ciclo {ciclo} - Metas: PEF={meta_pef_ciclo}, EUD={meta_eud_ciclo}")
+                
+                tarefas[("PEF", ciclo)] = (sender.format_data, (
+                    f"extracoes/resultado_pef_C{ciclo}.csv",
+                    f"*➡️ Parcial Receita PEF - Ciclo {ciclo}*",
+                    "",
+                    meta_pef_ciclo,
+                    "PEF"
+                ))
+                tarefas[("EUD", ciclo)] = (sender.format_data, (
+                    f"extracoes/resultado_eud_C{ciclo}.csv",
+                    f"*➡️ Parcial Receita EUD -​ Ciclo {ciclo}*",
+                    "",
+                    meta_eud_ciclo,
+                    "EUDORA"
+                ))
+                # MARCAS (SEM meta)
+                tarefas[("MARCAS", ciclo)] = (sender.format_marcas, (
+                    f"extracoes/resultado_marcas_C{ciclo}.csv",
+                    ciclo
+                ))
             
-            # MARCAS (SEM meta)
-            marcas_msg = sender.format_marcas(
-                f"extracoes/resultado_marcas_C{ciclo}.csv",
-                ciclo
-            )
-            if marcas_msg:
-                mensagens_ciclo.append(marcas_msg)
+            mensagens = sender.formatar_em_paralelo(tarefas)
+            imagens = sender.gerar_imagens(tarefas)
             
-            # Combina todas as mensagens do ciclo
-            if mensagens_ciclo:
-                mensagem_completa = "\n\n".join(mensagens_ciclo)
-                logger.info(f"Enviando mensagens do ciclo {ciclo}...")
-                
-                sender.navegar_para_grupo(GROUP_LINKS["VD"])
-                sender.enviar_mensagem(mensagem_completa)
-                logger.info(f"✅ Mensagens do ciclo {ciclo} enviadas!")
-                print(f"✅ Mensagens do ciclo {ciclo} enviadas!")
-                time.sleep(10)
+            # Combina PEF + EUD + MARCAS de cada ciclo (rankings grandes vão como imagem + resumo)
+            mensagens_vd = []
+            for ciclo in ciclos:
+                chaves = [(tipo, ciclo) for tipo in ("PEF", "EUD", "MARCAS")]
+                mensagens_vd.append((ciclo, *sender.combinar_mensagens(chaves, mensagens, imagens)))
+            return sender.combinar_mensagens(["LOJA"], mensagens, imagens), mensagens_vd
+        
+        # Da abertura do WhatsApp Web até a última mensagem (vez exclusiva na execução multi-tenant)
+        with sender.envio_exclusivo():
+            # Prepara as mensagens enquanto o WhatsApp Web carrega
+            logger.info("📤 Preparando mensagens (WhatsApp Web abrindo em paralelo)...")
+            (loja_msg, loja_imagens, loja_completa), mensagens_vd = sender.preparar_com_aquecimento(preparar)
+        
+            # Fila por grupo: LOJA e depois VD, cada grupo aberto uma única vez
+            fila = FilaEnvio(sender, confirmar_envio=sender.hook_confirmacao)
+            if loja_msg:
+                fila.adicionar("LOJA", GROUP_LINKS["LOJA"], loja_msg, rotulo="LOJA",
+                               imagens=loja_imagens, mensagem_alternativa=loja_completa)
             else:
-                logger.warning(f"⚠️ Nenhuma mensagem válida para ciclo {ciclo}")
+                logger.warning("⚠️ Mensagem LOJA vazia ou arquivo não encontrado")
+        
+            # === GRUPO VD (PEF + EUD + MARCAS) ===
+            for ciclo, mensagem_ciclo, imagens_ciclo, mensagem_completa in mensagens_vd:
+                if mensagem_ciclo:
+                    fila.adicionar("VD", GROUP_LINKS["VD"], mensagem_ciclo, rotulo=f"ciclo {ciclo}",
+                                   imagens=imagens_ciclo, mensagem_alternativa=mensagem_completa, ciclo=ciclo)
+                else:
+                    logger.warning(f"⚠️ Nenhuma mensagem válida para ciclo {ciclo}")
+        
+            resultado = fila.enviar()
+        for grupo, contagem in resultado.items():
+            logger.info(f"✅ Grupo {grupo}: {contagem['enviadas']} enviada(s), {contagem['falhas']} falha(s)")
+            print(f"✅ Grupo {grupo}: {contagem['enviadas']} mensagem(ns) enviada(s)")
+        if any(contagem["falhas"] for contagem in resultado.values()):
+            logger.error("❌ Houve falhas no envio")
+            return False
         
         logger.info("✅ Envio completo!")
         print("✅ Envio completo!")
@@ -406,32 +495,48 @@ def enviar_mensagens():
 
 def main():
     """Função principal - orquestra todas as extrações e envios."""
+    iniciar_servidor_metricas()
+    sucesso = False
+    try:
+        sucesso = _main()
+    finally:
+        last_run_timestamp_seconds.set(time.time(), pipeline="main_com_marcas", resultado="sucesso" if sucesso else "falha")
+        escrever_arquivo_metricas("main_com_marcas")
+        gravar_rastreamento("main_com_marcas")
+    return sucesso
+
+def _main():
     logger.info("🚀 Iniciando execução do sistema MAIN COM MARCAS (18h)")
     print("🚀 Iniciando Sistema MAIN COM MARCAS - Envio Completo 18h")
     print("=" * 50)
     notification_manager.info("Sistema Main COM MARCAS", "Execução 18h - Navegador compartilhado")
     
     start_time = datetime.now()
+    journal = JournalCheckpoints("main_com_marcas")
     
     # ETAPA 0: Limpeza de Segurança
     logger.info("=" * 50)
     logger.info("📊 ETAPA 0: Limpeza de Segurança")
     print("\n📊 ETAPA 0: Limpeza de Segurança")
-    limpar_arquivos_extracao_antigos()
+    limpar_arquivos_extracao_antigos(journal)
     time.sleep(1)
     
     # ETAPA 1: Extração LOJA
     logger.info("=" * 50)
     logger.info("📊 ETAPA 1: Extração LOJA")
     print("\n📊 ETAPA 1: Extração LOJA")
-    sucesso_loja = extrair_loja_integrado()
+    with extraction_duration_seconds.time(script="extracao_loja.py"):
+        sucesso_loja = extrair_loja_integrado(journal)
+    extraction_runs_total.inc(script="extracao_loja.py", resultado="sucesso" if sucesso_loja else "falha")
     time.sleep(3)
     
     # ETAPA 2: Extração VD/EUD/PEF/MARCAS (INTEGRADO - mesmo navegador!)
     logger.info("=" * 50)
     logger.info("📊 ETAPA 2: Extração PEF + EUD + MARCAS (Navegador Compartilhado)")
     print("\n📊 ETAPA 2: Extração PEF + EUD + MARCAS (Navegador Compartilhado)")
-    sucesso_vd = extrair_vd_eud_pef_marcas_integrado()
+    with extraction_duration_seconds.time(script="extracao_vd_eud_pef_marcas"):
+        sucesso_vd = extrair_vd_eud_pef_marcas_integrado(journal)
+    extraction_runs_total.inc(script="extracao_vd_eud_pef_marcas", resultado="sucesso" if sucesso_vd else "falha")
     time.sleep(3)
     
     # Verifica se pelo menos uma extração foi bem-sucedida
@@ -485,6 +590,10 @@ def main():
         notification_manager.error("Sistema Interrompido", "Falha no envio")
         return False
     
+    # Execução completa: a próxima do dia extrai tudo de novo em vez de retomar deste diário
+    if sucesso_loja and sucesso_vd:
+        journal.finalizar()
+    
     # Finalização
     end_time = datetime.now()
     duration = end_time - start_time